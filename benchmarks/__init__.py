@@ -0,0 +1,7 @@
+#
+# file __init__.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
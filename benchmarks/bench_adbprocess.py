@@ -0,0 +1,58 @@
+#
+# file bench_adbprocess.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Micro-benchmark of adb subprocess per call overhead against stub adb.
+
+Usage: python -m benchmarks.bench_adbprocess [--calls N]
+"""
+
+import argparse
+import os
+import time
+from simpleadb.adbprocess import AdbProcess, AdbSubprocessTransport
+
+STUB_ADB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_adb")
+
+TRANSPORTS = {
+    "shell=True (before)": AdbSubprocessTransport(use_shell=True),
+    "argv": AdbSubprocessTransport(),
+    "argv, close_fds=False": AdbSubprocessTransport(close_fds=False),
+}
+
+
+def measure(transport: AdbSubprocessTransport, calls: int) -> float:
+    """Measure average time of a single adb call.
+
+    :param AdbSubprocessTransport transport: Transport.
+    :param int calls: Number of calls.
+    :return: Average time per call in sec.
+    :rtype: float
+    """
+    process = AdbProcess("stub-5554", STUB_ADB, transport)
+    cmd = ["shell", "getprop", "ro.build.version.sdk"]
+    process.check_output(cmd)
+    start = time.perf_counter()
+    for _ in range(calls):
+        process.check_output(cmd)
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=300)
+    options = parser.parse_args()
+    baseline = None
+    for name, transport in TRANSPORTS.items():
+        per_call = measure(transport, options.calls)
+        baseline = baseline if baseline else per_call
+        print(f"{name:24} {per_call * 1e3:8.3f} ms/call {baseline / per_call:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
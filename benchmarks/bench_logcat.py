@@ -0,0 +1,113 @@
+#
+# file bench_logcat.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Micro-benchmark of text and binary logcat decoding throughput on the
+sample buffers from tests/resources.
+
+Usage: python -m benchmarks.bench_logcat [--repeat N]
+"""
+
+import argparse
+import os
+import time
+from typing import Callable
+from simpleadb import adblogcat
+
+RESOURCES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "resources"
+)
+
+
+def read_resource(name: str, repeat: int) -> bytes:
+    """Read sample buffer repeated given number of times.
+
+    :param str name: Resource file name.
+    :param int repeat: Number of copies.
+    :return: Buffer.
+    :rtype: bytes
+    """
+    with open(os.path.join(RESOURCES, name), "rb") as resource:
+        return resource.read() * repeat
+
+
+def decode_text(data: bytes, level: str = "V") -> int:
+    """Decode threadtime buffer, access every field of messages with at
+    least given priority.
+
+    :param bytes data: Logcat text.
+    :param str level: Minimum priority.
+    :return: Number of accepted entries.
+    :rtype: int
+    """
+    min_level = adblogcat.LEVELS.index(level)
+    count = 0
+    for entry in adblogcat.read_entries(data.splitlines(keepends=True)):
+        if adblogcat.LEVELS.index(entry.level) >= min_level:
+            _ = entry.pid, entry.tid, entry.level, entry.tag, entry.message
+            count += 1
+    return count
+
+
+def decode_binary(data: bytes, level: str = "V") -> int:
+    """Decode binary buffer, access every field of messages with at least
+    given priority.
+
+    :param bytes data: Logcat binary output.
+    :param str level: Minimum priority.
+    :return: Number of accepted entries.
+    :rtype: int
+    """
+    accept = adblogcat.create_filter(level=level)
+    count = 0
+    for record in adblogcat.parse_binary(data):
+        if accept(record):
+            _ = record.pid, record.tid, record.level, record.tag, record.message
+            count += 1
+    return count
+
+
+def measure(decode: Callable[[bytes, str], int], data: bytes, level: str) -> float:
+    """Measure best decoding time of three runs.
+
+    :param Callable[[bytes, str], int] decode: Decoding function.
+    :param bytes data: Buffer.
+    :param str level: Minimum priority.
+    :return: Time in sec.
+    :rtype: float
+    """
+    elapsed = []
+    for _ in range(3):
+        start = time.perf_counter()
+        decode(data, level)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+
+def main() -> None:
+    """Run benchmark and print results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    options = parser.parse_args()
+    text = read_resource("logcat_threadtime.txt", options.repeat)
+    binary = read_resource("logcat_binary.bin", options.repeat)
+    entries = len(list(adblogcat.parse_binary(binary)))
+    for level in ("V", "E"):
+        text_time = measure(decode_text, text, level)
+        binary_time = measure(decode_binary, binary, level)
+        for name, elapsed, size in (
+            ("text (threadtime)", text_time, len(text)),
+            ("binary (-B)", binary_time, len(binary)),
+        ):
+            print(
+                f"level {level} {name:18} {entries / elapsed / 1e3:8.1f} k entries/s "
+                f"{size / elapsed / 1e6:7.1f} MB/s {text_time / elapsed:6.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
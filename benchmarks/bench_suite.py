@@ -0,0 +1,276 @@
+#
+# file bench_suite.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Benchmark suite against stub adb client and fake adb server with
+configurable latency and bandwidth. Measures per call overhead, push, pull
+and logcat throughput, fan-out scaling to many simulated devices and memory
+use, and writes results as JSON to compare between versions.
+
+Usage: python -m benchmarks.bench_suite [--quick] [--output results.json]
+[--compare baseline.json] [--latency SEC] [--bandwidth BYTES_PER_SEC]
+[--devices N]
+"""
+
+import argparse
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+import simpleadb
+from simpleadb.adbprocess import AdbProcess, AdbSubprocessTransport
+from tests.fakeadb import FakeAdbServer
+from .bench_logcat import read_resource
+
+STUB_ADB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_adb")
+
+LOWER = "lower"
+HIGHER = "higher"
+
+
+class Suite:
+    """Suite collects named results of benchmarks.
+
+    :param argparse.Namespace options: Command line options.
+    """
+
+    def __init__(self, options: argparse.Namespace):
+        self.options = options
+        self.results: List[Dict] = []
+
+    def add(self, name: str, value: float, unit: str, better: str) -> None:
+        """Add and print result.
+
+        :param str name: Benchmark name.
+        :param float value: Measured value.
+        :param str unit: Unit of value.
+        :param str better: 'lower' or 'higher'.
+        """
+        self.results.append(
+            {"name": name, "value": value, "unit": unit, "better": better}
+        )
+        print(f"{name:32} {value:12.3f} {unit}", flush=True)
+
+    def scale(self, full: int, quick: int) -> int:
+        """Get size of a benchmark depending on --quick option."""
+        return quick if self.options.quick else full
+
+
+def per_call(call: Callable[[], object], calls: int) -> float:
+    """Measure average time of a call after a warm up call.
+
+    :param Callable[[], object] call: Measured call.
+    :param int calls: Number of calls.
+    :return: Average time per call in sec.
+    :rtype: float
+    """
+    call()
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - start) / calls
+
+
+def bench_overhead(suite: Suite, fake: FakeAdbServer) -> None:
+    """Measure per call overhead of adb client, socket shell, shell v2 and
+    shell session."""
+    calls = suite.scale(200, 20)
+    process = AdbProcess("stub-5554", STUB_ADB, AdbSubprocessTransport())
+    cmd = ["shell", "getprop", "ro.build.version.sdk"]
+    suite.add(
+        "overhead.subprocess",
+        per_call(lambda: process.check_output(cmd), calls) * 1e3,
+        "ms/call",
+        LOWER,
+    )
+    device = simpleadb.AdbDevice(
+        "fake-0", transport=simpleadb.AdbSocketTransport(port=fake.port)
+    )
+    suite.add(
+        "overhead.socket_shell",
+        per_call(lambda: device.shell("true"), calls) * 1e3,
+        "ms/call",
+        LOWER,
+    )
+    suite.add(
+        "overhead.run_v2",
+        per_call(lambda: device.run("true"), calls) * 1e3,
+        "ms/call",
+        LOWER,
+    )
+    with device.session() as session:
+        suite.add(
+            "overhead.session_run",
+            per_call(lambda: session.run("true"), calls * 5) * 1e3,
+            "ms/call",
+            LOWER,
+        )
+    suite.add(
+        "overhead.get_state",
+        per_call(device.get_state, calls * 5) * 1e3,
+        "ms/call",
+        LOWER,
+    )
+
+
+def bench_throughput(suite: Suite, fake: FakeAdbServer, directory: str) -> None:
+    """Measure push, pull and logcat throughput."""
+    device = simpleadb.AdbDevice(
+        "fake-0", transport=simpleadb.AdbSocketTransport(port=fake.port)
+    )
+    size = suite.scale(64, 8) * 1024 * 1024
+    remote = os.path.join(directory, "remote.bin")
+    data = os.urandom(size)
+    start = time.perf_counter()
+    device.push(data, remote)
+    suite.add("push", size / (time.perf_counter() - start) / 1e6, "MB/s", HIGHER)
+    with open(os.devnull, "wb") as dest:
+        start = time.perf_counter()
+        device.pull(remote, dest)
+        elapsed = time.perf_counter() - start
+    suite.add("pull", size / elapsed / 1e6, "MB/s", HIGHER)
+
+    logcat = os.path.join(directory, "logcat.txt")
+    with open(logcat, "wb") as dest:
+        dest.write(read_resource("logcat_threadtime.txt", suite.scale(200, 20)))
+    fake.add_command("logcat", f"cat {logcat}")
+    start = time.perf_counter()
+    entries = sum(1 for _ in device.stream_logcat(dump=True))
+    elapsed = time.perf_counter() - start
+    suite.add("logcat", entries / elapsed / 1e3, "k entries/s", HIGHER)
+    suite.add("logcat.bytes", os.path.getsize(logcat) / elapsed / 1e6, "MB/s", HIGHER)
+
+
+def bench_fanout(suite: Suite, fake: FakeAdbServer) -> None:
+    """Measure shell command on many devices run concurrently."""
+    adb_server = simpleadb.AdbServer(
+        transport=simpleadb.AdbSocketTransport(port=fake.port)
+    )
+    devices = adb_server.devices()
+    for count in sorted({1, 16, len(devices)}):
+        start = time.perf_counter()
+        results = list(adb_server.map("shell", devices[:count], args=["true"]))
+        elapsed = time.perf_counter() - start
+        if not all(result.ok for result in results):
+            raise RuntimeError(f"fan-out to {count} devices failed")
+        suite.add(f"fanout.{count}", elapsed * 1e3, "ms", LOWER)
+        suite.add(f"fanout.{count}.per_device", elapsed / count * 1e3, "ms", LOWER)
+
+
+def bench_memory(suite: Suite, fake: FakeAdbServer, directory: str) -> None:
+    """Measure peak memory of streamed pull and memory kept per device."""
+    transport = simpleadb.AdbSocketTransport(port=fake.port)
+    device = simpleadb.AdbDevice("fake-0", transport=transport)
+    size = suite.scale(64, 8) * 1024 * 1024
+    remote = os.path.join(directory, "remote.bin")
+    with open(remote, "wb") as dest:
+        dest.truncate(size)
+    tracemalloc.start()
+    try:
+        with open(os.devnull, "wb") as dest:
+            device.pull(remote, dest)
+        pull_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        adb_server = simpleadb.AdbServer(transport=transport)
+        devices = adb_server.devices()
+        per_device = (tracemalloc.get_traced_memory()[0] - before) / len(devices)
+    finally:
+        tracemalloc.stop()
+    suite.add("memory.pull_peak", pull_peak / 1024, "KiB", LOWER)
+    suite.add("memory.per_device", per_device / 1024, "KiB", LOWER)
+
+
+def get_version() -> str:
+    """Get installed package version and git revision of the tree."""
+    try:
+        version = importlib.metadata.version("simpleadb")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+    revision = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        check=False,
+    ).stdout.strip()
+    return f"{version}+{revision}" if revision else version
+
+
+def compare(results: List[Dict], baseline: Dict, threshold: float) -> bool:
+    """Print results relative to baseline.
+
+    :param List[Dict] results: Current results.
+    :param Dict baseline: Baseline report.
+    :param float threshold: Allowed relative regression, e.g. 0.1.
+    :return: True if no result regressed more than threshold.
+    :rtype: bool
+    """
+    previous = {result["name"]: result for result in baseline["results"]}
+    print(f"\ncompared to {baseline.get('version', 'baseline')}:")
+    ok = True
+    for result in results:
+        old: Optional[Dict] = previous.get(result["name"])
+        if old is None or not old["value"] or not result["value"]:
+            continue
+        ratio = result["value"] / old["value"]
+        speedup = ratio if result["better"] == HIGHER else 1 / ratio
+        regressed = speedup < 1 - threshold
+        ok = ok and not regressed
+        print(
+            f"{result['name']:32} {old['value']:12.3f} -> {result['value']:12.3f} "
+            f"{result['unit']:12} {speedup:6.2f}x{' REGRESSED' if regressed else ''}"
+        )
+    return ok
+
+
+def main() -> None:
+    """Run benchmarks, print and write results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quick", action="store_true", help="small sizes")
+    parser.add_argument("--latency", type=float, default=0.0, help="sec/request")
+    parser.add_argument("--bandwidth", type=float, help="bytes/sec/connection")
+    parser.add_argument("--devices", type=int, default=128)
+    parser.add_argument("--output", help="write results to JSON file")
+    parser.add_argument("--compare", help="baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    options = parser.parse_args()
+    suite = Suite(options)
+    devices = {f"fake-{i}": "device" for i in range(options.devices)}
+    with FakeAdbServer(devices, options.latency, options.bandwidth) as fake:
+        with tempfile.TemporaryDirectory() as directory:
+            bench_overhead(suite, fake)
+            bench_throughput(suite, fake, directory)
+            bench_fanout(suite, fake)
+            bench_memory(suite, fake, directory)
+    report = {
+        "version": get_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "config": vars(options),
+        "results": suite.results,
+    }
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as baseline:
+            if not compare(suite.results, json.load(baseline), options.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,64 @@
 
 from .adbprocess import AdbCommandError
 from .adbprocess import AdbCommandTimeoutExpired
+from .adbcassette import AdbRecordingTransport
+from .adbcassette import AdbReplayTransport
+from .adbprocess import AdbSubprocessTransport
+from .adbprocess import AdbTransport
+from .adbsocket import AdbSocketTransport
+from .asyncadbdevice import AsyncAdbDevice
+from .asyncadbprocess import AsyncAdbSocketTransport
+from .asyncadbprocess import AsyncAdbSubprocessTransport
+from .asyncadbprocess import AsyncAdbTransport
+from .asyncadbserver import AsyncAdbServer
 from .adbdevice import AdbDevice
+from .adbinstall import ApkSet
+from .adbbatch import BatchResult
+from .adbscreen import CaptureStats
+from .adbcassette import Cassette
+from .adbtrack import DeviceEvent
+from .adbtrack import DeviceInfo
+from .adbtrack import DeviceRegistry
+from .adbfleet import DeviceResult
+from .adbsync import DirSyncResult
+from .adbmetrics import MetricsRecorder
+from .adbpackages import PackageIndex
+from .adbpackages import PackageInfo
 from .adbserver import AdbServer
+from .adbscreen import ScreenFrame
+from .adbready import ReadyResult
+from .adbshell import ShellResult
+from .adbsync import TransferStats
 
-__all__ = ["AdbCommandError", "AdbCommandTimeoutExpired", "AdbDevice", "AdbServer"]
+__all__ = [
+    "AdbCommandError",
+    "AdbCommandTimeoutExpired",
+    "AdbDevice",
+    "AdbRecordingTransport",
+    "AdbReplayTransport",
+    "AdbServer",
+    "AdbSocketTransport",
+    "AdbSubprocessTransport",
+    "AdbTransport",
+    "ApkSet",
+    "AsyncAdbDevice",
+    "AsyncAdbServer",
+    "AsyncAdbSocketTransport",
+    "AsyncAdbSubprocessTransport",
+    "AsyncAdbTransport",
+    "BatchResult",
+    "CaptureStats",
+    "Cassette",
+    "DeviceEvent",
+    "DeviceInfo",
+    "DeviceRegistry",
+    "DeviceResult",
+    "DirSyncResult",
+    "MetricsRecorder",
+    "PackageIndex",
+    "PackageInfo",
+    "ReadyResult",
+    "ScreenFrame",
+    "ShellResult",
+    "TransferStats",
+]
@@ -0,0 +1,373 @@
+# pylint: disable=duplicate-code
+#
+# file adbbatch.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Batched device shell commands sent to the device in a single adb round
+trip."""
+
+import shlex
+from subprocess import CalledProcessError
+from typing import Any, Callable, List, Optional
+from . import adbcmds
+from .adbprocess import AdbCommandError
+
+BATCH_MARKER = "\x1esimpleadb-batch:"
+
+
+class BatchResult:
+    """BatchResult is the outcome of a single command of a batch, filled in
+    when the batch is run.
+
+    :param str command: Device shell command.
+    """
+
+    def __init__(self, command: str):
+        self.command = command
+        self.output: Optional[str] = None
+        self.returncode: Optional[int] = None
+        self.error: Optional[AdbCommandError] = None
+
+    def __repr__(self):
+        return f"BatchResult({self.command!r}, returncode={self.returncode})"
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """True if command exited with zero status."""
+        return self.returncode == 0
+
+    def get(self) -> Any:
+        """Get command output or raise the command error.
+
+        :raise: AdbCommandError: When command failed or was not run.
+        :return: Command output.
+        :rtype: str
+        """
+        if self.error is not None:
+            raise self.error
+        return self.output
+
+
+class BaseAdbBatch:
+    """BaseAdbBatch collects device shell commands and builds a single
+    device shell script. Every command runs in a subshell with stderr merged
+    into stdout and is followed by a marker with its index and exit status.
+
+    :param str device_id: Device ID.
+    :param bool stop_on_error: Skip remaining commands after a failed one.
+    :param bool check: Raise the first command error when the batch is run
+        as a context manager.
+    :param Optional[Callable[[str], None]] invalidate: Called with every set
+        property after the batch is run, e.g. to drop cached values.
+    """
+
+    def __init__(
+        self,
+        device_id: str,
+        stop_on_error: bool = False,
+        check: bool = True,
+        invalidate: Optional[Callable[[str], None]] = None,
+    ):
+        self.device_id = device_id
+        self.stop_on_error = stop_on_error
+        self.check = check
+        self.invalidate = invalidate
+        self.props: List[str] = []
+        self.results: List[BatchResult] = []
+
+    def __len__(self):
+        return len(self.results)
+
+    def shell(self, args: str) -> BatchResult:
+        """Add device shell command.
+
+        :param str args: Adb shell arguments.
+        :return: Command result, filled in when the batch is run.
+        :rtype: BatchResult
+        """
+        result = BatchResult(args)
+        self.results.append(result)
+        return result
+
+    def setprop(self, prop: str, value: str) -> BatchResult:
+        """Add set property command.
+
+        :param str prop: Property name.
+        :param str value: Property Value.
+        :return: Command result.
+        :rtype: BatchResult
+        """
+        cmd = []
+        cmd.append(adbcmds.SETPROP)
+        cmd.append(shlex.quote(prop))
+        cmd.append(shlex.quote(value))
+        self.props.append(prop)
+        return self.shell(" ".join(cmd))
+
+    def getprop(self, prop: str) -> BatchResult:
+        """Add get property command, output is the property value.
+
+        :param str prop: Property name.
+        :return: Command result.
+        :rtype: BatchResult
+        """
+        cmd = []
+        cmd.append(adbcmds.GETPROP)
+        cmd.append(shlex.quote(prop))
+        return self.shell(" ".join(cmd))
+
+    def pm_grant(self, package: str, permission: str) -> BatchResult:
+        """Add grant permission command.
+
+        :param str package: Package name.
+        :param str permission: Android permission.
+        :return: Command result.
+        :rtype: BatchResult
+        """
+        cmd = []
+        cmd.append(adbcmds.PM_GRANT)
+        cmd.append(shlex.quote(package))
+        cmd.append(shlex.quote(permission))
+        return self.shell(" ".join(cmd))
+
+    def rm(self, remote_path: str) -> BatchResult:  # pylint: disable=invalid-name
+        """Add remove file command.
+
+        :param str remote_path: Remote path.
+        :return: Command result.
+        :rtype: BatchResult
+        """
+        cmd = []
+        cmd.append(adbcmds.RM)
+        cmd.append(shlex.quote(remote_path))
+        return self.shell(" ".join(cmd))
+
+    def tap(self, pos_x: int, pos_y: int) -> BatchResult:
+        """Add tap screen command.
+
+        :param int pos_x: x position.
+        :param int pos_y: y position.
+        :return: Command result.
+        :rtype: BatchResult
+        """
+        cmd = []
+        cmd.append(adbcmds.INPUT_TAP)
+        cmd.append(str(pos_x))
+        cmd.append(str(pos_y))
+        return self.shell(" ".join(cmd))
+
+    def swipe(self, pos_x1: int, pos_y1: int, pos_x2: int, pos_y2: int) -> BatchResult:
+        """Add swipe screen command.
+
+        :param: int pos_x1: Start x position.
+        :param: int pos_y1: Start y position.
+        :param: int pos_x2: End x position.
+        :param: int pos_y2: End y position.
+        :return: Command result.
+        :rtype: BatchResult
+        """
+        cmd = []
+        cmd.append(adbcmds.INPUT_SWIPE)
+        cmd.append(str(pos_x1))
+        cmd.append(str(pos_y1))
+        cmd.append(str(pos_x2))
+        cmd.append(str(pos_y2))
+        return self.shell(" ".join(cmd))
+
+    def broadcast(self, intent: str) -> BatchResult:
+        """Add send broadcast command.
+
+        :param str intent: Intent argument.
+        :return: Command result.
+        :rtype: BatchResult
+        """
+        cmd = []
+        cmd.append("am broadcast -a")
+        cmd.append(intent)
+        return self.shell(" ".join(cmd))
+
+    def create_script(self) -> str:
+        """Create device shell script running all commands.
+
+        :return: Shell script.
+        :rtype: str
+        """
+        lines = []
+        for index, result in enumerate(self.results):
+            lines.append(f"(\n{result.command}\n) 2>&1")
+            lines.append(f'status=$?; echo "{BATCH_MARKER}{index}:$status"')
+            if self.stop_on_error:
+                lines.append('[ "$status" = 0 ] || exit 0')
+        return "\n".join(lines)
+
+    def parse_output(self, output: str) -> List[BatchResult]:
+        """Split script output into command results.
+
+        :param str output: Script output.
+        :return: Command results.
+        :rtype: List[BatchResult]
+        """
+        segments = output.replace("\r\n", "\n").split(BATCH_MARKER)
+        pending = segments[0]
+        for segment in segments[1:]:
+            header, _, rest = segment.partition("\n")
+            index, _, status = header.partition(":")
+            if index.isdigit() and status.isdigit() and int(index) < len(self.results):
+                self.finish(self.results[int(index)], pending, int(status))
+            pending = rest
+        for result in self.results:
+            if result.returncode is None:
+                result.error = AdbCommandError(self.device_id, "command not run")
+        return self.results
+
+    def finish(self, result: BatchResult, output: str, returncode: int) -> None:
+        """Fill in command result.
+
+        :param BatchResult result: Command result.
+        :param str output: Command output.
+        :param int returncode: Command exit status.
+        """
+        result.output = output.rstrip("\n")
+        result.returncode = returncode
+        if returncode != 0:
+            err = CalledProcessError(returncode, result.command, result.output)
+            result.error = AdbCommandError(self.device_id, result.output, err)
+
+    def invalidate_props(self) -> None:
+        """Call invalidate callback with every property set by the batch."""
+        if self.invalidate is not None:
+            for prop in self.props:
+                self.invalidate(prop)
+
+    def raise_first_error(self) -> None:
+        """Raise error of the first failed command.
+
+        :raise: AdbCommandError: When any command failed.
+        """
+        for result in self.results:
+            if result.error is not None:
+                raise result.error
+
+
+class AdbBatch(BaseAdbBatch):
+    """AdbBatch collects device shell commands and runs them with a single
+    adb shell call, see :meth:`simpleadb.AdbDevice.batch`.
+
+    :param adb_process: Device adb process.
+    :param bool stop_on_error: Skip remaining commands after a failed one.
+    :param bool check: Raise the first command error on context exit.
+    :param Optional[Callable[[str], None]] invalidate: Called with every set
+        property after the batch is run.
+
+    :example:
+
+    >>> import simpleadb
+    >>> device = simpleadb.AdbDevice('emulator-5554')
+    >>> with device.batch() as batch:
+    ...     batch.setprop('persist.dummy.prop', '42')
+    ...     prop = batch.getprop('persist.dummy.prop')
+    >>> prop.output
+    '42'
+    """
+
+    def __init__(
+        self,
+        adb_process,
+        stop_on_error: bool = False,
+        check: bool = True,
+        invalidate: Optional[Callable[[str], None]] = None,
+    ):
+        super().__init__(adb_process.device_id, stop_on_error, check, invalidate)
+        self.__adb_process = adb_process
+
+    def run(self, **kwargs) -> List[BatchResult]:
+        """Run collected commands in a single adb shell call.
+
+        :keyword int timeout: Timeout in sec.
+        :raise: AdbCommandError: When adb shell failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command results, command failures are stored in results.
+        :rtype: List[BatchResult]
+        """
+        if not self.results:
+            return self.results
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(self.create_script())
+        try:
+            output = self.__adb_process.check_output(cmd, **kwargs)
+        finally:
+            self.invalidate_props()
+        return self.parse_output(output)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.run()
+            if self.check:
+                self.raise_first_error()
+
+
+class AsyncAdbBatch(BaseAdbBatch):
+    """AsyncAdbBatch is the asyncio counterpart of :class:`AdbBatch`, see
+    :meth:`simpleadb.AsyncAdbDevice.batch`.
+
+    :param adb_process: Device asyncio adb process.
+    :param bool stop_on_error: Skip remaining commands after a failed one.
+    :param bool check: Raise the first command error on context exit.
+    :param Optional[Callable[[str], None]] invalidate: Called with every set
+        property after the batch is run.
+
+    :example:
+
+    >>> import simpleadb
+    >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+    >>> async with device.batch() as batch:
+    ...     batch.tap(42, 42)
+    ...     batch.rm('/sdcard/dummy_file')
+    """
+
+    def __init__(
+        self,
+        adb_process,
+        stop_on_error: bool = False,
+        check: bool = True,
+        invalidate: Optional[Callable[[str], None]] = None,
+    ):
+        super().__init__(adb_process.device_id, stop_on_error, check, invalidate)
+        self.__adb_process = adb_process
+
+    async def run(self, **kwargs) -> List[BatchResult]:
+        """Run collected commands in a single adb shell call.
+
+        :keyword float timeout: Timeout in sec.
+        :raise: AdbCommandError: When adb shell failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command results, command failures are stored in results.
+        :rtype: List[BatchResult]
+        """
+        if not self.results:
+            return self.results
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(self.create_script())
+        try:
+            output = await self.__adb_process.check_output(cmd, **kwargs)
+        finally:
+            self.invalidate_props()
+        return self.parse_output(output)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            await self.run()
+            if self.check:
+                self.raise_first_error()
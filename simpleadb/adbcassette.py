@@ -0,0 +1,648 @@
+#
+# file adbcassette.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Record adb commands into a cassette file and replay them without
+devices."""
+
+import abc
+import base64
+import collections
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from subprocess import CalledProcessError, TimeoutExpired
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Union
+from . import adbcmds
+from .adbprocess import AdbCommandError, AdbCommandTimeoutExpired, AdbStream
+from .adbprocess import AdbSubprocessTransport, AdbTransport
+from .adbshell import ShellResult
+
+VERSION = 1
+
+CHECK_OUTPUT = "check_output"
+OPEN = "open"
+RUN = "run"
+
+Runner = Callable[[AdbTransport, str, Optional[float]], ShellResult]
+
+
+def encode_bytes(data: bytes) -> Dict[str, str]:
+    """Encode bytes for JSON, as text when valid UTF-8.
+
+    :param bytes data: Data.
+    :return: Dict with 'text' or 'base64' key.
+    :rtype: Dict[str, str]
+
+    :example:
+
+    >>> encode_bytes(b'ok')
+    {'text': 'ok'}
+    >>> encode_bytes(b'\\x89PNG')
+    {'base64': 'iVBORw=='}
+    """
+    try:
+        return {"text": data.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(data).decode("ascii")}
+
+
+def decode_bytes(value: Dict[str, str]) -> bytes:
+    """Decode bytes encoded with :func:`encode_bytes`.
+
+    :param Dict[str, str] value: Encoded data.
+    :return: Data.
+    :rtype: bytes
+    """
+    if "base64" in value:
+        return base64.b64decode(value["base64"])
+    return value["text"].encode("utf-8")
+
+
+def encode_error(err: Exception) -> Dict:
+    """Encode raised adb command exception.
+
+    :param Exception err: AdbCommandError or AdbCommandTimeoutExpired.
+    :return: Error fields.
+    :rtype: Dict
+    """
+    if isinstance(err, AdbCommandTimeoutExpired):
+        expired = err.timeout_expired
+        return {"timeout": expired.timeout, "cmd": str(expired.cmd)}
+    error = {"output": str(err.output) if err.output is not None else ""}
+    if err.called_process_error is not None:
+        error["returncode"] = err.called_process_error.returncode
+        error["process_output"] = err.called_process_error.output
+    return error
+
+
+def decode_error(device_id: str, args: List[str], error: Dict) -> Exception:
+    """Create exception from error fields of :func:`encode_error`.
+
+    :param str device_id: Device ID.
+    :param List[str] args: Adb command line arguments.
+    :param Dict error: Error fields.
+    :return: AdbCommandError or AdbCommandTimeoutExpired.
+    :rtype: Exception
+    """
+    if "timeout" in error:
+        expired = TimeoutExpired(error["cmd"], error["timeout"])
+        return AdbCommandTimeoutExpired(device_id, expired)
+    called_process_error = None
+    if "returncode" in error:
+        called_process_error = CalledProcessError(
+            error["returncode"], args, error.get("process_output")
+        )
+    return AdbCommandError(device_id, error["output"], called_process_error)
+
+
+# pylint: disable-next=too-many-instance-attributes
+class Interaction:  # pylint: disable=too-few-public-methods
+    """Interaction is a recorded adb command and its outcome.
+
+    :param str kind: 'check_output', 'open' or 'run'.
+    :param str device_id: Device ID, empty for server commands.
+    :param List[str] args: Adb command line arguments.
+    :param Optional[bytes] stdout: Output, None when the command failed
+        before producing any.
+    :param bytes stderr: Standard error of 'run' commands.
+    :param Optional[int] exit_code: Exit status of 'run' commands.
+    :param Optional[Dict] error: Raised exception, see :func:`encode_error`.
+    :param float elapsed: Duration in sec.
+    """
+
+    __slots__ = (
+        "kind",
+        "device_id",
+        "args",
+        "stdout",
+        "stderr",
+        "exit_code",
+        "error",
+        "elapsed",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        kind: str,
+        device_id: str,
+        args: List[str],
+        stdout: Optional[bytes] = None,
+        *,
+        stderr: bytes = b"",
+        exit_code: Optional[int] = None,
+        error: Optional[Dict] = None,
+        elapsed: float = 0.0,
+    ):
+        self.kind = kind
+        self.device_id = device_id
+        self.args = args
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (
+            f"Interaction({self.kind!r}, {self.device_id!r}, {self.args!r}, "
+            f"exit_code={self.exit_code!r}, error={self.error!r})"
+        )
+
+    @property
+    def key(self) -> Tuple[str, str, Tuple[str, ...]]:
+        """Key matching the same command."""
+        return (self.kind, self.device_id, tuple(self.args))
+
+    def raise_error(self) -> None:
+        """Raise recorded exception, if any.
+
+        :raise: AdbCommandError: When the command failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        """
+        if self.error is not None:
+            raise decode_error(self.device_id, self.args, self.error)
+
+    def to_dict(self) -> Dict:
+        """Get interaction as JSON serializable dict, without default
+        fields.
+
+        :return: Interaction fields.
+        :rtype: Dict
+        """
+        data: Dict = {"kind": self.kind, "device": self.device_id, "args": self.args}
+        if self.stdout is not None:
+            data["stdout"] = encode_bytes(self.stdout)
+        if self.stderr:
+            data["stderr"] = encode_bytes(self.stderr)
+        if self.exit_code is not None:
+            data["exit_code"] = self.exit_code
+        if self.error is not None:
+            data["error"] = self.error
+        data["elapsed"] = round(self.elapsed, 6)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Interaction":
+        """Create interaction from dict of :meth:`to_dict`.
+
+        :param Dict data: Interaction fields.
+        :return: Interaction.
+        :rtype: Interaction
+        """
+        return cls(
+            data["kind"],
+            data["device"],
+            data["args"],
+            decode_bytes(data["stdout"]) if "stdout" in data else None,
+            stderr=decode_bytes(data["stderr"]) if "stderr" in data else b"",
+            exit_code=data.get("exit_code"),
+            error=data.get("error"),
+            elapsed=data.get("elapsed", 0.0),
+        )
+
+
+def create_key(
+    kind: str, device_id: Optional[str], args: List[str]
+) -> Tuple[str, str, Tuple[str, ...]]:
+    """Create interaction key of a command.
+
+    :param str kind: Interaction kind.
+    :param Optional[str] device_id: Device ID.
+    :param List[str] args: Adb command line arguments, empty ones are
+        ignored.
+    :return: Key.
+    :rtype: Tuple[str, str, Tuple[str, ...]]
+    """
+    return (kind, device_id or "", tuple(arg for arg in args if arg))
+
+
+class Cassette:
+    """Cassette keeps recorded adb commands in order, in a JSON file which
+    is gzip compressed when the path ends with '.gz'. Recorded outcomes of
+    the same command on the same device are replayed in order, the last one
+    is repeated, e.g. for polling.
+
+    :param Optional[str] path: Cassette file, loaded if it exists.
+
+    :example:
+
+    >>> import simpleadb
+    >>> cassette = simpleadb.Cassette('tests/cassettes/boot.json.gz')
+    >>> len(cassette)
+    42
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.interactions: List[Interaction] = []
+        self.__lock = threading.Lock()
+        self.__pending: Dict[Tuple, Deque[Interaction]] = {}
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.interactions)
+
+    def load(self, path: str) -> None:
+        """Load interactions from file, replacing the current ones.
+
+        :param str path: Cassette file.
+        :raise: ValueError: When cassette version is not supported.
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as source:
+            data = json.load(source)
+        if data.get("version") != VERSION:
+            raise ValueError(f"unsupported cassette version {data.get('version')}")
+        interactions = [Interaction.from_dict(entry) for entry in data["interactions"]]
+        with self.__lock:
+            self.interactions = interactions
+            self.__rewind()
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Write interactions to file.
+
+        :param Optional[str] path: Cassette file, default :attr:`path`.
+        :raise: ValueError: When no path is given.
+        """
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("cassette path is not set")
+        with self.__lock:
+            data = {
+                "version": VERSION,
+                "interactions": [entry.to_dict() for entry in self.interactions],
+            }
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wt", encoding="utf-8") as dest:
+            json.dump(data, dest, separators=(",", ":"))
+
+    def append(self, interaction: Interaction) -> None:
+        """Add recorded interaction, it can be replayed at once.
+
+        :param Interaction interaction: Interaction.
+        """
+        with self.__lock:
+            self.interactions.append(interaction)
+            self.__pending.setdefault(interaction.key, collections.deque()).append(
+                interaction
+            )
+
+    def find(
+        self, kind: str, device_id: Optional[str], args: List[str]
+    ) -> Optional[Interaction]:
+        """Find the next recorded outcome of a command.
+
+        :param str kind: Interaction kind.
+        :param Optional[str] device_id: Device ID.
+        :param List[str] args: Adb command line arguments.
+        :return: Interaction, None if the command was not recorded.
+        :rtype: Optional[Interaction]
+        """
+        with self.__lock:
+            pending = self.__pending.get(create_key(kind, device_id, args))
+            if not pending:
+                return None
+            return pending.popleft() if len(pending) > 1 else pending[0]
+
+    def rewind(self) -> None:
+        """Replay again from the first recorded outcomes."""
+        with self.__lock:
+            self.__rewind()
+
+    def __rewind(self) -> None:
+        self.__pending = {}
+        for interaction in self.interactions:
+            self.__pending.setdefault(interaction.key, collections.deque()).append(
+                interaction
+            )
+
+
+class AdbCassetteTransport(AdbTransport):
+    """AdbCassetteTransport is a base class for transports recording or
+    replaying commands with a :class:`Cassette`.
+
+    :param Union[Cassette, str] cassette: Cassette or its file path.
+    """
+
+    def __init__(self, cassette: Union[Cassette, str]):
+        self.cassette = (
+            cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        )
+
+    @abc.abstractmethod
+    def run_shell(
+        self,
+        device_id: Optional[str],
+        command: str,
+        timeout: Optional[float],
+        run: Runner,
+    ) -> ShellResult:
+        """Run device shell command for :meth:`simpleadb.AdbDevice.run`.
+
+        :param Optional[str] device_id: Device ID.
+        :param str command: Shell command.
+        :param Optional[float] timeout: Timeout in sec.
+        :param Runner run: Runs the command with given transport.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command result.
+        :rtype: ShellResult
+        """
+
+
+class RecordingStream(AdbStream):
+    """RecordingStream copies the output of an adb stream and records it
+    when closed.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param AdbStream stream: Recorded stream.
+    :param Callable record: Called once with output and raised exception.
+    """
+
+    def __init__(
+        self,
+        device_id: str,
+        stream: AdbStream,
+        record: Callable[[bytes, Optional[Exception]], None],
+    ):
+        super().__init__(device_id, stream)
+        self.record = record
+        self.chunks: List[bytes] = []
+        self.error: Optional[Exception] = None
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.__capture(lambda: self.reader.read(size))
+        self.chunks.append(data)
+        return data
+
+    def readinto(self, buffer: memoryview) -> int:
+        view = memoryview(buffer).cast("B")
+        size = self.__capture(lambda: self.reader.readinto(view))
+        self.chunks.append(bytes(view[:size]))
+        return size
+
+    def readline(self) -> bytes:
+        line = self.__capture(self.reader.readline)
+        self.chunks.append(line)
+        return line
+
+    def close(self) -> None:
+        if not self.closed:
+            self.record(b"".join(self.chunks), self.error)
+        super().close()
+
+    def __capture(self, call):
+        try:
+            return call()
+        except (AdbCommandError, AdbCommandTimeoutExpired) as err:
+            self.error = err
+            raise
+
+
+class ReplayStream(AdbStream):
+    """ReplayStream is the recorded output of an adb stream.
+
+    :param Interaction interaction: Recorded stream.
+    """
+
+    def __init__(self, interaction: Interaction):
+        super().__init__(interaction.device_id, io.BytesIO(interaction.stdout or b""))
+        self.interaction = interaction
+
+    def finish(self) -> None:
+        if not self.closed:
+            self.interaction.raise_error()
+
+
+class AdbRecordingTransport(AdbCassetteTransport):
+    """AdbRecordingTransport runs commands with another transport and
+    records arguments, output, exit status, errors and duration of every
+    command into a cassette, saved when used as context manager. Commands
+    are recorded as sent by :class:`simpleadb.adbprocess.AdbProcess`, so
+    devices use adb client commands for file transfers and shell sessions
+    are not recorded.
+
+    :param Union[Cassette, str] cassette: Cassette or its file path.
+    :param Optional[AdbTransport] transport: Transport running commands,
+        default :class:`AdbSubprocessTransport`.
+
+    :example:
+
+    >>> import simpleadb
+    >>> with simpleadb.AdbRecordingTransport('boot.json.gz') as transport:
+    ...     device = simpleadb.AdbDevice('emulator-5554', transport=transport)
+    ...     device.getprop('ro.product.model')
+    'Pixel 6'
+    """
+
+    def __init__(
+        self,
+        cassette: Union[Cassette, str],
+        transport: Optional[AdbTransport] = None,
+    ):
+        super().__init__(cassette)
+        self.transport = transport if transport else AdbSubprocessTransport()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cassette.save()
+
+    def check_output(
+        self, device_id: Optional[str], adb_path: str, args: List[str], **kwargs
+    ) -> str:
+        start = time.perf_counter()
+        try:
+            output = self.transport.check_output(device_id, adb_path, args, **kwargs)
+        except (AdbCommandError, AdbCommandTimeoutExpired) as err:
+            self.__record(CHECK_OUTPUT, device_id, args, start, error=encode_error(err))
+            raise
+        self.__record(CHECK_OUTPUT, device_id, args, start, output.encode("utf-8"))
+        return output
+
+    def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AdbStream:
+        start = time.perf_counter()
+        try:
+            stream = self.transport.open(device_id, adb_path, args)
+        except (AdbCommandError, AdbCommandTimeoutExpired) as err:
+            self.__record(OPEN, device_id, args, start, error=encode_error(err))
+            raise
+
+        def record(output: bytes, err: Optional[Exception]) -> None:
+            error = encode_error(err) if err is not None else None
+            self.__record(OPEN, device_id, args, start, output, error=error)
+
+        return RecordingStream(device_id or "", stream, record)
+
+    def run_shell(
+        self,
+        device_id: Optional[str],
+        command: str,
+        timeout: Optional[float],
+        run: Runner,
+    ) -> ShellResult:
+        """Run device shell command with the wrapped transport and record
+        its result.
+
+        :param Optional[str] device_id: Device ID.
+        :param str command: Shell command.
+        :param Optional[float] timeout: Timeout in sec.
+        :param Runner run: Runs the command with given transport.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command result.
+        :rtype: ShellResult
+        """
+        args = [adbcmds.SHELL, command]
+        start = time.perf_counter()
+        try:
+            result = run(self.transport, command, timeout)
+        except (AdbCommandError, AdbCommandTimeoutExpired) as err:
+            self.__record(RUN, device_id, args, start, error=encode_error(err))
+            raise
+        self.__record(
+            RUN,
+            device_id,
+            args,
+            start,
+            result.stdout,
+            stderr=result.stderr,
+            exit_code=result.exit_code,
+        )
+        return result
+
+    def __record(  # pylint: disable=too-many-arguments
+        self,
+        kind: str,
+        device_id: Optional[str],
+        args: List[str],
+        start: float,
+        stdout: Optional[bytes] = None,
+        **kwargs,
+    ) -> None:
+        _, device, key_args = create_key(kind, device_id, args)
+        self.cassette.append(
+            Interaction(
+                kind,
+                device,
+                list(key_args),
+                stdout,
+                elapsed=time.perf_counter() - start,
+                **kwargs,
+            )
+        )
+
+
+class AdbReplayTransport(AdbCassetteTransport):
+    """AdbReplayTransport answers commands with outcomes recorded by
+    :class:`AdbRecordingTransport`, without adb server, devices or
+    subprocesses. Commands missing in the cassette fail, or are run with
+    the fallback transport, e.g. a recording transport adding them to the
+    cassette.
+
+    :param Union[Cassette, str] cassette: Cassette or its file path.
+    :param Optional[AdbTransport] fallback: Transport running commands
+        missing in the cassette.
+    :param bool realtime: Take the recorded duration of every command.
+
+    :example:
+
+    >>> import simpleadb
+    >>> transport = simpleadb.AdbReplayTransport('boot.json.gz')
+    >>> device = simpleadb.AdbDevice('emulator-5554', transport=transport)
+    >>> device.getprop('ro.product.model')
+    'Pixel 6'
+    >>> cassette = simpleadb.Cassette('boot.json.gz')
+    >>> transport = simpleadb.AdbReplayTransport(
+    ...     cassette, fallback=simpleadb.AdbRecordingTransport(cassette))
+    """
+
+    def __init__(
+        self,
+        cassette: Union[Cassette, str],
+        fallback: Optional[AdbTransport] = None,
+        realtime: bool = False,
+    ):
+        super().__init__(cassette)
+        self.fallback = fallback
+        self.realtime = realtime
+
+    def check_output(
+        self, device_id: Optional[str], adb_path: str, args: List[str], **kwargs
+    ) -> str:
+        interaction = self.__find(CHECK_OUTPUT, device_id, args)
+        if interaction is None:
+            return self.__fallback(device_id, args).check_output(
+                device_id, adb_path, args, **kwargs
+            )
+        interaction.raise_error()
+        return (interaction.stdout or b"").decode("utf-8")
+
+    def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AdbStream:
+        interaction = self.__find(OPEN, device_id, args)
+        if interaction is None:
+            return self.__fallback(device_id, args).open(device_id, adb_path, args)
+        if interaction.stdout is None:
+            interaction.raise_error()
+        return ReplayStream(interaction)
+
+    def run_shell(
+        self,
+        device_id: Optional[str],
+        command: str,
+        timeout: Optional[float],
+        run: Runner,
+    ) -> ShellResult:
+        """Get recorded result of device shell command, or run it with the
+        fallback transport.
+
+        :param Optional[str] device_id: Device ID.
+        :param str command: Shell command.
+        :param Optional[float] timeout: Timeout in sec.
+        :param Runner run: Runs the command with given transport.
+        :raise: AdbCommandError: When failed or not recorded.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command result.
+        :rtype: ShellResult
+        """
+        args = [adbcmds.SHELL, command]
+        interaction = self.__find(RUN, device_id, args)
+        if interaction is None:
+            return run(self.__fallback(device_id, args), command, timeout)
+        interaction.raise_error()
+        return ShellResult(
+            command,
+            interaction.stdout or b"",
+            interaction.stderr,
+            interaction.exit_code if interaction.exit_code is not None else 0,
+        )
+
+    def __find(
+        self, kind: str, device_id: Optional[str], args: List[str]
+    ) -> Optional[Interaction]:
+        interaction = self.cassette.find(kind, device_id, args)
+        if interaction is not None and self.realtime:
+            time.sleep(interaction.elapsed)
+        return interaction
+
+    def __fallback(self, device_id: Optional[str], args: List[str]) -> AdbTransport:
+        if self.fallback is None:
+            command = " ".join(arg for arg in args if arg)
+            raise AdbCommandError(
+                device_id or "", f"no recorded outcome of '{command}'"
+            )
+        return self.fallback
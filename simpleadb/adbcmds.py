@@ -23,6 +23,13 @@ INPUT_SWIPE = "input swipe"
 INPUT_TAP = "input tap"
 SCREENCAP = "screencap"
 PM_GRANT = "pm grant"
+PM_LIST_PACKAGES = "pm list packages"
+PM_INSTALL = "cmd package install"
+PM_INSTALL_CREATE = "cmd package install-create"
+PM_INSTALL_WRITE = "cmd package install-write"
+PM_INSTALL_COMMIT = "cmd package install-commit"
+PM_INSTALL_ABANDON = "cmd package install-abandon"
+DUMPSYS_PACKAGE = "dumpsys package"
 SETPROP = "setprop"
 GETPROP = "getprop"
 USB = "usb"
@@ -33,9 +40,11 @@ DISABLE_VERITY = "disable-verity"
 ENABLE_VERITY = "enable-verity"
 UNINSTALL = "uninstall"
 INSTALL = "install"
+INSTALL_MULTIPLE = "install-multiple"
 FORWARD = "forward"
 DEVPATH = "get-devpath"
 DEVICES = "devices"
+TRACK_DEVICES = "track-devices"
 GET_SERIALNO = "get-serialno"
 DISCONNECT = "disconnect"
 CONNECT = "connect"
@@ -44,6 +53,12 @@ KILL_SERVER = "kill-server"
 START_SERVER = "start-server"
 TCPIP = "tcpip"
 RM = "rm"
+RM_FORCE = "rm -f"
+MKDIR = "mkdir -p"
+MD5SUM = "md5sum"
 GET_STATE = "get-state"
+FEATURES = "features"
+PKILL_CHILDREN = "pkill -P"
 VERSION = "version"
 LOGCAT = "logcat"
+EXEC_OUT = "exec-out"
@@ -1,4 +1,4 @@
-# pylint: disable=too-many-public-methods
+# pylint: disable=too-many-public-methods,too-many-lines
 #
 # file adbdevice.py
 #
@@ -10,21 +10,47 @@
 
 """This module includes AdbDevice class used on device with given serial."""
 
+import os
+import re
+import shlex
+import posixpath
 import time
-from typing import Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+from . import adbbatch
+from . import adbcassette
 from . import adbcmds
+from . import adbinstall
+from . import adblogcat
+from . import adbmetrics
+from . import adbmode
+from . import adbpackages
+from . import adbprops
+from . import adbready
+from . import adbscreen
+from . import adbshell
+from . import adbsync
 from . import adbprocess
 from .adbprocess import AdbCommandError
+from .adbsocket import AdbSocketTransport
 from .utils import is_valid_ip
 
 
-class AdbDevice:
+class AdbDevice:  # pylint: disable=too-many-instance-attributes
     """AdbDevice is a class representation of adb commands used on device with
     given serial.
 
     :param str device_id: Device ID or Host address.
     :param Optional[int] port: Port, default is 5555.
     :keyword str path: Adb binary path.
+    :keyword AdbTransport transport: Transport used to deliver commands,
+        default adb subprocess.
+    :keyword float prop_cache_ttl: Cache property values, read-only ``ro.*``
+        properties until reboot, other properties for given number of sec.
+    :keyword bool lazy_connect: Connect network device before the first
+        command instead of in the constructor, default True.
+    :keyword float package_index_ttl: Reload installed package index older
+        than given number of sec, default 60.
 
     :example:
 
@@ -32,18 +58,37 @@ class AdbDevice:
     >>> device = simpleadb.AdbDevice('emulator-5554')
     >>> device = simpleadb.AdbDevice('emulator-5554', path='/usr/bin/adb')
     >>> device = simpleadb.AdbDevice('192.168.42.42', 5555)
+    >>> device = simpleadb.AdbDevice('192.168.42.42', 5555, lazy_connect=False)
+    >>> device = simpleadb.AdbDevice('emulator-5554', prop_cache_ttl=30)
+    >>> device = simpleadb.AdbDevice(
+    ...     'emulator-5554', transport=simpleadb.AdbSocketTransport())
     """
 
     def __init__(self, device_id: str, port: Optional[int] = None, **kwargs):
-        options_path = kwargs.get("path")
+        options_path = kwargs.pop("path", None)
+        transport = kwargs.pop("transport", None)
+        prop_cache_ttl = kwargs.pop("prop_cache_ttl", None)
+        lazy_connect = kwargs.pop("lazy_connect", True)
+        package_index_ttl = kwargs.pop("package_index_ttl", 60.0)
         self.__adb_path = options_path if options_path else adbcmds.ADB
-        if port is not None or device_id == "localhost" or is_valid_ip(device_id):
-            self.__id = device_id + ":" + str(port) if port is not None else device_id
-            cmd = " ".join([self.__adb_path, adbcmds.CONNECT, self.__id])
-            adbprocess.subprocess.check_call(cmd, shell=True, **kwargs)
-        else:
-            self.__id = device_id
-        self.__adb_process = adbprocess.AdbProcess(self.__id, self.__adb_path)
+        connect = port is not None or device_id == "localhost"
+        connect = connect or is_valid_ip(device_id)
+        self.__id = device_id + ":" + str(port) if port is not None else device_id
+        if connect and not lazy_connect:
+            cmd = [self.__adb_path, adbcmds.CONNECT, self.__id]
+            adbprocess.subprocess.check_call(cmd, **kwargs)
+        self.__adb_process = adbprocess.AdbProcess(
+            self.__id, self.__adb_path, transport, connect and lazy_connect
+        )
+        self.__prop_cache = (
+            adbprops.PropCache(prop_cache_ttl) if prop_cache_ttl is not None else None
+        )
+        self.__screencap_colorspace: Optional[bool] = None
+        self.__features: Optional[List[str]] = None
+        self.__mode = adbmode.DeviceMode()
+        self.__packages = adbpackages.PackageIndex(
+            self.__list_packages, package_index_ttl
+        )
 
     def __str__(self):
         return self.get_id()
@@ -108,7 +153,7 @@ class AdbDevice:
         cmd = []
         cmd.append(adbcmds.SHELL)
         cmd.append("pidof")
-        cmd.append(package_name)
+        cmd.append(shlex.quote(package_name))
         return int(self.__adb_process.check_output(cmd))
 
     def get_ip(self, iface: Optional[str] = "wlan0") -> str:
@@ -126,16 +171,16 @@ class AdbDevice:
         >>> device.get_ip('wlan0')
         '192.168.42.42'
         """
-        if_config = (
-            f"ifconfig {iface} | grep 'inet addr' | cut -d: -f2 | awk '{{print $1}}'"
-        )
         cmd = []
         cmd.append(adbcmds.SHELL)
-        cmd.append(if_config)
+        cmd.append("ifconfig")
+        cmd.append(shlex.quote(iface))
         output = self.__adb_process.check_output(cmd)
-        if not is_valid_ip(output):
+        match = re.search(r"inet addr:(\S+)", output)
+        ip_address = match.group(1) if match else output
+        if not is_valid_ip(ip_address):
             raise AdbCommandError(self.get_id(), output, None)
-        return output
+        return ip_address
 
     def get_serialno(self) -> str:
         """Get target device serial number.
@@ -154,6 +199,25 @@ class AdbDevice:
         cmd.append(adbcmds.GET_SERIALNO)
         return self.__adb_process.check_output(cmd)
 
+    def get_features(self) -> List[str]:
+        """Get features supported by both adb server and device.
+
+        :raise: AdbCommandError: When failed.
+        :return: Feature names, e.g. 'shell_v2'.
+        :rtype: List[str]
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> 'shell_v2' in device.get_features()
+        True
+        """
+        cmd = []
+        cmd.append(adbcmds.FEATURES)
+        output = self.__adb_process.check_output(cmd)
+        return [feature for feature in re.split(r"[,\s]+", output) if feature]
+
     def is_available(self) -> bool:
         """Check if device is available.
 
@@ -208,6 +272,10 @@ class AdbDevice:
         output = self.__adb_process.check_output(cmd)
         if "remount failed" in output.lower():
             raise AdbCommandError(self.get_id(), output, None)
+        if adbmode.requires_reboot(output):
+            self.__mode.reboot_pending = True
+        else:
+            self.__mode.remounted = True
 
     def reboot(self) -> None:
         """Reboot the device. Defaults to booting system image.
@@ -223,10 +291,13 @@ class AdbDevice:
         cmd = []
         cmd.append(adbcmds.REBOOT)
         self.__adb_process.check_output(cmd)
+        self.__mode = adbmode.DeviceMode()
+        if self.__prop_cache is not None:
+            self.__prop_cache.invalidate()
 
     def root(self, timeout_sec: Optional[int] = None) -> None:
         """Restart adb with root permission if device has one. Wait for device
-        to be in 'device' state.
+        to be in 'device' state, unless adbd was already running as root.
 
         :param Optional[int] timeout_sec: Timeout in seconds.
         :raise: AdbCommandError: When failed.
@@ -241,12 +312,15 @@ class AdbDevice:
         cmd = []
         cmd.append(adbcmds.ROOT)
         output = self.__adb_process.check_output(cmd)
-        if ("cannot" or "unable") in output.lower():
+        if "cannot" in output.lower() or "unable" in output.lower():
             raise AdbCommandError(self.get_id(), output)
-        self.wait_for_device(timeout_sec)
+        if adbmode.restarts_adbd(output):
+            self.wait_for_device(timeout_sec)
+        self.__mode.root = True
 
     def unroot(self, timeout_sec: Optional[int] = None) -> None:
-        """Restart adb without root permission.
+        """Restart adb without root permission. Wait for device to be in
+        'device' state, unless adbd was not running as root.
 
         :param Optional[int] timeout_sec: Timeout in seconds.
         :raise: AdbCommandError: When failed.
@@ -259,8 +333,126 @@ class AdbDevice:
         """
         cmd = []
         cmd.append(adbcmds.UNROOT)
-        self.__adb_process.check_output(cmd)
-        self.wait_for_device(timeout_sec)
+        output = self.__adb_process.check_output(cmd)
+        if "cannot" in output.lower() or "unable" in output.lower():
+            raise AdbCommandError(self.get_id(), output)
+        if adbmode.restarts_adbd(output):
+            self.wait_for_device(timeout_sec)
+        self.__mode.root = False
+
+    def get_mode(self, refresh: bool = False) -> adbmode.DeviceMode:
+        """Get adbd root, verity and remount state. The mode is read from
+        the device with a single shell command and then kept up to date by
+        root, unroot, enable_verity, remount and reboot calls. Changes made
+        outside the library are seen with refresh.
+
+        :param bool refresh: Read the mode from the device again.
+        :raise: AdbCommandError: When failed.
+        :return: Device mode.
+        :rtype: DeviceMode
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> device.get_mode()
+        DeviceMode(root=False, verity=True, remounted=False, reboot_pending=False)
+        """
+        if refresh or not self.__mode.known:
+            output = self.run(adbmode.create_query_command()).get(self.get_id())
+            try:
+                mode = adbmode.parse_query_output(output)
+            except ValueError as err:
+                raise AdbCommandError(self.get_id(), str(err)) from err
+            if self.__mode.reboot_pending:
+                mode.verity = self.__mode.verity
+                mode.reboot_pending = True
+            self.__mode = mode
+        return self.__mode
+
+    def set_mode(  # pylint: disable=too-many-arguments
+        self,
+        root: Optional[bool] = None,
+        verity: Optional[bool] = None,
+        remount: bool = False,
+        timeout: Optional[float] = None,
+        refresh: bool = False,
+    ) -> adbmode.ModeResult:
+        """Bring device into given mode with the fewest adbd restarts and
+        reboots. Transitions to the current mode are skipped, verity change
+        and remount share a single reboot and root is restored after it.
+        Remount and verity change imply root.
+
+        :param Optional[bool] root: Run adbd as root, None keeps current.
+        :param Optional[bool] verity: Enable verity, None keeps current.
+        :param bool remount: Mount system partition read-write.
+        :param Optional[float] timeout: Timeout of adbd restarts and reboots
+            in sec, default 'inf'.
+        :param bool refresh: Read the mode from the device before the change.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :raise: ValueError: When remount or verity change is requested
+            without root.
+        :return: Phases run with their duration and the resulting mode.
+        :rtype: ModeResult
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> device.set_mode(verity=False, remount=True)
+        ModeResult('emulator-5554', [root=0.912, verity=0.201, reboot=24.170, ...
+        >>> device.set_mode(verity=False, remount=True).phases
+        []
+        """
+        if remount or verity is not None:
+            if root is False:
+                raise ValueError("remount and verity change require root")
+            root = True
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        result = adbmode.ModeResult(self.get_id(), self.get_mode(refresh))
+
+        def remaining() -> Optional[float]:
+            if deadline is None:
+                return None
+            return max(0.0, deadline - time.monotonic())
+
+        def phase(name: str, change) -> None:
+            start = time.monotonic()
+            change()
+            result.phases.append((name, time.monotonic() - start))
+
+        def reboot() -> None:
+            boot_id = self.__mode.boot_id
+            conditions = [adbready.BOOT_COMPLETED]
+            if boot_id is not None:
+                conditions.insert(0, adbmode.create_boot_condition(boot_id))
+            self.reboot()
+            self.wait_until_ready(conditions, remaining())
+
+        def restart() -> None:
+            phase(adbmode.REBOOT, reboot)
+            if root and not self.get_mode().root:
+                phase(adbmode.ROOT, lambda: self.root(remaining()))
+
+        if root is not None and self.__mode.root != root:
+            if root:
+                phase(adbmode.ROOT, lambda: self.root(remaining()))
+            else:
+                phase(adbmode.UNROOT, lambda: self.unroot(remaining()))
+        if verity is not None and self.__mode.verity != verity:
+            phase(adbmode.VERITY, lambda: self.enable_verity(verity))
+        if remount and not self.__mode.remounted:
+            if self.__mode.reboot_pending:
+                restart()
+            phase(adbmode.REMOUNT, self.remount)
+            if self.__mode.reboot_pending:
+                restart()
+                phase(adbmode.REMOUNT, self.remount)
+        elif verity is not None and self.__mode.reboot_pending:
+            restart()
+        result.mode = self.__mode
+        return result
 
     def is_root(self) -> bool:
         """Check if device has root permissions (experimental). Not guarantee
@@ -303,6 +495,71 @@ class AdbDevice:
         cmd.append(adbcmds.INSTALL)
         cmd.append(apk)
         self.__adb_process.check_output(cmd)
+        try:
+            self.__packages.refresh(adbinstall.read_apk_info(apk).package)
+        except (OSError, ValueError):
+            self.__packages.invalidate()
+
+    def install_apks(
+        self,
+        apks: Union[adbinstall.ApkSet, str, Sequence[str]],
+        replace: bool = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """Install app made of a single APK or base and split APKs. With
+        :class:`simpleadb.AdbSocketTransport` APKs held in memory are
+        streamed to package manager, otherwise adb install or
+        install-multiple is run.
+
+        :param Union[ApkSet, str, Sequence[str]] apks: APKs or their paths.
+        :param bool replace: Replace existing app.
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: AdbCommandError: When failed.
+        :raise: ValueError: When APKs are not valid.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> device.install_apks(['base.apk', 'split_config.arm64_v8a.apk'])
+        """
+        if not isinstance(apks, adbinstall.ApkSet):
+            apks = adbinstall.ApkSet(apks)
+        transport = self.__adb_process.transport
+        if isinstance(transport, AdbSocketTransport) and self.__has_feature("cmd"):
+            apk_set = apks
+            if not adbmetrics.HOOKS:
+                transport.install(self.__id, apk_set, replace, timeout)
+            else:
+                adbprocess.instrument(
+                    self.__id,
+                    [adbcmds.INSTALL, apk_set.package],
+                    lambda: transport.install(self.__id, apk_set, replace, timeout),
+                    lambda _: apk_set.size,
+                )
+        else:
+            self.__adb_process.check_output(
+                adbinstall.create_args(apks, replace), timeout=timeout
+            )
+        self.__packages.refresh(apks.package)
+
+    def get_version_code(self, package: str) -> Optional[int]:
+        """Get version code of installed package.
+
+        :param str package: Package name.
+        :raise: AdbCommandError: When failed.
+        :return: Version code, None if package is not installed.
+        :rtype: Optional[int]
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> device.get_version_code('com.android.chrome')
+        609911033
+        """
+        result = self.run(adbinstall.create_version_query(package))
+        return adbinstall.parse_version_code(result.output)
 
     def uninstall(self, package: str) -> None:
         """Remove app package from the device.
@@ -320,6 +577,34 @@ class AdbDevice:
         cmd.append(adbcmds.UNINSTALL)
         cmd.append(package)
         self.__adb_process.check_output(cmd)
+        self.__packages.remove(package)
+
+    @property
+    def packages(self) -> adbpackages.PackageIndex:
+        """Index of installed packages with version code, APK path, uid,
+        enabled state and installer. It is loaded with a single package
+        manager query on the first lookup and kept up to date after
+        install and uninstall.
+
+        :return: Package index.
+        :rtype: PackageIndex
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> device.packages.get('com.android.chrome').version_code
+        609911033
+        >>> 'com.dummy' in device.packages
+        False
+        """
+        return self.__packages
+
+    def __list_packages(
+        self, package: Optional[str] = None
+    ) -> Dict[str, adbpackages.PackageInfo]:
+        result = self.run(adbpackages.create_list_command(package))
+        return adbpackages.parse_package_list(result.get(self.get_id()))
 
     def shell(self, args: str) -> str:
         """Run remote shell command interface.
@@ -340,6 +625,209 @@ class AdbDevice:
         cmd.append(args)
         return self.__adb_process.check_output(cmd)
 
+    def session(self) -> adbshell.ShellSession:
+        """Open long-lived device shell running commands one after another,
+        with shell protocol v2 when supported by the device. A command costs
+        a single round trip instead of a new adb client and device shell.
+
+        :raise: AdbCommandError: When failed.
+        :return: Shell session.
+        :rtype: ShellSession
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> with device.session() as session:
+        ...     session.shell('getprop ro.product.model')
+        ...     session.run('sleep 10', timeout=1)
+        'Pixel 6'
+        Traceback (most recent call last):
+        ...
+        simpleadb.adbprocess.AdbCommandTimeoutExpired: ...
+        """
+        v2 = self.__has_feature(adbshell.SHELL_V2_FEATURE)
+        transport = self.__adb_process.transport
+        if isinstance(transport, AdbSocketTransport):
+            service = adbshell.SHELL_V2_SERVICE if v2 else adbshell.RAW_SHELL_SERVICE
+            try:
+                conn = transport.request(self.__id, service, local=True)
+            except OSError as err:
+                raise AdbCommandError(self.get_id(), str(err)) from err
+            conn.settimeout(None)
+            conn.device_id = self.__id
+            channel: adbshell.ShellChannel = adbshell.SocketShellChannel(conn, v2)
+        else:
+            cmd = adbprocess.AdbSubprocessTransport.create_args(
+                self.__id, self.__adb_path, [adbcmds.SHELL]
+            )
+            try:
+                process = (
+                    adbprocess.subprocess.Popen(  # pylint: disable=consider-using-with
+                        cmd,
+                        stdin=adbprocess.subprocess.PIPE,
+                        stdout=adbprocess.subprocess.PIPE,
+                        stderr=adbprocess.subprocess.PIPE,
+                    )
+                )
+            except OSError as err:
+                raise AdbCommandError(self.get_id(), str(err)) from err
+            channel = adbshell.ProcessShellChannel(self.__id, process, v2)
+        return adbshell.ShellSession(channel, self.__kill_children)
+
+    def run(
+        self, command: str, timeout: Optional[float] = None
+    ) -> adbshell.ShellResult:
+        """Run device shell command and return its stdout, stderr and the
+        remote exit status, instead of raising on failure. With
+        :class:`simpleadb.AdbSocketTransport` the command runs with shell
+        protocol v2 when supported by the device.
+
+        :param str command: Shell command.
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: AdbCommandError: When adb failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command result.
+        :rtype: ShellResult
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> result = device.run('ls /missing')
+        >>> result.exit_code, result.stderr
+        (1, b'ls: /missing: No such file or directory\\n')
+        >>> device.run('getprop ro.product.model').output
+        'Pixel 6'
+        """
+        if not adbmetrics.HOOKS:
+            return self.__run(command, timeout)
+        return adbprocess.instrument(
+            self.__id,
+            [adbcmds.SHELL, command],
+            lambda: self.__run(command, timeout),
+            lambda result: len(result.stdout) + len(result.stderr),
+        )
+
+    def __run(
+        self, command: str, timeout: Optional[float] = None
+    ) -> adbshell.ShellResult:
+        return self.__run_with(self.__adb_process.transport, command, timeout)
+
+    def __run_with(
+        self,
+        transport: adbprocess.AdbTransport,
+        command: str,
+        timeout: Optional[float] = None,
+    ) -> adbshell.ShellResult:
+        if isinstance(transport, adbcassette.AdbCassetteTransport):
+            return transport.run_shell(self.__id, command, timeout, self.__run_with)
+        if isinstance(transport, AdbSocketTransport):
+            return transport.run_shell(
+                self.__id,
+                command,
+                timeout,
+                self.__has_feature(adbshell.SHELL_V2_FEATURE),
+            )
+        self.__adb_process.ensure_connected()
+        cmd = adbprocess.AdbSubprocessTransport.create_args(
+            self.__id, self.__adb_path, [adbcmds.SHELL, command]
+        )
+        try:
+            process = adbprocess.subprocess.run(
+                cmd,
+                stdout=adbprocess.subprocess.PIPE,
+                stderr=adbprocess.subprocess.PIPE,
+                timeout=timeout,
+                check=False,
+            )
+        except adbprocess.TimeoutExpired as err:
+            raise adbprocess.AdbCommandTimeoutExpired(self.get_id(), err) from err
+        except OSError as err:
+            raise AdbCommandError(self.get_id(), str(err)) from err
+        return adbshell.ShellResult(
+            command, process.stdout, process.stderr, process.returncode
+        )
+
+    def stream_shell(self, command: str) -> adbprocess.AdbStream:
+        """Start device shell command and read its stdout while it runs,
+        instead of buffering whole output. Non-zero exit status is raised at
+        the end of output, with shell protocol v2 or adb client.
+
+        :param str command: Shell command.
+        :raise: AdbCommandError: When failed.
+        :return: Stdout stream, closing it stops the command.
+        :rtype: AdbStream
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> with device.stream_shell('find /sdcard') as stream:
+        ...     for line in stream:
+        ...         print(line.decode().rstrip())
+        """
+        transport = self.__adb_process.transport
+        if isinstance(transport, AdbSocketTransport) and self.__has_feature(
+            adbshell.SHELL_V2_FEATURE
+        ):
+            return transport.shell_v2(self.__id, command)
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(command)
+        return self.__adb_process.open(cmd)
+
+    def __has_feature(self, feature: str) -> bool:
+        """Check if device supports feature, features are read once.
+
+        :param str feature: Feature name, e.g. 'shell_v2'.
+        :raise: AdbCommandError: When failed.
+        :return: True if supported.
+        :rtype: bool
+        """
+        if self.__features is None:
+            self.__features = self.get_features()
+        return feature in self.__features
+
+    def __kill_children(self, pid: int) -> None:
+        """Kill child processes of device shell.
+
+        :param int pid: Shell process ID.
+        :raise: AdbCommandError: When failed.
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(f"{adbcmds.PKILL_CHILDREN} {pid}")
+        self.__adb_process.check_output(cmd)
+
+    def batch(
+        self, stop_on_error: bool = False, check: bool = True
+    ) -> adbbatch.AdbBatch:
+        """Collect device shell commands and run them in a single adb shell
+        call when the context exits. Every command gets its own result with
+        output and exit status.
+
+        :param bool stop_on_error: Skip remaining commands after a failed one.
+        :param bool check: Raise the first command error on context exit.
+        :return: Batch of commands.
+        :rtype: AdbBatch
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> with device.batch() as batch:
+        ...     batch.setprop('persist.dummy.prop', '42')
+        ...     batch.pm_grant('com.dummy.app', 'android.permission.PERMISSION')
+        ...     prop = batch.getprop('persist.dummy.prop')
+        >>> prop.output
+        '42'
+        """
+        invalidate = (
+            self.__prop_cache.invalidate if self.__prop_cache is not None else None
+        )
+        return adbbatch.AdbBatch(self.__adb_process, stop_on_error, check, invalidate)
+
     def rm(self, remote_path: str) -> None:
         """Remove file in adb device.
 
@@ -355,7 +843,7 @@ class AdbDevice:
         cmd = []
         cmd.append(adbcmds.SHELL)
         cmd.append(adbcmds.RM)
-        cmd.append(remote_path)
+        cmd.append(shlex.quote(remote_path))
         self.__adb_process.check_output(cmd)
 
     def tap(self, pos_x: int, pos_y: int) -> None:
@@ -403,36 +891,137 @@ class AdbDevice:
         self.__adb_process.check_output(cmd)
 
     def screencap(self, **kwargs) -> None:
-        """Capture screenshot.
+        """Capture screenshot as PNG. Unless remote path is given, the image
+        is streamed with exec-out straight to local file or file object,
+        without temporary file on the device.
 
-        :keyword str remote: Remote path.
+        :keyword str remote: Remote path, capture through device file.
         :keyword str local: Local path.
+        :keyword BinaryIO dest: Writable binary file object used instead of
+            local path.
         :raise: AdbCommandError: When failed.
 
         :example:
 
+        >>> import io
         >>> import simpleadb
         >>> device = simpleadb.AdbDevice('emulator-5554')
         >>> device.screencap()
+        >>> device.screencap(local='screen.png')
+        >>> png = io.BytesIO()
+        >>> device.screencap(dest=png)
         """
-        remote_default = "/sdcard/screencap.png"
         local_default = "screencap"
         local_default += time.strftime("%Y%m%d-%H%M%S")
         local_default += ".png"
 
         remote_arg = kwargs.get("remote")
         local_arg = kwargs.get("local")
+        dest = kwargs.get("dest")
 
-        remote = remote_arg if remote_arg else remote_default
         local = local_arg if local_arg else local_default
 
+        if remote_arg is None:
+            with self.__adb_process.open(adbscreen.create_args()) as stream:
+                if dest is not None:
+                    adbscreen.read_png(stream, dest)
+                    return
+                try:
+                    with open(local, "wb") as local_file:
+                        adbscreen.read_png(stream, local_file)
+                except AdbCommandError:
+                    os.remove(local)
+                    raise
+            return
+
         cmd = []
         cmd.append(adbcmds.SHELL)
         cmd.append(adbcmds.SCREENCAP)
-        cmd.append(remote)
+        cmd.append(shlex.quote(remote_arg))
         self.__adb_process.check_output(cmd)
-        self.pull(remote, local)
-        self.rm(remote)
+        self.pull(remote_arg, dest if dest is not None else local)
+        self.rm(remote_arg)
+
+    def screencap_bytes(
+        self, buffer: Optional[adbscreen.Buffer] = None
+    ) -> adbscreen.ScreenFrame:
+        """Capture raw screen pixels, usually RGBA_8888, streamed with
+        exec-out straight into the buffer. Reusing the buffer across frames
+        avoids allocating a new one for every capture.
+
+        :param Optional[adbscreen.Buffer] buffer: Writable buffer of at least
+            width * height * 4 bytes, allocated when None.
+        :raise: AdbCommandError: When failed.
+        :raise: ValueError: When buffer is too small.
+        :return: Frame with pixels referring to the buffer.
+        :rtype: ScreenFrame
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> frame = device.screencap_bytes()
+        >>> frame
+        ScreenFrame(1080x2400, format=1, size=10368000)
+        >>> buffer = bytearray(len(frame.pixels))
+        >>> for _ in range(10):
+        ...     frame = device.screencap_bytes(buffer)
+        """
+        cmd = adbscreen.create_args(png=False)
+        colorspace = self.__has_colorspace()
+        with self.__adb_process.open(cmd) as stream:
+            try:
+                return adbscreen.read_raw(stream, buffer, colorspace)
+            except EOFError as err:
+                raise AdbCommandError(self.get_id(), str(err)) from err
+
+    def capture(
+        self,
+        directory: Optional[str] = None,
+        dedup: bool = True,
+        interval: float = 0.0,
+        queue_size: int = 8,
+    ) -> adbscreen.CaptureSession:
+        """Start capturing raw frames back to back from a screencap loop
+        running on the device, streamed by a single exec-out call.
+
+        :param Optional[str] directory: Directory where unique frames are
+            written by background thread, frames are only yielded when None.
+        :param bool dedup: Skip frames identical to the previous one.
+        :param float interval: Device sleep between frames in sec.
+        :param int queue_size: Number of frames waiting for the writer.
+        :raise: AdbCommandError: When failed.
+        :return: Capture session, iterable of unique frames.
+        :rtype: CaptureSession
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> with device.capture('frames') as session:
+        ...     session.run(max_frames=100)
+        CaptureStats(captured=150, duplicates=50, dropped=0, written=100, ...)
+        >>> with device.capture() as session:
+        ...     for frame in session:
+        ...         print(frame.width, frame.height)
+        """
+        colorspace = self.__has_colorspace()
+        stream = self.__adb_process.open(adbscreen.create_loop_args(interval))
+        return adbscreen.CaptureSession(
+            stream, colorspace, directory, dedup, queue_size
+        )
+
+    def __has_colorspace(self) -> bool:
+        """Check once if raw screencap header has color space field.
+
+        :raise: AdbCommandError: When failed.
+        :return: True if header has color space field.
+        :rtype: bool
+        """
+        if self.__screencap_colorspace is None:
+            sdk = self.getprop("ro.build.version.sdk")
+            self.__screencap_colorspace = adbscreen.has_colorspace(sdk)
+        return self.__screencap_colorspace
 
     def broadcast(self, intent: str) -> None:
         """Send broadcast.
@@ -469,8 +1058,8 @@ class AdbDevice:
         cmd = []
         cmd.append(adbcmds.SHELL)
         cmd.append(adbcmds.PM_GRANT)
-        cmd.append(package)
-        cmd.append(permission)
+        cmd.append(shlex.quote(package))
+        cmd.append(shlex.quote(permission))
         self.__adb_process.check_output(cmd)
 
     def setprop(self, prop: str, value: str) -> None:
@@ -489,9 +1078,11 @@ class AdbDevice:
         cmd = []
         cmd.append(adbcmds.SHELL)
         cmd.append(adbcmds.SETPROP)
-        cmd.append(prop)
-        cmd.append(value)
+        cmd.append(shlex.quote(prop))
+        cmd.append(shlex.quote(value))
         self.__adb_process.check_output(cmd)
+        if self.__prop_cache is not None:
+            self.__prop_cache.invalidate(prop)
 
     def getprop(self, prop: str) -> str:
         """Get android system property value.
@@ -509,11 +1100,42 @@ class AdbDevice:
         >>> device.getprop('persist.dummy.prop')
         '42'
         """
+        if self.__prop_cache is not None:
+            value = self.__prop_cache.get(prop)
+            if value is not None:
+                return value
         cmd = []
         cmd.append(adbcmds.SHELL)
         cmd.append(adbcmds.GETPROP)
-        cmd.append(prop)
-        return self.__adb_process.check_output(cmd)
+        cmd.append(shlex.quote(prop))
+        value = self.__adb_process.check_output(cmd)
+        if self.__prop_cache is not None:
+            self.__prop_cache.put(prop, value)
+        return value
+
+    def getprops(self) -> Dict[str, str]:
+        """Get all android system properties with a single getprop call.
+        Refreshes property cache when enabled.
+
+        :raise: AdbCommandError: When failed.
+        :return: Property name to value mapping.
+        :rtype: Dict[str, str]
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> props = device.getprops()
+        >>> props['ro.product.model']
+        'Pixel 6'
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.GETPROP)
+        props = adbprops.parse_getprop(self.__adb_process.check_output(cmd))
+        if self.__prop_cache is not None:
+            self.__prop_cache.update(props)
+        return props
 
     def enable_verity(self, enabled: bool) -> None:
         """Enable/Disable verity.
@@ -531,33 +1153,103 @@ class AdbDevice:
         """
         cmd = []
         cmd.append((adbcmds.ENABLE_VERITY if enabled else adbcmds.DISABLE_VERITY))
-        self.__adb_process.check_output(cmd)
+        output = self.__adb_process.check_output(cmd)
+        if adbmode.requires_reboot(output):
+            self.__mode.reboot_pending = True
+        self.__mode.verity = enabled
 
-    def push(self, source: str, dest: str) -> None:
-        """Copy local files/dirs to device.
+    def sync(self, timeout: Optional[float] = None) -> adbsync.AdbSyncConnection:
+        """Open connection to the device file sync service, requires
+        :class:`simpleadb.AdbSocketTransport`.
+
+        :param Optional[float] timeout: Socket timeout in sec.
+        :raise: AdbCommandError: When failed or not supported by transport.
+        :return: Sync service connection.
+        :rtype: AdbSyncConnection
+
+        :example:
 
-        :param str source: Local path.
+        >>> import simpleadb
+        >>> transport = simpleadb.AdbSocketTransport()
+        >>> device = simpleadb.AdbDevice('emulator-5554', transport=transport)
+        >>> with device.sync() as sync:
+        ...     sync.stat('/sdcard/Download/dummy_file.txt').size
+        42
+        """
+        transport = self.__adb_process.transport
+        if not isinstance(transport, AdbSocketTransport):
+            raise AdbCommandError(self.get_id(), "file sync requires socket transport")
+        self.__adb_process.ensure_connected()
+        return transport.sync(self.__id, timeout)
+
+    def push(
+        self,
+        source: adbsync.Source,
+        dest: str,
+        progress: Optional[adbsync.Progress] = None,
+    ) -> Optional[adbsync.TransferStats]:
+        """Copy local files/dirs to device. With
+        :class:`simpleadb.AdbSocketTransport` files are streamed over the sync
+        protocol, which also accepts file objects and iterables of bytes.
+
+        :param adbsync.Source source: Local path, with socket transport also
+            bytes, binary file object or iterable of bytes.
         :param str dest: Remote path.
+        :param Optional[adbsync.Progress] progress: Called with number of sent
+            bytes and file size after every chunk, socket transport only.
         :raise: AdbCommandError: When failed.
+        :return: Transfer stats, None when adb client was used.
+        :rtype: Optional[TransferStats]
 
         :example:
 
         >>> import simpleadb
         >>> device = simpleadb.AdbDevice('emulator-5554')
         >>> device.push('dummy_file.txt', '/sdcard/Downloads/')
+        >>> device = simpleadb.AdbDevice(
+        ...     'emulator-5554', transport=simpleadb.AdbSocketTransport())
+        >>> with open('dummy_file.txt', 'rb') as source:
+        ...     device.push(source, '/sdcard/Downloads/dummy_file.txt')
+        TransferStats('/sdcard/Downloads/dummy_file.txt', size=42, ...)
         """
+        native = isinstance(self.__adb_process.transport, AdbSocketTransport)
+        if native and not (isinstance(source, str) and os.path.isdir(source)):
+            if not adbmetrics.HOOKS:
+                return self.__push(source, dest, progress)
+            return adbprocess.instrument(
+                self.__id,
+                [adbcmds.PUSH, dest],
+                lambda: self.__push(source, dest, progress),
+                lambda result: result.size,
+            )
+        if not isinstance(source, str):
+            raise AdbCommandError(self.get_id(), "streamed push requires socket")
         cmd = []
         cmd.append(adbcmds.PUSH)
         cmd.append(source)
         cmd.append(dest)
         self.__adb_process.check_output(cmd)
-
-    def pull(self, source: str, dest: Optional[str] = ".") -> None:
-        """Pull files or directories from remote device.
+        return None
+
+    def pull(
+        self,
+        source: str,
+        dest: Optional[adbsync.Destination] = ".",
+        progress: Optional[adbsync.Progress] = None,
+    ) -> Optional[adbsync.TransferStats]:
+        """Pull files or directories from remote device. With
+        :class:`simpleadb.AdbSocketTransport` files are streamed over the sync
+        protocol, which also accepts writable file object as destination.
 
         :param str source: Remote path.
-        :param Optional[str] dest: Local path, default is ``'.'``.
+        :param Optional[adbsync.Destination] dest: Local path, default is
+            ``'.'``, with socket transport also binary file object.
+        :param Optional[adbsync.Progress] progress: Called with number of
+            received bytes and file size after every chunk, socket transport
+            only.
         :raise: AdbCommandError: When failed.
+        :return: Transfer stats, None when adb client was used.
+        :rtype: Optional[TransferStats]
 
         :example:
 
@@ -567,11 +1259,164 @@ class AdbDevice:
         >>> device.pull('/sdcard/Downloads/dummy_file.txt')
         >>> device.pull('/sdcard/Downloads/dummy_file.txt', '/tmp')
         """
+        if isinstance(self.__adb_process.transport, AdbSocketTransport):
+            if not adbmetrics.HOOKS:
+                stats = self.__pull(source, dest, progress)
+            else:
+                stats = adbprocess.instrument(
+                    self.__id,
+                    [adbcmds.PULL, source],
+                    lambda: self.__pull(source, dest, progress),
+                    lambda result: result.size if result is not None else 0,
+                )
+            if stats is not None:
+                return stats
+        if not isinstance(dest, str):
+            raise AdbCommandError(self.get_id(), "streamed pull requires socket")
         cmd = []
         cmd.append(adbcmds.PULL)
         cmd.append(source)
         cmd.append(dest)
         self.__adb_process.check_output(cmd)
+        return None
+
+    def __push(
+        self,
+        source: adbsync.Source,
+        dest: str,
+        progress: Optional[adbsync.Progress],
+    ) -> adbsync.TransferStats:
+        with self.sync() as sync:
+            return sync.push(source, dest, progress)
+
+    def __pull(
+        self,
+        source: str,
+        dest: Optional[adbsync.Destination],
+        progress: Optional[adbsync.Progress],
+    ) -> Optional[adbsync.TransferStats]:
+        with self.sync() as sync:
+            if sync.stat(source).is_dir:
+                return None
+            return sync.pull(source, dest, progress)
+
+    def sync_dir(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        local: str,
+        remote: str,
+        delete: bool = False,
+        checksum: bool = False,
+        max_workers: int = 4,
+    ) -> adbsync.DirSyncResult:
+        """Push only changed files of local directory tree to device. Remote
+        files are listed with a single shell command and compared by size and
+        modification time, or by size and md5 digest with checksum enabled.
+        Changed files are pushed by concurrent transfers, over the sync
+        protocol with :class:`simpleadb.AdbSocketTransport`.
+
+        :param str local: Local directory path.
+        :param str remote: Remote directory path.
+        :param bool delete: Delete remote files missing in local directory.
+        :param bool checksum: Compare content digest instead of modification
+            time.
+        :param int max_workers: Maximum number of concurrent transfers.
+        :raise: AdbCommandError: When failed.
+        :return: Sync result.
+        :rtype: DirSyncResult
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> device.sync_dir('assets', '/sdcard/assets', delete=True)
+        DirSyncResult(pushed=3, deleted=1, unchanged=1200, size=4242, ...)
+        """
+        start = time.monotonic()
+        local_files = adbsync.scan_local(local)
+        remote_files = adbsync.parse_list_output(
+            self.shell(adbsync.create_list_command(remote)), remote
+        )
+        changed = adbsync.changed_files(local_files, remote_files, not checksum)
+        if checksum:
+            same_size = [name for name in local_files if name not in changed]
+            changed += self.__changed_content(local, remote, same_size)
+        dirs = {
+            posixpath.dirname(posixpath.join(remote, name))
+            for name in changed
+            if name not in remote_files
+        }
+        for args in adbsync.quote_chunks(sorted(dirs)):
+            self.shell(f"{adbcmds.MKDIR} {args}")
+        changed.sort(key=lambda name: local_files[name].size, reverse=True)
+        self.__push_files(local, remote, changed, max_workers)
+        stale = sorted(set(remote_files) - set(local_files)) if delete else []
+        paths = [posixpath.join(remote, name) for name in stale]
+        for args in adbsync.quote_chunks(paths):
+            self.shell(f"{adbcmds.RM_FORCE} {args}")
+        return adbsync.DirSyncResult(
+            changed,
+            stale,
+            len(local_files) - len(changed),
+            sum(local_files[name].size for name in changed),
+            time.monotonic() - start,
+        )
+
+    def __changed_content(self, local: str, remote: str, names: List[str]) -> List[str]:
+        """Compare md5 digest of local and remote files, remote files are
+        hashed by batched md5sum calls.
+
+        :param str local: Local directory path.
+        :param str remote: Remote directory path.
+        :param List[str] names: File paths relative to directories.
+        :raise: AdbCommandError: When failed.
+        :return: Files with different content.
+        :rtype: List[str]
+        """
+        paths = [posixpath.join(remote, name) for name in names]
+        hashes: Dict[str, str] = {}
+        for args in adbsync.quote_chunks(paths):
+            output = self.shell(f"{adbcmds.MD5SUM} {args}")
+            hashes.update(adbsync.parse_hash_output(output, remote))
+        return [
+            name
+            for name in names
+            if hashes.get(name) != adbsync.file_digest(os.path.join(local, name))
+        ]
+
+    def __push_files(
+        self, local: str, remote: str, names: List[str], max_workers: int
+    ) -> None:
+        """Push files split between concurrent workers, every worker reuses
+        a single sync connection.
+
+        :param str local: Local directory path.
+        :param str remote: Remote directory path.
+        :param List[str] names: File paths relative to directories.
+        :param int max_workers: Maximum number of workers.
+        :raise: AdbCommandError: When failed.
+        """
+        native = isinstance(self.__adb_process.transport, AdbSocketTransport)
+
+        def push_files(part: List[str]) -> None:
+            pairs = [
+                (os.path.join(local, name), posixpath.join(remote, name))
+                for name in part
+            ]
+            if not native:
+                for source, dest in pairs:
+                    self.push(source, dest)
+                return
+            with self.sync() as sync:
+                for source, dest in pairs:
+                    sync.send_file(source, dest)
+
+        workers = max(1, min(max_workers, len(names)))
+        with ThreadPoolExecutor(workers) as executor:
+            futures = [
+                executor.submit(push_files, names[i::workers]) for i in range(workers)
+            ]
+            for future in futures:
+                future.result()
 
     def wait_for_device(self, timeout_sec: Optional[int] = None) -> None:
         """Wait for device available.
@@ -591,6 +1436,77 @@ class AdbDevice:
         cmd.append(adbcmds.WAIT_FOR_DEVICE)
         self.__adb_process.check_output(cmd, timeout=timeout_sec)
 
+    def wait_until_ready(
+        self,
+        conditions: Sequence[str] = adbready.DEFAULT_CONDITIONS,
+        timeout: Optional[float] = None,
+        backoff: Optional[adbready.Backoff] = None,
+    ) -> adbready.ReadyResult:
+        """Wait until device is available and meets conditions, checked one
+        after another over a single device shell session with adaptive
+        polling delay. The session is opened again if the device goes away
+        while waiting.
+
+        :param Sequence[str] conditions: Conditions of
+            :data:`simpleadb.adbready.CONDITIONS`, e.g. 'boot_completed',
+            'package_manager', 'unlocked', or shell commands met when they
+            exit with zero status.
+        :param Optional[float] timeout: Timeout in sec, default 'inf'.
+        :param Optional[Backoff] backoff: Polling delay, default from 50 ms
+            growing up to 1 sec.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Time it took to meet each condition.
+        :rtype: ReadyResult
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> device.reboot()
+        >>> device.wait_until_ready(timeout=120)
+        ReadyResult('emulator-5554', boot_completed=21.402, package_manager=21.460, ...)
+        """
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        checks = adbready.resolve(conditions)
+        backoff = backoff if backoff is not None else adbready.Backoff()
+        result = adbready.ReadyResult(self.get_id())
+        session: Optional[adbshell.ShellSession] = None
+        try:
+            while checks:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise adbprocess.AdbCommandTimeoutExpired(
+                            self.get_id(),
+                            adbprocess.TimeoutExpired(checks[0][1], timeout),
+                        )
+                try:
+                    if session is None:
+                        self.wait_for_device(remaining)
+                        session = self.session()
+                    name, command = checks[0]
+                    if session.run(command, remaining).exit_code == 0:
+                        result.timings[name] = time.monotonic() - start
+                        checks.pop(0)
+                        backoff.reset()
+                        continue
+                except AdbCommandError:
+                    if session is not None:
+                        session.close()
+                    session = None
+                delay = backoff.next()
+                if deadline is not None:
+                    delay = min(delay, max(0.0, deadline - time.monotonic()))
+                time.sleep(delay)
+        finally:
+            if session is not None:
+                session.close()
+        result.elapsed = time.monotonic() - start
+        return result
+
     def dump_logcat(self, *buffers: str) -> str:
         """Dump logcat.
 
@@ -640,6 +1556,52 @@ class AdbDevice:
         cmd.append("-c")
         self.__adb_process.check_output(cmd)
 
+    def stream_logcat(  # pylint: disable=too-many-arguments
+        self,
+        *buffers: str,
+        tags: Optional[Iterable[str]] = None,
+        level: Optional[str] = None,
+        pid: Optional[int] = None,
+        dump: bool = False,
+        binary: bool = False,
+    ) -> Iterator[Union[adblogcat.LogcatEntry, adblogcat.LogcatRecord]]:
+        """Follow logcat and yield parsed messages as they arrive. Logcat is
+        read only as fast as messages are consumed. Closing the iterator
+        stops logcat.
+
+        :param str \\*buffers: Logcat buffers.
+        :param Optional[Iterable[str]] tags: Show only messages with given
+            tags.
+        :param Optional[str] level: Show only messages with at least given
+            priority, one of V, D, I, W, E, F.
+        :param Optional[int] pid: Show only messages of given process.
+        :param bool dump: Stop at the end of the buffers instead of following.
+        :param bool binary: Request binary format and decode it into
+            :class:`LogcatRecord`, cheaper than parsing text for many devices.
+        :raise: AdbCommandError: When failed.
+        :return: Iterator of parsed messages.
+        :rtype: Iterator[Union[LogcatEntry, LogcatRecord]]
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AdbDevice('emulator-5554')
+        >>> for entry in device.stream_logcat(tags=['ActivityManager']):
+        ...     print(entry.pid, entry.level, entry.message)
+        >>> errors = device.stream_logcat('main', 'crash', level='E')
+        >>> next(errors).tag
+        'AndroidRuntime'
+        >>> errors.close()
+        >>> records = device.stream_logcat(binary=True, dump=True)
+        """
+        cmd = adblogcat.create_args(buffers, tags, level, pid, dump, binary)
+        with self.__adb_process.open(cmd) as stream:
+            if binary:
+                accept = adblogcat.create_filter(tags, level)
+                yield from adblogcat.read_records(stream, accept)
+            else:
+                yield from adblogcat.read_entries(stream)
+
     def usb(self) -> None:
         """Restart adb server listening on USB.
 
@@ -0,0 +1,206 @@
+#
+# file adbfleet.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Run operations on many devices concurrently."""
+
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Union,
+)
+
+DEFAULT_MAX_WORKERS = 32
+
+
+class DeviceResult:
+    """DeviceResult is the outcome of an operation run on a single device.
+
+    :param device: Device the operation was run on.
+    :param Any value: Returned value.
+    :param Optional[BaseException] error: Raised exception.
+    :param float elapsed: Operation time in sec.
+    """
+
+    def __init__(
+        self,
+        device,
+        value: Any = None,
+        error: Optional[BaseException] = None,
+        elapsed: float = 0.0,
+    ):
+        self.device = device
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        outcome = f"error={self.error!r}" if self.error else f"value={self.value!r}"
+        return f"DeviceResult({self.device}, {outcome}, elapsed={self.elapsed:.3f})"
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """True if operation did not raise."""
+        return self.error is None
+
+    def get(self) -> Any:
+        """Get returned value or raise the operation exception.
+
+        :return: Returned value.
+        :rtype: Any
+        """
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def resolve(
+    fn: Union[str, Callable], args: Sequence = (), kwargs: Optional[Dict] = None
+) -> Callable:
+    """Create callable taking device as the only argument.
+
+    :param Union[str, Callable] fn: Device method name or callable taking the
+        device as first argument.
+    :param Sequence args: Additional positional arguments.
+    :param Optional[Dict] kwargs: Additional keyword arguments.
+    :return: Callable taking device.
+    :rtype: Callable
+    """
+    kwargs = kwargs if kwargs else {}
+    if isinstance(fn, str):
+        name = fn
+        return lambda device: getattr(device, name)(*args, **kwargs)
+    return lambda device: fn(device, *args, **kwargs)
+
+
+class DeviceLimiter:
+    """DeviceLimiter limits number of operations running at once on a single
+    device, shared by all fleet operations of one server.
+
+    :param int max_per_device: Maximum number of operations per device.
+    """
+
+    def __init__(self, max_per_device: int = 1):
+        self.max_per_device = max_per_device
+        self.__lock = threading.Lock()
+        self.__slots: Dict[str, threading.Semaphore] = {}
+        self.__async_slots: Dict[str, asyncio.Semaphore] = {}
+
+    def slot(self, device) -> threading.Semaphore:
+        """Get semaphore guarding device.
+
+        :param device: Device.
+        :return: Device semaphore.
+        :rtype: threading.Semaphore
+        """
+        with self.__lock:
+            return self.__slots.setdefault(
+                str(device), threading.Semaphore(self.max_per_device)
+            )
+
+    def async_slot(self, device) -> asyncio.Semaphore:
+        """Get asyncio semaphore guarding device, must be called from the
+        event loop.
+
+        :param device: Device.
+        :return: Device semaphore.
+        :rtype: asyncio.Semaphore
+        """
+        key = str(device)
+        if key not in self.__async_slots:
+            self.__async_slots[key] = asyncio.Semaphore(self.max_per_device)
+        return self.__async_slots[key]
+
+
+def run_on_devices(
+    fn: Callable,
+    devices: Iterable,
+    max_workers: Optional[int] = None,
+    limiter: Optional[DeviceLimiter] = None,
+) -> Iterator[DeviceResult]:
+    """Run callable on every device in a thread pool, yield results as they
+    complete. Pending operations are cancelled when the iterator is closed.
+
+    :param Callable fn: Callable taking device.
+    :param Iterable devices: Devices.
+    :param Optional[int] max_workers: Maximum number of operations running at
+        once, default 32.
+    :param Optional[DeviceLimiter] limiter: Per device limit.
+    :return: Iterator of device results.
+    :rtype: Iterator[DeviceResult]
+    """
+    limiter = limiter if limiter else DeviceLimiter()
+
+    def run(device) -> DeviceResult:
+        with limiter.slot(device):
+            start = time.monotonic()
+            try:
+                value = fn(device)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                return DeviceResult(device, None, err, time.monotonic() - start)
+            return DeviceResult(device, value, None, time.monotonic() - start)
+
+    executor = ThreadPoolExecutor(max_workers or DEFAULT_MAX_WORKERS)
+    try:
+        futures = [executor.submit(run, device) for device in devices]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def async_run_on_devices(
+    fn: Callable,
+    devices: Iterable,
+    max_workers: Optional[int] = None,
+    limiter: Optional[DeviceLimiter] = None,
+) -> AsyncIterator[DeviceResult]:
+    """Run coroutine function on every device concurrently, yield results as
+    they complete. Pending operations are cancelled when the iterator is
+    closed.
+
+    :param Callable fn: Callable taking device, may return awaitable.
+    :param Iterable devices: Devices.
+    :param Optional[int] max_workers: Maximum number of operations running at
+        once, default 32.
+    :param Optional[DeviceLimiter] limiter: Per device limit.
+    :return: Asynchronous iterator of device results.
+    :rtype: AsyncIterator[DeviceResult]
+    """
+    limiter = limiter if limiter else DeviceLimiter()
+    workers = asyncio.Semaphore(max_workers or DEFAULT_MAX_WORKERS)
+
+    async def run(device) -> DeviceResult:
+        async with workers, limiter.async_slot(device):
+            start = time.monotonic()
+            try:
+                value = fn(device)
+                if inspect.isawaitable(value):
+                    value = await value
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                return DeviceResult(device, None, err, time.monotonic() - start)
+            return DeviceResult(device, value, None, time.monotonic() - start)
+
+    tasks = [asyncio.ensure_future(run(device)) for device in devices]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
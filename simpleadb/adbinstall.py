@@ -0,0 +1,341 @@
+#
+# file adbinstall.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Package installation streamed from memory to many devices."""
+
+import io
+import os
+import re
+import shlex
+import struct
+import zipfile
+from typing import List, Optional, Sequence, Tuple
+from . import adbcmds
+
+MANIFEST = "AndroidManifest.xml"
+
+CHUNK_HEADER = struct.Struct("<HHI")
+STRING_POOL_HEADER = struct.Struct("<IIIII")
+ELEMENT_HEADER = struct.Struct("<IIIIHHH")
+ATTRIBUTE = struct.Struct("<IIIHBBI")
+
+CHUNK_XML = 0x0003
+CHUNK_STRING_POOL = 0x0001
+CHUNK_RESOURCE_MAP = 0x0180
+CHUNK_START_ELEMENT = 0x0102
+
+UTF8_FLAG = 0x100
+NO_INDEX = 0xFFFFFFFF
+TYPE_STRING = 0x03
+
+RESOURCE_IDS = {0x0101021B: "versionCode", 0x0101021C: "versionName"}
+
+VERSION_CODE_REGEX = re.compile(r"versionCode=(\d+)")
+
+INSTALLED = "installed"
+SKIPPED = "skipped"
+
+
+class ApkInfo:  # pylint: disable=too-few-public-methods
+    """ApkInfo is the identity of a package read from its manifest.
+
+    :param str package: Package name.
+    :param Optional[int] version_code: Version code.
+    :param Optional[str] split: Split name, None for base APK.
+    """
+
+    __slots__ = ("package", "version_code", "split")
+
+    def __init__(
+        self, package: str, version_code: Optional[int], split: Optional[str] = None
+    ):
+        self.package = package
+        self.version_code = version_code
+        self.split = split
+
+    def __repr__(self):
+        return (
+            f"ApkInfo({self.package!r}, version_code={self.version_code!r}, "
+            f"split={self.split!r})"
+        )
+
+
+def read_string(data: bytes, offset: int, utf8: bool) -> str:
+    """Read string of binary XML string pool.
+
+    :param bytes data: Manifest.
+    :param int offset: String offset.
+    :param bool utf8: Pool of UTF-8 strings, UTF-16 otherwise.
+    :return: String.
+    :rtype: str
+    """
+    if utf8:
+        offset += 2 if data[offset] & 0x80 else 1
+        size = data[offset]
+        offset += 1
+        if size & 0x80:
+            size = ((size & 0x7F) << 8) | data[offset]
+            offset += 1
+        return data[offset : offset + size].decode(errors="replace")
+    size = struct.unpack_from("<H", data, offset)[0]
+    offset += 2
+    if size & 0x8000:
+        size = ((size & 0x7FFF) << 16) | struct.unpack_from("<H", data, offset)[0]
+        offset += 2
+    return data[offset : offset + size * 2].decode("utf-16-le", errors="replace")
+
+
+def read_string_pool(data: bytes, offset: int) -> List[str]:
+    """Read binary XML string pool chunk.
+
+    :param bytes data: Manifest.
+    :param int offset: Chunk offset.
+    :return: Strings.
+    :rtype: List[str]
+    """
+    count, _, flags, strings_start, _ = STRING_POOL_HEADER.unpack_from(
+        data, offset + CHUNK_HEADER.size
+    )
+    offsets = struct.unpack_from(f"<{count}I", data, offset + 28)
+    start = offset + strings_start
+    utf8 = bool(flags & UTF8_FLAG)
+    return [read_string(data, start + string, utf8) for string in offsets]
+
+
+def parse_manifest(data: bytes) -> ApkInfo:  # pylint: disable=too-many-locals
+    """Read package name, version code and split name from the root element
+    of binary AndroidManifest.xml. Attribute names are resolved with the
+    resource map, so obfuscated manifests are read as well.
+
+    :param bytes data: Compiled manifest.
+    :raise: ValueError: When data is not a compiled manifest.
+    :return: Package identity.
+    :rtype: ApkInfo
+    """
+    chunk_type, header_size, _ = CHUNK_HEADER.unpack_from(data, 0)
+    if chunk_type != CHUNK_XML:
+        raise ValueError("not a binary XML")
+    strings: List[str] = []
+    resources: Tuple[int, ...] = ()
+    offset = header_size
+    while offset + CHUNK_HEADER.size <= len(data):
+        chunk_type, header_size, size = CHUNK_HEADER.unpack_from(data, offset)
+        if chunk_type == CHUNK_STRING_POOL:
+            strings = read_string_pool(data, offset)
+        elif chunk_type == CHUNK_RESOURCE_MAP:
+            count = (size - header_size) // 4
+            resources = struct.unpack_from(f"<{count}I", data, offset + header_size)
+        elif chunk_type == CHUNK_START_ELEMENT:
+            attributes = {}
+            _, _, _, _, start, attr_size, count = ELEMENT_HEADER.unpack_from(
+                data, offset + CHUNK_HEADER.size
+            )
+            for index in range(count):
+                _, name, raw, _, _, kind, value = ATTRIBUTE.unpack_from(
+                    data, offset + header_size + start + index * attr_size
+                )
+                if name < len(resources) and resources[name] in RESOURCE_IDS:
+                    key = RESOURCE_IDS[resources[name]]
+                else:
+                    key = strings[name]
+                if raw != NO_INDEX:
+                    attributes[key] = strings[raw]
+                elif kind == TYPE_STRING:
+                    attributes[key] = strings[value]
+                else:
+                    attributes[key] = value
+            version_code = attributes.get("versionCode")
+            return ApkInfo(
+                str(attributes.get("package", "")),
+                int(version_code) if version_code is not None else None,
+                attributes.get("split"),
+            )
+        offset += size
+    raise ValueError("manifest element not found")
+
+
+def read_apk_info(path: str) -> ApkInfo:
+    """Read package identity of APK without reading the whole file.
+
+    :param str path: APK path.
+    :raise: OSError: When not readable.
+    :raise: ValueError: When not an APK.
+    :return: Package identity.
+    :rtype: ApkInfo
+    """
+    try:
+        with zipfile.ZipFile(path) as apk:
+            return parse_manifest(apk.read(MANIFEST))
+    except (zipfile.BadZipFile, KeyError, IndexError, struct.error) as err:
+        raise ValueError(f"{path}: not an APK, {err}") from err
+
+
+class ApkFile:
+    """ApkFile is an APK read into memory once and sent to any number of
+    devices.
+
+    :param str path: APK path.
+    :raise: OSError: When not readable.
+    :raise: ValueError: When not an APK.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        with open(path, "rb") as source:
+            self.data = source.read()
+        try:
+            with zipfile.ZipFile(io.BytesIO(self.data)) as apk:
+                self.info = parse_manifest(apk.read(MANIFEST))
+        except (zipfile.BadZipFile, KeyError, IndexError, struct.error) as err:
+            raise ValueError(f"{path}: not an APK, {err}") from err
+
+    def __repr__(self):
+        return f"ApkFile({self.path!r}, {self.info!r})"
+
+    @property
+    def size(self) -> int:
+        """Size in bytes."""
+        return len(self.data)
+
+
+class ApkSet:
+    """ApkSet is an app made of a base APK and optional split APKs, read once
+    and installed as a whole.
+
+    :param Sequence[str] paths: APK paths.
+    :raise: ValueError: When APKs do not belong to the same package.
+
+    :example:
+
+    >>> apks = ApkSet(['base.apk', 'split_config.arm64_v8a.apk'])
+    >>> apks.package, apks.version_code
+    ('com.dummy.app', 42)
+    """
+
+    def __init__(self, paths: Sequence[str]):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.files = [ApkFile(path) for path in paths]
+        if not self.files:
+            raise ValueError("no APK given")
+        packages = {apk.info.package for apk in self.files}
+        if len(packages) != 1:
+            raise ValueError(f"APKs of different packages {sorted(packages)}")
+        base = [apk for apk in self.files if apk.info.split is None]
+        self.package = self.files[0].info.package
+        self.version_code = (base[0] if base else self.files[0]).info.version_code
+
+    def __repr__(self):
+        return f"ApkSet({self.package!r}, {[apk.name for apk in self.files]})"
+
+    @property
+    def size(self) -> int:
+        """Total size in bytes."""
+        return sum(apk.size for apk in self.files)
+
+
+def create_args(apks: ApkSet, replace: bool = True) -> List[str]:
+    """Create adb install or install-multiple arguments.
+
+    :param ApkSet apks: APKs.
+    :param bool replace: Replace existing app.
+    :return: Adb command line arguments.
+    :rtype: List[str]
+    """
+    cmd = []
+    cmd.append(adbcmds.INSTALL if len(apks.files) == 1 else adbcmds.INSTALL_MULTIPLE)
+    if replace:
+        cmd.append("-r")
+    cmd += [apk.path for apk in apks.files]
+    return cmd
+
+
+def create_stream_service(size: int, replace: bool = True) -> str:
+    """Create service installing single APK streamed to stdin.
+
+    :param int size: APK size.
+    :param bool replace: Replace existing app.
+    :return: Device local service.
+    :rtype: str
+    """
+    return f"exec:{adbcmds.PM_INSTALL}{' -r' if replace else ''} -S {size}"
+
+
+def create_session_service(size: int, replace: bool = True) -> str:
+    """Create service opening install session for split APKs.
+
+    :param int size: Total size of APKs.
+    :param bool replace: Replace existing app.
+    :return: Device local service.
+    :rtype: str
+    """
+    return f"exec:{adbcmds.PM_INSTALL_CREATE}{' -r' if replace else ''} -S {size}"
+
+
+def create_session_services(
+    apks: ApkSet, session_id: int
+) -> List[Tuple[str, Optional[bytes]]]:
+    """Create services writing APKs to install session and committing it.
+
+    :param ApkSet apks: APKs.
+    :param int session_id: Install session ID.
+    :return: Pairs of service and data sent to it.
+    :rtype: List[Tuple[str, Optional[bytes]]]
+    """
+    services: List[Tuple[str, Optional[bytes]]] = []
+    for index, apk in enumerate(apks.files):
+        name = shlex.quote(f"{index}_{apk.name}")
+        services.append(
+            (
+                f"exec:{adbcmds.PM_INSTALL_WRITE} -S {apk.size} {session_id} {name} -",
+                apk.data,
+            )
+        )
+    services.append((f"exec:{adbcmds.PM_INSTALL_COMMIT} {session_id}", None))
+    return services
+
+
+def parse_session_id(output: str) -> int:
+    """Read session ID from install-create output.
+
+    :param str output: Output, e.g. 'Success: created install session [42]'.
+    :raise: ValueError: When session was not created.
+    :return: Session ID.
+    :rtype: int
+    """
+    match = re.search(r"\[(\d+)\]", output)
+    if not output.startswith("Success") or match is None:
+        raise ValueError(output.strip())
+    return int(match.group(1))
+
+
+def create_version_query(package: str) -> str:
+    """Create shell command printing installed version code line.
+
+    :param str package: Package name.
+    :return: Shell command.
+    :rtype: str
+    """
+    return f"{adbcmds.DUMPSYS_PACKAGE} {shlex.quote(package)} | grep -m 1 versionCode="
+
+
+def parse_version_code(output: str) -> Optional[int]:
+    """Read version code from ``dumpsys package`` output.
+
+    :param str output: Output.
+    :return: Installed version code, None if package is not installed.
+    :rtype: Optional[int]
+
+    :example:
+
+    >>> parse_version_code('    versionCode=42 minSdk=28 targetSdk=34')
+    42
+    """
+    match = VERSION_CODE_REGEX.search(output)
+    return int(match.group(1)) if match else None
@@ -0,0 +1,360 @@
+#
+# file adblogcat.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Logcat streaming and parsing."""
+
+import re
+import struct
+import time
+from typing import (
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+)
+from . import adbcmds
+
+LEVELS = "VDIWEFS"
+PRIORITY_LEVELS = "??" + LEVELS
+
+ENTRY_HEADER = struct.Struct("<HH")
+ENTRY_V1 = struct.Struct("<HHiIII")
+ENTRY_FIELDS = struct.Struct("<iIII")
+ENTRY_LOG_ID = struct.Struct("<I")
+
+THREADTIME_REGEX = re.compile(
+    r"^(\d\d-\d\d \d\d:\d\d:\d\d\.\d+)\s+(\d+)\s+(\d+)\s+([VDIWEFS])\s(.*?)\s*: ?(.*)$"
+)
+
+
+class LogcatEntry:  # pylint: disable=too-few-public-methods
+    """LogcatEntry is a single parsed log message.
+
+    :param str timestamp: Time of the message, e.g. '01-20 12:34:56.789'.
+    :param int pid: Process ID.
+    :param int tid: Thread ID.
+    :param str level: Priority, one of V, D, I, W, E, F.
+    :param str tag: Message tag.
+    :param str message: Message.
+    """
+
+    __slots__ = ("timestamp", "pid", "tid", "level", "tag", "message")
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self, timestamp: str, pid: int, tid: int, level: str, tag: str, message: str
+    ):
+        self.timestamp = timestamp
+        self.pid = pid
+        self.tid = tid
+        self.level = level
+        self.tag = tag
+        self.message = message
+
+    def __repr__(self):
+        return (
+            f"LogcatEntry({self.timestamp!r}, {self.pid}, {self.tid}, "
+            f"{self.level!r}, {self.tag!r}, {self.message!r})"
+        )
+
+    def __eq__(self, other):
+        return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+
+class LogcatRecord:  # pylint: disable=too-many-instance-attributes
+    """LogcatRecord is a single log message decoded from binary
+    ``logger_entry`` format. Tag and message are decoded from the received
+    buffer only when accessed. Attributes match :class:`LogcatEntry`.
+
+    Records of binary buffers, e.g. events, carry binary payload which is
+    not a tag and message.
+
+    :param bytes data: Buffer holding the entry.
+    :param int offset: Entry offset in data.
+    :param int end: Entry end offset in data.
+    :param Optional[int] hdr_size: Header size if the length and header size
+        fields were read separately and entry at offset starts after them.
+    """
+
+    __slots__ = (
+        "pid",
+        "tid",
+        "sec",
+        "nsec",
+        "log_id",
+        "priority",
+        "data",
+        "tag_start",
+        "tag_end",
+        "end",
+    )
+
+    def __init__(
+        self, data: bytes, offset: int, end: int, hdr_size: Optional[int] = None
+    ):
+        if hdr_size is None:
+            hdr_size = ENTRY_HEADER.unpack_from(data, offset)[1]
+        else:
+            offset -= ENTRY_HEADER.size
+        self.pid, self.tid, self.sec, self.nsec = ENTRY_FIELDS.unpack_from(
+            data, offset + ENTRY_HEADER.size
+        )
+        if hdr_size > ENTRY_V1.size:
+            self.log_id = ENTRY_LOG_ID.unpack_from(data, offset + ENTRY_V1.size)[0]
+            start = offset + hdr_size
+        else:
+            self.log_id = 0
+            start = offset + ENTRY_V1.size
+        self.priority = data[start] if start < end else 0
+        self.data = data
+        self.tag_start = start + 1
+        self.tag_end = data.find(b"\0", start + 1, end)
+        if self.tag_end < 0:
+            self.tag_end = end
+        self.end = end
+
+    def __repr__(self):
+        return (
+            f"LogcatRecord({self.timestamp!r}, {self.pid}, {self.tid}, "
+            f"{self.level!r}, {self.tag!r}, {self.message!r})"
+        )
+
+    @property
+    def level(self) -> str:
+        """Priority, one of V, D, I, W, E, F."""
+        priority = self.priority
+        return PRIORITY_LEVELS[priority] if priority < len(PRIORITY_LEVELS) else "?"
+
+    @property
+    def tag_bytes(self) -> bytes:
+        """Message tag not decoded."""
+        return self.data[self.tag_start : self.tag_end]
+
+    @property
+    def tag(self) -> str:
+        """Message tag."""
+        return self.data[self.tag_start : self.tag_end].decode(errors="replace")
+
+    @property
+    def message(self) -> str:
+        """Message."""
+        data = self.data
+        start = self.tag_end + 1
+        end = self.end
+        if end > start and data[end - 1] == 0:
+            end -= 1
+        if end > start and data[end - 1] == 10:
+            end -= 1
+        return data[start:end].decode(errors="replace")
+
+    @property
+    def timestamp(self) -> str:
+        """Local time of the message formatted as in threadtime format."""
+        local = time.strftime("%m-%d %H:%M:%S", time.localtime(self.sec))
+        return f"{local}.{self.nsec // 1000000:03d}"
+
+
+def parse_threadtime(line: str) -> Optional[LogcatEntry]:
+    """Parse line of ``logcat -v threadtime`` output.
+
+    :param str line: Logcat line.
+    :return: Parsed entry, None for lines which are not log messages, e.g.
+        '--------- beginning of main'.
+    :rtype: Optional[LogcatEntry]
+
+    :example:
+
+    >>> parse_threadtime('01-20 12:34:56.789  1234  1240 I Dummy   : dummy msg')
+    LogcatEntry('01-20 12:34:56.789', 1234, 1240, 'I', 'Dummy', 'dummy msg')
+    """
+    match = THREADTIME_REGEX.match(line.rstrip("\r\n"))
+    if match is None:
+        return None
+    timestamp, pid, tid, level, tag, message = match.groups()
+    return LogcatEntry(timestamp, int(pid), int(tid), level, tag, message)
+
+
+def parse_binary(data: bytes) -> Iterator[LogcatRecord]:
+    """Decode buffer of binary ``logger_entry`` records. Records refer to
+    the buffer instead of copying it, incomplete trailing entry is ignored.
+
+    :param bytes data: Output of ``logcat -B``.
+    :return: Iterator of records.
+    :rtype: Iterator[LogcatRecord]
+    """
+    offset = 0
+    size = len(data)
+    while offset + ENTRY_HEADER.size <= size:
+        length, hdr_size = ENTRY_HEADER.unpack_from(data, offset)
+        end = offset + (hdr_size if hdr_size else ENTRY_V1.size) + length
+        if end > size:
+            return
+        yield LogcatRecord(data, offset + ENTRY_HEADER.size, end, hdr_size)
+        offset = end
+
+
+def create_filter(
+    tags: Optional[Iterable[str]] = None, level: Optional[str] = None
+) -> Callable[[LogcatRecord], bool]:
+    """Create binary record filter. Logcat does not filter binary output by
+    tag and priority, so records are filtered on the host without decoding
+    them.
+
+    :param Optional[Iterable[str]] tags: Accept only messages with given tags.
+    :param Optional[str] level: Accept only messages with at least given
+        priority.
+    :return: Filter returning True for accepted records.
+    :rtype: Callable[[LogcatRecord], bool]
+    """
+    min_priority = PRIORITY_LEVELS.index(level) if level else 0
+    tag_set = {tag.encode() for tag in tags} if tags is not None else None
+
+    def accept(record: LogcatRecord) -> bool:
+        if record.priority < min_priority:
+            return False
+        return tag_set is None or record.tag_bytes in tag_set
+
+    return accept
+
+
+def create_args(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    buffers: Iterable[str] = (),
+    tags: Optional[Iterable[str]] = None,
+    level: Optional[str] = None,
+    pid: Optional[int] = None,
+    dump: bool = False,
+    binary: bool = False,
+) -> List[str]:
+    """Create logcat arguments, filters are applied on the device. Binary
+    logcat runs with exec-out to keep the output untouched, tag and priority
+    filters are left to :func:`create_filter`.
+
+    :param Iterable[str] buffers: Logcat buffers.
+    :param Optional[Iterable[str]] tags: Show only messages with given tags.
+    :param Optional[str] level: Show only messages with at least given
+        priority.
+    :param Optional[int] pid: Show only messages of given process.
+    :param bool dump: Stop at the end of the buffers instead of following.
+    :param bool binary: Request binary ``logger_entry`` format.
+    :raise: ValueError: When level is not valid.
+    :return: Adb command line arguments.
+    :rtype: List[str]
+    """
+    if level is not None and level not in LEVELS:
+        raise ValueError(f"invalid logcat level {level!r}")
+    cmd = []
+    if binary:
+        cmd.append(adbcmds.EXEC_OUT)
+        cmd.append(adbcmds.LOGCAT)
+        cmd.append("-B")
+    else:
+        cmd.append(adbcmds.LOGCAT)
+        cmd.append("-v")
+        cmd.append("threadtime")
+    for buf in buffers:
+        cmd.append("-b")
+        cmd.append(buf)
+    if pid is not None:
+        cmd.append(f"--pid={pid}")
+    if dump:
+        cmd.append("-d")
+    if binary:
+        return cmd
+    if tags is not None:
+        cmd += [f"{tag}:{level or 'V'}" for tag in tags]
+        cmd.append("*:S")
+    elif level is not None:
+        cmd.append(f"*:{level}")
+    return cmd
+
+
+def read_entries(lines: Iterable[bytes]) -> Iterator[LogcatEntry]:
+    """Parse logcat lines as they arrive.
+
+    :param Iterable[bytes] lines: Logcat output lines.
+    :return: Iterator of parsed entries.
+    :rtype: Iterator[LogcatEntry]
+    """
+    for line in lines:
+        entry = parse_threadtime(line.decode(errors="replace"))
+        if entry is not None:
+            yield entry
+
+
+async def async_read_entries(lines: AsyncIterator[bytes]) -> AsyncIterator[LogcatEntry]:
+    """Parse logcat lines as they arrive from asyncio stream.
+
+    :param AsyncIterator[bytes] lines: Logcat output lines.
+    :return: Asynchronous iterator of parsed entries.
+    :rtype: AsyncIterator[LogcatEntry]
+    """
+    async for line in lines:
+        entry = parse_threadtime(line.decode(errors="replace"))
+        if entry is not None:
+            yield entry
+
+
+def entry_size(length: int, hdr_size: int) -> int:
+    """Get size of entry read from stream following its length and header
+    size fields.
+
+    :param int length: Payload length field.
+    :param int hdr_size: Header size field, 0 for v1 entries.
+    :return: Number of bytes.
+    :rtype: int
+    """
+    return (hdr_size if hdr_size else ENTRY_V1.size) - ENTRY_HEADER.size + length
+
+
+def read_records(
+    stream, accept: Optional[Callable[[LogcatRecord], bool]] = None
+) -> Iterator[LogcatRecord]:
+    """Decode binary logcat records as they arrive.
+
+    :param AdbStream stream: Output of ``logcat -B``.
+    :param Optional[Callable[[LogcatRecord], bool]] accept: Record filter.
+    :return: Iterator of records.
+    :rtype: Iterator[LogcatRecord]
+    """
+    while True:
+        header = stream.read(ENTRY_HEADER.size)
+        if len(header) < ENTRY_HEADER.size:
+            return
+        length, hdr_size = ENTRY_HEADER.unpack(header)
+        size = entry_size(length, hdr_size)
+        body = stream.read(size)
+        if len(body) < size:
+            return
+        record = LogcatRecord(body, 0, size, hdr_size)
+        if accept is None or accept(record):
+            yield record
+
+
+async def async_read_records(
+    stream, accept: Optional[Callable[[LogcatRecord], bool]] = None
+) -> AsyncIterator[LogcatRecord]:
+    """Decode binary logcat records as they arrive from asyncio stream.
+
+    :param AsyncAdbStream stream: Output of ``logcat -B``.
+    :param Optional[Callable[[LogcatRecord], bool]] accept: Record filter.
+    :return: Asynchronous iterator of records.
+    :rtype: AsyncIterator[LogcatRecord]
+    """
+    while True:
+        header = await stream.read(ENTRY_HEADER.size)
+        if len(header) < ENTRY_HEADER.size:
+            return
+        length, hdr_size = ENTRY_HEADER.unpack(header)
+        size = entry_size(length, hdr_size)
+        body = await stream.read(size)
+        if len(body) < size:
+            return
+        record = LogcatRecord(body, 0, size, hdr_size)
+        if accept is None or accept(record):
+            yield record
@@ -0,0 +1,388 @@
+#
+# file adbmetrics.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Adb command instrumentation hooks and metrics recorder."""
+
+import bisect
+import collections
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+SHELL_COMMANDS = frozenset(
+    (
+        "am",
+        "cmd",
+        "dumpsys",
+        "getprop",
+        "input",
+        "logcat",
+        "pm",
+        "screencap",
+        "setprop",
+        "settings",
+        "wm",
+    )
+)
+
+HOOKS: Tuple["Hook", ...] = ()
+
+HOOKS_LOCK = threading.Lock()
+
+
+def command_type(args: Sequence[str]) -> str:
+    """Get command type used as metrics key: adb command, or well known
+    device command run with shell.
+
+    :param Sequence[str] args: Adb command line arguments.
+    :return: Command type.
+    :rtype: str
+
+    :example:
+
+    >>> command_type(['shell', 'getprop ro.product.model'])
+    'getprop'
+    >>> command_type(['shell', 'ls /sdcard'])
+    'shell'
+    """
+    if not args:
+        return ""
+    if args[0] == "shell" and len(args) > 1:
+        name = args[1].split(" ", 1)[0]
+        if name in SHELL_COMMANDS:
+            return name
+    return args[0]
+
+
+# pylint: disable-next=too-many-instance-attributes
+class CommandEvent:  # pylint: disable=too-few-public-methods
+    """CommandEvent describes a single adb command passed to hooks.
+
+    :param str device_id: Device ID, empty for server commands.
+    :param str command: Command type, see :func:`command_type`.
+    :param Sequence[str] args: Adb command line arguments.
+    """
+
+    __slots__ = (
+        "device_id",
+        "command",
+        "args",
+        "start_ns",
+        "start",
+        "elapsed",
+        "nbytes",
+        "error",
+        "timeout",
+    )
+
+    def __init__(self, device_id: str, command: str, args: Sequence[str]):
+        self.device_id = device_id
+        self.command = command
+        self.args = args
+        self.start_ns = time.time_ns()
+        self.start = time.perf_counter()
+        self.elapsed = 0.0
+        self.nbytes: Optional[int] = None
+        self.error: Optional[BaseException] = None
+        self.timeout = False
+
+    def __repr__(self):
+        return (
+            f"CommandEvent({self.device_id!r}, {self.command!r}, "
+            f"elapsed={self.elapsed:.6f}, nbytes={self.nbytes!r}, "
+            f"error={self.error!r})"
+        )
+
+
+class Hook:
+    """Hook is called before and after every instrumented adb command.
+    Subclasses override :meth:`before` and :meth:`after`. Hooks are called
+    from the thread running the command and must not raise.
+    """
+
+    def before(self, event: CommandEvent) -> None:
+        """Called before the command is run.
+
+        :param CommandEvent event: Command, timing is not set yet.
+        """
+
+    def after(self, event: CommandEvent) -> None:
+        """Called after the command finished or failed.
+
+        :param CommandEvent event: Command with duration, size and error.
+        """
+
+
+def add_hook(hook: Hook) -> None:
+    """Enable hook for adb commands of all devices.
+
+    :param Hook hook: Hook.
+    """
+    global HOOKS  # pylint: disable=global-statement
+    with HOOKS_LOCK:
+        HOOKS = HOOKS + (hook,)
+
+
+def remove_hook(hook: Hook) -> None:
+    """Disable hook, commands are not instrumented when no hook is enabled.
+
+    :param Hook hook: Hook.
+    """
+    global HOOKS  # pylint: disable=global-statement
+    with HOOKS_LOCK:
+        HOOKS = tuple(enabled for enabled in HOOKS if enabled is not hook)
+
+
+def start(device_id: Optional[str], args: Sequence[str]) -> CommandEvent:
+    """Create command event and call hooks before the command.
+
+    :param Optional[str] device_id: Device ID.
+    :param Sequence[str] args: Adb command line arguments.
+    :return: Command event.
+    :rtype: CommandEvent
+    """
+    event = CommandEvent(device_id or "", command_type(args), args)
+    for hook in HOOKS:
+        hook.before(event)
+    event.start = time.perf_counter()
+    return event
+
+
+def finish(
+    event: CommandEvent,
+    error: Optional[BaseException] = None,
+    nbytes: Optional[int] = None,
+    timeout: bool = False,
+) -> None:
+    """Complete command event and call hooks after the command.
+
+    :param CommandEvent event: Command event.
+    :param Optional[BaseException] error: Raised exception.
+    :param Optional[int] nbytes: Number of bytes transferred.
+    :param bool timeout: True if the command timed out.
+    """
+    event.elapsed = time.perf_counter() - event.start
+    event.error = error
+    event.nbytes = nbytes
+    event.timeout = timeout
+    for hook in HOOKS:
+        hook.after(event)
+
+
+class Histogram:  # pylint: disable=too-few-public-methods
+    """Histogram counts values in cumulative buckets.
+
+    :param Sequence[float] buckets: Upper bounds, sorted.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Count value.
+
+        :param float value: Value.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Get cumulative counts of buckets, the last one is '+Inf'.
+
+        :return: Pairs of upper bound and number of values up to it.
+        :rtype: List[Tuple[str, int]]
+        """
+        total = 0
+        counts = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            counts.append(("+Inf" if bound == float("inf") else f"{bound:g}", total))
+        return counts
+
+
+class CommandStats:  # pylint: disable=too-few-public-methods
+    """CommandStats is the latency histogram and counters of a command type
+    on a device."""
+
+    __slots__ = ("latency", "errors", "timeouts", "nbytes")
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS):
+        self.latency = Histogram(buckets)
+        self.errors = 0
+        self.timeouts = 0
+        self.nbytes = 0
+
+
+def escape_label(value: str) -> str:
+    """Escape Prometheus label value.
+
+    :param str value: Label value.
+    :return: Escaped value.
+    :rtype: str
+    """
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRecorder(Hook):
+    """MetricsRecorder keeps latency histograms, error, timeout and byte
+    counters per command type and device, and the most recent commands as
+    spans. Use it as context manager, or enable with :func:`add_hook`.
+
+    :param Sequence[float] buckets: Latency histogram bucket upper bounds in
+        sec.
+    :param int max_spans: Number of kept spans.
+
+    :example:
+
+    >>> import simpleadb
+    >>> device = simpleadb.AdbDevice('emulator-5554')
+    >>> with simpleadb.MetricsRecorder() as recorder:
+    ...     device.getprop('ro.product.model')
+    'Pixel 6'
+    >>> recorder.snapshot()['commands'][0]['command']
+    'getprop'
+    >>> print(recorder.prometheus())
+    # HELP simpleadb_command_duration_seconds Adb command duration.
+    ...
+    """
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS, max_spans: int = 1000):
+        self.buckets = tuple(buckets)
+        self.__lock = threading.Lock()
+        self.__stats: Dict[Tuple[str, str], CommandStats] = {}
+        self.__spans: Deque[CommandEvent] = collections.deque(maxlen=max_spans)
+
+    def __enter__(self):
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_hook(self)
+
+    def after(self, event: CommandEvent) -> None:
+        key = (event.command, event.device_id)
+        with self.__lock:
+            stats = self.__stats.get(key)
+            if stats is None:
+                stats = self.__stats[key] = CommandStats(self.buckets)
+            stats.latency.observe(event.elapsed)
+            if event.error is not None:
+                stats.errors += 1
+            if event.timeout:
+                stats.timeouts += 1
+            if event.nbytes:
+                stats.nbytes += event.nbytes
+            self.__spans.append(event)
+
+    def reset(self) -> None:
+        """Drop recorded metrics and spans."""
+        with self.__lock:
+            self.__stats.clear()
+            self.__spans.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict]]:
+        """Get metrics as plain data, e.g. to dump as JSON. Errors include
+        timeouts.
+
+        :return: Dict with 'commands' list of per command type and device
+            counters, latency sum and cumulative buckets.
+        :rtype: Dict[str, List[Dict]]
+        """
+        with self.__lock:
+            items = sorted(self.__stats.items())
+            return {
+                "commands": [
+                    {
+                        "command": command,
+                        "device": device,
+                        "count": stats.latency.count,
+                        "errors": stats.errors,
+                        "timeouts": stats.timeouts,
+                        "bytes": stats.nbytes,
+                        "sum": stats.latency.sum,
+                        "buckets": dict(stats.latency.cumulative()),
+                    }
+                    for (command, device), stats in items
+                ]
+            }
+
+    def prometheus(self, prefix: str = "simpleadb") -> str:
+        """Get metrics in Prometheus text exposition format.
+
+        :param str prefix: Metric name prefix.
+        :return: Metrics text.
+        :rtype: str
+        """
+        commands = self.snapshot()["commands"]
+        duration = f"{prefix}_command_duration_seconds"
+        lines = [
+            f"# HELP {duration} Adb command duration.",
+            f"# TYPE {duration} histogram",
+        ]
+        for entry in commands:
+            labels = (
+                f'command="{escape_label(entry["command"])}",'
+                f'device="{escape_label(entry["device"])}"'
+            )
+            for bound, count in entry["buckets"].items():
+                lines.append(f'{duration}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{duration}_sum{{{labels}}} {entry['sum']!r}")
+            lines.append(f"{duration}_count{{{labels}}} {entry['count']}")
+        for name, key, text in (
+            ("command_errors_total", "errors", "Failed adb commands, with timeouts."),
+            ("command_timeouts_total", "timeouts", "Timed out adb commands."),
+            ("transferred_bytes_total", "bytes", "Bytes sent and received."),
+        ):
+            lines.append(f"# HELP {prefix}_{name} {text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for entry in commands:
+                lines.append(
+                    f'{prefix}_{name}{{command="{escape_label(entry["command"])}",'
+                    f'device="{escape_label(entry["device"])}"}} {entry[key]}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def spans(self) -> List[Dict]:
+        """Get recent commands as OpenTelemetry style spans.
+
+        :return: Spans with name, start and end time in ns since epoch,
+            attributes and status.
+        :rtype: List[Dict]
+        """
+        with self.__lock:
+            events = list(self.__spans)
+        spans = []
+        for event in events:
+            attributes: Dict[str, object] = {
+                "adb.command": event.command,
+                "adb.device": event.device_id,
+                "adb.args": " ".join(str(arg) for arg in event.args),
+            }
+            if event.nbytes is not None:
+                attributes["adb.bytes"] = event.nbytes
+            status = {"code": "OK"}
+            if event.error is not None:
+                status = {"code": "ERROR", "message": str(event.error)}
+            spans.append(
+                {
+                    "name": f"adb {event.command}",
+                    "start_time_unix_nano": event.start_ns,
+                    "end_time_unix_nano": event.start_ns + int(event.elapsed * 1e9),
+                    "attributes": attributes,
+                    "status": status,
+                }
+            )
+        return spans
@@ -0,0 +1,194 @@
+#
+# file adbmode.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Device mode tracking: adbd root, verity and remount state."""
+
+import shlex
+from typing import List, Optional, Tuple
+
+ROOT = "root"
+UNROOT = "unroot"
+VERITY = "verity"
+REBOOT = "reboot"
+REMOUNT = "remount"
+
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+MOUNTS_PATH = "/proc/mounts"
+VERITY_MODE_PROP = "ro.boot.veritymode"
+ROOT_MOUNT_POINT = "/"
+SYSTEM_MOUNT_POINT = "/system"
+SYSTEM_MOUNT_POINTS = (ROOT_MOUNT_POINT, SYSTEM_MOUNT_POINT)
+
+
+class DeviceMode:  # pylint: disable=too-few-public-methods
+    """DeviceMode is the last known mode of a device, None when not known.
+
+    :param Optional[bool] root: True if adbd runs as root.
+    :param Optional[bool] verity: True if verity is enabled, or set to be
+        enabled after reboot.
+    :param Optional[bool] remounted: True if system partition is mounted
+        read-write.
+    :param Optional[str] boot_id: Kernel boot ID, changed by every boot.
+    :param bool reboot_pending: True if a change takes effect after reboot.
+    """
+
+    __slots__ = ("root", "verity", "remounted", "boot_id", "reboot_pending")
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        root: Optional[bool] = None,
+        verity: Optional[bool] = None,
+        remounted: Optional[bool] = None,
+        boot_id: Optional[str] = None,
+        reboot_pending: bool = False,
+    ):
+        self.root = root
+        self.verity = verity
+        self.remounted = remounted
+        self.boot_id = boot_id
+        self.reboot_pending = reboot_pending
+
+    def __repr__(self):
+        return (
+            f"DeviceMode(root={self.root!r}, verity={self.verity!r}, "
+            f"remounted={self.remounted!r}, "
+            f"reboot_pending={self.reboot_pending!r})"
+        )
+
+    @property
+    def known(self) -> bool:
+        """True if the mode was read from the device since the last boot."""
+        return self.boot_id is not None
+
+
+class ModeResult:  # pylint: disable=too-few-public-methods
+    """ModeResult is the outcome of a device mode change.
+
+    :param str device_id: Device ID.
+    :param DeviceMode mode: Device mode after the change.
+    :param List[Tuple[str, float]] phases: Phases run in order, e.g.
+        'root', 'verity', 'reboot', 'remount', with their duration in sec.
+        Phases with nothing to do are not run.
+    """
+
+    __slots__ = ("device_id", "mode", "phases")
+
+    def __init__(
+        self,
+        device_id: str,
+        mode: DeviceMode,
+        phases: Optional[List[Tuple[str, float]]] = None,
+    ):
+        self.device_id = device_id
+        self.mode = mode
+        self.phases = phases if phases is not None else []
+
+    def __repr__(self):
+        phases = ", ".join(f"{name}={sec:.3f}" for name, sec in self.phases)
+        return f"ModeResult({self.device_id!r}, [{phases}], {self.mode!r})"
+
+    @property
+    def elapsed(self) -> float:
+        """Total duration in sec."""
+        return sum(sec for _, sec in self.phases)
+
+
+def create_query_command() -> str:
+    """Create shell command printing adbd user ID, verity mode, boot ID and
+    mounted file systems.
+
+    :return: Shell command.
+    :rtype: str
+    """
+    cmd = []
+    cmd.append("id -u")
+    cmd.append(f"getprop {VERITY_MODE_PROP}")
+    cmd.append(f"cat {BOOT_ID_PATH}")
+    cmd.append(f"cat {MOUNTS_PATH}")
+    return ";".join(cmd)
+
+
+def parse_mounts(lines: List[str]) -> Optional[bool]:
+    """Check if system partition is mounted read-write. The last mount of a
+    mount point hides the previous ones. /system is checked when mounted,
+    / only on system-as-root devices, where / may be a read-write rootfs.
+
+    :param List[str] lines: Lines of /proc/mounts.
+    :return: True if mounted read-write, None if not found.
+    :rtype: Optional[bool]
+
+    :example:
+
+    >>> parse_mounts(['/dev/block/dm-0 / ext4 ro,seclabel 0 0',
+    ...               'overlay / overlay rw,seclabel 0 0'])
+    True
+    >>> parse_mounts(['rootfs / rootfs rw,seclabel 0 0',
+    ...               '/dev/block/vda /system ext4 ro,seclabel 0 0'])
+    False
+    """
+    options = {}
+    for line in lines:
+        fields = line.split()
+        if len(fields) > 3 and fields[1] in SYSTEM_MOUNT_POINTS:
+            options[fields[1]] = fields[3].split(",")
+    mount = options.get(SYSTEM_MOUNT_POINT, options.get(ROOT_MOUNT_POINT))
+    if mount is None:
+        return None
+    return "rw" in mount
+
+
+def parse_query_output(output: str) -> DeviceMode:
+    """Parse output of :func:`create_query_command`.
+
+    :param str output: Query output.
+    :raise: ValueError: When output is not complete.
+    :return: Device mode.
+    :rtype: DeviceMode
+    """
+    lines = output.splitlines()
+    if len(lines) < 3 or not lines[0].strip().isdigit():
+        raise ValueError(f"unexpected mode query output {output!r}")
+    uid, verity_mode, boot_id = (line.strip() for line in lines[:3])
+    return DeviceMode(
+        uid == "0",
+        verity_mode != "disabled" if verity_mode else None,
+        parse_mounts(lines[3:]),
+        boot_id or None,
+    )
+
+
+def restarts_adbd(output: str) -> bool:
+    """Check if root or unroot output reports adbd restart, it is not
+    restarted when already running in the requested mode.
+
+    :param str output: Output, e.g. 'adbd is already running as root'.
+    :return: True if adbd restarts.
+    :rtype: bool
+    """
+    return "restarting" in output.lower()
+
+
+def requires_reboot(output: str) -> bool:
+    """Check if verity or remount output asks for reboot.
+
+    :param str output: Output, e.g. 'Now reboot your device for settings
+        to take effect'.
+    :return: True if the change takes effect after reboot.
+    :rtype: bool
+    """
+    return "reboot" in output.lower()
+
+
+def create_boot_condition(boot_id: str) -> str:
+    """Create readiness condition met after the device booted again.
+
+    :param str boot_id: Boot ID read before reboot.
+    :return: Shell command.
+    :rtype: str
+    """
+    return f'[ "$(cat {BOOT_ID_PATH})" != {shlex.quote(boot_id)} ]'
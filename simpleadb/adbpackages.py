@@ -0,0 +1,236 @@
+#
+# file adbpackages.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Installed package index loaded with a single package manager query."""
+
+import shlex
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+from . import adbcmds
+
+LIST_OPTIONS = "-f -U --show-versioncode -i"
+DISABLED_MARKER = "--disabled--"
+
+
+class PackageInfo:  # pylint: disable=too-few-public-methods
+    """PackageInfo is an installed package entry of package manager.
+
+    :param str package: Package name.
+    :param Optional[int] version_code: Version code.
+    :param Optional[str] path: Base APK path.
+    :param Optional[int] uid: Linux user ID of the app.
+    :param bool enabled: False if the package is disabled.
+    :param Optional[str] installer: Installer package name.
+    """
+
+    __slots__ = ("package", "version_code", "path", "uid", "enabled", "installer")
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        package: str,
+        version_code: Optional[int] = None,
+        path: Optional[str] = None,
+        uid: Optional[int] = None,
+        enabled: bool = True,
+        installer: Optional[str] = None,
+    ):
+        self.package = package
+        self.version_code = version_code
+        self.path = path
+        self.uid = uid
+        self.enabled = enabled
+        self.installer = installer
+
+    def __repr__(self):
+        return (
+            f"PackageInfo({self.package!r}, version_code={self.version_code!r}, "
+            f"path={self.path!r}, uid={self.uid!r}, enabled={self.enabled!r}, "
+            f"installer={self.installer!r})"
+        )
+
+    def __eq__(self, other):
+        return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+
+def create_list_command(package: Optional[str] = None) -> str:
+    """Create shell command listing packages with path, version code, uid
+    and installer, followed by the disabled packages.
+
+    :param Optional[str] package: List only packages containing given
+        name, all packages when None.
+    :return: Shell command.
+    :rtype: str
+    """
+    name = f" {shlex.quote(package)}" if package else ""
+    cmd = []
+    cmd.append(f"{adbcmds.PM_LIST_PACKAGES} {LIST_OPTIONS}{name}")
+    cmd.append(f"echo {DISABLED_MARKER}")
+    cmd.append(f"{adbcmds.PM_LIST_PACKAGES} -d{name}")
+    return ";".join(cmd)
+
+
+def parse_package_line(line: str) -> Optional[PackageInfo]:
+    """Parse line of ``pm list packages -f -U --show-versioncode -i``
+    output. The APK path is separated from the package name by the last
+    '=' of the first field.
+
+    :param str line: Package list line.
+    :return: Package entry, None if line is not a package.
+    :rtype: Optional[PackageInfo]
+
+    :example:
+
+    >>> info = parse_package_line(
+    ...     'package:/data/app/base.apk=com.dummy versionCode:42 '
+    ...     'installer=com.android.vending uid:10123')
+    >>> info.package, info.version_code, info.uid, info.installer
+    ('com.dummy', 42, 10123, 'com.android.vending')
+    """
+    fields = line.split()
+    if not fields or not fields[0].startswith("package:"):
+        return None
+    path, _, package = fields[0][len("package:") :].rpartition("=")
+    info = PackageInfo(package, path=path or None)
+    for field in fields[1:]:
+        if field.startswith("versionCode:"):
+            info.version_code = int(field[len("versionCode:") :])
+        elif field.startswith("uid:"):
+            info.uid = int(field[len("uid:") :].split(",")[0])
+        elif field.startswith("installer="):
+            installer = field[len("installer=") :]
+            info.installer = installer if installer != "null" else None
+    return info
+
+
+def parse_package_list(output: str) -> Dict[str, PackageInfo]:
+    """Parse output of :func:`create_list_command`.
+
+    :param str output: Package list and disabled package list.
+    :return: Package name to package entry mapping.
+    :rtype: Dict[str, PackageInfo]
+    """
+    packages, _, disabled = output.partition(DISABLED_MARKER)
+    index = {}
+    for line in packages.splitlines():
+        info = parse_package_line(line)
+        if info is not None:
+            index[info.package] = info
+    for line in disabled.splitlines():
+        info = parse_package_line(line)
+        if info is not None and info.package in index:
+            index[info.package].enabled = False
+    return index
+
+
+class PackageIndex:
+    """PackageIndex is an in-memory view of installed packages. It is loaded
+    with a single query on the first lookup, single packages are refreshed
+    after installing and uninstalling through the library and the whole
+    index is reloaded when older than ttl_sec, to pick up changes made on
+    the device in other ways. Updates replace the whole mapping, so lookups
+    and iteration never see it change.
+
+    :param Callable loader: Function listing packages, takes package name
+        filter or None for all packages.
+    :param float ttl_sec: Reload index older than given number of sec.
+
+    :example:
+
+    >>> import simpleadb
+    >>> device = simpleadb.AdbDevice('emulator-5554')
+    >>> device.packages.get('com.android.chrome').version_code
+    609911033
+    >>> 'com.dummy' in device.packages
+    False
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Optional[str]], Dict[str, PackageInfo]],
+        ttl_sec: float = 60.0,
+    ):
+        self.ttl_sec = ttl_sec
+        self.__loader = loader
+        self.__lock = threading.Lock()
+        self.__packages: Dict[str, PackageInfo] = {}
+        self.__loaded: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.__current())
+
+    def __contains__(self, package: str) -> bool:
+        return package in self.__current()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self.__current()))
+
+    def get(self, package: str) -> Optional[PackageInfo]:
+        """Get installed package entry.
+
+        :param str package: Package name.
+        :raise: AdbCommandError: When loading failed.
+        :return: Package entry, None if package is not installed.
+        :rtype: Optional[PackageInfo]
+        """
+        return self.__current().get(package)
+
+    def packages(self) -> List[PackageInfo]:
+        """Get installed packages.
+
+        :raise: AdbCommandError: When loading failed.
+        :return: Package entries sorted by package name.
+        :rtype: List[PackageInfo]
+        """
+        packages = self.__current()
+        return [packages[package] for package in sorted(packages)]
+
+    def refresh(self, package: Optional[str] = None) -> None:
+        """Reload single package entry, or the whole index. A single package
+        is refreshed only when the index is loaded.
+
+        :param Optional[str] package: Package name, None reloads all packages.
+        :raise: AdbCommandError: When loading failed.
+        """
+        if package is None:
+            packages = self.__loader(None)
+            with self.__lock:
+                self.__packages = packages
+                self.__loaded = time.monotonic()
+            return
+        if self.__loaded is None:
+            return
+        info = self.__loader(package).get(package)
+        with self.__lock:
+            packages = dict(self.__packages)
+            if info is None:
+                packages.pop(package, None)
+            else:
+                packages[package] = info
+            self.__packages = packages
+
+    def remove(self, package: str) -> None:
+        """Drop package entry, e.g. after uninstall.
+
+        :param str package: Package name.
+        """
+        with self.__lock:
+            packages = dict(self.__packages)
+            packages.pop(package, None)
+            self.__packages = packages
+
+    def invalidate(self) -> None:
+        """Reload the whole index on the next lookup."""
+        with self.__lock:
+            self.__loaded = None
+
+    def __current(self) -> Dict[str, PackageInfo]:
+        loaded = self.__loaded
+        if loaded is None or time.monotonic() - loaded >= self.ttl_sec:
+            self.refresh()
+        return self.__packages
@@ -8,10 +8,17 @@
 
 """Interface for adb process"""
 
+import abc
+import functools
+import shutil
 import subprocess
+import threading
 from subprocess import CalledProcessError, TimeoutExpired
-from typing import List, Optional
+from typing import BinaryIO, Callable, Iterator, List, Optional, Sequence, TypeVar
 from . import adbcmds
+from . import adbmetrics
+
+Result = TypeVar("Result")
 
 
 class AdbCommandError(Exception):
@@ -63,19 +70,343 @@ class AdbCommandTimeoutExpired(Exception):
             {self.timeout_expired.timeout} seconds.'
 
 
+class AdbStream:
+    """AdbStream is the binary output of a running adb command, read while
+    the command runs. Reading blocks until the command produces data, so a
+    slow reader slows the command down instead of buffering its output in
+    memory. Closing the stream stops the command.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param BinaryIO reader: Command output.
+    """
+
+    def __init__(self, device_id: str, reader: BinaryIO):
+        self.device_id = device_id
+        self.reader = reader
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+    def read(self, size: int = -1) -> bytes:
+        """Read size bytes, less only at the end of output.
+
+        :param int size: Number of bytes, -1 reads until the end of output.
+        :raise: AdbCommandError: When command failed.
+        :return: Received data.
+        :rtype: bytes
+        """
+        data = self.reader.read(size)
+        if len(data) < size or size < 0:
+            self.finish()
+        return data
+
+    def readinto(self, buffer: memoryview) -> int:
+        """Read into buffer until it is full, less only at the end of output.
+
+        :param memoryview buffer: Writable buffer.
+        :raise: AdbCommandError: When command failed.
+        :return: Number of bytes read.
+        :rtype: int
+        """
+        view = memoryview(buffer).cast("B")
+        size = 0
+        while size < len(view):
+            count = self.reader.readinto(view[size:])
+            if not count:
+                self.finish()
+                break
+            size += count
+        return size
+
+    def readline(self) -> bytes:
+        """Read single line.
+
+        :raise: AdbCommandError: When command failed.
+        :return: Line including line separator, empty at the end of output.
+        :rtype: bytes
+        """
+        line = self.reader.readline()
+        if not line:
+            self.finish()
+        return line
+
+    def finish(self) -> None:
+        """Called at the end of output, check command status.
+
+        :raise: AdbCommandError: When command failed.
+        """
+
+    def close(self) -> None:
+        """Stop the command and release its resources."""
+        self.closed = True
+        self.reader.close()
+
+
+class AdbProcessStream(AdbStream):
+    """AdbProcessStream is the output of adb client subprocess.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param subprocess.Popen process: Adb process with stdout and stderr pipes.
+    """
+
+    def __init__(self, device_id: str, process: subprocess.Popen):
+        super().__init__(device_id, process.stdout)
+        self.process = process
+
+    def finish(self) -> None:
+        if self.closed:
+            return
+        returncode = self.process.wait()
+        if returncode != 0:
+            output = self.process.stderr.read().decode(errors="replace")
+            err = CalledProcessError(returncode, self.process.args, output)
+            raise AdbCommandError(self.device_id, output, err)
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        super().close()
+        self.process.stderr.close()
+
+
+def check_connect_output(address: str, output: str) -> None:
+    """Check output of adb connect, adb client may exit with zero status
+    when connection failed.
+
+    :param str address: Device address.
+    :param str output: Command output.
+    :raise: AdbCommandError: When not connected.
+
+    :example:
+
+    >>> check_connect_output('192.168.42.42:5555', 'connected to 192.168.42.42:5555')
+    """
+    if not output.strip().startswith(("connected to", "already connected to")):
+        raise AdbCommandError(address, output.strip())
+
+
+def instrument(
+    device_id: Optional[str],
+    args: Sequence[str],
+    call: Callable[[], Result],
+    size: Optional[Callable[[Result], int]] = None,
+) -> Result:
+    """Run adb command with enabled :mod:`simpleadb.adbmetrics` hooks.
+    Callers check ``adbmetrics.HOOKS`` first and call the command directly
+    when no hook is enabled.
+
+    :param Optional[str] device_id: Device ID.
+    :param Sequence[str] args: Adb command line arguments, identify command.
+    :param Callable call: Runs the command.
+    :param Optional[Callable] size: Gets number of transferred bytes from
+        command result.
+    :return: Command result.
+    """
+    event = adbmetrics.start(device_id, args)
+    try:
+        result = call()
+    except AdbCommandTimeoutExpired as err:
+        adbmetrics.finish(event, err, timeout=True)
+        raise
+    except BaseException as err:
+        adbmetrics.finish(event, err)
+        raise
+    adbmetrics.finish(event, nbytes=size(result) if size is not None else None)
+    return result
+
+
+class AdbTransport(abc.ABC):
+    """AdbTransport is a base class for the ways adb commands are delivered to
+    the adb server. Subclasses implement :meth:`check_output` and
+    :meth:`open`.
+    """
+
+    @abc.abstractmethod
+    def check_output(
+        self, device_id: Optional[str], adb_path: str, args: List[str], **kwargs
+    ) -> str:
+        """Run adb command.
+
+        :param Optional[str] device_id: Device ID, None for server commands.
+        :param str adb_path: Adb binary path.
+        :param List[str] args: Adb command line arguments.
+        :keyword int timeout: Timeout in sec.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command output.
+        :rtype: str
+        """
+
+    @abc.abstractmethod
+    def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AdbStream:
+        """Start adb command and return its output as a stream.
+
+        :param Optional[str] device_id: Device ID, None for server commands.
+        :param str adb_path: Adb binary path.
+        :param List[str] args: Adb command line arguments.
+        :raise: AdbCommandError: When failed.
+        :return: Command output stream.
+        :rtype: AdbStream
+        """
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_adb_path(adb_path: str) -> str:
+    """Resolve adb binary path using PATH once per process. Absolute
+    executable path lets Python spawn adb with ``posix_spawn``.
+
+    :param str adb_path: Adb binary name or path.
+    :return: Absolute path if found, otherwise adb_path.
+    :rtype: str
+    """
+    return shutil.which(adb_path) or adb_path
+
+
+class AdbSubprocessTransport(AdbTransport):
+    """AdbSubprocessTransport runs every command as an adb client subprocess.
+
+    Arguments are passed to adb as argv without a host shell. Adb joins
+    arguments of device shell commands with spaces, so values used in device
+    shell commands are quoted with :func:`shlex.quote` by the callers.
+
+    :param bool use_shell: Run joined command line with ``/bin/sh`` as in
+        previous versions, one more process per command.
+    :param bool close_fds: Close inherited file descriptors in adb process,
+        False lets Python spawn adb with ``posix_spawn``.
+
+    :example:
+
+    >>> import simpleadb
+    >>> transport = simpleadb.AdbSubprocessTransport(close_fds=False)
+    >>> device = simpleadb.AdbDevice('emulator-5554', transport=transport)
+    """
+
+    def __init__(self, use_shell: bool = False, close_fds: bool = True):
+        self.use_shell = use_shell
+        self.close_fds = close_fds
+
+    @staticmethod
+    def create_use_on_device_arg(device_id: Optional[str]) -> str:
+        """Create use on device argument.
+
+        :param Optional[str] device_id: Device ID.
+        :return: Concatenated string used for adb commands '-s <device_id>', or
+            empty string.
+        :rtype: str
+        """
+        return "-s " + str(device_id) if device_id is not None else ""
+
+    @staticmethod
+    def create_args(
+        device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> List[str]:
+        """Create adb process argv.
+
+        :param Optional[str] device_id: Device ID.
+        :param str adb_path: Adb binary path.
+        :param List[str] args: Adb command line arguments.
+        :return: Process argv.
+        :rtype: List[str]
+        """
+        cmd = [resolve_adb_path(adb_path)]
+        if device_id is not None:
+            cmd += ["-s", device_id]
+        cmd += [arg for arg in args if arg]
+        return cmd
+
+    def check_output(
+        self, device_id: Optional[str], adb_path: str, args: List[str], **kwargs
+    ) -> str:
+        kwargs.setdefault("universal_newlines", True)
+        kwargs.setdefault("stderr", subprocess.STDOUT)
+        if kwargs.setdefault("shell", self.use_shell):
+            cmd_args = [adb_path]
+            if device_id is not None:
+                cmd_args += [self.create_use_on_device_arg(device_id)]
+            cmd_args += args
+            cmd = " ".join(arg for arg in cmd_args if arg is not None)
+        else:
+            cmd = self.create_args(device_id, adb_path, args)
+            kwargs.setdefault("close_fds", self.close_fds)
+        try:
+            return subprocess.check_output(cmd, **kwargs).rstrip("\n\r")
+        except CalledProcessError as err:
+            raise AdbCommandError(device_id or "", "", err) from err
+        except TimeoutExpired as err:
+            raise AdbCommandTimeoutExpired(device_id or "", err) from err
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+
+    def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AdbStream:
+        cmd = self.create_args(device_id, adb_path, args)
+        try:
+            process = subprocess.Popen(  # pylint: disable=consider-using-with
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                close_fds=self.close_fds,
+            )
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        return AdbProcessStream(device_id or "", process)
+
+
 class AdbProcess:
     """AdbProcess this class is used to call adb process.
 
     :param Optional[str] device_id: Device ID, used when called adb command on
         device.
     :param: adb_path (Optional[str]): adb path, default: 'adb'
+    :param Optional[AdbTransport] transport: Transport used to deliver
+        commands, default :class:`AdbSubprocessTransport`.
+    :param bool connect: Run 'adb connect device_id' before the first
+        command.
     """
 
     def __init__(
-        self, device_id: Optional[str] = None, adb_path: Optional[str] = adbcmds.ADB
+        self,
+        device_id: Optional[str] = None,
+        adb_path: Optional[str] = adbcmds.ADB,
+        transport: Optional[AdbTransport] = None,
+        connect: bool = False,
     ):
         self.device_id = device_id
         self.adb_path = adb_path
+        self.transport = transport if transport else AdbSubprocessTransport()
+        self.connect_pending = connect
+        self.connect_lock = threading.Lock()
+
+    def ensure_connected(self) -> None:
+        """Run pending 'adb connect device_id' once. Concurrent callers wait
+        for the first one, failed connect is retried by the next command.
+
+        :raise: AdbCommandError: When failed.
+        """
+        if not self.connect_pending:
+            return
+        with self.connect_lock:
+            if self.connect_pending:
+                output = self.transport.check_output(
+                    None, self.adb_path, [adbcmds.CONNECT, self.device_id]
+                )
+                check_connect_output(self.device_id, output)
+                self.connect_pending = False
 
     def create_use_on_device_arg(self) -> str:
         """Create use on device argument.
@@ -84,28 +415,44 @@ class AdbProcess:
             empty string.
         :rtype: str
         """
-        return "-s " + str(self.device_id) if self.device_id is not None else ""
+        return AdbSubprocessTransport.create_use_on_device_arg(self.device_id)
 
     def check_output(self, args: List[str], **kwargs) -> str:
-        """Call adb subprocess.
+        """Call adb command using the process transport.
 
         :param List[str] prop: Arguments.
         :keyword str timeout: Timeout in sec.
         :raise: AdbCommandError: When failed.
         :return: Process output.
         """
-        cmd = []
-        cmd_args = [self.adb_path]
-        if self.device_id is not None:
-            cmd_args += [self.create_use_on_device_arg()]
-        cmd_args += args
-        cmd = " ".join(arg for arg in cmd_args if arg is not None)
-        kwargs.setdefault("shell", True)
-        kwargs.setdefault("universal_newlines", True)
-        kwargs.setdefault("stderr", subprocess.STDOUT)
-        try:
-            return subprocess.check_output(cmd, **kwargs).rstrip("\n\r")
-        except CalledProcessError as err:
-            raise AdbCommandError(self.device_id or "", "", err) from err
-        except TimeoutExpired as err:
-            raise AdbCommandTimeoutExpired(self.device_id or "", err) from err
+        self.ensure_connected()
+        if not adbmetrics.HOOKS:
+            return self.transport.check_output(
+                self.device_id, self.adb_path, args, **kwargs
+            )
+        return instrument(
+            self.device_id,
+            args,
+            lambda: self.transport.check_output(
+                self.device_id, self.adb_path, args, **kwargs
+            ),
+            len,
+        )
+
+    def open(self, args: List[str]) -> AdbStream:
+        """Start adb command using the process transport and return its output
+        as a stream.
+
+        :param List[str] args: Arguments.
+        :raise: AdbCommandError: When failed.
+        :return: Command output stream.
+        :rtype: AdbStream
+        """
+        self.ensure_connected()
+        if not adbmetrics.HOOKS:
+            return self.transport.open(self.device_id, self.adb_path, args)
+        return instrument(
+            self.device_id,
+            args,
+            lambda: self.transport.open(self.device_id, self.adb_path, args),
+        )
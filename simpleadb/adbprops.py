@@ -0,0 +1,104 @@
+#
+# file adbprops.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Android system properties parsing and caching."""
+
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+GETPROP_REGEX = re.compile(r"^\[(.*?)\]: \[(.*?)\]$", re.MULTILINE | re.DOTALL)
+READ_ONLY_PREFIX = "ro."
+
+
+def parse_getprop(output: str) -> Dict[str, str]:
+    """Parse ``getprop`` dump with ``[key]: [value]`` lines.
+
+    :param str output: Getprop output.
+    :return: Property name to value mapping.
+    :rtype: Dict[str, str]
+
+    :example:
+
+    >>> parse_getprop('[ro.product.model]: [Pixel]\\n[sys.boot_completed]: [1]')
+    {'ro.product.model': 'Pixel', 'sys.boot_completed': '1'}
+    """
+    return dict(GETPROP_REGEX.findall(output.replace("\r\n", "\n")))
+
+
+def is_read_only(prop: str) -> bool:
+    """Check if property can be set only once per boot.
+
+    :param str prop: Property name.
+    :return: True if property is read-only.
+    :rtype: bool
+    """
+    return prop.startswith(READ_ONLY_PREFIX)
+
+
+class PropCache:
+    """PropCache keeps property values read from a device. Read-only
+    ``ro.*`` properties with a value are served until invalidated, other
+    properties are served for ttl_sec after they were read.
+
+    :param float ttl_sec: Staleness window of mutable properties in sec,
+        0 caches only read-only properties.
+    """
+
+    def __init__(self, ttl_sec: float = 0.0):
+        self.ttl_sec = ttl_sec
+        self.__lock = threading.Lock()
+        self.__values: Dict[str, Tuple[str, float]] = {}
+
+    def get(self, prop: str) -> Optional[str]:
+        """Get cached property value.
+
+        :param str prop: Property name.
+        :return: Property value, None if not cached or stale.
+        :rtype: Optional[str]
+        """
+        with self.__lock:
+            cached = self.__values.get(prop)
+        if cached is None:
+            return None
+        value, updated = cached
+        if value and is_read_only(prop):
+            return value
+        if time.monotonic() - updated < self.ttl_sec:
+            return value
+        return None
+
+    def put(self, prop: str, value: str) -> None:
+        """Store property value.
+
+        :param str prop: Property name.
+        :param str value: Property value.
+        """
+        with self.__lock:
+            self.__values[prop] = (value, time.monotonic())
+
+    def update(self, props: Dict[str, str]) -> None:
+        """Store property values read at once.
+
+        :param Dict[str, str] props: Property name to value mapping.
+        """
+        now = time.monotonic()
+        with self.__lock:
+            self.__values.update((prop, (value, now)) for prop, value in props.items())
+
+    def invalidate(self, prop: Optional[str] = None) -> None:
+        """Drop cached property value.
+
+        :param Optional[str] prop: Property name, None drops all values.
+        """
+        with self.__lock:
+            if prop is None:
+                self.__values.clear()
+            else:
+                self.__values.pop(prop, None)
@@ -0,0 +1,107 @@
+#
+# file adbready.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Device readiness conditions checked after boot."""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BOOT_COMPLETED = "boot_completed"
+PACKAGE_MANAGER = "package_manager"
+UNLOCKED = "unlocked"
+
+CONDITIONS = {
+    BOOT_COMPLETED: '[ "$(getprop sys.boot_completed)" = 1 ]',
+    PACKAGE_MANAGER: "service check package | grep -q ': found'",
+    UNLOCKED: "! dumpsys window | grep -q -E "
+    "'mDreamingLockscreen=true|mShowingLockscreen=true|isStatusBarKeyguard=true'",
+}
+DEFAULT_CONDITIONS = (BOOT_COMPLETED, PACKAGE_MANAGER)
+
+
+class ReadyResult:  # pylint: disable=too-few-public-methods
+    """ReadyResult is the time it took until device met each condition.
+
+    :param str device_id: Device ID.
+    :param Dict[str, float] timings: Condition to time in sec since the
+        wait started when the condition was met.
+    :param float elapsed: Total wait time in sec.
+    """
+
+    __slots__ = ("device_id", "timings", "elapsed")
+
+    def __init__(
+        self,
+        device_id: str,
+        timings: Optional[Dict[str, float]] = None,
+        elapsed: float = 0.0,
+    ):
+        self.device_id = device_id
+        self.timings = timings if timings is not None else {}
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        timings = ", ".join(f"{name}={sec:.3f}" for name, sec in self.timings.items())
+        return f"ReadyResult({self.device_id!r}, {timings}, elapsed={self.elapsed:.3f})"
+
+
+class Backoff:
+    """Backoff is a polling delay growing while nothing changes and reset
+    when a condition is met, so fast devices are not slowed down by long
+    delays and slow devices are not flooded with checks.
+
+    :param float initial: First delay in sec.
+    :param float maximum: Maximum delay in sec.
+    :param float factor: Delay multiplier after every unmet check.
+
+    :example:
+
+    >>> backoff = Backoff(0.1, 0.3, 2)
+    >>> [backoff.next() for _ in range(3)]
+    [0.1, 0.2, 0.3]
+    """
+
+    def __init__(
+        self, initial: float = 0.05, maximum: float = 1.0, factor: float = 1.5
+    ):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.__delay = initial
+
+    def next(self) -> float:
+        """Get delay and grow the following one.
+
+        :return: Delay in sec.
+        :rtype: float
+        """
+        delay = self.__delay
+        self.__delay = min(self.__delay * self.factor, self.maximum)
+        return delay
+
+    def reset(self) -> None:
+        """Start again from the initial delay."""
+        self.__delay = self.initial
+
+
+def resolve(conditions: Sequence[str]) -> List[Tuple[str, str]]:
+    """Get shell commands of conditions. A condition which is not one of
+    :data:`CONDITIONS` is a shell command met when it exits with zero
+    status.
+
+    :param Sequence[str] conditions: Condition names or shell commands.
+    :return: Pairs of condition and shell command.
+    :rtype: List[Tuple[str, str]]
+
+    :example:
+
+    >>> resolve(['boot_completed', 'pidof system_server'])[1]
+    ('pidof system_server', 'pidof system_server')
+    """
+    if isinstance(conditions, str):
+        conditions = [conditions]
+    return [(name, CONDITIONS.get(name, name)) for name in conditions]
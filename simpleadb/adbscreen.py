@@ -0,0 +1,424 @@
+#
+# file adbscreen.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Screen capture streamed from ``exec-out screencap``."""
+
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import BinaryIO, Iterator, List, Optional, Union
+from . import adbcmds
+from .adbprocess import AdbCommandError
+
+RAW_HEADER = struct.Struct("<III")
+RAW_COLORSPACE = struct.Struct("<I")
+COLORSPACE_SDK = 28
+CHUNK_SIZE = 64 * 1024
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CHUNK = struct.Struct(">I4s")
+PNG_HEADER = struct.Struct(">IIBBBBB")
+
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_RGB_888 = 3
+PIXEL_FORMAT_RGB_565 = 4
+PIXEL_FORMAT_BGRA_8888 = 5
+
+BYTES_PER_PIXEL = {
+    PIXEL_FORMAT_RGBA_8888: 4,
+    PIXEL_FORMAT_RGBX_8888: 4,
+    PIXEL_FORMAT_RGB_888: 3,
+    PIXEL_FORMAT_RGB_565: 2,
+    PIXEL_FORMAT_BGRA_8888: 4,
+}
+
+Buffer = Union[bytearray, memoryview]
+
+
+class ScreenFrame:  # pylint: disable=too-few-public-methods
+    """ScreenFrame is a raw screen capture. Pixels refer to the buffer the
+    frame was read into, the next capture into the same buffer overwrites
+    them.
+
+    :param int width: Width in pixels.
+    :param int height: Height in pixels.
+    :param int pixel_format: Android pixel format, e.g. 1 for RGBA_8888.
+    :param memoryview pixels: Pixel rows without padding.
+    :param int colorspace: Android color space, 0 when not reported.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        width: int,
+        height: int,
+        pixel_format: int,
+        pixels: memoryview,
+        colorspace: int = 0,
+    ):
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.pixels = pixels
+        self.colorspace = colorspace
+
+    def __repr__(self):
+        return (
+            f"ScreenFrame({self.width}x{self.height}, "
+            f"format={self.pixel_format}, size={len(self.pixels)})"
+        )
+
+    @property
+    def stride(self) -> int:
+        """Number of bytes in pixel row."""
+        return self.width * BYTES_PER_PIXEL[self.pixel_format]
+
+
+class CaptureStats:  # pylint: disable=too-few-public-methods
+    """CaptureStats describes a capture session.
+
+    :param int captured: Number of frames read from the device.
+    :param int duplicates: Frames skipped as identical to the previous one.
+    :param int dropped: Frames skipped because writer was behind.
+    :param int written: Frames written to disk.
+    :param float elapsed: Capture time in sec.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        captured: int = 0,
+        duplicates: int = 0,
+        dropped: int = 0,
+        written: int = 0,
+        elapsed: float = 0.0,
+    ):
+        self.captured = captured
+        self.duplicates = duplicates
+        self.dropped = dropped
+        self.written = written
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (
+            f"CaptureStats(captured={self.captured}, duplicates={self.duplicates}, "
+            f"dropped={self.dropped}, written={self.written}, fps={self.fps:.1f})"
+        )
+
+    @property
+    def fps(self) -> float:
+        """Captured frames per sec."""
+        return self.captured / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def create_args(png: bool = True) -> List[str]:
+    """Create screencap arguments, output is streamed by exec-out without
+    temporary file on the device.
+
+    :param bool png: PNG encoded, raw framebuffer otherwise.
+    :return: Adb command line arguments.
+    :rtype: List[str]
+    """
+    cmd = []
+    cmd.append(adbcmds.EXEC_OUT)
+    cmd.append(adbcmds.SCREENCAP)
+    if png:
+        cmd.append("-p")
+    return cmd
+
+
+def create_loop_args(interval: float = 0.0) -> List[str]:
+    """Create arguments of device loop writing raw frames back to back into
+    a single exec-out stream.
+
+    :param float interval: Sleep between frames in sec.
+    :return: Adb command line arguments.
+    :rtype: List[str]
+    """
+    command = adbcmds.SCREENCAP
+    if interval > 0:
+        command += f"; sleep {interval}"
+    cmd = []
+    cmd.append(adbcmds.EXEC_OUT)
+    cmd.append(f"while true; do {command}; done")
+    return cmd
+
+
+def has_colorspace(sdk: str) -> bool:
+    """Check if raw screencap header has color space field, added in
+    Android 9.
+
+    :param str sdk: Value of ro.build.version.sdk.
+    :return: True if header is 16 bytes long, 12 otherwise.
+    :rtype: bool
+    """
+    sdk = sdk.strip()
+    return sdk.isdigit() and int(sdk) >= COLORSPACE_SDK
+
+
+def read_png(stream, dest: BinaryIO) -> int:
+    """Copy PNG screencap output to file object in chunks.
+
+    :param AdbStream stream: Output of ``exec-out screencap -p``.
+    :param BinaryIO dest: Writable binary file object.
+    :raise: AdbCommandError: When failed.
+    :return: Number of written bytes.
+    :rtype: int
+    """
+    buffer = memoryview(bytearray(CHUNK_SIZE))
+    size = 0
+    while True:
+        count = stream.readinto(buffer)
+        dest.write(buffer[:count])
+        size += count
+        if count < len(buffer):
+            return size
+
+
+def read_raw(stream, buffer: Optional[Buffer], colorspace: bool) -> ScreenFrame:
+    """Read raw screencap output straight into buffer.
+
+    :param AdbStream stream: Output of ``exec-out screencap``.
+    :param Optional[Buffer] buffer: Buffer reused across frames, allocated
+        when None.
+    :param bool colorspace: Header has color space field.
+    :raise: AdbCommandError: When failed or output is truncated.
+    :raise: EOFError: When output ended before the frame.
+    :raise: ValueError: When buffer is too small.
+    :return: Captured frame.
+    :rtype: ScreenFrame
+    """
+    header_size = RAW_HEADER.size + (RAW_COLORSPACE.size if colorspace else 0)
+    header = stream.read(header_size)
+    if not header:
+        raise EOFError("screencap output ended")
+    if len(header) < header_size:
+        raise AdbCommandError(stream.device_id, "screencap header truncated")
+    width, height, pixel_format = RAW_HEADER.unpack_from(header)
+    space = RAW_COLORSPACE.unpack_from(header, RAW_HEADER.size)[0] if colorspace else 0
+    if pixel_format not in BYTES_PER_PIXEL:
+        raise AdbCommandError(stream.device_id, f"pixel format {pixel_format}")
+    size = width * height * BYTES_PER_PIXEL[pixel_format]
+    view = memoryview(buffer if buffer is not None else bytearray(size)).cast("B")
+    if len(view) < size:
+        raise ValueError(f"buffer too small, {size} bytes required")
+    if stream.readinto(view[:size]) < size:
+        raise AdbCommandError(stream.device_id, "screencap output truncated")
+    return ScreenFrame(width, height, pixel_format, view[:size], space)
+
+
+def encode_png(frame: ScreenFrame, level: int = 1) -> bytes:
+    """Encode RGBA_8888 or RGB_888 frame as PNG.
+
+    :param ScreenFrame frame: Raw frame.
+    :param int level: Zlib compression level, low values are faster.
+    :raise: ValueError: When pixel format is not supported.
+    :return: PNG image.
+    :rtype: bytes
+    """
+    color_types = {PIXEL_FORMAT_RGBA_8888: 6, PIXEL_FORMAT_RGB_888: 2}
+    if frame.pixel_format not in color_types:
+        raise ValueError(f"pixel format {frame.pixel_format} not supported")
+    stride = frame.stride
+    rows = bytearray((stride + 1) * frame.height)
+    for row in range(frame.height):
+        start = row * (stride + 1) + 1
+        rows[start : start + stride] = frame.pixels[row * stride : (row + 1) * stride]
+    header = PNG_HEADER.pack(
+        frame.width, frame.height, 8, color_types[frame.pixel_format], 0, 0, 0
+    )
+    chunks = [PNG_SIGNATURE]
+    for kind, data in (
+        (b"IHDR", header),
+        (b"IDAT", zlib.compress(rows, level)),
+        (b"IEND", b""),
+    ):
+        chunks.append(PNG_CHUNK.pack(len(data), kind))
+        chunks.append(data)
+        chunks.append(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+    return b"".join(chunks)
+
+
+def write_frame(path: str, frame: ScreenFrame) -> str:
+    """Write frame as PNG, or raw screencap output for pixel formats PNG
+    encoder does not support.
+
+    :param str path: File path without extension.
+    :param ScreenFrame frame: Raw frame.
+    :return: Written file path.
+    :rtype: str
+    """
+    if frame.pixel_format in (PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGB_888):
+        path += ".png"
+        with open(path, "wb") as dest:
+            dest.write(encode_png(frame))
+        return path
+    path += ".raw"
+    with open(path, "wb") as dest:
+        dest.write(RAW_HEADER.pack(frame.width, frame.height, frame.pixel_format))
+        dest.write(frame.pixels)
+    return path
+
+
+class CaptureSession:  # pylint: disable=too-many-instance-attributes
+    """CaptureSession reads raw frames back to back from a single device
+    screencap loop. Frames identical to the previous one are skipped by
+    comparing CRC32 of pixels. With a directory, unique frames are written
+    by a background thread. Frame buffers are reused, a frame is dropped
+    when the writer is behind and no buffer is free, instead of slowing the
+    capture down.
+
+    :param AdbStream stream: Output of :func:`create_loop_args` command.
+    :param bool colorspace: Raw header has color space field.
+    :param Optional[str] directory: Directory for frame files, frames are
+        only yielded when None.
+    :param bool dedup: Skip frames identical to the previous one.
+    :param int queue_size: Number of frames waiting for the writer.
+
+    :example:
+
+    >>> import simpleadb
+    >>> device = simpleadb.AdbDevice('emulator-5554')
+    >>> with device.capture('frames') as session:
+    ...     session.run(duration=10)
+    CaptureStats(captured=120, duplicates=80, dropped=0, written=40, fps=12.0)
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        stream,
+        colorspace: bool,
+        directory: Optional[str] = None,
+        dedup: bool = True,
+        queue_size: int = 8,
+    ):
+        self.stream = stream
+        self.colorspace = colorspace
+        self.directory = directory
+        self.dedup = dedup
+        self.stats = CaptureStats()
+        self.__queue_size = queue_size
+        self.__free: "queue.Queue[bytearray]" = queue.Queue()
+        self.__pending: "queue.Queue" = queue.Queue()
+        self.__scratch: Optional[bytearray] = None
+        self.__writer: Optional[threading.Thread] = None
+        self.__error: Optional[OSError] = None
+        self.__start = time.monotonic()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            self.__writer = threading.Thread(target=self.__write, daemon=True)
+            self.__writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self) -> Iterator[ScreenFrame]:
+        last_crc = None
+        while not self.stream.closed:
+            buffer = self.__acquire()
+            try:
+                frame = read_raw(self.stream, buffer, self.colorspace)
+            except EOFError:
+                return
+            if buffer is None:
+                buffer = frame.pixels.obj
+                self.__allocate(len(buffer))
+            self.stats.captured += 1
+            self.stats.elapsed = time.monotonic() - self.__start
+            crc = zlib.crc32(frame.pixels) if self.dedup else None
+            if crc is not None and crc == last_crc:
+                self.stats.duplicates += 1
+                self.__release(buffer)
+                continue
+            if self.__writer is not None:
+                if buffer is self.__scratch:
+                    self.stats.dropped += 1
+                    continue
+                self.__pending.put((self.stats.captured, frame, buffer))
+            last_crc = crc
+            yield frame
+
+    def __allocate(self, size: int) -> None:
+        """Allocate frame buffers once the frame size is known."""
+        self.__scratch = bytearray(size)
+        if self.__writer is not None:
+            for _ in range(self.__queue_size - 1):
+                self.__free.put(bytearray(size))
+
+    def __acquire(self) -> Optional[bytearray]:
+        """Get free frame buffer, scratch buffer when writer holds all."""
+        if self.__scratch is None or self.__writer is None:
+            return self.__scratch
+        try:
+            return self.__free.get_nowait()
+        except queue.Empty:
+            return self.__scratch
+
+    def __release(self, buffer: bytearray) -> None:
+        """Return frame buffer to the pool."""
+        if buffer is not self.__scratch:
+            self.__free.put(buffer)
+
+    def __write(self) -> None:
+        """Writer thread loop."""
+        while True:
+            item = self.__pending.get()
+            if item is None:
+                return
+            index, frame, buffer = item
+            path = os.path.join(self.directory, f"frame{index:06d}")
+            try:
+                if self.__error is None:
+                    write_frame(path, frame)
+                    self.stats.written += 1
+            except OSError as err:
+                self.__error = err
+            self.__release(buffer)
+
+    def run(
+        self, max_frames: Optional[int] = None, duration: Optional[float] = None
+    ) -> CaptureStats:
+        """Capture until number of unique frames or time limit is reached,
+        or the stream ends, then close the session.
+
+        :param Optional[int] max_frames: Maximum number of unique frames.
+        :param Optional[float] duration: Maximum capture time in sec.
+        :raise: AdbCommandError: When failed.
+        :return: Capture stats.
+        :rtype: CaptureStats
+        """
+        deadline = time.monotonic() + duration if duration is not None else None
+        count = 0
+        try:
+            for _ in self:
+                count += 1
+                if max_frames is not None and count >= max_frames:
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        finally:
+            self.close()
+        return self.stats
+
+    def close(self) -> None:
+        """Stop device loop and wait for pending frames to be written.
+
+        :raise: OSError: When writing frame failed.
+        """
+        self.stats.elapsed = time.monotonic() - self.__start
+        self.stream.close()
+        if self.__writer is not None:
+            self.__pending.put(None)
+            self.__writer.join()
+            self.__writer = None
+        if self.__error is not None:
+            raise self.__error
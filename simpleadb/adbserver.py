@@ -8,11 +8,22 @@
 
 """This module includes AdbServer class used for adb server operations."""
 
-from typing import List, Optional, Union
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
 from subprocess import CalledProcessError
 from . import adbcmds
 from . import adbdevice
-from .adbprocess import AdbCommandError, AdbProcess
+from . import adbfleet
+from . import adbinstall
+from . import adbready
+from . import adbtrack
+from .adbprocess import (
+    AdbCommandError,
+    AdbCommandTimeoutExpired,
+    AdbProcess,
+    check_connect_output,
+)
 
 
 class AdbServer:
@@ -20,26 +31,47 @@ class AdbServer:
 
     :param Optional[int] port: Port, default is 5555.
     :keyword str path: Adb binary path.
+    :keyword AdbTransport transport: Transport used to deliver commands,
+        default adb subprocess.
+    :keyword int max_per_device: Maximum number of fleet operations running
+        at once on a single device, default 1.
 
     :Example:
 
     >>> import simpleadb
     >>> device = simpleadb.AdbServer(5555)
     >>> device = simpleadb.AdbDevice(5555, path='/usr/bin/adb')
+    >>> device = simpleadb.AdbServer(transport=simpleadb.AdbSocketTransport())
     """
 
     def __init__(self, port: Optional[int] = None, **kwargs):
         options_path = kwargs.get("path")
         adb_path = options_path if options_path else adbcmds.ADB
-        self.__adb_process = AdbProcess(None, adb_path)
+        self.__transport = kwargs.get("transport")
+        self.__adb_process = AdbProcess(None, adb_path, self.__transport)
+        self.__limiter = adbfleet.DeviceLimiter(kwargs.get("max_per_device", 1))
+        self.__registry = adbtrack.DeviceRegistry()
+        self.__handles: Dict[str, adbdevice.AdbDevice] = {}
+        self.__lock = threading.Lock()
         self.start(port)
 
-    def devices(self) -> List[str]:
-        """Get list connected adb devices.
+    @property
+    def registry(self) -> adbtrack.DeviceRegistry:
+        """Device registry updated by :meth:`devices` and
+        :meth:`track_devices`."""
+        return self.__registry
 
+    def devices(self, state: Optional[str] = None) -> List[adbdevice.AdbDevice]:
+        """Get list connected adb devices. Device objects are kept by the
+        server and reused by later calls together with their caches, long
+        device list updates :attr:`registry` with product, model and
+        transport ID of every device.
+
+        :param Optional[str] state: Return only devices in given state, e.g.
+            'device', all devices when None.
         :raise: AdbCommandError: When failed.
-        :return: List of connected devices serial numbers.
-        :rtype: List[str]
+        :return: List of connected devices sorted by serial number.
+        :rtype: List[AdbDevice]
 
         :Example:
 
@@ -47,22 +79,209 @@ class AdbServer:
         >>> adb_server = simpleadb.AdbServer(5555)
         >>> adb_server.devices()
         ['emulator-5554']
+        >>> adb_server.devices(state='device')
+        ['emulator-5554']
+        >>> adb_server.registry.get('emulator-5554').model
+        'sdk_gphone_x86'
         """
         cmd = []
         cmd.append(adbcmds.DEVICES)
+        cmd.append("-l")
         try:
             output = self.__adb_process.check_output(cmd)
         except CalledProcessError as err:
             raise AdbCommandError("", "", err) from err
-        devices = []
-        devices_list = output.splitlines()
-        devices_list.pop(0)
-        for line in devices_list:
-            device = line.strip().split()
-            if device:
-                device_id = device[0]
-                devices.append(adbdevice.AdbDevice(device_id))
-        return devices
+        self.__registry.update(adbtrack.parse_device_list(output))
+        return self.__get_devices(state)
+
+    def __get_devices(self, state: Optional[str]) -> List[adbdevice.AdbDevice]:
+        """Get device objects of registry devices, create missing ones and
+        drop the ones of disconnected devices.
+
+        :param Optional[str] state: Return only devices in given state.
+        :return: List of devices.
+        :rtype: List[AdbDevice]
+        """
+        adb_path = self.__adb_process.adb_path
+        with self.__lock:
+            handles = {}
+            for info in self.__registry.devices():
+                handle = self.__handles.get(info.serial)
+                if handle is None:
+                    handle = adbdevice.AdbDevice(
+                        info.serial, path=adb_path, transport=self.__transport
+                    )
+                handles[info.serial] = handle
+            self.__handles = handles
+        return [handles[info.serial] for info in self.__registry.devices(state)]
+
+    def track_devices(self) -> Iterator[adbtrack.DeviceEvent]:
+        """Track devices with adb server track-devices service instead of
+        polling the device list. The server sends the whole list on every
+        change, :attr:`registry` is updated from it and the differences are
+        yielded as events. The first events describe devices connected
+        before tracking started.
+
+        :raise: AdbCommandError: When failed.
+        :return: Iterator of events, ends when adb server closes connection.
+        :rtype: Iterator[DeviceEvent]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AdbServer()
+        >>> for event in adb_server.track_devices():
+        ...     print(event.kind, event.serial, event.device.state)
+        connected emulator-5554 offline
+        state emulator-5554 device
+        >>> adb_server.registry.get('emulator-5554').model
+        'sdk_gphone_x86'
+        """
+        cmd = []
+        cmd.append(adbcmds.TRACK_DEVICES)
+        cmd.append("-l")
+        with self.__adb_process.open(cmd) as stream:
+            yield from adbtrack.track(stream, self.__registry)
+
+    def map(  # pylint: disable=too-many-arguments
+        self,
+        fn: Union[str, Callable],
+        devices: Optional[List[adbdevice.AdbDevice]] = None,
+        max_workers: Optional[int] = None,
+        args: Sequence = (),
+        kwargs: Optional[Dict] = None,
+    ) -> Iterator[adbfleet.DeviceResult]:
+        """Run operation on many devices concurrently in a thread pool and
+        yield per device results as they complete. Operations on the same
+        device issued by concurrent map calls are limited to
+        ``max_per_device``, serialized by default.
+
+        :param Union[str, Callable] fn: AdbDevice method name or callable
+            taking device as first argument.
+        :param Optional[List[AdbDevice]] devices: Devices, default all
+            connected devices.
+        :param Optional[int] max_workers: Maximum number of operations running
+            at once, default 32.
+        :param Sequence args: Additional positional arguments.
+        :param Optional[Dict] kwargs: Additional keyword arguments.
+        :raise: AdbCommandError: When listing devices failed.
+        :return: Iterator of results, exceptions are stored in results.
+        :rtype: Iterator[DeviceResult]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AdbServer()
+        >>> for result in adb_server.map('install', args=['dummy.apk']):
+        ...     print(result.device, result.ok, result.elapsed)
+        emulator-5554 True 4.2
+        >>> results = list(adb_server.map(lambda device: device.get_state()))
+        """
+        devices = devices if devices is not None else self.devices()
+        return adbfleet.run_on_devices(
+            adbfleet.resolve(fn, args, kwargs), devices, max_workers, self.__limiter
+        )
+
+    def install(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        apks: Union[adbinstall.ApkSet, str, Sequence[str]],
+        devices: Optional[List[adbdevice.AdbDevice]] = None,
+        replace: bool = True,
+        skip_installed: bool = True,
+        max_workers: Optional[int] = None,
+    ) -> List[adbfleet.DeviceResult]:
+        """Install app on many devices concurrently. APKs are read once and
+        sent from memory to every device, see
+        :meth:`simpleadb.AdbDevice.install_apks`. Devices which already have
+        the same version code installed are skipped.
+
+        :param Union[ApkSet, str, Sequence[str]] apks: APK, base and split
+            APKs or their paths.
+        :param Optional[List[AdbDevice]] devices: Devices, default all
+            devices in 'device' state.
+        :param bool replace: Replace existing app.
+        :param bool skip_installed: Skip devices with the same version code
+            installed.
+        :param Optional[int] max_workers: Maximum number of installations
+            running at once, default 32.
+        :raise: AdbCommandError: When listing devices failed.
+        :raise: ValueError: When APKs are not valid.
+        :return: Results in order of devices, value is 'installed' or
+            'skipped'.
+        :rtype: List[DeviceResult]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AdbServer()
+        >>> results = adb_server.install(['base.apk', 'split_config.xxhdpi.apk'])
+        >>> [(str(result.device), result.value) for result in results]
+        [('emulator-5554', 'installed'), ('emulator-5556', 'skipped')]
+        """
+        if not isinstance(apks, adbinstall.ApkSet):
+            apks = adbinstall.ApkSet(apks)
+        apk_set = apks
+
+        def install(device: adbdevice.AdbDevice) -> str:
+            if skip_installed and apk_set.version_code is not None:
+                installed = device.get_version_code(apk_set.package)
+                if installed == apk_set.version_code:
+                    return adbinstall.SKIPPED
+            device.install_apks(apk_set, replace)
+            return adbinstall.INSTALLED
+
+        devices = devices if devices is not None else self.devices("device")
+        results = {
+            id(result.device): result
+            for result in self.map(install, devices, max_workers)
+        }
+        return [results[id(device)] for device in devices]
+
+    def wait_until_ready(
+        self,
+        devices: Optional[List[adbdevice.AdbDevice]] = None,
+        conditions: Sequence[str] = adbready.DEFAULT_CONDITIONS,
+        timeout: Optional[float] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[adbfleet.DeviceResult]:
+        """Wait until many devices are ready concurrently, see
+        :meth:`simpleadb.AdbDevice.wait_until_ready`. All devices share a
+        single timeout budget, devices not ready in time are reported in
+        results instead of raised.
+
+        :param Optional[List[AdbDevice]] devices: Devices, default all
+            connected devices.
+        :param Sequence[str] conditions: Conditions or shell commands.
+        :param Optional[float] timeout: Timeout of the whole wait in sec,
+            default 'inf'.
+        :param Optional[int] max_workers: Maximum number of devices waited
+            for at once, default all devices.
+        :raise: AdbCommandError: When listing devices failed.
+        :return: Results in order of devices, value is ReadyResult.
+        :rtype: List[DeviceResult]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AdbServer()
+        >>> results = adb_server.wait_until_ready(timeout=120)
+        >>> [result.value.timings for result in results if result.ok]
+        [{'boot_completed': 21.402, 'package_manager': 21.46}]
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        def wait(device: adbdevice.AdbDevice) -> adbready.ReadyResult:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+            return device.wait_until_ready(conditions, remaining)
+
+        devices = devices if devices is not None else self.devices()
+        results = {
+            id(result.device): result
+            for result in self.map(wait, devices, max_workers or len(devices) or 1)
+        }
+        return [results[id(device)] for device in devices]
 
     def connect(self, address, port: Optional[Union[int, str]] = 5555) -> None:
         """Connect a device via TCP/IP.
@@ -83,6 +302,64 @@ class AdbServer:
         cmd.append(str(port))
         self.__adb_process.check_output(cmd)
 
+    def connect_many(  # pylint: disable=too-many-arguments
+        self,
+        addresses: Sequence[str],
+        timeout: Optional[float] = 5.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_workers: Optional[int] = None,
+    ) -> List[adbfleet.DeviceResult]:
+        """Connect many devices via TCP/IP concurrently. Failed connection is
+        retried with exponentially growing delay, failures are reported in
+        results instead of raised.
+
+        :param Sequence[str] addresses: Device addresses, e.g.
+            '192.168.42.42:5555'.
+        :param Optional[float] timeout: Timeout of single attempt in sec.
+        :param int retries: Number of retries after failed attempt.
+        :param float backoff: Delay before the first retry in sec, doubled
+            after every retry.
+        :param Optional[int] max_workers: Maximum number of connections made
+            at once, default 32.
+        :return: Results in order of addresses, value is adb connect output.
+        :rtype: List[DeviceResult]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AdbServer()
+        >>> addresses = ['192.168.42.42:5555', '192.168.42.43:5555']
+        >>> results = adb_server.connect_many(addresses)
+        >>> [result.device for result in results if not result.ok]
+        ['192.168.42.43:5555']
+        """
+
+        def connect(address: str) -> str:
+            delay = backoff
+            for attempt in range(retries + 1):
+                try:
+                    cmd = []
+                    cmd.append(adbcmds.CONNECT)
+                    cmd.append(address)
+                    output = self.__adb_process.check_output(cmd, timeout=timeout)
+                    check_connect_output(address, output)
+                    return output
+                except (AdbCommandError, AdbCommandTimeoutExpired):
+                    if attempt == retries:
+                        raise
+                time.sleep(delay)
+                delay *= 2
+            raise AdbCommandError(address, "not connected")
+
+        results = {
+            result.device: result
+            for result in adbfleet.run_on_devices(
+                connect, addresses, max_workers, self.__limiter
+            )
+        }
+        return [results[address] for address in addresses]
+
     def disconnect(self, address, port: Optional[Union[int, str]] = None) -> None:
         """Disconnect from given TCP/IP device.
 
@@ -99,7 +376,7 @@ class AdbServer:
         """
         cmd = []
         cmd.append(adbcmds.DISCONNECT)
-        cmd.append(address + f":{port}" if port is not None else "")
+        cmd.append(address + f":{port}" if port is not None else address)
         self.__adb_process.check_output(cmd)
 
     def start(self, port: Optional[Union[int, str]] = None) -> None:
@@ -118,7 +395,8 @@ class AdbServer:
         """
         cmd = []
         if port is not None:
-            cmd.append(" ".join(["-P", str(port)]))
+            cmd.append("-P")
+            cmd.append(str(port))
         cmd.append(adbcmds.START_SERVER)
         try:
             self.__adb_process.check_output(cmd)
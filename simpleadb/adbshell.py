@@ -0,0 +1,529 @@
+#
+# file adbshell.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Persistent device shell session and shell protocol v2 packets."""
+
+import abc
+import io
+import queue
+import re
+import shlex
+import struct
+import subprocess
+import threading
+import time
+from subprocess import CalledProcessError, TimeoutExpired
+from typing import Callable, Optional, Tuple
+from .adbprocess import AdbCommandError, AdbCommandTimeoutExpired, AdbStream
+
+SHELL_V2_FEATURE = "shell_v2"
+SHELL_V2_SERVICE = "shell,v2,raw:"
+RAW_SHELL_SERVICE = "exec:sh"
+
+PACKET_HEADER = struct.Struct("<BI")
+ID_STDIN = 0
+ID_STDOUT = 1
+ID_STDERR = 2
+ID_EXIT = 3
+ID_CLOSE_STDIN = 4
+
+READ_SIZE = 64 * 1024
+BEGIN_MARKER = "simpleadb-begin"
+END_MARKER = "simpleadb-end"
+MARKER_SIZE = 64
+MARKER_REGEX = re.compile(rb"\x1e(simpleadb-(?:begin|end)):(\d+):(\d+)\r?\n")
+
+
+def encode_packet(ident: int, data: bytes) -> bytes:
+    """Encode shell protocol v2 packet.
+
+    :param int ident: Packet ID, e.g. ID_STDIN.
+    :param bytes data: Payload.
+    :return: Encoded packet.
+    :rtype: bytes
+
+    :example:
+
+    >>> encode_packet(ID_STDIN, b'ls')
+    b'\\x00\\x02\\x00\\x00\\x00ls'
+    """
+    return PACKET_HEADER.pack(ident, len(data)) + data
+
+
+def create_script(command: str, number: int, separate_stderr: bool) -> bytes:
+    """Create session input running command between output markers. The
+    command is evaluated in the session shell, so working directory and
+    variables persist, and syntax errors do not end the session.
+
+    :param str command: Shell command.
+    :param int number: Command sequence number.
+    :param bool separate_stderr: Mark also stderr, which is a separate stream.
+    :return: Session input.
+    :rtype: bytes
+    """
+    begin = f"printf '\\036{BEGIN_MARKER}:{number}:%d\\n' $$"
+    end = f"printf '\\036{END_MARKER}:{number}:%d\\n'"
+    lines = []
+    lines.append(begin)
+    if separate_stderr:
+        lines.append(begin + " >&2")
+    lines.append(f"command eval {shlex.quote(command)} </dev/null")
+    lines.append(end + " $?")
+    if separate_stderr:
+        lines.append(end + " 0 >&2")
+    return ("\n".join(lines) + "\n").encode()
+
+
+class MarkedOutput:
+    """MarkedOutput is an output stream of session commands, each delimited
+    by begin and end markers. Data before begin marker, e.g. output of
+    timed out command, is skipped.
+    """
+
+    def __init__(self):
+        self.data = bytearray()
+        self.pid: Optional[int] = None
+        self.__begin: Optional[int] = None
+        self.__scanned = 0
+        self.__number = 0
+
+    def append(self, chunk: bytes) -> None:
+        """Append received data.
+
+        :param bytes chunk: Data.
+        """
+        self.data += chunk
+
+    def __find(self, name: str, number: int, start: int) -> Optional[re.Match]:
+        """Find marker in data not scanned yet."""
+        start = max(start, self.__scanned - MARKER_SIZE)
+        for match in MARKER_REGEX.finditer(self.data, start):
+            if match.group(1) == name.encode() and int(match.group(2)) == number:
+                return match
+        self.__scanned = len(self.data)
+        return None
+
+    def take(self, number: int) -> Optional[Tuple[bytes, int]]:
+        """Remove output of command from the stream.
+
+        :param int number: Command sequence number.
+        :return: Command output and exit status, None if not complete yet.
+        :rtype: Optional[Tuple[bytes, int]]
+        """
+        if number != self.__number:
+            self.__number = number
+            self.__begin = None
+            self.__scanned = 0
+        if self.__begin is None:
+            begin = self.__find(BEGIN_MARKER, number, 0)
+            if begin is None:
+                return None
+            self.pid = int(begin.group(3))
+            self.__begin = self.__scanned = begin.end()
+        end = self.__find(END_MARKER, number, self.__begin)
+        if end is None:
+            return None
+        output = bytes(self.data[self.__begin : end.start()])
+        status = int(end.group(3))
+        del self.data[: end.end()]
+        self.__begin = None
+        self.__scanned = 0
+        return output, status
+
+
+class ShellChannel(abc.ABC):
+    """ShellChannel is a connection to long-lived device shell. Output is
+    read by a background thread and queued as (packet ID, data) pairs,
+    (ID_EXIT, b'') marks the end of output.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param bool separate_stderr: Stderr is received separately from stdout.
+    """
+
+    def __init__(self, device_id: str, separate_stderr: bool):
+        self.device_id = device_id
+        self.separate_stderr = separate_stderr
+        self.output: "queue.Queue[Tuple[int, bytes]]" = queue.Queue()
+
+    @abc.abstractmethod
+    def write(self, data: bytes) -> None:
+        """Write shell input.
+
+        :param bytes data: Input.
+        :raise: AdbCommandError: When connection is closed.
+        """
+
+    @abc.abstractmethod
+    def close(self) -> None:
+        """Stop the shell."""
+
+
+class SocketShellChannel(ShellChannel):
+    """SocketShellChannel is a shell service connection to adb server, with
+    shell protocol v2 or raw ``exec:sh`` stream.
+
+    :param AdbSocket conn: Connection with accepted shell service request.
+    :param bool v2: Connection uses shell protocol v2.
+    """
+
+    def __init__(self, conn, v2: bool):
+        super().__init__(conn.device_id, v2)
+        self.conn = conn
+        self.v2 = v2
+        self.__reader = threading.Thread(target=self.__read, daemon=True)
+        self.__reader.start()
+
+    def __read(self) -> None:
+        """Reader thread loop."""
+        try:
+            while True:
+                if self.v2:
+                    ident, length = PACKET_HEADER.unpack(
+                        self.conn.read_exactly(PACKET_HEADER.size)
+                    )
+                    data = self.conn.read_exactly(length)
+                else:
+                    ident, data = ID_STDOUT, self.conn.sock.recv(READ_SIZE)
+                if not data or ident == ID_EXIT:
+                    return
+                self.output.put((ident, data))
+        except (AdbCommandError, OSError):
+            pass
+        finally:
+            self.output.put((ID_EXIT, b""))
+
+    def write(self, data: bytes) -> None:
+        try:
+            self.conn.write(encode_packet(ID_STDIN, data) if self.v2 else data)
+        except OSError as err:
+            raise AdbCommandError(self.device_id, str(err)) from err
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class ProcessShellChannel(ShellChannel):
+    """ProcessShellChannel is an ``adb shell`` client process with stdin
+    pipe. Adb does not allocate pty for piped stdin and splits stderr when
+    the device supports shell protocol v2.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param subprocess.Popen process: Adb shell process with pipes.
+    :param bool v2: Device supports shell protocol v2.
+    """
+
+    def __init__(self, device_id: str, process: subprocess.Popen, v2: bool):
+        super().__init__(device_id, v2)
+        self.process = process
+        for pipe, ident in ((process.stdout, ID_STDOUT), (process.stderr, ID_STDERR)):
+            threading.Thread(
+                target=self.__read, args=(pipe, ident), daemon=True
+            ).start()
+
+    def __read(self, pipe, ident: int) -> None:
+        """Reader thread loop."""
+        try:
+            while True:
+                data = pipe.read1(READ_SIZE)
+                if not data:
+                    return
+                self.output.put((ident, data))
+        except (OSError, ValueError):
+            pass
+        finally:
+            if ident == ID_STDOUT:
+                self.output.put((ID_EXIT, b""))
+
+    def write(self, data: bytes) -> None:
+        try:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+        except OSError as err:
+            raise AdbCommandError(self.device_id, str(err)) from err
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for pipe in (self.process.stdin, self.process.stdout, self.process.stderr):
+            pipe.close()
+
+
+class ShellResult:
+    """ShellResult is the outcome of a device shell command.
+
+    :param str command: Shell command.
+    :param bytes stdout: Standard output.
+    :param bytes stderr: Standard error, empty when merged into stdout.
+    :param int exit_code: Exit status.
+    """
+
+    def __init__(self, command: str, stdout: bytes, stderr: bytes, exit_code: int):
+        self.command = command
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+
+    def __repr__(self):
+        return (
+            f"ShellResult({self.command!r}, exit_code={self.exit_code}, "
+            f"stdout={self.stdout!r}, stderr={self.stderr!r})"
+        )
+
+    @property
+    def ok(self) -> bool:  # pylint: disable=invalid-name
+        """True if command exited with zero status."""
+        return self.exit_code == 0
+
+    @property
+    def output(self) -> str:
+        """Decoded standard output without trailing new line, as returned by
+        :meth:`AdbDevice.shell`."""
+        text = self.stdout.decode(errors="replace")
+        return text.replace("\r\n", "\n").rstrip("\n\r")
+
+    def get(self, device_id: str = "") -> str:
+        """Get decoded output or raise command error.
+
+        :param str device_id: Device ID used in raised exception.
+        :raise: AdbCommandError: When command exited with non-zero status.
+        :return: Standard output without trailing new line.
+        :rtype: str
+        """
+        if self.exit_code != 0:
+            output = (self.stderr or self.stdout).decode(errors="replace")
+            err = CalledProcessError(self.exit_code, self.command, output)
+            raise AdbCommandError(device_id, output, err)
+        return self.output
+
+
+class ShellPacketReader(io.RawIOBase):
+    """ShellPacketReader reads stdout of shell protocol v2 connection as a
+    raw binary stream. Stdout packet payload is received straight into the
+    caller buffer, stderr is collected and exit status is kept.
+
+    :param AdbSocket conn: Connection with accepted ``shell,v2`` request.
+    """
+
+    def __init__(self, conn):
+        super().__init__()
+        self.conn = conn
+        self.stderr = bytearray()
+        self.exit_code: Optional[int] = None
+        self.__remaining = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        while self.__remaining == 0:
+            if self.exit_code is not None:
+                return 0
+            try:
+                header = self.conn.read_exactly(PACKET_HEADER.size)
+            except AdbCommandError:
+                return 0
+            ident, length = PACKET_HEADER.unpack(header)
+            if ident == ID_STDOUT:
+                self.__remaining = length
+                continue
+            data = self.conn.read_exactly(length)
+            if ident == ID_STDERR:
+                self.stderr += data
+            elif ident == ID_EXIT:
+                self.exit_code = data[0] if data else 0
+        count = self.conn.sock.recv_into(view[: min(len(view), self.__remaining)])
+        self.__remaining -= count
+        return count
+
+
+class ShellV2Stream(AdbStream):
+    """ShellV2Stream is stdout of a shell protocol v2 command read while the
+    command runs. Stderr and exit status are available at the end of
+    output.
+
+    :param AdbSocket conn: Connection with accepted ``shell,v2`` request.
+    :param str command: Shell command.
+    :param bool check: Raise command error at the end of output when exit
+        status is non-zero.
+    """
+
+    def __init__(self, conn, command: str, check: bool = True):
+        self.packets = ShellPacketReader(conn)
+        super().__init__(conn.device_id, io.BufferedReader(self.packets, READ_SIZE))
+        self.conn = conn
+        self.command = command
+        self.check = check
+
+    @property
+    def stderr(self) -> bytes:
+        """Standard error received so far."""
+        return bytes(self.packets.stderr)
+
+    @property
+    def exit_code(self) -> Optional[int]:
+        """Exit status, None until the end of output."""
+        return self.packets.exit_code
+
+    def finish(self) -> None:
+        if self.closed or not self.check:
+            return
+        if self.exit_code is None:
+            raise AdbCommandError(self.device_id, "shell connection closed")
+        if self.exit_code != 0:
+            output = self.stderr.decode(errors="replace")
+            err = CalledProcessError(self.exit_code, self.command, output)
+            raise AdbCommandError(self.device_id, output, err)
+
+    def result(self) -> ShellResult:
+        """Read remaining output.
+
+        :raise: AdbCommandError: When connection closed before exit status.
+        :return: Command result.
+        :rtype: ShellResult
+        """
+        stdout = self.reader.read()
+        if self.exit_code is None:
+            raise AdbCommandError(self.device_id, "shell connection closed")
+        return ShellResult(self.command, stdout, self.stderr, self.exit_code)
+
+    def close(self) -> None:
+        super().close()
+        self.conn.close()
+
+
+class ShellSession:  # pylint: disable=too-many-instance-attributes
+    """ShellSession runs commands one after another in a single long-lived
+    device shell, each command costs a single round trip instead of a new
+    adb client and device shell. When a command times out, its child
+    processes are killed and the session stays usable.
+
+    Commands run in the session shell, so ``cd`` and variables persist.
+    Commands must not read stdin or call ``exit``.
+
+    :param ShellChannel channel: Shell connection.
+    :param Optional[Callable[[int], None]] interrupt: Called with session
+        shell PID to kill running command on timeout.
+
+    :example:
+
+    >>> import simpleadb
+    >>> device = simpleadb.AdbDevice('emulator-5554')
+    >>> with device.session() as session:
+    ...     session.shell('cd /sdcard')
+    ...     session.shell('ls')
+    ...     session.run('cat missing', timeout=5).exit_code
+    'Download'
+    1
+    """
+
+    def __init__(
+        self, channel: ShellChannel, interrupt: Optional[Callable[[int], None]] = None
+    ):
+        self.channel = channel
+        self.device_id = channel.device_id
+        self.__interrupt = interrupt
+        self.__stdout = MarkedOutput()
+        self.__stderr = MarkedOutput()
+        self.__lock = threading.Lock()
+        self.__count = 0
+        self.__closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        """True if session shell is not running."""
+        return self.__closed
+
+    def run(self, command: str, timeout: Optional[float] = None) -> ShellResult:
+        """Run command in the session shell.
+
+        :param str command: Shell command.
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: AdbCommandError: When session is closed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired, the command
+            is killed and session stays open.
+        :return: Command result.
+        :rtype: ShellResult
+        """
+        with self.__lock:
+            if self.__closed:
+                raise AdbCommandError(self.device_id, "shell session closed")
+            self.__count += 1
+            number = self.__count
+            separate = self.channel.separate_stderr
+            self.channel.write(create_script(command, number, separate))
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            stdout = None
+            stderr = None if separate else (b"", 0)
+            while True:
+                stdout = stdout or self.__stdout.take(number)
+                stderr = stderr or self.__stderr.take(number)
+                if stdout is not None and stderr is not None:
+                    break
+                self.__receive(command, deadline, timeout)
+            return ShellResult(command, stdout[0], stderr[0], stdout[1])
+
+    def shell(self, command: str, timeout: Optional[float] = None) -> str:
+        """Run command in the session shell like :meth:`AdbDevice.shell`.
+
+        :param str command: Shell command.
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: AdbCommandError: When command failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command output.
+        :rtype: str
+        """
+        return self.run(command, timeout).get(self.device_id)
+
+    def __receive(
+        self, command: str, deadline: Optional[float], timeout: Optional[float]
+    ) -> None:
+        """Wait for output chunk.
+
+        :raise: AdbCommandError: When session shell ended.
+        :raise: AdbCommandTimeoutExpired: When deadline passed.
+        """
+        remaining = None
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.monotonic())
+        try:
+            ident, data = self.channel.output.get(timeout=remaining)
+        except queue.Empty as err:
+            self.__kill_command()
+            expired = TimeoutExpired(command, timeout)
+            raise AdbCommandTimeoutExpired(self.device_id, expired) from err
+        if ident == ID_EXIT:
+            self.__closed = True
+            self.channel.close()
+            raise AdbCommandError(self.device_id, "shell session closed")
+        if ident == ID_STDERR and self.channel.separate_stderr:
+            self.__stderr.append(data)
+        else:
+            self.__stdout.append(data)
+
+    def __kill_command(self) -> None:
+        """Kill children of the session shell."""
+        if self.__interrupt is None or self.__stdout.pid is None:
+            return
+        try:
+            self.__interrupt(self.__stdout.pid)
+        except AdbCommandError:
+            pass
+
+    def close(self) -> None:
+        """Stop the session shell."""
+        with self.__lock:
+            self.__closed = True
+            self.channel.close()
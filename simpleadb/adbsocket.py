@@ -0,0 +1,956 @@
+#
+# file adbsocket.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Native adb host protocol transport talking to adb server over TCP."""
+
+import collections
+import os
+import queue
+import select
+import shlex
+import socket
+import threading
+import time
+from subprocess import CalledProcessError, TimeoutExpired
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from . import adbcmds
+from . import adbinstall
+from .adbshell import SHELL_V2_SERVICE, ShellResult, ShellV2Stream
+from .adbsync import AdbSyncConnection
+from .adbprocess import (
+    AdbCommandError,
+    AdbCommandTimeoutExpired,
+    AdbStream,
+    AdbSubprocessTransport,
+    AdbTransport,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5037
+
+OKAY = b"OKAY"
+FAIL = b"FAIL"
+
+EXIT_MARKER = "\x1esimpleadb-exit:"
+
+HOST_QUERIES = {
+    adbcmds.GET_STATE: "get-state",
+    adbcmds.GET_SERIALNO: "get-serialno",
+    adbcmds.DEVPATH: "get-devpath",
+    adbcmds.FEATURES: "features",
+}
+
+LOCAL_SERVICES = {
+    adbcmds.ROOT: "root:",
+    adbcmds.UNROOT: "unroot:",
+    adbcmds.REMOUNT: "remount:",
+    adbcmds.REBOOT: "reboot:",
+    adbcmds.USB: "usb:",
+    adbcmds.TCPIP: "tcpip:",
+    adbcmds.DISABLE_VERITY: "disable-verity:",
+    adbcmds.ENABLE_VERITY: "enable-verity:",
+}
+
+
+def get_server_port() -> int:
+    """Get adb server port, respects ANDROID_ADB_SERVER_PORT variable.
+
+    :return: Adb server port.
+    :rtype: int
+    """
+    return int(os.environ.get(adbcmds.ENV_SERVER_PORT, DEFAULT_PORT))
+
+
+def encode_request(service: str) -> bytes:
+    """Encode service request using adb hex-length framing.
+
+    :param str service: Service name, e.g. 'host:version'.
+    :return: Framed request.
+    :rtype: bytes
+
+    :example:
+
+    >>> encode_request('host:version')
+    b'000chost:version'
+    """
+    payload = service.encode()
+    return f"{len(payload):04x}".encode() + payload
+
+
+class UnsupportedCommand(Exception):
+    """Raised when adb command has no native protocol equivalent."""
+
+
+QUERY = "query"
+REQUEST = "request"
+WAIT = "wait"
+LOCAL = "local"
+SHELL = "shell"
+
+
+def translate(  # pylint: disable=too-many-return-statements
+    device_id: Optional[str], args: List[str]
+) -> Tuple[str, str]:
+    """Translate adb command line arguments into adb service request.
+
+    Kind of the request tells how to read the reply: QUERY reads
+    length-prefixed reply, REQUEST and WAIT read one or two statuses, LOCAL
+    and SHELL run device service and read until connection is closed.
+
+    :param Optional[str] device_id: Device ID.
+    :param List[str] args: Adb command line arguments.
+    :raise: UnsupportedCommand: When command has no native equivalent.
+    :return: Tuple of request kind and service.
+    :rtype: Tuple[str, str]
+
+    :example:
+
+    >>> translate('emulator-5554', ['get-state'])
+    ('query', 'host-serial:emulator-5554:get-state')
+    """
+    if not args or args[0].startswith("-"):
+        raise UnsupportedCommand(" ".join(args))
+    command = args[0]
+    prefix = f"host-serial:{device_id}:" if device_id is not None else "host:"
+    if command in HOST_QUERIES:
+        return QUERY, prefix + HOST_QUERIES[command]
+    if command == adbcmds.DEVICES:
+        return QUERY, "host:devices-l" if "-l" in args else "host:devices"
+    if command in (adbcmds.CONNECT, adbcmds.DISCONNECT):
+        return QUERY, f"host:{command}:" + ":".join(args[1:3])
+    if command == adbcmds.START_SERVER:
+        return QUERY, "host:version"
+    if command == adbcmds.KILL_SERVER:
+        return REQUEST, "host:kill"
+    if command == adbcmds.WAIT_FOR_DEVICE:
+        return WAIT, prefix + "wait-for-any-device"
+    if command in LOCAL_SERVICES:
+        return LOCAL, LOCAL_SERVICES[command] + "".join(args[1:2])
+    if command == adbcmds.SHELL:
+        return SHELL, shell_service(" ".join(args[1:]))
+    if command == adbcmds.LOGCAT:
+        return SHELL, shell_service(" ".join(shlex.quote(arg) for arg in args))
+    if command == adbcmds.UNINSTALL:
+        args = ["pm", "uninstall"] + args[1:]
+        return SHELL, shell_service(" ".join(shlex.quote(arg) for arg in args))
+    raise UnsupportedCommand(" ".join(args))
+
+
+def shell_service(command: str) -> str:
+    """Create shell service request reporting exit status with a marker
+    appended to the output.
+
+    :param str command: Shell command.
+    :return: Shell service.
+    :rtype: str
+    """
+    return f'shell:(\n{command}\n)\necho "{EXIT_MARKER}$?"'
+
+
+def parse_shell_output(device_id: Optional[str], args: List[str], raw: bytes) -> str:
+    """Split shell output and exit status marker.
+
+    :param Optional[str] device_id: Device ID.
+    :param List[str] args: Adb command line arguments.
+    :param bytes raw: Shell service output.
+    :raise: AdbCommandError: When command exited with non-zero status.
+    :return: Command output.
+    :rtype: str
+    """
+    output, marker, status = raw.decode(errors="replace").rpartition(EXIT_MARKER)
+    if not marker:
+        raise AdbCommandError(device_id or "", status)
+    returncode = int(status.strip() or 255)
+    if returncode != 0:
+        err = CalledProcessError(returncode, " ".join(args), output)
+        raise AdbCommandError(device_id or "", output, err)
+    return output
+
+
+def finish_output(device_id: Optional[str], args: List[str], output: str) -> str:
+    """Make service output look like adb client output.
+
+    :param Optional[str] device_id: Device ID.
+    :param List[str] args: Adb command line arguments.
+    :param str output: Service output.
+    :raise: AdbCommandError: When output reports failure.
+    :return: Command output.
+    :rtype: str
+    """
+    command = args[0]
+    if command == adbcmds.DEVICES:
+        output = "List of devices attached\n" + output
+    elif command == adbcmds.START_SERVER:
+        output = ""
+    elif command in (adbcmds.CONNECT, adbcmds.DISCONNECT) and output.lower().startswith(
+        ("failed", "unable", "cannot", "error")
+    ):
+        raise AdbCommandError(device_id or "", output)
+    elif command == adbcmds.UNINSTALL and "Failure" in output:
+        raise AdbCommandError(device_id or "", output.strip())
+    return output.replace("\r\n", "\n").rstrip("\n\r")
+
+
+def stream_service(args: List[str]) -> str:
+    """Translate streamed adb command into device local service, or host
+    service for track-devices. Unlike :func:`translate` the service output
+    is passed through untouched.
+
+    :param List[str] args: Adb command line arguments.
+    :raise: UnsupportedCommand: When command has no native equivalent.
+    :return: Device local service.
+    :rtype: str
+
+    :example:
+
+    >>> stream_service(['logcat', '-v', 'threadtime', '*:W'])
+    "exec:logcat -v threadtime '*:W'"
+    """
+    command = args[0] if args else ""
+    if command == adbcmds.SHELL:
+        return "shell:" + " ".join(args[1:])
+    if command == adbcmds.EXEC_OUT:
+        return "exec:" + " ".join(args[1:])
+    if command == adbcmds.LOGCAT:
+        return "exec:" + " ".join(shlex.quote(arg) for arg in args)
+    if command == adbcmds.TRACK_DEVICES:
+        return "host:track-devices" + ("-l" if "-l" in args else "")
+    raise UnsupportedCommand(" ".join(args))
+
+
+class AdbSocket:
+    """AdbSocket is a single connection to adb server speaking smart-socket
+    protocol.
+
+    :param str host: Adb server host.
+    :param int port: Adb server port.
+    :param Optional[float] timeout: Socket timeout in sec.
+    :param str device_id: Device ID used in raised exceptions.
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        timeout: Optional[float] = None,
+        device_id: str = "",
+    ):
+        self.host = host
+        self.port = port
+        self.device_id = device_id
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        # small request frames are not delayed waiting for ack, like adb client
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.created = time.monotonic()
+        self.reused = False
+        self.on_close: Optional[Callable[[], None]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """Close connection, return the slot to the pool if pooled."""
+        self.sock.close()
+        on_close, self.on_close = self.on_close, None
+        if on_close is not None:
+            on_close()
+
+    def is_alive(self) -> bool:
+        """Check if idle connection was not closed by adb server. Idle
+        connection must not have any pending data.
+
+        :return: True if connection can be used, False otherwise.
+        :rtype: bool
+        """
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def settimeout(self, timeout: Optional[float]) -> None:
+        """Set socket timeout.
+
+        :param Optional[float] timeout: Timeout in sec, None blocks forever.
+        """
+        self.sock.settimeout(timeout)
+
+    def send_request(self, service: str) -> None:
+        """Send service request and wait for OKAY.
+
+        :param str service: Service name.
+        :raise: AdbCommandError: When adb server replied FAIL.
+        """
+        self.sock.sendall(encode_request(service))
+        self.read_status()
+
+    def read_status(self) -> None:
+        """Read OKAY or FAIL status.
+
+        :raise: AdbCommandError: When adb server replied FAIL or invalid data.
+        """
+        status = self.read_exactly(4)
+        if status == OKAY:
+            return
+        if status == FAIL:
+            raise AdbCommandError(self.device_id, self.read_string())
+        raise AdbCommandError(self.device_id, f"invalid adb status {status!r}")
+
+    def read_exactly(self, size: int) -> bytes:
+        """Read exactly size bytes.
+
+        :param int size: Number of bytes.
+        :raise: AdbCommandError: When connection closed prematurely.
+        :return: Received data.
+        :rtype: bytes
+        """
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise AdbCommandError(self.device_id, "adb connection closed")
+            data += chunk
+        return bytes(data)
+
+    def read_into(self, buffer: memoryview) -> None:
+        """Read exactly len(buffer) bytes into buffer.
+
+        :param memoryview buffer: Buffer.
+        :raise: AdbCommandError: When connection closed prematurely.
+        """
+        received = 0
+        while received < len(buffer):
+            size = self.sock.recv_into(buffer[received:])
+            if not size:
+                raise AdbCommandError(self.device_id, "adb connection closed")
+            received += size
+
+    def read_string(self) -> str:
+        """Read hex-length prefixed string.
+
+        :return: Decoded string.
+        :rtype: str
+        """
+        size = int(self.read_exactly(4), 16)
+        return self.read_exactly(size).decode(errors="replace")
+
+    def read_all(self) -> bytes:
+        """Read until server closes connection.
+
+        :return: Received data.
+        :rtype: bytes
+        """
+        chunks = []
+        while True:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def write(self, data: bytes) -> None:
+        """Write raw data to connection.
+
+        :param bytes data: Data.
+        """
+        self.sock.sendall(data)
+
+
+class AdbSocketStream(AdbStream):
+    """AdbSocketStream is the output of device local service read from adb
+    server connection.
+
+    :param AdbSocket conn: Connection with accepted service request.
+    """
+
+    def __init__(self, conn: AdbSocket):
+        super().__init__(conn.device_id, conn.sock.makefile("rb"))
+        self.conn = conn
+
+    def close(self) -> None:
+        super().close()
+        self.conn.close()
+
+
+def create_connection(
+    host: str,
+    port: int,
+    serial: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> AdbSocket:
+    """Open connection to adb server, switch it to device transport when
+    serial is given.
+
+    :param str host: Adb server host.
+    :param int port: Adb server port.
+    :param Optional[str] serial: Device serial, plain connection when None.
+    :param Optional[float] timeout: Socket timeout in sec.
+    :raise: AdbCommandError: When device not found.
+    :return: Connection.
+    :rtype: AdbSocket
+    """
+    conn = AdbSocket(host, port, timeout, serial or "")
+    if serial is not None:
+        try:
+            conn.send_request("host:transport:" + serial)
+        except BaseException:
+            conn.close()
+            raise
+    return conn
+
+
+class AdbConnectionPool:  # pylint: disable=too-many-instance-attributes
+    """AdbConnectionPool keeps pre-negotiated connections to adb server keyed
+    by device serial. Adb server serves a single service per connection, so
+    pooled connections are handed out once and replaced in background. This
+    moves the TCP connect and the ``host:transport`` handshake out of the
+    command path.
+
+    :param str host: Adb server host.
+    :param int port: Adb server port.
+    :param int max_per_device: Maximum number of connections used at once per
+        device, further requests wait for a free slot.
+    :param int max_idle: Number of idle connections kept ready per device.
+    :param float idle_timeout_sec: Idle connections older than this are
+        closed.
+
+    :example:
+
+    >>> import simpleadb
+    >>> from simpleadb import adbsocket
+    >>> pool = adbsocket.get_shared_pool()
+    >>> with pool.acquire('emulator-5554') as conn:
+    ...     conn.send_request('shell:ls')
+    ...     output = conn.read_all()
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        max_per_device: int = 8,
+        max_idle: int = 1,
+        idle_timeout_sec: float = 30.0,
+    ):
+        self.host = host
+        self.port = port
+        self.max_per_device = max_per_device
+        self.max_idle = max_idle
+        self.idle_timeout_sec = idle_timeout_sec
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+        self.__idle: Dict[Optional[str], Deque[AdbSocket]] = {}
+        self.__slots: Dict[Optional[str], threading.BoundedSemaphore] = {}
+        self.__refill: "queue.Queue[Tuple[bool, Optional[str]]]" = queue.Queue()
+        self.__worker: Optional[threading.Thread] = None
+        self.__closed = False
+
+    def acquire(
+        self, serial: Optional[str], timeout: Optional[float] = None
+    ) -> AdbSocket:
+        """Get connection switched to device transport, or plain connection
+        when serial is None. Closing the connection frees the device slot.
+
+        :param Optional[str] serial: Device serial.
+        :param Optional[float] timeout: Timeout in sec for the slot and
+            socket operations.
+        :raise: socket.timeout: When no slot freed in time.
+        :raise: AdbCommandError: When device not found.
+        :return: Connection.
+        :rtype: AdbSocket
+        """
+        with self.__lock:
+            slot = self.__slots.setdefault(
+                serial, threading.BoundedSemaphore(self.max_per_device)
+            )
+        if not slot.acquire(timeout=timeout):
+            raise socket.timeout(f"no free adb connection for {serial}")
+        try:
+            conn = self.__pop_idle(serial)
+            if conn is None:
+                conn = create_connection(self.host, self.port, serial, timeout)
+            else:
+                conn.settimeout(timeout)
+        except BaseException:
+            slot.release()
+            raise
+        conn.on_close = slot.release
+        self.prefill(serial)
+        return conn
+
+    def prefill(self, serial: Optional[str]) -> None:
+        """Schedule opening idle connections for device in background.
+
+        :param Optional[str] serial: Device serial.
+        """
+        if self.max_idle <= 0 or self.__closed:
+            return
+        with self.__lock:
+            if self.__worker is None:
+                self.__worker = threading.Thread(target=self.__run, daemon=True)
+                self.__worker.start()
+        self.__refill.put((True, serial))
+
+    def idle_count(self, serial: Optional[str]) -> int:
+        """Get number of idle connections for device.
+
+        :param Optional[str] serial: Device serial.
+        :return: Number of idle connections.
+        :rtype: int
+        """
+        with self.__lock:
+            return len(self.__idle.get(serial, ()))
+
+    def evict(self) -> None:
+        """Close idle connections which expired or were closed by server."""
+        now = time.monotonic()
+        with self.__lock:
+            for idle in self.__idle.values():
+                for conn in list(idle):
+                    if not self.__is_usable(conn, now):
+                        idle.remove(conn)
+                        conn.close()
+
+    def close(self) -> None:
+        """Close all idle connections and stop background refill."""
+        with self.__lock:
+            self.__closed = True
+            for idle in self.__idle.values():
+                while idle:
+                    idle.popleft().close()
+        self.__refill.put((False, None))
+
+    def __is_usable(self, conn: AdbSocket, now: float) -> bool:
+        return now - conn.created < self.idle_timeout_sec and conn.is_alive()
+
+    def __pop_idle(self, serial: Optional[str]) -> Optional[AdbSocket]:
+        now = time.monotonic()
+        with self.__lock:
+            idle = self.__idle.get(serial)
+            while idle:
+                conn = idle.popleft()
+                if self.__is_usable(conn, now):
+                    self.hits += 1
+                    conn.reused = True
+                    return conn
+                conn.close()
+            self.misses += 1
+        return None
+
+    def __fill(self, serial: Optional[str]) -> None:
+        while self.idle_count(serial) < self.max_idle:
+            try:
+                conn = create_connection(
+                    self.host, self.port, serial, self.idle_timeout_sec
+                )
+            except (AdbCommandError, OSError):
+                return
+            conn.settimeout(None)
+            with self.__lock:
+                if self.__closed:
+                    conn.close()
+                    return
+                self.__idle.setdefault(serial, collections.deque()).append(conn)
+
+    def __run(self) -> None:
+        while True:
+            try:
+                running, serial = self.__refill.get(timeout=self.idle_timeout_sec)
+            except queue.Empty:
+                self.evict()
+                continue
+            if not running:
+                return
+            self.__fill(serial)
+
+
+_SHARED_POOLS: Dict[Tuple[str, int], AdbConnectionPool] = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+def get_shared_pool(
+    host: str = DEFAULT_HOST, port: Optional[int] = None
+) -> AdbConnectionPool:
+    """Get connection pool shared by all transports using the same adb
+    server.
+
+    :param str host: Adb server host.
+    :param Optional[int] port: Adb server port, default 5037.
+    :return: Shared connection pool.
+    :rtype: AdbConnectionPool
+    """
+    key = (host, port if port else get_server_port())
+    with _SHARED_POOLS_LOCK:
+        if key not in _SHARED_POOLS:
+            _SHARED_POOLS[key] = AdbConnectionPool(*key)
+        return _SHARED_POOLS[key]
+
+
+class AdbSocketTransport(AdbTransport):
+    """AdbSocketTransport talks to adb server directly over TCP using adb
+    smart-socket protocol, without spawning adb client processes. Commands
+    without native equivalent fall back to :class:`AdbSubprocessTransport`.
+
+    :param Optional[str] host: Adb server host, default 127.0.0.1.
+    :param Optional[int] port: Adb server port, default 5037.
+    :param bool fallback: Use adb subprocess for unsupported commands or when
+        adb server is not running.
+    :param bool pooled: Use connection pool shared by transports talking to
+        the same adb server, see :class:`AdbConnectionPool`.
+
+    :example:
+
+    >>> import simpleadb
+    >>> transport = simpleadb.AdbSocketTransport()
+    >>> device = simpleadb.AdbDevice('emulator-5554', transport=transport)
+    >>> device.getprop('ro.product.model')
+    'sdk_gphone_x86'
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        fallback: bool = True,
+        pooled: bool = True,
+    ):
+        self.host = host if host else DEFAULT_HOST
+        self.port = port if port else get_server_port()
+        self.fallback = AdbSubprocessTransport() if fallback else None
+        self.pool = get_shared_pool(self.host, self.port) if pooled else None
+
+    def connect(
+        self, device_id: Optional[str] = None, timeout: Optional[float] = None
+    ) -> AdbSocket:
+        """Open connection to adb server.
+
+        :param Optional[str] device_id: Device ID used in raised exceptions.
+        :param Optional[float] timeout: Socket timeout in sec.
+        :return: Connected socket.
+        :rtype: AdbSocket
+        """
+        if self.pool is not None:
+            conn = self.pool.acquire(None, timeout)
+            conn.device_id = device_id or ""
+            return conn
+        return AdbSocket(self.host, self.port, timeout, device_id or "")
+
+    def open_transport(
+        self, device_id: Optional[str], timeout: Optional[float] = None
+    ) -> AdbSocket:
+        """Open connection and switch it to the device transport.
+
+        :param Optional[str] device_id: Device ID, any device when None.
+        :param Optional[float] timeout: Socket timeout in sec.
+        :raise: AdbCommandError: When device not found.
+        :return: Connection ready for local service request.
+        :rtype: AdbSocket
+        """
+        if device_id is not None:
+            if self.pool is not None:
+                return self.pool.acquire(device_id, timeout)
+            return create_connection(self.host, self.port, device_id, timeout)
+        conn = AdbSocket(self.host, self.port, timeout)
+        try:
+            conn.send_request("host:transport-any")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def request(
+        self,
+        device_id: Optional[str],
+        service: str,
+        timeout: Optional[float] = None,
+        local: bool = False,
+    ) -> AdbSocket:
+        """Open connection and request service. Pooled connection which
+        turned out to be closed by adb server is replaced by a new one.
+
+        :param Optional[str] device_id: Device ID.
+        :param str service: Service name.
+        :param Optional[float] timeout: Timeout in sec.
+        :param bool local: Device local service, e.g. 'shell:', host service
+            otherwise.
+        :raise: AdbCommandError: When adb server replied FAIL.
+        :return: Connection with accepted service request.
+        :rtype: AdbSocket
+        """
+        for _ in range(2):
+            if local:
+                conn = self.open_transport(device_id, timeout)
+            else:
+                conn = self.connect(device_id, timeout)
+            try:
+                conn.send_request(service)
+                return conn
+            except (AdbCommandError, OSError):
+                conn.close()
+                if not conn.reused:
+                    raise
+        raise AdbCommandError(device_id or "", "adb connection closed")
+
+    def check_output(
+        self, device_id: Optional[str], adb_path: str, args: List[str], **kwargs
+    ) -> str:
+        timeout = kwargs.get("timeout")
+        cmd_args = [arg for arg in args if arg]
+        try:
+            output = self.execute(device_id, cmd_args, timeout)
+        except (UnsupportedCommand, ConnectionRefusedError) as err:
+            if self.fallback is None:
+                raise AdbCommandError(device_id or "", str(err)) from err
+            return self.fallback.check_output(device_id, adb_path, args, **kwargs)
+        except socket.timeout as err:
+            expired = TimeoutExpired(" ".join(cmd_args), timeout)
+            raise AdbCommandTimeoutExpired(device_id or "", expired) from err
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        return output
+
+    def execute(
+        self, device_id: Optional[str], args: List[str], timeout: Optional[float]
+    ) -> str:
+        """Translate adb command line arguments into services and execute
+        them.
+
+        :param Optional[str] device_id: Device ID.
+        :param List[str] args: Adb command line arguments.
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: UnsupportedCommand: When command has no native equivalent.
+        :return: Command output.
+        :rtype: str
+        """
+        kind, service = translate(device_id, args)
+        if kind == QUERY:
+            output = self.query(device_id, service, timeout)
+        elif kind == REQUEST:
+            self.request(device_id, service, timeout).close()
+            output = ""
+        elif kind == WAIT:
+            with self.request(device_id, service, timeout) as conn:
+                conn.read_status()
+            output = ""
+        else:
+            raw = self.service(device_id, service, timeout)
+            if kind == SHELL:
+                output = parse_shell_output(device_id, args, raw)
+            else:
+                output = raw.decode(errors="replace")
+        return finish_output(device_id, args, output)
+
+    def query(self, device_id: Optional[str], service: str, timeout) -> str:
+        """Send host request and read length-prefixed reply.
+
+        :param Optional[str] device_id: Device ID.
+        :param str service: Host service.
+        :param Optional[float] timeout: Timeout in sec.
+        :return: Reply.
+        :rtype: str
+        """
+        with self.request(device_id, service, timeout) as conn:
+            return conn.read_string()
+
+    def service(self, device_id: Optional[str], service: str, timeout) -> bytes:
+        """Run local service on the device and read whole output.
+
+        :param Optional[str] device_id: Device ID.
+        :param str service: Local service, e.g. 'shell:ls'.
+        :param Optional[float] timeout: Timeout in sec.
+        :return: Service output.
+        :rtype: bytes
+        """
+        with self.request(device_id, service, timeout, local=True) as conn:
+            return conn.read_all()
+
+    def sync(
+        self, device_id: Optional[str], timeout: Optional[float] = None
+    ) -> AdbSyncConnection:
+        """Open connection to the device file sync service.
+
+        :param Optional[str] device_id: Device ID, any device when None.
+        :param Optional[float] timeout: Socket timeout in sec.
+        :raise: AdbCommandError: When failed.
+        :return: Sync service connection.
+        :rtype: AdbSyncConnection
+
+        :example:
+
+        >>> import simpleadb
+        >>> transport = simpleadb.AdbSocketTransport()
+        >>> with transport.sync('emulator-5554') as sync:
+        ...     [entry.name for entry in sync.listdir('/sdcard')]
+        ['Download', 'Pictures']
+        """
+        try:
+            conn = self.request(device_id, "sync:", timeout, local=True)
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        conn.device_id = device_id or ""
+        return AdbSyncConnection(conn)
+
+    def shell_v2(
+        self,
+        device_id: Optional[str],
+        command: str,
+        timeout: Optional[float] = None,
+        check: bool = True,
+    ) -> ShellV2Stream:
+        """Start device shell command with shell protocol v2, which keeps
+        stdout and stderr apart and reports exit status.
+
+        :param Optional[str] device_id: Device ID, any device when None.
+        :param str command: Shell command.
+        :param Optional[float] timeout: Socket timeout in sec.
+        :param bool check: Raise command error at the end of output when
+            exit status is non-zero.
+        :raise: AdbCommandError: When failed.
+        :return: Command stdout stream.
+        :rtype: ShellV2Stream
+
+        :example:
+
+        >>> import simpleadb
+        >>> transport = simpleadb.AdbSocketTransport()
+        >>> with transport.shell_v2('emulator-5554', 'ls /missing', check=False) as s:
+        ...     s.result()
+        ShellResult('ls /missing', exit_code=1, stdout=b'', stderr=b'ls: ...')
+        """
+        try:
+            conn = self.request(device_id, SHELL_V2_SERVICE + command, timeout, True)
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        conn.device_id = device_id or ""
+        return ShellV2Stream(conn, command, check)
+
+    def run_shell(
+        self,
+        device_id: Optional[str],
+        command: str,
+        timeout: Optional[float] = None,
+        v2: bool = True,
+    ) -> ShellResult:
+        """Run device shell command and collect its result. Without shell
+        protocol v2 stderr is merged into stdout and exit status is taken
+        from a marker appended to the output.
+
+        :param Optional[str] device_id: Device ID, any device when None.
+        :param str command: Shell command.
+        :param Optional[float] timeout: Timeout in sec.
+        :param bool v2: Device supports shell protocol v2.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command result.
+        :rtype: ShellResult
+        """
+        try:
+            if v2:
+                with self.shell_v2(device_id, command, timeout, False) as stream:
+                    return stream.result()
+            raw = self.service(device_id, shell_service(command), timeout)
+        except socket.timeout as err:
+            expired = TimeoutExpired(command, timeout)
+            raise AdbCommandTimeoutExpired(device_id or "", expired) from err
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        output, marker, status = raw.rpartition(EXIT_MARKER.encode())
+        if not marker:
+            raise AdbCommandError(device_id or "", status.decode(errors="replace"))
+        return ShellResult(command, output, b"", int(status.strip() or 255))
+
+    def install(
+        self,
+        device_id: Optional[str],
+        apks: adbinstall.ApkSet,
+        replace: bool = True,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Install APKs streamed from memory with package manager, without
+        pushing them to device storage first. Split APKs are written to an
+        install session which is abandoned when any write fails.
+
+        :param Optional[str] device_id: Device ID, any device when None.
+        :param ApkSet apks: APKs.
+        :param bool replace: Replace existing app.
+        :param Optional[float] timeout: Timeout of every step in sec.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Package manager output.
+        :rtype: str
+        """
+        try:
+            if len(apks.files) == 1:
+                service = adbinstall.create_stream_service(apks.size, replace)
+                return self.__install_step(
+                    device_id, service, apks.files[0].data, timeout
+                )
+            service = adbinstall.create_session_service(apks.size, replace)
+            output = self.__install_step(device_id, service, None, timeout)
+            session_id = adbinstall.parse_session_id(output)
+            try:
+                for service, data in adbinstall.create_session_services(
+                    apks, session_id
+                ):
+                    output = self.__install_step(device_id, service, data, timeout)
+            except BaseException:
+                abandon = f"exec:{adbcmds.PM_INSTALL_ABANDON} {session_id}"
+                self.service(device_id, abandon, timeout)
+                raise
+            return output
+        except socket.timeout as err:
+            expired = TimeoutExpired(f"install {apks.package}", timeout)
+            raise AdbCommandTimeoutExpired(device_id or "", expired) from err
+        except (OSError, ValueError) as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+
+    def __install_step(
+        self,
+        device_id: Optional[str],
+        service: str,
+        data: Optional[bytes],
+        timeout: Optional[float],
+    ) -> str:
+        """Run package manager command with data written to its stdin.
+
+        :param Optional[str] device_id: Device ID.
+        :param str service: Device local service.
+        :param Optional[bytes] data: Data written to stdin.
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: AdbCommandError: When command did not report success.
+        :return: Command output.
+        :rtype: str
+        """
+        with self.request(device_id, service, timeout, local=True) as conn:
+            if data:
+                conn.write(data)
+            output = conn.read_all().decode(errors="replace").strip()
+        if not output.startswith("Success"):
+            raise AdbCommandError(device_id or "", output)
+        return output
+
+    def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AdbStream:
+        cmd_args = [arg for arg in args if arg]
+        try:
+            service = stream_service(cmd_args)
+            local = not service.startswith("host:")
+            conn = self.request(device_id, service, local=local)
+        except (UnsupportedCommand, ConnectionRefusedError) as err:
+            if self.fallback is None:
+                raise AdbCommandError(device_id or "", str(err)) from err
+            return self.fallback.open(device_id, adb_path, args)
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        conn.settimeout(None)
+        conn.device_id = device_id or ""
+        return AdbSocketStream(conn)
@@ -0,0 +1,535 @@
+#
+# file adbsync.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Adb file sync protocol, used by push and pull over adb server socket."""
+
+import hashlib
+import os
+import posixpath
+import shlex
+import stat
+import struct
+import time
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+from .adbprocess import AdbCommandError
+
+MAX_CHUNK = 64 * 1024
+MAX_COMMAND = 16 * 1024
+DEFAULT_MODE = 0o644
+LIST_FORMAT = "%s %Y %n"
+
+SYNC_HEADER = struct.Struct("<4sI")
+STAT_REPLY = struct.Struct("<4sIII")
+DENT_REPLY = struct.Struct("<4sIIII")
+
+Source = Union[str, bytes, BinaryIO, Iterable[bytes]]
+Destination = Union[str, BinaryIO]
+Progress = Callable[[int, Optional[int]], None]
+
+
+class SyncStat:  # pylint: disable=too-few-public-methods
+    """SyncStat is a remote file status.
+
+    :param int mode: File mode, 0 if file does not exist.
+    :param int size: File size.
+    :param int mtime: Modification time.
+    :param str name: File name, set for directory entries.
+    """
+
+    def __init__(self, mode: int, size: int, mtime: int, name: str = ""):
+        self.mode = mode
+        self.size = size
+        self.mtime = mtime
+        self.name = name
+
+    def __repr__(self):
+        return f"SyncStat({self.name!r}, mode={self.mode:o}, size={self.size})"
+
+    @property
+    def exists(self) -> bool:
+        """True if remote file exists."""
+        return self.mode != 0
+
+    @property
+    def is_dir(self) -> bool:
+        """True if remote file is a directory."""
+        return stat.S_ISDIR(self.mode)
+
+
+class TransferStats:  # pylint: disable=too-few-public-methods
+    """TransferStats describes a completed file transfer.
+
+    :param str path: Remote path.
+    :param int size: Number of transferred bytes.
+    :param float elapsed: Transfer time in sec.
+    """
+
+    def __init__(self, path: str, size: int, elapsed: float):
+        self.path = path
+        self.size = size
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (
+            f"TransferStats({self.path!r}, size={self.size}, "
+            f"elapsed={self.elapsed:.3f}, throughput={self.throughput:.0f})"
+        )
+
+    @property
+    def throughput(self) -> float:
+        """Throughput in bytes per sec."""
+        return self.size / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class DirSyncResult:  # pylint: disable=too-few-public-methods
+    """DirSyncResult describes a completed directory sync.
+
+    :param List[str] pushed: Pushed files relative to synced directory.
+    :param List[str] deleted: Deleted stale remote files.
+    :param int unchanged: Number of files which were up to date.
+    :param int size: Number of pushed bytes.
+    :param float elapsed: Sync time in sec.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        pushed: List[str],
+        deleted: List[str],
+        unchanged: int,
+        size: int,
+        elapsed: float,
+    ):
+        self.pushed = pushed
+        self.deleted = deleted
+        self.unchanged = unchanged
+        self.size = size
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (
+            f"DirSyncResult(pushed={len(self.pushed)}, deleted={len(self.deleted)}, "
+            f"unchanged={self.unchanged}, size={self.size}, "
+            f"elapsed={self.elapsed:.3f})"
+        )
+
+
+def iter_chunks(source: Source, buffer: memoryview) -> Iterator[int]:
+    """Fill buffer with consecutive source chunks.
+
+    :param Source source: Local path, bytes, binary file object or iterable
+        of bytes.
+    :param memoryview buffer: Buffer of MAX_CHUNK bytes.
+    :return: Iterator of number of bytes in the buffer.
+    :rtype: Iterator[int]
+    """
+    if isinstance(source, str):
+        with open(source, "rb") as source_file:
+            yield from iter_chunks(source_file, buffer)
+        return
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = [source]
+    if hasattr(source, "readinto"):
+        while True:
+            size = source.readinto(buffer)
+            if not size:
+                return
+            yield size
+    if hasattr(source, "read"):
+        read = source.read
+        source = iter(lambda: read(len(buffer)), b"")
+    for chunk in source:
+        chunk = memoryview(chunk)
+        for offset in range(0, len(chunk), len(buffer)):
+            piece = chunk[offset : offset + len(buffer)]
+            buffer[: len(piece)] = piece
+            yield len(piece)
+
+
+def scan_local(local: str) -> Dict[str, SyncStat]:
+    """Get status of every file in local directory tree.
+
+    :param str local: Local directory path.
+    :return: File status by path relative to the directory, with '/'
+        separators.
+    :rtype: Dict[str, SyncStat]
+    """
+    files = {}
+    for root, _, names in os.walk(local):
+        for name in names:
+            path = os.path.join(root, name)
+            local_stat = os.stat(path)
+            rel = os.path.relpath(path, local).replace(os.sep, "/")
+            files[rel] = SyncStat(
+                local_stat.st_mode, local_stat.st_size, int(local_stat.st_mtime), rel
+            )
+    return files
+
+
+def create_list_command(remote: str) -> str:
+    """Create shell command listing size and modification time of every file
+    in remote directory tree at once.
+
+    :param str remote: Remote directory path.
+    :return: Shell command, prints nothing if directory does not exist.
+    :rtype: str
+    """
+    path = shlex.quote(remote.rstrip("/") or "/")
+    return (
+        f"if [ -d {path} ]; then "
+        f"find {path} -type f -exec stat -c '{LIST_FORMAT}' {{}} +; fi"
+    )
+
+
+def parse_list_output(output: str, remote: str) -> Dict[str, SyncStat]:
+    """Parse output of :func:`create_list_command`.
+
+    :param str output: Shell command output.
+    :param str remote: Listed remote directory path.
+    :return: File status by path relative to the directory.
+    :rtype: Dict[str, SyncStat]
+    """
+    prefix = remote.rstrip("/") + "/"
+    files = {}
+    for line in output.splitlines():
+        fields = line.split(" ", 2)
+        if len(fields) == 3 and fields[2].startswith(prefix):
+            name = fields[2][len(prefix) :]
+            files[name] = SyncStat(stat.S_IFREG, int(fields[0]), int(fields[1]), name)
+    return files
+
+
+def quote_chunks(args: Iterable[str], limit: int = MAX_COMMAND) -> Iterator[str]:
+    """Join quoted shell arguments in chunks short enough for a single adb
+    shell command.
+
+    :param Iterable[str] args: Arguments.
+    :param int limit: Maximum chunk length.
+    :return: Iterator of joined arguments.
+    :rtype: Iterator[str]
+    """
+    chunk: List[str] = []
+    length = 0
+    for arg in args:
+        quoted = shlex.quote(arg)
+        if chunk and length + len(quoted) + 1 > limit:
+            yield " ".join(chunk)
+            chunk, length = [], 0
+        chunk.append(quoted)
+        length += len(quoted) + 1
+    if chunk:
+        yield " ".join(chunk)
+
+
+def parse_hash_output(output: str, remote: str) -> Dict[str, str]:
+    """Parse ``md5sum`` output of remote files.
+
+    :param str output: Shell command output.
+    :param str remote: Remote directory path.
+    :return: Hex digest by path relative to the directory.
+    :rtype: Dict[str, str]
+    """
+    prefix = remote.rstrip("/") + "/"
+    hashes = {}
+    for line in output.splitlines():
+        digest, _, path = line.partition("  ")
+        if path.startswith(prefix):
+            hashes[path[len(prefix) :]] = digest
+    return hashes
+
+
+def file_digest(path: str) -> str:
+    """Compute md5 digest of local file, as printed by ``md5sum``.
+
+    :param str path: Local file path.
+    :return: Hex digest.
+    :rtype: str
+    """
+    digest = hashlib.md5()
+    buffer = memoryview(bytearray(MAX_CHUNK))
+    with open(path, "rb") as source:
+        for size in iter(lambda: source.readinto(buffer), 0):
+            digest.update(buffer[:size])
+    return digest.hexdigest()
+
+
+def changed_files(
+    local_files: Dict[str, SyncStat],
+    remote_files: Dict[str, SyncStat],
+    compare_mtime: bool = True,
+) -> List[str]:
+    """Get local files missing on remote or differing in size or
+    modification time.
+
+    :param Dict[str, SyncStat] local_files: Local files status.
+    :param Dict[str, SyncStat] remote_files: Remote files status.
+    :param bool compare_mtime: Compare modification time.
+    :return: Changed file relative paths.
+    :rtype: List[str]
+    """
+    changed = []
+    for name, local_stat in local_files.items():
+        remote_stat = remote_files.get(name)
+        if (
+            remote_stat is None
+            or remote_stat.size != local_stat.size
+            or (compare_mtime and remote_stat.mtime != local_stat.mtime)
+        ):
+            changed.append(name)
+    return changed
+
+
+class AdbSyncConnection:
+    """AdbSyncConnection is a connection to the device sync service. Files
+    are sent and received in 64 KB chunks straight from and to file objects,
+    without loading whole file into memory.
+
+    :param AdbSocket conn: Connection with accepted 'sync:' request.
+
+    :example:
+
+    >>> import simpleadb
+    >>> transport = simpleadb.AdbSocketTransport()
+    >>> with transport.sync('emulator-5554') as sync:
+    ...     sync.push('dummy_file.txt', '/sdcard/Download/')
+    ...     sync.stat('/sdcard/Download/dummy_file.txt').size
+    42
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.device_id = conn.device_id
+        self.__buffer = bytearray(SYNC_HEADER.size + MAX_CHUNK)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
+        """Quit sync service and close connection."""
+        try:
+            self.conn.write(SYNC_HEADER.pack(b"QUIT", 0))
+        except OSError:
+            pass
+        self.conn.close()
+
+    def request(self, command: bytes, path: str) -> None:
+        """Send sync request.
+
+        :param bytes command: Request ID, e.g. b'STAT'.
+        :param str path: Request argument.
+        """
+        data = path.encode()
+        self.conn.write(SYNC_HEADER.pack(command, len(data)) + data)
+
+    def fail(self, length: int) -> AdbCommandError:
+        """Read failure message.
+
+        :param int length: Message length.
+        :return: Exception to raise.
+        :rtype: AdbCommandError
+        """
+        message = self.conn.read_exactly(length).decode(errors="replace")
+        return AdbCommandError(self.device_id, message)
+
+    def stat(self, remote: str) -> SyncStat:
+        """Get remote file status.
+
+        :param str remote: Remote path.
+        :raise: AdbCommandError: When failed.
+        :return: File status, mode is 0 if file does not exist.
+        :rtype: SyncStat
+        """
+        self.request(b"STAT", remote)
+        ident, mode, size, mtime = STAT_REPLY.unpack(
+            self.conn.read_exactly(STAT_REPLY.size)
+        )
+        if ident != b"STAT":
+            raise AdbCommandError(self.device_id, f"invalid sync reply {ident!r}")
+        return SyncStat(mode, size, mtime, posixpath.basename(remote))
+
+    def listdir(self, remote: str) -> List[SyncStat]:
+        """List remote directory.
+
+        :param str remote: Remote directory path.
+        :raise: AdbCommandError: When failed.
+        :return: Directory entries, without '.' and '..'.
+        :rtype: List[SyncStat]
+        """
+        self.request(b"LIST", remote)
+        entries = []
+        while True:
+            ident, mode, size, mtime, length = DENT_REPLY.unpack(
+                self.conn.read_exactly(DENT_REPLY.size)
+            )
+            if ident == b"DONE":
+                return entries
+            if ident != b"DENT":
+                raise AdbCommandError(self.device_id, f"invalid sync reply {ident!r}")
+            name = self.conn.read_exactly(length).decode(errors="replace")
+            if name not in (".", ".."):
+                entries.append(SyncStat(mode, size, mtime, name))
+
+    def send(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        source: Source,
+        remote: str,
+        mode: int = DEFAULT_MODE,
+        mtime: Optional[int] = None,
+        progress: Optional[Progress] = None,
+        total: Optional[int] = None,
+    ) -> TransferStats:
+        """Send data to remote file.
+
+        :param Source source: Local path, bytes, binary file object or
+            iterable of bytes.
+        :param str remote: Remote file path.
+        :param int mode: Remote file permissions.
+        :param Optional[int] mtime: Remote modification time, default now.
+        :param Optional[Progress] progress: Called with number of sent bytes
+            and total size after every chunk.
+        :param Optional[int] total: Total size passed to progress.
+        :raise: AdbCommandError: When failed.
+        :return: Transfer stats.
+        :rtype: TransferStats
+        """
+        start = time.monotonic()
+        self.request(b"SEND", f"{remote},{mode}")
+        view = memoryview(self.__buffer)
+        sent = 0
+        for size in iter_chunks(source, view[SYNC_HEADER.size :]):
+            SYNC_HEADER.pack_into(view, 0, b"DATA", size)
+            self.conn.write(view[: SYNC_HEADER.size + size])
+            sent += size
+            if progress is not None:
+                progress(sent, total)
+        mtime = int(time.time()) if mtime is None else mtime
+        self.conn.write(SYNC_HEADER.pack(b"DONE", mtime))
+        ident, length = SYNC_HEADER.unpack(self.conn.read_exactly(SYNC_HEADER.size))
+        if ident == b"FAIL":
+            raise self.fail(length)
+        if ident != b"OKAY":
+            raise AdbCommandError(self.device_id, f"invalid sync reply {ident!r}")
+        return TransferStats(remote, sent, time.monotonic() - start)
+
+    def send_file(
+        self, path: str, remote: str, progress: Optional[Progress] = None
+    ) -> TransferStats:
+        """Send local file, keep its mode and modification time.
+
+        :param str path: Local file path.
+        :param str remote: Remote file path.
+        :param Optional[Progress] progress: Called with number of sent bytes
+            and file size after every chunk.
+        :raise: AdbCommandError: When failed.
+        :return: Transfer stats.
+        :rtype: TransferStats
+        """
+        local_stat = os.stat(path)
+        return self.send(
+            path,
+            remote,
+            stat.S_IMODE(local_stat.st_mode),
+            int(local_stat.st_mtime),
+            progress,
+            local_stat.st_size,
+        )
+
+    def recv(
+        self,
+        remote: str,
+        dest: Destination,
+        progress: Optional[Progress] = None,
+        total: Optional[int] = None,
+    ) -> TransferStats:
+        """Receive remote file.
+
+        :param str remote: Remote file path.
+        :param Destination dest: Local path or writable binary file object.
+        :param Optional[Progress] progress: Called with number of received
+            bytes and total size after every chunk.
+        :param Optional[int] total: Total size passed to progress.
+        :raise: AdbCommandError: When failed.
+        :return: Transfer stats.
+        :rtype: TransferStats
+        """
+        if isinstance(dest, str):
+            with open(dest, "wb") as dest_file:
+                return self.recv(remote, dest_file, progress, total)
+        start = time.monotonic()
+        self.request(b"RECV", remote)
+        view = memoryview(self.__buffer)
+        received = 0
+        while True:
+            ident, length = SYNC_HEADER.unpack(self.conn.read_exactly(SYNC_HEADER.size))
+            if ident == b"DONE":
+                return TransferStats(remote, received, time.monotonic() - start)
+            if ident == b"FAIL":
+                raise self.fail(length)
+            if ident != b"DATA" or length > len(view):
+                raise AdbCommandError(self.device_id, f"invalid sync reply {ident!r}")
+            self.conn.read_into(view[:length])
+            dest.write(view[:length])
+            received += length
+            if progress is not None:
+                progress(received, total)
+
+    def push(
+        self, source: Source, dest: str, progress: Optional[Progress] = None
+    ) -> TransferStats:
+        """Copy local file to device like 'adb push'. File name is appended
+        to destination directory, local file mode and modification time are
+        preserved.
+
+        :param Source source: Local file path, bytes, binary file object or
+            iterable of bytes.
+        :param str dest: Remote path.
+        :param Optional[Progress] progress: Called with number of sent bytes
+            and file size after every chunk.
+        :raise: AdbCommandError: When failed.
+        :return: Transfer stats.
+        :rtype: TransferStats
+        """
+        if isinstance(source, str):
+            if dest.endswith("/") or self.stat(dest).is_dir:
+                dest = posixpath.join(dest, os.path.basename(source))
+            return self.send_file(source, dest, progress)
+        return self.send(source, dest, progress=progress)
+
+    def pull(
+        self, source: str, dest: Destination = ".", progress: Optional[Progress] = None
+    ) -> TransferStats:
+        """Copy remote file to local path or file object like 'adb pull'.
+
+        :param str source: Remote file path.
+        :param Destination dest: Local path or writable binary file object,
+            file name is appended to a directory path.
+        :param Optional[Progress] progress: Called with number of received
+            bytes and file size after every chunk.
+        :raise: AdbCommandError: When failed.
+        :return: Transfer stats.
+        :rtype: TransferStats
+        """
+        remote_stat = self.stat(source)
+        if not remote_stat.exists:
+            raise AdbCommandError(
+                self.device_id, f"remote object '{source}' does not exist"
+            )
+        if isinstance(dest, str) and os.path.isdir(dest):
+            dest = os.path.join(dest, posixpath.basename(source))
+        return self.recv(source, dest, progress, remote_stat.size)
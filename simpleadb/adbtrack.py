@@ -0,0 +1,285 @@
+#
+# file adbtrack.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Device tracking with adb server track-devices service."""
+
+import threading
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+CONNECTED = "connected"
+DISCONNECTED = "disconnected"
+STATE_CHANGED = "state"
+
+DEVICE_PROPERTIES = ("usb", "product", "model", "device", "transport_id")
+
+
+class DeviceInfo:  # pylint: disable=too-few-public-methods
+    """DeviceInfo is a device entry of adb server device list.
+
+    :param str serial: Device serial number.
+    :param str state: Device state, e.g. 'device', 'offline', 'unauthorized'.
+    :param Optional[str] product: Product name.
+    :param Optional[str] model: Model name.
+    :param Optional[str] device: Device name.
+    :param Optional[int] transport_id: Adb server transport ID.
+    """
+
+    __slots__ = ("serial", "state", "product", "model", "device", "transport_id")
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        serial: str,
+        state: str,
+        product: Optional[str] = None,
+        model: Optional[str] = None,
+        device: Optional[str] = None,
+        transport_id: Optional[int] = None,
+    ):
+        self.serial = serial
+        self.state = state
+        self.product = product
+        self.model = model
+        self.device = device
+        self.transport_id = transport_id
+
+    def __repr__(self):
+        return (
+            f"DeviceInfo({self.serial!r}, {self.state!r}, product={self.product!r}, "
+            f"model={self.model!r}, device={self.device!r}, "
+            f"transport_id={self.transport_id!r})"
+        )
+
+    def __eq__(self, other):
+        return all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+
+class DeviceEvent:  # pylint: disable=too-few-public-methods
+    """DeviceEvent is a change of the adb server device list.
+
+    :param str kind: One of :data:`CONNECTED`, :data:`DISCONNECTED` and
+        :data:`STATE_CHANGED`.
+    :param DeviceInfo device: Device entry, the last known one when
+        disconnected.
+    :param Optional[DeviceInfo] previous: Previous entry on state change.
+    """
+
+    __slots__ = ("kind", "device", "previous")
+
+    def __init__(
+        self, kind: str, device: DeviceInfo, previous: Optional[DeviceInfo] = None
+    ):
+        self.kind = kind
+        self.device = device
+        self.previous = previous
+
+    def __repr__(self):
+        return f"DeviceEvent({self.kind!r}, {self.device!r})"
+
+    @property
+    def serial(self) -> str:
+        """Device serial number."""
+        return self.device.serial
+
+
+def parse_device_line(line: str) -> Optional[DeviceInfo]:
+    """Parse line of ``adb devices`` or ``adb devices -l`` output. State may
+    consist of many words, e.g. 'no permissions'.
+
+    :param str line: Device list line.
+    :return: Device entry, None for empty line.
+    :rtype: Optional[DeviceInfo]
+
+    :example:
+
+    >>> info = parse_device_line('emulator-5554 device model:Pixel transport_id:1')
+    >>> info.state, info.model, info.transport_id
+    ('device', 'Pixel', 1)
+    """
+    fields = line.split()
+    if not fields:
+        return None
+    state = []
+    properties: Dict[str, str] = {}
+    for field in fields[1:]:
+        key, separator, value = field.partition(":")
+        if separator and key in DEVICE_PROPERTIES:
+            properties[key] = value
+        else:
+            state.append(field)
+    transport_id = properties.get("transport_id")
+    return DeviceInfo(
+        fields[0],
+        " ".join(state),
+        properties.get("product"),
+        properties.get("model"),
+        properties.get("device"),
+        int(transport_id) if transport_id and transport_id.isdigit() else None,
+    )
+
+
+def parse_device_list(output: str) -> Dict[str, DeviceInfo]:
+    """Parse device list, the header of ``adb devices`` is skipped.
+
+    :param str output: Device list.
+    :return: Serial number to device entry mapping.
+    :rtype: Dict[str, DeviceInfo]
+    """
+    devices = {}
+    for line in output.splitlines():
+        if line.startswith("List of devices") or line.startswith("* "):
+            continue
+        info = parse_device_line(line)
+        if info is not None:
+            devices[info.serial] = info
+    return devices
+
+
+class DeviceRegistry:
+    """DeviceRegistry is an in-memory view of the adb server device list
+    kept up to date from device list updates. It is safe to read from other
+    threads while it is updated.
+
+    :example:
+
+    >>> registry = DeviceRegistry()
+    >>> events = registry.update(parse_device_list('emulator-5554 device\\n'))
+    >>> [(event.kind, event.serial) for event in events]
+    [('connected', 'emulator-5554')]
+    >>> registry.get('emulator-5554').state
+    'device'
+    """
+
+    def __init__(self):
+        self.__devices: Dict[str, DeviceInfo] = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__devices)
+
+    def __contains__(self, serial: str) -> bool:
+        return serial in self.__devices
+
+    def get(self, serial: str) -> Optional[DeviceInfo]:
+        """Get device entry.
+
+        :param str serial: Device serial number.
+        :return: Device entry, None if device is not known.
+        :rtype: Optional[DeviceInfo]
+        """
+        return self.__devices.get(serial)
+
+    def devices(self, state: Optional[str] = None) -> List[DeviceInfo]:
+        """Get known devices.
+
+        :param Optional[str] state: Return only devices in given state, e.g.
+            'device', all devices when None.
+        :return: Device entries sorted by serial number.
+        :rtype: List[DeviceInfo]
+        """
+        with self.__lock:
+            devices = sorted(self.__devices.values(), key=lambda info: info.serial)
+        if state is None:
+            return devices
+        return [info for info in devices if info.state == state]
+
+    def update(self, devices: Dict[str, DeviceInfo]) -> List[DeviceEvent]:
+        """Replace device list and return the differences. A device which
+        got a new transport ID was reconnected, it is reported as
+        disconnected and connected again.
+
+        :param Dict[str, DeviceInfo] devices: Current device list.
+        :return: Events ordered by serial number.
+        :rtype: List[DeviceEvent]
+        """
+        events = []
+        with self.__lock:
+            previous = self.__devices
+            self.__devices = dict(devices)
+        for serial in sorted(set(previous) | set(devices)):
+            old = previous.get(serial)
+            new = devices.get(serial)
+            if old is not None and (
+                new is None or new.transport_id != old.transport_id
+            ):
+                events.append(DeviceEvent(DISCONNECTED, old))
+                old = None
+            if new is None:
+                continue
+            if old is None:
+                events.append(DeviceEvent(CONNECTED, new))
+            elif new.state != old.state:
+                events.append(DeviceEvent(STATE_CHANGED, new, old))
+        return events
+
+
+def read_device_lists(stream) -> Iterator[Dict[str, DeviceInfo]]:
+    """Read hex-length prefixed device lists sent by track-devices service
+    on every change.
+
+    :param AdbStream stream: Output of ``adb track-devices -l``.
+    :return: Iterator of device lists.
+    :rtype: Iterator[Dict[str, DeviceInfo]]
+    """
+    while True:
+        header = stream.read(4)
+        if len(header) < 4:
+            return
+        size = int(header, 16)
+        payload = stream.read(size)
+        if len(payload) < size:
+            return
+        yield parse_device_list(payload.decode(errors="replace"))
+
+
+async def async_read_device_lists(stream) -> AsyncIterator[Dict[str, DeviceInfo]]:
+    """Read hex-length prefixed device lists from asyncio stream.
+
+    :param AsyncAdbStream stream: Output of ``adb track-devices -l``.
+    :return: Asynchronous iterator of device lists.
+    :rtype: AsyncIterator[Dict[str, DeviceInfo]]
+    """
+    while True:
+        header = await stream.read(4)
+        if len(header) < 4:
+            return
+        size = int(header, 16)
+        payload = await stream.read(size)
+        if len(payload) < size:
+            return
+        yield parse_device_list(payload.decode(errors="replace"))
+
+
+def track(stream, registry: DeviceRegistry) -> Iterator[DeviceEvent]:
+    """Update registry from track-devices stream and yield device events.
+    When the stream ends, e.g. adb server was killed, remaining devices are
+    reported as disconnected.
+
+    :param AdbStream stream: Output of ``adb track-devices -l``.
+    :param DeviceRegistry registry: Registry to update.
+    :return: Iterator of events.
+    :rtype: Iterator[DeviceEvent]
+    """
+    for devices in read_device_lists(stream):
+        yield from registry.update(devices)
+    yield from registry.update({})
+
+
+async def async_track(stream, registry: DeviceRegistry) -> AsyncIterator[DeviceEvent]:
+    """Update registry from asyncio track-devices stream and yield device
+    events, see :func:`track`.
+
+    :param AsyncAdbStream stream: Output of ``adb track-devices -l``.
+    :param DeviceRegistry registry: Registry to update.
+    :return: Asynchronous iterator of events.
+    :rtype: AsyncIterator[DeviceEvent]
+    """
+    async for devices in async_read_device_lists(stream):
+        for event in registry.update(devices):
+            yield event
+    for event in registry.update({}):
+        yield event
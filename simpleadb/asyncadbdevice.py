@@ -0,0 +1,809 @@
+# pylint: disable=too-many-public-methods,duplicate-code
+#
+# file asyncadbdevice.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+
+"""This module includes AsyncAdbDevice class, asyncio counterpart of AdbDevice."""
+
+import re
+import shlex
+import time
+from typing import AsyncIterator, Dict, Iterable, Optional, Union
+from . import adbbatch
+from . import adbcmds
+from . import adblogcat
+from . import adbmode
+from . import adbprops
+from . import asyncadbprocess
+from .adbprocess import AdbCommandError
+from .utils import is_valid_ip
+
+
+class AsyncAdbDevice:
+    """AsyncAdbDevice is an asyncio representation of adb commands used on
+    device with given serial. It mirrors :class:`simpleadb.AdbDevice`, every
+    command is a coroutine. Timeouts and task cancellation stop the command
+    and kill its adb process.
+
+    :param str device_id: Device ID or Host address.
+    :param Optional[int] port: Port, default is 5555.
+    :keyword str path: Adb binary path.
+    :keyword AsyncAdbTransport transport: Transport used to deliver commands,
+        default adb subprocess.
+    :keyword float prop_cache_ttl: Cache property values, read-only ``ro.*``
+        properties until reboot, other properties for given number of sec.
+
+    :example:
+
+    >>> import simpleadb
+    >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+    >>> device = simpleadb.AsyncAdbDevice('emulator-5554', path='/usr/bin/adb')
+    >>> device = simpleadb.AsyncAdbDevice('192.168.42.42', 5555)
+    >>> device = simpleadb.AsyncAdbDevice('emulator-5554', prop_cache_ttl=30)
+    >>> device = simpleadb.AsyncAdbDevice(
+    ...     'emulator-5554', transport=simpleadb.AsyncAdbSocketTransport())
+    """
+
+    def __init__(self, device_id: str, port: Optional[int] = None, **kwargs):
+        options_path = kwargs.get("path")
+        self.__adb_path = options_path if options_path else adbcmds.ADB
+        connect = port is not None or device_id == "localhost"
+        connect = connect or is_valid_ip(device_id)
+        self.__id = device_id + ":" + str(port) if port is not None else device_id
+        self.__adb_process = asyncadbprocess.AsyncAdbProcess(
+            self.__id, self.__adb_path, kwargs.get("transport"), connect
+        )
+        prop_cache_ttl = kwargs.get("prop_cache_ttl")
+        self.__prop_cache = (
+            adbprops.PropCache(prop_cache_ttl) if prop_cache_ttl is not None else None
+        )
+
+    def __str__(self):
+        return self.get_id()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __eq__(self, other):
+        return self.get_id() == other.get_id()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def get_id(self) -> str:
+        """Get target device id. Return the device id used in constructor.
+
+        :return: Device id.
+        :rtype: str
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> device.get_id()
+        'emulator-5554'
+        """
+        return self.__id
+
+    async def get_state(self) -> str:
+        """Get device state. Print offline, bootloader or disconnect.
+
+        :raise: AdbCommandError: When failed.
+        :return: State offline, bootloader or device.
+        :rtype: str
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.get_state()
+        'device'
+        """
+        cmd = []
+        cmd.append(adbcmds.GET_STATE)
+        return await self.__adb_process.check_output(cmd)
+
+    async def get_app_pid(self, package_name: str) -> int:
+        """Return the PID of the application.
+
+        :param str package_name: Package name.
+        :raise: AdbCommandError: When failed.
+        :return: Package PID.
+        :rtype: int
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.get_app_pid('com.dummy.app')
+        4367
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append("pidof")
+        cmd.append(shlex.quote(package_name))
+        return int(await self.__adb_process.check_output(cmd))
+
+    async def get_ip(self, iface: Optional[str] = "wlan0") -> str:
+        """Return the device IP address.
+
+        :param Optional[str] iface: Network interface, default wlan0.
+        :raise: AdbCommandError: When failed.
+        :return: Device ip address.
+        :rtype: str
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.get_ip('wlan0')
+        '192.168.42.42'
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append("ifconfig")
+        cmd.append(shlex.quote(iface))
+        output = await self.__adb_process.check_output(cmd)
+        match = re.search(r"inet addr:(\S+)", output)
+        ip_address = match.group(1) if match else output
+        if not is_valid_ip(ip_address):
+            raise AdbCommandError(self.get_id(), output, None)
+        return ip_address
+
+    async def get_serialno(self) -> str:
+        """Get target device serial number.
+
+        :raise: AdbCommandError: When failed.
+        :return: Serial number.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.get_serialno()
+        'emulator-5554'
+        """
+        cmd = []
+        cmd.append(adbcmds.GET_SERIALNO)
+        return await self.__adb_process.check_output(cmd)
+
+    async def is_available(self) -> bool:
+        """Check if device is available.
+
+        :return: True if available, otherwise False.
+        :rtype: bool
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.is_available()
+        True
+        """
+        try:
+            await self.get_serialno()
+            return True
+        except AdbCommandError:
+            return False
+
+    async def get_devpath(self) -> str:
+        """Get device path.
+
+        :raise: AdbCommandError: When failed.
+        :return: Device path.
+        :rtype: str
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.get_devpath()
+        'usb:3383384308X'
+        """
+        cmd = []
+        cmd.append(adbcmds.DEVPATH)
+        return await self.__adb_process.check_output(cmd)
+
+    async def remount(self) -> None:
+        """Remout partition read-write.
+
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.root()
+        >>> await device.remount()
+        """
+        cmd = []
+        cmd.append(adbcmds.REMOUNT)
+        output = await self.__adb_process.check_output(cmd)
+        if "remount failed" in output.lower():
+            raise AdbCommandError(self.get_id(), output, None)
+
+    async def reboot(self) -> None:
+        """Reboot the device. Defaults to booting system image.
+
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.reboot()
+        """
+        cmd = []
+        cmd.append(adbcmds.REBOOT)
+        await self.__adb_process.check_output(cmd)
+        if self.__prop_cache is not None:
+            self.__prop_cache.invalidate()
+
+    async def root(self, timeout_sec: Optional[int] = None) -> None:
+        """Restart adb with root permission if device has one. Wait for device
+        to be in 'device' state, unless adbd was already running as root.
+
+        :param Optional[int] timeout_sec: Timeout in seconds.
+        :raise: AdbCommandError: When failed.
+        :raise: TimeoutExpired: When timeout.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.root()
+        """
+        cmd = []
+        cmd.append(adbcmds.ROOT)
+        output = await self.__adb_process.check_output(cmd)
+        if "cannot" in output.lower() or "unable" in output.lower():
+            raise AdbCommandError(self.get_id(), output)
+        if adbmode.restarts_adbd(output):
+            await self.wait_for_device(timeout_sec)
+
+    async def unroot(self, timeout_sec: Optional[int] = None) -> None:
+        """Restart adb without root permission. Wait for device to be in
+        'device' state, unless adbd was not running as root.
+
+        :param Optional[int] timeout_sec: Timeout in seconds.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.unroot()
+        """
+        cmd = []
+        cmd.append(adbcmds.UNROOT)
+        output = await self.__adb_process.check_output(cmd)
+        if "cannot" in output.lower() or "unable" in output.lower():
+            raise AdbCommandError(self.get_id(), output)
+        if adbmode.restarts_adbd(output):
+            await self.wait_for_device(timeout_sec)
+
+    async def is_root(self) -> bool:
+        """Check if device has root permissions (experimental). Not guarantee
+        to work 'su' must be installed on device.
+
+        :return: True if device is rooted, False otherwise.
+        :rtype: bool
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.root()
+        >>> await device.is_root()
+        True
+        """
+        try_su = "su 0 id -u 2>/dev/null"
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(try_su)
+        try:
+            await self.__adb_process.check_output(cmd)
+            return True
+        except AdbCommandError:
+            return False
+
+    async def install(self, apk: str) -> None:
+        """Push package to the device and install.
+
+        :param str apk: Package path.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.install('dummy.apk')
+        """
+        cmd = []
+        cmd.append(adbcmds.INSTALL)
+        cmd.append(apk)
+        await self.__adb_process.check_output(cmd)
+
+    async def uninstall(self, package: str) -> None:
+        """Remove app package from the device.
+
+        :param str apk: Package name.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.uninstall('dummy.apk')
+        """
+        cmd = []
+        cmd.append(adbcmds.UNINSTALL)
+        cmd.append(package)
+        await self.__adb_process.check_output(cmd)
+
+    async def shell(self, args: str) -> str:
+        """Run remote shell command interface.
+
+        :param str args: Adb shell arguments.
+        :raise: AdbCommandError: When failed.
+        :return: Serial number.
+        :rtype: str
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.shell('ls')
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(args)
+        return await self.__adb_process.check_output(cmd)
+
+    def batch(
+        self, stop_on_error: bool = False, check: bool = True
+    ) -> adbbatch.AsyncAdbBatch:
+        """Collect device shell commands and run them in a single adb shell
+        call when the async context exits. Every command gets its own result
+        with output and exit status.
+
+        :param bool stop_on_error: Skip remaining commands after a failed one.
+        :param bool check: Raise the first command error on context exit.
+        :return: Batch of commands.
+        :rtype: AsyncAdbBatch
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> async with device.batch() as batch:
+        ...     batch.setprop('persist.dummy.prop', '42')
+        ...     batch.pm_grant('com.dummy.app', 'android.permission.PERMISSION')
+        ...     prop = batch.getprop('persist.dummy.prop')
+        >>> prop.output
+        '42'
+        """
+        invalidate = (
+            self.__prop_cache.invalidate if self.__prop_cache is not None else None
+        )
+        return adbbatch.AsyncAdbBatch(
+            self.__adb_process, stop_on_error, check, invalidate
+        )
+
+    async def rm(self, remote_path: str) -> None:
+        """Remove file in adb device.
+
+        :param str remote_path: Remote path.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.rm('/sdcard/dummy_file')
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.RM)
+        cmd.append(shlex.quote(remote_path))
+        await self.__adb_process.check_output(cmd)
+
+    async def tap(self, pos_x: int, pos_y: int) -> None:
+        """Tap screen.
+
+        :param int pos_x: x position.
+        :param int pos_y: y position.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.tap(42, 42)
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.INPUT_TAP)
+        cmd.append(str(pos_x))
+        cmd.append(str(pos_y))
+        await self.__adb_process.check_output(cmd)
+
+    async def swipe(self, pos_x1: int, pos_y1: int, pos_x2: int, pos_y2: int) -> None:
+        """Swipe screen.
+
+        :param: int pos_x1: Start x position.
+        :param: int pos_y1: Start y position.
+        :param: int pos_x2: End x position.
+        :param: int pos_y2: End y position.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.swipe(0, 0, 42, 42)
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.INPUT_SWIPE)
+        cmd.append(str(pos_x1))
+        cmd.append(str(pos_y1))
+        cmd.append(str(pos_x2))
+        cmd.append(str(pos_y2))
+        await self.__adb_process.check_output(cmd)
+
+    async def screencap(self, **kwargs) -> None:
+        """Capture screenshot.
+
+        :keyword str remote: Remote path.
+        :keyword str local: Local path.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.screencap()
+        """
+        remote_default = "/sdcard/screencap.png"
+        local_default = "screencap"
+        local_default += time.strftime("%Y%m%d-%H%M%S")
+        local_default += ".png"
+
+        remote_arg = kwargs.get("remote")
+        local_arg = kwargs.get("local")
+
+        remote = remote_arg if remote_arg else remote_default
+        local = local_arg if local_arg else local_default
+
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.SCREENCAP)
+        cmd.append(shlex.quote(remote))
+        await self.__adb_process.check_output(cmd)
+        await self.pull(remote, local)
+        await self.rm(remote)
+
+    async def broadcast(self, intent: str) -> None:
+        """Send broadcast.
+
+        :param str intent: Intent argument.
+        :raise: AdbCommandError: When failed.
+        :rtype: int
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.broadcast('am dummy_intent')
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append("am broadcast -a")
+        cmd.append(intent)
+        await self.__adb_process.check_output(cmd)
+
+    async def pm_grant(self, package: str, permission: str) -> None:
+        """Grant permission.
+
+        :param str package: Package name.
+        :param str permission: Android permission.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.pm_grant('com.dummy.app', 'android.permission.PERMISSION')
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.PM_GRANT)
+        cmd.append(shlex.quote(package))
+        cmd.append(shlex.quote(permission))
+        await self.__adb_process.check_output(cmd)
+
+    async def setprop(self, prop: str, value: str) -> None:
+        """Set property.
+
+        :param str prop: Property name.
+        :param str value: Property Value.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.setprop('persist.dummy_prop', 'true')
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.SETPROP)
+        cmd.append(shlex.quote(prop))
+        cmd.append(shlex.quote(value))
+        await self.__adb_process.check_output(cmd)
+        if self.__prop_cache is not None:
+            self.__prop_cache.invalidate(prop)
+
+    async def getprop(self, prop: str) -> str:
+        """Get android system property value.
+
+        :param str prop: Property name.
+        :raise: AdbCommandError: When failed.
+        :return: System property value.
+        :rtype: str
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.setprop('persist.dummy.prop 42')
+        >>> await device.getprop('persist.dummy.prop')
+        '42'
+        """
+        if self.__prop_cache is not None:
+            value = self.__prop_cache.get(prop)
+            if value is not None:
+                return value
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.GETPROP)
+        cmd.append(shlex.quote(prop))
+        value = await self.__adb_process.check_output(cmd)
+        if self.__prop_cache is not None:
+            self.__prop_cache.put(prop, value)
+        return value
+
+    async def getprops(self) -> Dict[str, str]:
+        """Get all android system properties with a single getprop call.
+        Refreshes property cache when enabled.
+
+        :raise: AdbCommandError: When failed.
+        :return: Property name to value mapping.
+        :rtype: Dict[str, str]
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> props = await device.getprops()
+        >>> props['ro.product.model']
+        'Pixel 6'
+        """
+        cmd = []
+        cmd.append(adbcmds.SHELL)
+        cmd.append(adbcmds.GETPROP)
+        props = adbprops.parse_getprop(await self.__adb_process.check_output(cmd))
+        if self.__prop_cache is not None:
+            self.__prop_cache.update(props)
+        return props
+
+    async def enable_verity(self, enabled: bool) -> None:
+        """Enable/Disable verity.
+
+        :param bool enabled: If true enable verity, otherwise disable
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.root()
+        >>> await device.enable_verity(False)
+        >>> await device.remount()
+        """
+        cmd = []
+        cmd.append((adbcmds.ENABLE_VERITY if enabled else adbcmds.DISABLE_VERITY))
+        await self.__adb_process.check_output(cmd)
+
+    async def push(self, source: str, dest: str) -> None:
+        """Copy local files/dirs to device.
+
+        :param str source: Local path.
+        :param str dest: Remote path.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.push('dummy_file.txt', '/sdcard/Downloads/')
+        """
+        cmd = []
+        cmd.append(adbcmds.PUSH)
+        cmd.append(source)
+        cmd.append(dest)
+        await self.__adb_process.check_output(cmd)
+
+    async def pull(self, source: str, dest: Optional[str] = ".") -> None:
+        """Pull files or directories from remote device.
+
+        :param str source: Remote path.
+        :param Optional[str] dest: Local path, default is ``'.'``.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.push('dummy_file.txt', '/sdcard/Downloads/')
+        >>> await device.pull('/sdcard/Downloads/dummy_file.txt')
+        >>> await device.pull('/sdcard/Downloads/dummy_file.txt', '/tmp')
+        """
+        cmd = []
+        cmd.append(adbcmds.PULL)
+        cmd.append(source)
+        cmd.append(dest)
+        await self.__adb_process.check_output(cmd)
+
+    async def wait_for_device(self, timeout_sec: Optional[int] = None) -> None:
+        """Wait for device available.
+
+        :keyword int timeout: Timeout in sec, default 'inf'
+        :raise: AdbCommandError: When failed.
+        :raise: TimeoutExpired: When timeout.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.wait_for_device()
+        >>> await device.wait_for_device(timeout=5)
+        """
+        cmd = []
+        cmd.append(adbcmds.WAIT_FOR_DEVICE)
+        await self.__adb_process.check_output(cmd, timeout=timeout_sec)
+
+    async def dump_logcat(self, *buffers: str) -> str:
+        """Dump logcat.
+
+        :param str \\*buffers: Additional logcat buffers to dump.
+        :raise: AdbCommandError: When failed.
+        :return: Logcat output string.
+        :rtype: str
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> dumped_logcat = await device.dump_logcat()
+        >>> logcat = await device.dump_logcat('main')
+        >>> logcat = await device.clear_logcat('main', 'kernel')
+        """
+        cmd = []
+        cmd.append(adbcmds.LOGCAT)
+        if buffers:
+            for buf in buffers:
+                cmd.append("-b")
+                cmd.append(buf)
+        cmd.append("-d")
+        return await self.__adb_process.check_output(cmd)
+
+    async def clear_logcat(self, *buffers: str) -> None:
+        """Clear logcat.
+
+        :param str \\*buffers: Additional logcat buffers to clear.
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.clear_logcat()
+        >>> await device.clear_logcat('main')
+        >>> await device.clear_logcat('main', 'kernel')
+        """
+        cmd = []
+        cmd.append(adbcmds.LOGCAT)
+
+        if buffers:
+            for buf in buffers:
+                cmd.append("-b")
+                cmd.append(buf)
+        cmd.append("-c")
+        await self.__adb_process.check_output(cmd)
+
+    async def stream_logcat(  # pylint: disable=too-many-arguments
+        self,
+        *buffers: str,
+        tags: Optional[Iterable[str]] = None,
+        level: Optional[str] = None,
+        pid: Optional[int] = None,
+        dump: bool = False,
+        binary: bool = False,
+    ) -> AsyncIterator[Union[adblogcat.LogcatEntry, adblogcat.LogcatRecord]]:
+        """Follow logcat and yield parsed messages as they arrive. Logcat is
+        read only as fast as messages are consumed. Closing the iterator
+        stops logcat.
+
+        :param str \\*buffers: Logcat buffers.
+        :param Optional[Iterable[str]] tags: Show only messages with given
+            tags.
+        :param Optional[str] level: Show only messages with at least given
+            priority, one of V, D, I, W, E, F.
+        :param Optional[int] pid: Show only messages of given process.
+        :param bool dump: Stop at the end of the buffers instead of following.
+        :param bool binary: Request binary format and decode it into
+            :class:`LogcatRecord`, cheaper than parsing text for many devices.
+        :raise: AdbCommandError: When failed.
+        :return: Asynchronous iterator of parsed messages.
+        :rtype: AsyncIterator[Union[LogcatEntry, LogcatRecord]]
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> async for entry in device.stream_logcat(tags=['ActivityManager']):
+        ...     print(entry.pid, entry.level, entry.message)
+        """
+        cmd = adblogcat.create_args(buffers, tags, level, pid, dump, binary)
+        stream = await self.__adb_process.open(cmd)
+        try:
+            if binary:
+                accept = adblogcat.create_filter(tags, level)
+                async for record in adblogcat.async_read_records(stream, accept):
+                    yield record
+            else:
+                async for entry in adblogcat.async_read_entries(stream):
+                    yield entry
+        finally:
+            await stream.close()
+
+    async def usb(self) -> None:
+        """Restart adb server listening on USB.
+
+        :raise: AdbCommandError: When failed.
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.usb()
+        """
+        cmd = []
+        cmd.append(adbcmds.USB)
+        await self.__adb_process.check_output(cmd)
+
+    async def tcpip(self, port: Union[int, str]) -> None:
+        """Restart adb server listening on TCP on PORT.
+
+        :param Union[[int, str] port: Port.
+        :raise: AdbCommandError: When failed.
+        :return: 0 if success, otherwise error code.
+        :rtype: int
+
+        :example:
+
+        >>> import simpleadb
+        >>> device = simpleadb.AsyncAdbDevice('emulator-5554')
+        >>> await device.tcpip(5555)
+        """
+        cmd = []
+        cmd.append(adbcmds.TCPIP)
+        cmd.append(str(port))
+        await self.__adb_process.check_output(cmd)
@@ -0,0 +1,530 @@
+#
+# file asyncadbprocess.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Interface for adb process running on asyncio event loop"""
+
+import abc
+import asyncio
+import subprocess
+from asyncio.subprocess import Process
+from subprocess import CalledProcessError, TimeoutExpired
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from . import adbcmds
+from . import adbmetrics
+from . import adbsocket
+from .adbprocess import AdbCommandError, AdbCommandTimeoutExpired
+from .adbprocess import Result, check_connect_output
+
+
+class AsyncAdbStream:
+    """AsyncAdbStream is the binary output of a running adb command read
+    from asyncio code, counterpart of :class:`simpleadb.adbprocess.AdbStream`.
+    Closing the stream stops the command.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param asyncio.StreamReader reader: Command output.
+    """
+
+    def __init__(self, device_id: str, reader: asyncio.StreamReader):
+        self.device_id = device_id
+        self.reader = reader
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            line = await self.readline()
+            if not line:
+                return
+            yield line
+
+    async def read(self, size: int = -1) -> bytes:
+        """Read size bytes, less only at the end of output.
+
+        :param int size: Number of bytes, -1 reads until the end of output.
+        :raise: AdbCommandError: When command failed.
+        :return: Received data.
+        :rtype: bytes
+        """
+        if size < 0:
+            data = await self.reader.read()
+            await self.finish()
+            return data
+        try:
+            return await self.reader.readexactly(size)
+        except asyncio.IncompleteReadError as err:
+            await self.finish()
+            return err.partial
+
+    async def readline(self) -> bytes:
+        """Read single line.
+
+        :raise: AdbCommandError: When command failed.
+        :return: Line including line separator, empty at the end of output.
+        :rtype: bytes
+        """
+        line = await self.reader.readline()
+        if not line:
+            await self.finish()
+        return line
+
+    async def finish(self) -> None:
+        """Called at the end of output, check command status.
+
+        :raise: AdbCommandError: When command failed.
+        """
+
+    async def close(self) -> None:
+        """Stop the command and release its resources."""
+        self.closed = True
+
+
+class AsyncAdbProcessStream(AsyncAdbStream):
+    """AsyncAdbProcessStream is the output of adb client subprocess.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param List[str] cmd: Process argv.
+    :param asyncio.subprocess.Process process: Adb process with stdout and
+        stderr pipes.
+    """
+
+    def __init__(self, device_id: str, cmd: List[str], process: Process):
+        super().__init__(device_id, process.stdout)
+        self.cmd = cmd
+        self.process = process
+
+    async def finish(self) -> None:
+        if self.closed:
+            return
+        returncode = await self.process.wait()
+        if returncode != 0:
+            output = (await self.process.stderr.read()).decode(errors="replace")
+            err = CalledProcessError(returncode, self.cmd, output)
+            raise AdbCommandError(self.device_id, output, err)
+
+    async def close(self) -> None:
+        await super().close()
+        if self.process.returncode is None:
+            self.process.kill()
+        await self.process.wait()
+
+
+class AsyncAdbSocketStream(AsyncAdbStream):
+    """AsyncAdbSocketStream is the output of device local service read from
+    adb server connection.
+
+    :param str device_id: Device ID used in raised exceptions.
+    :param asyncio.StreamReader reader: Connection reader.
+    :param asyncio.StreamWriter writer: Connection writer.
+    """
+
+    def __init__(
+        self,
+        device_id: str,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ):
+        super().__init__(device_id, reader)
+        self.writer = writer
+
+    async def close(self) -> None:
+        await super().close()
+        self.writer.close()
+
+
+class AsyncAdbTransport(abc.ABC):
+    """AsyncAdbTransport is a base class for the ways adb commands are
+    delivered to the adb server from asyncio code.
+    """
+
+    @abc.abstractmethod
+    async def check_output(
+        self,
+        device_id: Optional[str],
+        adb_path: str,
+        args: List[str],
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Run adb command.
+
+        :param Optional[str] device_id: Device ID, None for server commands.
+        :param str adb_path: Adb binary path.
+        :param List[str] args: Adb command line arguments.
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Command output.
+        :rtype: str
+        """
+
+    @abc.abstractmethod
+    async def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AsyncAdbStream:
+        """Start adb command and return its output as a stream.
+
+        :param Optional[str] device_id: Device ID, None for server commands.
+        :param str adb_path: Adb binary path.
+        :param List[str] args: Adb command line arguments.
+        :raise: AdbCommandError: When failed.
+        :return: Command output stream.
+        :rtype: AsyncAdbStream
+        """
+
+
+class AsyncAdbSubprocessTransport(AsyncAdbTransport):
+    """AsyncAdbSubprocessTransport runs every command as adb client subprocess
+    created with ``asyncio.create_subprocess_exec``. The subprocess is killed
+    when the command times out or the task is cancelled.
+    """
+
+    @staticmethod
+    def create_args(
+        device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> List[str]:
+        """Create adb process argv.
+
+        :param Optional[str] device_id: Device ID.
+        :param str adb_path: Adb binary path.
+        :param List[str] args: Adb command line arguments.
+        :return: Process argv.
+        :rtype: List[str]
+        """
+        cmd = [adb_path]
+        if device_id is not None:
+            cmd += ["-s", device_id]
+        cmd += [arg for arg in args if arg]
+        return cmd
+
+    async def check_output(
+        self,
+        device_id: Optional[str],
+        adb_path: str,
+        args: List[str],
+        timeout: Optional[float] = None,
+    ) -> str:
+        cmd = self.create_args(device_id, adb_path, args)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError as err:
+            expired = TimeoutExpired(cmd, timeout)
+            raise AdbCommandTimeoutExpired(device_id or "", expired) from err
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+        output = stdout.decode(errors="replace").replace("\r\n", "\n")
+        if proc.returncode != 0:
+            err = CalledProcessError(proc.returncode, cmd, output)
+            raise AdbCommandError(device_id or "", "", err)
+        return output.rstrip("\n\r")
+
+    async def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AsyncAdbStream:
+        cmd = self.create_args(device_id, adb_path, args)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        return AsyncAdbProcessStream(device_id or "", cmd, process)
+
+
+async def read_status(reader: asyncio.StreamReader, device_id: str) -> None:
+    """Read OKAY or FAIL status from adb server.
+
+    :param asyncio.StreamReader reader: Connection reader.
+    :param str device_id: Device ID used in raised exceptions.
+    :raise: AdbCommandError: When adb server replied FAIL or invalid data.
+    """
+    status = await read_exactly(reader, 4, device_id)
+    if status == adbsocket.OKAY:
+        return
+    if status == adbsocket.FAIL:
+        raise AdbCommandError(device_id, await read_string(reader, device_id))
+    raise AdbCommandError(device_id, f"invalid adb status {status!r}")
+
+
+async def read_exactly(
+    reader: asyncio.StreamReader, size: int, device_id: str
+) -> bytes:
+    """Read exactly size bytes from adb server.
+
+    :param asyncio.StreamReader reader: Connection reader.
+    :param int size: Number of bytes.
+    :param str device_id: Device ID used in raised exceptions.
+    :raise: AdbCommandError: When connection closed prematurely.
+    :return: Received data.
+    :rtype: bytes
+    """
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as err:
+        raise AdbCommandError(device_id, "adb connection closed") from err
+
+
+async def read_string(reader: asyncio.StreamReader, device_id: str) -> str:
+    """Read hex-length prefixed string from adb server.
+
+    :param asyncio.StreamReader reader: Connection reader.
+    :param str device_id: Device ID used in raised exceptions.
+    :return: Decoded string.
+    :rtype: str
+    """
+    size = int(await read_exactly(reader, 4, device_id), 16)
+    return (await read_exactly(reader, size, device_id)).decode(errors="replace")
+
+
+class AsyncAdbSocketTransport(AsyncAdbTransport):
+    """AsyncAdbSocketTransport talks to adb server over asyncio streams using
+    adb smart-socket protocol. Commands without native equivalent fall back
+    to :class:`AsyncAdbSubprocessTransport`.
+
+    :param Optional[str] host: Adb server host, default 127.0.0.1.
+    :param Optional[int] port: Adb server port, default 5037.
+    :param bool fallback: Use adb subprocess for unsupported commands or when
+        adb server is not running.
+
+    :example:
+
+    >>> import simpleadb
+    >>> transport = simpleadb.AsyncAdbSocketTransport()
+    >>> device = simpleadb.AsyncAdbDevice('emulator-5554', transport=transport)
+    >>> await device.get_state()
+    'device'
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        fallback: bool = True,
+    ):
+        self.host = host if host else adbsocket.DEFAULT_HOST
+        self.port = port if port else adbsocket.get_server_port()
+        self.fallback = AsyncAdbSubprocessTransport() if fallback else None
+
+    async def request(
+        self, device_id: Optional[str], service: str, local: bool = False
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Open connection and request service.
+
+        :param Optional[str] device_id: Device ID.
+        :param str service: Service name.
+        :param bool local: Device local service, host service otherwise.
+        :raise: AdbCommandError: When adb server replied FAIL.
+        :return: Connection reader and writer.
+        :rtype: Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+        """
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        requests = [service]
+        if local:
+            transport = "transport:" + device_id if device_id else "transport-any"
+            requests.insert(0, "host:" + transport)
+        try:
+            for request in requests:
+                writer.write(adbsocket.encode_request(request))
+                await read_status(reader, device_id or "")
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def execute(
+        self, device_id: Optional[str], args: List[str], kind: str, service: str
+    ) -> str:
+        """Execute translated adb command.
+
+        :param Optional[str] device_id: Device ID.
+        :param List[str] args: Adb command line arguments.
+        :param str kind: Request kind, see :func:`adbsocket.translate`.
+        :param str service: Service name.
+        :return: Command output.
+        :rtype: str
+        """
+        local = kind in (adbsocket.LOCAL, adbsocket.SHELL)
+        reader, writer = await self.request(device_id, service, local)
+        try:
+            output = ""
+            if kind == adbsocket.QUERY:
+                output = await read_string(reader, device_id or "")
+            elif kind == adbsocket.WAIT:
+                await read_status(reader, device_id or "")
+            elif kind == adbsocket.SHELL:
+                raw = await reader.read()
+                output = adbsocket.parse_shell_output(device_id, args, raw)
+            elif kind == adbsocket.LOCAL:
+                output = (await reader.read()).decode(errors="replace")
+        finally:
+            writer.close()
+        return adbsocket.finish_output(device_id, args, output)
+
+    async def check_output(
+        self,
+        device_id: Optional[str],
+        adb_path: str,
+        args: List[str],
+        timeout: Optional[float] = None,
+    ) -> str:
+        cmd_args = [arg for arg in args if arg]
+        try:
+            kind, service = adbsocket.translate(device_id, cmd_args)
+            return await asyncio.wait_for(
+                self.execute(device_id, cmd_args, kind, service), timeout
+            )
+        except (adbsocket.UnsupportedCommand, ConnectionRefusedError) as err:
+            if self.fallback is None:
+                raise AdbCommandError(device_id or "", str(err)) from err
+            return await self.fallback.check_output(device_id, adb_path, args, timeout)
+        except asyncio.TimeoutError as err:
+            expired = TimeoutExpired(" ".join(cmd_args), timeout)
+            raise AdbCommandTimeoutExpired(device_id or "", expired) from err
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+
+    async def open(
+        self, device_id: Optional[str], adb_path: str, args: List[str]
+    ) -> AsyncAdbStream:
+        cmd_args = [arg for arg in args if arg]
+        try:
+            service = adbsocket.stream_service(cmd_args)
+            local = not service.startswith("host:")
+            reader, writer = await self.request(device_id, service, local)
+        except (adbsocket.UnsupportedCommand, ConnectionRefusedError) as err:
+            if self.fallback is None:
+                raise AdbCommandError(device_id or "", str(err)) from err
+            return await self.fallback.open(device_id, adb_path, args)
+        except OSError as err:
+            raise AdbCommandError(device_id or "", str(err)) from err
+        return AsyncAdbSocketStream(device_id or "", reader, writer)
+
+
+async def instrument(
+    device_id: Optional[str],
+    args: List[str],
+    call: Awaitable[Result],
+    size: Optional[Callable[[Result], int]] = None,
+) -> Result:
+    """Await adb command with enabled :mod:`simpleadb.adbmetrics` hooks, see
+    :func:`simpleadb.adbprocess.instrument`.
+
+    :param Optional[str] device_id: Device ID.
+    :param List[str] args: Adb command line arguments, identify command.
+    :param Awaitable call: Runs the command.
+    :param Optional[Callable] size: Gets number of transferred bytes from
+        command result.
+    :return: Command result.
+    """
+    event = adbmetrics.start(device_id, args)
+    try:
+        result = await call
+    except BaseException as err:
+        timed_out = isinstance(err, AdbCommandTimeoutExpired)
+        adbmetrics.finish(event, err, timeout=timed_out)
+        raise
+    adbmetrics.finish(event, nbytes=size(result) if size is not None else None)
+    return result
+
+
+class AsyncAdbProcess:
+    """AsyncAdbProcess this class is used to call adb commands from asyncio
+    code.
+
+    :param Optional[str] device_id: Device ID, used when called adb command on
+        device.
+    :param Optional[str] adb_path: adb path, default: 'adb'
+    :param Optional[AsyncAdbTransport] transport: Transport used to deliver
+        commands, default :class:`AsyncAdbSubprocessTransport`.
+    :param bool connect: Run 'adb connect device_id' before the first
+        command.
+    """
+
+    def __init__(
+        self,
+        device_id: Optional[str] = None,
+        adb_path: Optional[str] = adbcmds.ADB,
+        transport: Optional[AsyncAdbTransport] = None,
+        connect: bool = False,
+    ):
+        self.device_id = device_id
+        self.adb_path = adb_path
+        self.transport = transport if transport else AsyncAdbSubprocessTransport()
+        self.connect_pending = connect
+        self.connect_lock: Optional[asyncio.Lock] = None
+
+    async def ensure_connected(self, timeout: Optional[float] = None) -> None:
+        """Run pending 'adb connect device_id' once. Concurrent callers wait
+        for the first one, failed connect is retried by the next command.
+
+        :param Optional[float] timeout: Timeout in sec.
+        :raise: AdbCommandError: When failed.
+        """
+        if not self.connect_pending:
+            return
+        if self.connect_lock is None:
+            self.connect_lock = asyncio.Lock()
+        async with self.connect_lock:
+            if self.connect_pending:
+                output = await self.transport.check_output(
+                    None, self.adb_path, [adbcmds.CONNECT, self.device_id], timeout
+                )
+                check_connect_output(self.device_id, output)
+                self.connect_pending = False
+
+    async def check_output(self, args: List[str], **kwargs) -> str:
+        """Call adb command using the process transport.
+
+        :param List[str] args: Arguments.
+        :keyword float timeout: Timeout in sec.
+        :raise: AdbCommandError: When failed.
+        :raise: AdbCommandTimeoutExpired: When timeout expired.
+        :return: Process output.
+        """
+        timeout = kwargs.get("timeout")
+        await self.ensure_connected(timeout)
+        if not adbmetrics.HOOKS:
+            return await self.transport.check_output(
+                self.device_id, self.adb_path, args, timeout
+            )
+        return await instrument(
+            self.device_id,
+            args,
+            self.transport.check_output(self.device_id, self.adb_path, args, timeout),
+            len,
+        )
+
+    async def open(self, args: List[str]) -> AsyncAdbStream:
+        """Start adb command using the process transport and return its output
+        as a stream.
+
+        :param List[str] args: Arguments.
+        :raise: AdbCommandError: When failed.
+        :return: Command output stream.
+        :rtype: AsyncAdbStream
+        """
+        await self.ensure_connected()
+        if not adbmetrics.HOOKS:
+            return await self.transport.open(self.device_id, self.adb_path, args)
+        return await instrument(
+            self.device_id,
+            args,
+            self.transport.open(self.device_id, self.adb_path, args),
+        )
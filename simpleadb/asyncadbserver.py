@@ -0,0 +1,294 @@
+# pylint: disable=duplicate-code
+#
+# file asyncadbserver.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""This module includes AsyncAdbServer class, asyncio counterpart of
+AdbServer."""
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, Union
+from . import adbcmds
+from . import adbfleet
+from . import adbtrack
+from . import asyncadbdevice
+from .adbprocess import (
+    AdbCommandError,
+    AdbCommandTimeoutExpired,
+    check_connect_output,
+)
+from .asyncadbprocess import AsyncAdbProcess
+
+
+class AsyncAdbServer:
+    """AsyncAdbServer is an asyncio representation of adb server operations.
+    It mirrors :class:`simpleadb.AdbServer`, every command is a coroutine.
+    Unlike AdbServer the constructor does not start the server, await
+    :meth:`start` instead.
+
+    :keyword str path: Adb binary path.
+    :keyword AsyncAdbTransport transport: Transport used to deliver commands,
+        default adb subprocess.
+    :keyword int max_per_device: Maximum number of fleet operations running
+        at once on a single device, default 1.
+
+    :Example:
+
+    >>> import simpleadb
+    >>> adb_server = simpleadb.AsyncAdbServer()
+    >>> adb_server = simpleadb.AsyncAdbServer(path='/usr/bin/adb')
+    >>> await adb_server.start()
+    """
+
+    def __init__(self, **kwargs):
+        options_path = kwargs.get("path")
+        adb_path = options_path if options_path else adbcmds.ADB
+        self.__transport = kwargs.get("transport")
+        self.__adb_process = AsyncAdbProcess(None, adb_path, self.__transport)
+        self.__limiter = adbfleet.DeviceLimiter(kwargs.get("max_per_device", 1))
+        self.__registry = adbtrack.DeviceRegistry()
+        self.__handles: Dict[str, asyncadbdevice.AsyncAdbDevice] = {}
+
+    @property
+    def registry(self) -> adbtrack.DeviceRegistry:
+        """Device registry updated by :meth:`devices` and
+        :meth:`track_devices`."""
+        return self.__registry
+
+    async def devices(
+        self, state: Optional[str] = None
+    ) -> List[asyncadbdevice.AsyncAdbDevice]:
+        """Get list connected adb devices. Device objects are kept by the
+        server and reused by later calls, see
+        :meth:`simpleadb.AdbServer.devices`.
+
+        :param Optional[str] state: Return only devices in given state, e.g.
+            'device', all devices when None.
+        :raise: AdbCommandError: When failed.
+        :return: List of connected devices sorted by serial number.
+        :rtype: List[AsyncAdbDevice]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> await adb_server.devices()
+        ['emulator-5554']
+        >>> await adb_server.devices(state='device')
+        ['emulator-5554']
+        """
+        cmd = []
+        cmd.append(adbcmds.DEVICES)
+        cmd.append("-l")
+        output = await self.__adb_process.check_output(cmd)
+        self.__registry.update(adbtrack.parse_device_list(output))
+        adb_path = self.__adb_process.adb_path
+        handles = {}
+        for info in self.__registry.devices():
+            handle = self.__handles.get(info.serial)
+            if handle is None:
+                handle = asyncadbdevice.AsyncAdbDevice(
+                    info.serial, path=adb_path, transport=self.__transport
+                )
+            handles[info.serial] = handle
+        self.__handles = handles
+        return [handles[info.serial] for info in self.__registry.devices(state)]
+
+    async def track_devices(self) -> AsyncIterator[adbtrack.DeviceEvent]:
+        """Track devices with adb server track-devices service instead of
+        polling the device list, see :meth:`simpleadb.AdbServer.track_devices`.
+
+        :raise: AdbCommandError: When failed.
+        :return: Asynchronous iterator of events, ends when adb server closes
+            connection.
+        :rtype: AsyncIterator[DeviceEvent]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> async for event in adb_server.track_devices():
+        ...     print(event.kind, event.serial, event.device.state)
+        connected emulator-5554 device
+        """
+        cmd = []
+        cmd.append(adbcmds.TRACK_DEVICES)
+        cmd.append("-l")
+        stream = await self.__adb_process.open(cmd)
+        try:
+            async for event in adbtrack.async_track(stream, self.__registry):
+                yield event
+        finally:
+            await stream.close()
+
+    async def map(  # pylint: disable=too-many-arguments
+        self,
+        fn: Union[str, Callable],
+        devices: Optional[List[asyncadbdevice.AsyncAdbDevice]] = None,
+        max_workers: Optional[int] = None,
+        args: Sequence = (),
+        kwargs: Optional[Dict] = None,
+    ) -> AsyncIterator[adbfleet.DeviceResult]:
+        """Run operation on many devices concurrently and yield per device
+        results as they complete. Operations on the same device issued by
+        concurrent map calls are limited to ``max_per_device``, serialized by
+        default.
+
+        :param Union[str, Callable] fn: AsyncAdbDevice method name or callable
+            taking device as first argument, may return awaitable.
+        :param Optional[List[AsyncAdbDevice]] devices: Devices, default all
+            connected devices.
+        :param Optional[int] max_workers: Maximum number of operations running
+            at once, default 32.
+        :param Sequence args: Additional positional arguments.
+        :param Optional[Dict] kwargs: Additional keyword arguments.
+        :raise: AdbCommandError: When listing devices failed.
+        :return: Asynchronous iterator of results, exceptions are stored in
+            results.
+        :rtype: AsyncIterator[DeviceResult]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> async for result in adb_server.map('reboot'):
+        ...     print(result.device, result.ok, result.elapsed)
+        emulator-5554 True 0.1
+        """
+        devices = devices if devices is not None else await self.devices()
+        func = adbfleet.resolve(fn, args, kwargs)
+        async for result in adbfleet.async_run_on_devices(
+            func, devices, max_workers, self.__limiter
+        ):
+            yield result
+
+    async def connect(self, address, port: Optional[Union[int, str]] = 5555) -> None:
+        """Connect a device via TCP/IP.
+
+        :param str address: Host address.
+        :param port (Optional[Union[int,str]]): Port, default 5555.
+        :raise: AdbCommandError: When failed.
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> await adb_server.connect('192.168.42.42', 5555)
+        """
+        cmd = []
+        cmd.append(adbcmds.CONNECT)
+        cmd.append(f"{address}:{port}")
+        await self.__adb_process.check_output(cmd)
+
+    async def connect_many(  # pylint: disable=too-many-arguments
+        self,
+        addresses: Sequence[str],
+        timeout: Optional[float] = 5.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_workers: Optional[int] = None,
+    ) -> List[adbfleet.DeviceResult]:
+        """Connect many devices via TCP/IP concurrently, see
+        :meth:`simpleadb.AdbServer.connect_many`.
+
+        :param Sequence[str] addresses: Device addresses, e.g.
+            '192.168.42.42:5555'.
+        :param Optional[float] timeout: Timeout of single attempt in sec.
+        :param int retries: Number of retries after failed attempt.
+        :param float backoff: Delay before the first retry in sec, doubled
+            after every retry.
+        :param Optional[int] max_workers: Maximum number of connections made
+            at once, default 32.
+        :return: Results in order of addresses, value is adb connect output.
+        :rtype: List[DeviceResult]
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> results = await adb_server.connect_many(['192.168.42.42:5555'])
+        >>> [result.device for result in results if not result.ok]
+        []
+        """
+
+        async def connect(address: str) -> str:
+            delay = backoff
+            for attempt in range(retries + 1):
+                try:
+                    cmd = []
+                    cmd.append(adbcmds.CONNECT)
+                    cmd.append(address)
+                    output = await self.__adb_process.check_output(cmd, timeout=timeout)
+                    check_connect_output(address, output)
+                    return output
+                except (AdbCommandError, AdbCommandTimeoutExpired):
+                    if attempt == retries:
+                        raise
+                await asyncio.sleep(delay)
+                delay *= 2
+            raise AdbCommandError(address, "not connected")
+
+        results = {}
+        async for result in adbfleet.async_run_on_devices(
+            connect, addresses, max_workers, self.__limiter
+        ):
+            results[result.device] = result
+        return [results[address] for address in addresses]
+
+    async def disconnect(self, address, port: Optional[Union[int, str]] = None) -> None:
+        """Disconnect from given TCP/IP device.
+
+        :param address str: Host address.
+        :param (Optional[Union[int, str] port]): Port.
+        :raise: AdbCommandError: When failed.
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> await adb_server.connect('192.168.42.42', 5555)
+        >>> await adb_server.disconnect('192.168.42.42')
+        """
+        cmd = []
+        cmd.append(adbcmds.DISCONNECT)
+        cmd.append(address + f":{port}" if port is not None else address)
+        await self.__adb_process.check_output(cmd)
+
+    async def start(self, port: Optional[Union[int, str]] = None) -> None:
+        """Start adb and ensure that there is running.
+
+        :param (Optional[Union[int, str] port]): Port, default adb server port.
+        :raise: AdbCommandError: When failed.
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> await adb_server.start()
+        >>> await adb_server.start(5037)
+        """
+        cmd = []
+        if port is not None:
+            cmd.append("-P")
+            cmd.append(str(port))
+        cmd.append(adbcmds.START_SERVER)
+        await self.__adb_process.check_output(cmd)
+
+    async def kill(self) -> None:
+        """Kill the server if it is running.
+
+        :raise: AdbCommandError: When failed.
+
+        :Example:
+
+        >>> import simpleadb
+        >>> adb_server = simpleadb.AsyncAdbServer()
+        >>> await adb_server.kill()
+        """
+        cmd = []
+        cmd.append(adbcmds.KILL_SERVER)
+        await self.__adb_process.check_output(cmd)
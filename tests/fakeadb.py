@@ -0,0 +1,581 @@
+#
+# file fakeadb.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Fake adb server implementing adb smart-socket wire framing for tests.
+
+Device shell services are executed by the local ``/bin/sh``, so the host
+filesystem acts as the fake device filesystem.
+"""
+
+import itertools
+import os
+import socket
+import socketserver
+import stat
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+import unittest
+from typing import Callable, Dict, List, Optional, Union
+import simpleadb
+
+LOCAL_SERVICES = (
+    "root",
+    "unroot",
+    "remount",
+    "reboot",
+    "usb",
+    "tcpip",
+    "enable-verity",
+    "disable-verity",
+)
+
+
+def encode_string(data: bytes) -> bytes:
+    """Encode hex-length prefixed string.
+
+    :param bytes data: Payload.
+    :return: Framed payload.
+    :rtype: bytes
+    """
+    return f"{len(data):04x}".encode() + data
+
+
+def create_stub_adb(directory: str, script: str, name: str = "adb") -> str:
+    """Create stub adb executable, or other command, running given shell
+    script."""
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as stub:
+        stub.write("#!/bin/sh\n" + script + "\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+
+class ThrottledSocket:
+    """Socket sending and receiving at most bandwidth bytes per sec."""
+
+    def __init__(self, sock: socket.socket, bandwidth: float):
+        self.sock = sock
+        self.bandwidth = bandwidth
+        self.due = 0.0
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        return getattr(self.sock, name)
+
+    def throttle(self, size: int) -> None:
+        """Sleep until size more bytes fit into the bandwidth, idle time
+        does not add up to bursts."""
+        with self.lock:
+            self.due = max(self.due, time.perf_counter()) + size / self.bandwidth
+            due = self.due
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def sendall(self, data: bytes) -> None:
+        """Send data at limited rate."""
+        self.sock.sendall(data)
+        self.throttle(len(data))
+
+    def recv(self, size: int) -> bytes:
+        """Receive data at limited rate."""
+        data = self.sock.recv(size)
+        self.throttle(len(data))
+        return data
+
+
+class FakeAdbHandler(socketserver.BaseRequestHandler):
+    """Handle single adb server connection."""
+
+    server: "FakeAdbTCPServer"
+
+    def setup(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.server.fake.bandwidth:
+            self.request = ThrottledSocket(self.request, self.server.fake.bandwidth)
+
+    def read_exactly(self, size: int) -> bytes:
+        """Read exactly size bytes, empty bytes on EOF."""
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                return b""
+            data += chunk
+        return data
+
+    def read_request(self) -> Optional[str]:
+        """Read hex-length framed request."""
+        header = self.read_exactly(4)
+        if not header:
+            return None
+        return self.read_exactly(int(header, 16)).decode()
+
+    def okay(self, payload: Optional[str] = None) -> None:
+        """Send OKAY with optional length-prefixed payload."""
+        data = b"OKAY"
+        if payload is not None:
+            data += encode_string(payload.encode())
+        self.request.sendall(data)
+
+    def fail(self, message: str) -> None:
+        """Send FAIL with message."""
+        self.request.sendall(b"FAIL" + encode_string(message.encode()))
+
+    def handle(self):
+        fake = self.server.fake
+        serial = None
+        while True:
+            service = self.read_request()
+            if service is None:
+                return
+            fake.requests.append(service)
+            if fake.latency:
+                time.sleep(fake.latency)
+            if serial is not None:
+                self.handle_local(serial, service)
+                return
+            if service.startswith("host:transport"):
+                serial = self.select_transport(service)
+                if serial is None:
+                    return
+                continue
+            self.handle_host(service)
+            return
+
+    def select_transport(self, service: str) -> Optional[str]:
+        """Handle host:transport request, return selected serial."""
+        fake = self.server.fake
+        if service == "host:transport-any":
+            online = [s for s, state in fake.devices.items() if state == "device"]
+            if len(online) != 1:
+                self.fail("more than one device/emulator")
+                return None
+            self.okay()
+            return online[0]
+        serial = service[len("host:transport:") :]
+        if fake.devices.get(serial) != "device":
+            self.fail(f"device '{serial}' not found")
+            return None
+        self.okay()
+        return serial
+
+    def handle_host(self, service: str) -> None:  # pylint: disable=too-many-branches
+        """Handle host service request."""
+        fake = self.server.fake
+        if service.startswith("host-serial:"):
+            serial, _, query = service[len("host-serial:") :].rpartition(":")
+        else:
+            serial, query = None, service[len("host:") :]
+        if serial is not None and serial not in fake.devices:
+            self.fail(f"device '{serial}' not found")
+        elif query == "version":
+            self.okay("0029")
+        elif query == "devices":
+            self.okay(fake.device_list(False))
+        elif query == "devices-l":
+            self.okay(fake.device_list(True))
+        elif query in ("track-devices", "track-devices-l"):
+            self.okay()
+            self.handle_track(query.endswith("-l"))
+        elif query == "features":
+            self.okay(fake.features)
+        elif query == "get-state":
+            self.okay(fake.devices[serial])
+        elif query in ("get-serialno", "get-devpath"):
+            self.okay(serial)
+        elif query.startswith("connect:"):
+            self.handle_connect(query[len("connect:") :])
+        elif query.startswith("disconnect:"):
+            fake.devices.pop(query[len("disconnect:") :], None)
+            self.okay("disconnected")
+        elif query == "wait-for-any-device":
+            self.okay()
+            self.okay()
+        elif query == "kill":
+            self.okay()
+        else:
+            self.fail(f"unknown host service {query}")
+
+    def handle_install(self, serial: str, args: List[str]) -> None:
+        """Handle streamed install and install session commands."""
+        fake = self.server.fake
+        command = args[2]
+        size = int(args[args.index("-S") + 1]) if "-S" in args else 0
+        data = b""
+        if command in ("install", "install-write"):
+            data = self.read_exactly(size)
+        if command == "install":
+            fake.installs[serial] = [data]
+            output = "Success"
+        elif command == "install-create":
+            session_id = next(fake.transport_counter) + 1000
+            fake.sessions[session_id] = []
+            output = f"Success: created install session [{session_id}]"
+        elif command == "install-write":
+            fake.sessions[int(args[-3])].append(data)
+            output = f"Success: streamed {size} bytes"
+        else:
+            fake.installs[serial] = fake.sessions.pop(int(args[-1]))
+            output = "Success"
+        self.request.sendall(output.encode() + b"\n")
+
+    def handle_connect(self, address: str) -> None:
+        """Add device, unless it should fail given number of times."""
+        fake = self.server.fake
+        if fake.connect_failures.get(address, 0) > 0:
+            fake.connect_failures[address] -= 1
+            self.okay(f"failed to connect to '{address}': Connection refused")
+        else:
+            fake.devices[address] = "device"
+            self.okay(f"connected to {address}")
+
+    def handle_track(self, long: bool) -> None:
+        """Send device list on every change until the server stops."""
+        fake = self.server.fake
+        sent = None
+        while not fake.stopped.is_set():
+            devices = fake.device_list(long)
+            if devices != sent:
+                try:
+                    self.request.sendall(encode_string(devices.encode()))
+                except OSError:
+                    return
+                sent = devices
+            fake.stopped.wait(0.01)
+
+    def handle_local(self, serial: str, service: str) -> None:
+        """Handle device local service request."""
+        fake = self.server.fake
+        name, _, arg = service.partition(":")
+        if name == "shell,v2,raw" or (name, arg) == ("exec", "sh"):
+            self.okay()
+            self.handle_interactive(
+                serial, name != "exec", arg if name != "exec" else ""
+            )
+        elif name == "exec" and arg.startswith("cmd package install"):
+            self.okay()
+            self.handle_install(serial, arg.split())
+        elif name in ("shell", "exec"):
+            self.okay()
+            self.request.sendall(fake.run_shell(serial, arg))
+        elif name == "sync":
+            self.okay()
+            self.handle_sync()
+        elif name in fake.local_outputs or name in LOCAL_SERVICES:
+            self.okay()
+            output = fake.local_outputs.get(name, "")
+            if callable(output):
+                output = output()
+            self.request.sendall(output.encode())
+        else:
+            self.fail(f"unknown local service {name}")
+
+    def handle_interactive(self, serial: str, v2: bool, command: str = "") -> None:
+        """Run local shell reading commands from the connection, or given
+        command, with shell protocol v2 packets or raw stream."""
+        # pylint: disable-next=consider-using-with
+        process = subprocess.Popen(
+            ["/bin/sh", "-c", command] if command else ["/bin/sh"],
+            env=dict(self.server.fake.env, ANDROID_SERIAL=serial),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if v2 else subprocess.STDOUT,
+        )
+        lock = threading.Lock()
+
+        def forward(pipe, ident: int) -> None:
+            while True:
+                chunk = os.read(pipe.fileno(), 65536)
+                if not chunk:
+                    return
+                if v2:
+                    chunk = struct.pack("<BI", ident, len(chunk)) + chunk
+                with lock:
+                    try:
+                        self.request.sendall(chunk)
+                    except OSError:
+                        return
+
+        pipes = [(process.stdout, 1)] + ([(process.stderr, 2)] if v2 else [])
+        forwarders = [
+            threading.Thread(target=forward, args=pipe, daemon=True) for pipe in pipes
+        ]
+
+        def finish() -> None:
+            for thread in forwarders:
+                thread.join()
+            returncode = process.wait()
+            with lock:
+                try:
+                    if v2:
+                        packet = struct.pack("<BIB", 3, 1, returncode & 0xFF)
+                        self.request.sendall(packet)
+                    self.request.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+
+        for thread in forwarders:
+            thread.start()
+        threading.Thread(target=finish, daemon=True).start()
+        try:
+            while True:
+                if v2:
+                    header = self.read_exactly(5)
+                    if not header:
+                        break
+                    ident, length = struct.unpack("<BI", header)
+                    data = self.read_exactly(length)
+                    if ident != 0:
+                        continue
+                else:
+                    data = self.request.recv(65536)
+                if not data:
+                    break
+                process.stdin.write(data)
+                process.stdin.flush()
+        except OSError:
+            pass
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            process.stdin.close()
+
+    def handle_sync(self) -> None:
+        """Handle file sync service requests on host filesystem."""
+        while True:
+            header = self.read_exactly(8)
+            if not header:
+                return
+            ident, length = struct.unpack("<4sI", header)
+            path = self.read_exactly(length).decode()
+            self.server.fake.requests.append(f"sync:{ident.decode()}:{path}")
+            if ident == b"QUIT":
+                return
+            if ident == b"STAT":
+                self.sync_stat(path)
+            elif ident == b"LIST":
+                self.sync_list(path)
+            elif ident == b"SEND":
+                self.sync_send(path)
+            elif ident == b"RECV":
+                self.sync_recv(path)
+
+    def sync_fail(self, message: str) -> None:
+        """Send sync FAIL with message."""
+        data = message.encode()
+        self.request.sendall(struct.pack("<4sI", b"FAIL", len(data)) + data)
+
+    def sync_stat(self, path: str) -> None:
+        """Reply to STAT request."""
+        try:
+            st = os.stat(path)
+            reply = (st.st_mode, st.st_size, int(st.st_mtime))
+        except OSError:
+            reply = (0, 0, 0)
+        self.request.sendall(struct.pack("<4sIII", b"STAT", *reply))
+
+    def sync_list(self, path: str) -> None:
+        """Reply to LIST request."""
+        for name in [".", ".."] + (os.listdir(path) if os.path.isdir(path) else []):
+            st = os.stat(os.path.join(path, name))
+            data = name.encode()
+            self.request.sendall(
+                struct.pack(
+                    "<4sIIII",
+                    b"DENT",
+                    st.st_mode,
+                    st.st_size,
+                    int(st.st_mtime),
+                    len(data),
+                )
+                + data
+            )
+        self.request.sendall(struct.pack("<4sIIII", b"DONE", 0, 0, 0, 0))
+
+    def sync_send(self, spec: str) -> None:
+        """Receive SEND data chunks into a file."""
+        path, _, mode = spec.rpartition(",")
+        chunks = []
+        while True:
+            ident, length = struct.unpack("<4sI", self.read_exactly(8))
+            if ident == b"DONE":
+                break
+            chunks.append(self.read_exactly(length))
+        try:
+            with open(path, "wb") as dest:
+                dest.write(b"".join(chunks))
+            os.chmod(path, int(mode) & 0o777)
+            os.utime(path, (length, length))
+        except OSError as err:
+            self.sync_fail(f"{path}: {err.strerror}")
+            return
+        self.request.sendall(struct.pack("<4sI", b"OKAY", 0))
+
+    def sync_recv(self, path: str) -> None:
+        """Send file in RECV data chunks."""
+        try:
+            source = open(path, "rb")  # pylint: disable=consider-using-with
+        except OSError as err:
+            self.sync_fail(f"{path}: {err.strerror}")
+            return
+        with source:
+            for chunk in iter(lambda: source.read(65536), b""):
+                self.request.sendall(struct.pack("<4sI", b"DATA", len(chunk)) + chunk)
+        self.request.sendall(struct.pack("<4sI", b"DONE", 0))
+
+
+class FakeAdbTCPServer(socketserver.ThreadingTCPServer):
+    """Threading TCP server bound to FakeAdbServer."""
+
+    daemon_threads = True
+    request_queue_size = 128
+    allow_reuse_address = True
+
+    def __init__(self, fake: "FakeAdbServer"):
+        super().__init__(("127.0.0.1", 0), FakeAdbHandler)
+        self.fake = fake
+
+
+class FakeAdbServer:  # pylint: disable=too-many-instance-attributes
+    """Fake adb server listening on a random local port.
+
+    :param Optional[Dict[str, str]] devices: Device serial to state mapping.
+    :param float latency: Delay of every request in sec.
+    :param Optional[float] bandwidth: Transfer rate limit of every
+        connection in bytes per sec.
+    """
+
+    def __init__(
+        self,
+        devices: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+    ):
+        self.devices = devices if devices is not None else {"fake-5554": "device"}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests: List[str] = []
+        self.local_outputs: Dict[str, Union[str, Callable[[], str]]] = {
+            "root": "restarting adbd as root\n"
+        }
+        self.features = "shell_v2,cmd,stat_v2"
+        self.transport_ids: Dict[str, int] = {}
+        self.transport_counter = itertools.count(1)
+        self.stopped = threading.Event()
+        self.connect_failures: Dict[str, int] = {}
+        self.installs: Dict[str, List[bytes]] = {}
+        self.sessions: Dict[int, List[bytes]] = {}
+        # pylint: disable-next=consider-using-with
+        self.bin_dir = tempfile.TemporaryDirectory()
+        self.env = dict(os.environ)
+        self.env["PATH"] = self.bin_dir.name + os.pathsep + self.env.get("PATH", "")
+        self.server = FakeAdbTCPServer(self)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        """Listening port."""
+        return self.server.server_address[1]
+
+    def add_command(self, name: str, script: str) -> None:
+        """Add device command available to shell services."""
+        create_stub_adb(self.bin_dir.name, script, name)
+
+    def device_list(self, long: bool) -> str:
+        """Format device list, with properties and transport IDs if long."""
+        if not long:
+            return "".join(f"{s}\t{st}\n" for s, st in list(self.devices.items()))
+        devices = dict(self.devices)
+        for serial in set(self.transport_ids) - set(devices):
+            self.transport_ids.pop(serial, None)
+        lines = []
+        for serial, state in devices.items():
+            if serial not in self.transport_ids:
+                self.transport_ids[serial] = next(self.transport_counter)
+            transport_id = self.transport_ids[serial]
+            lines.append(
+                f"{serial:22} {state} product:fake model:Fake device:fake "
+                f"transport_id:{transport_id}\n"
+            )
+        return "".join(lines)
+
+    def run_shell(self, serial: str, command: str) -> bytes:
+        """Execute device shell command with local shell."""
+        return subprocess.run(
+            ["/bin/sh", "-c", command],
+            env=dict(self.env, ANDROID_SERIAL=serial),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+        ).stdout
+
+    def wait_request(self, request: str, timeout: float = 5.0) -> bool:
+        """Wait until request is received by a server thread.
+
+        :return: False if request was not received within timeout in sec.
+        """
+        deadline = time.monotonic() + timeout
+        while request not in self.requests:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def start(self) -> None:
+        """Start serving in background thread."""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and close listening socket."""
+        self.stopped.set()
+        self.bin_dir.cleanup()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeAdbTestCase(unittest.TestCase):
+    """Test case with a fake adb server, socket transport and device started
+    for every test. Subclasses set DEVICES to serve other devices and
+    DEVICE_ID to pick the device."""
+
+    DEVICES: Optional[Dict[str, str]] = None
+    DEVICE_ID = "fake-5554"
+
+    def setUp(self):
+        self.fake = FakeAdbServer(dict(self.DEVICES) if self.DEVICES else None)
+        self.fake.start()
+        self.addCleanup(self.fake.stop)
+        self.transport = simpleadb.AdbSocketTransport(port=self.fake.port)
+        self.device = simpleadb.AdbDevice(self.DEVICE_ID, transport=self.transport)
+
+
+class AsyncFakeAdbTestCase(unittest.IsolatedAsyncioTestCase):
+    """Asyncio test case with a fake adb server, socket transport and device
+    started for every test, see :class:`FakeAdbTestCase`."""
+
+    DEVICES: Optional[Dict[str, str]] = None
+    DEVICE_ID = "fake-5554"
+
+    def setUp(self):
+        self.fake = FakeAdbServer(dict(self.DEVICES) if self.DEVICES else None)
+        self.fake.start()
+        self.addCleanup(self.fake.stop)
+        self.transport = simpleadb.AsyncAdbSocketTransport(port=self.fake.port)
+        self.device = simpleadb.AsyncAdbDevice(self.DEVICE_ID, transport=self.transport)
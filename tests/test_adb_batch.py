@@ -0,0 +1,102 @@
+#
+# file test_adb_batch.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member,duplicate-code
+"""Unit tests for batched shell commands."""
+
+import asyncio
+import simpleadb
+from .fakeadb import FakeAdbTestCase
+
+GETPROP = """cat "$(dirname "$0")/prop-$1\""""
+SETPROP = """echo "$2" > "$(dirname "$0")/prop-$1\""""
+
+
+class AdbBatchTest(FakeAdbTestCase):
+    """Batched shell commands unit tests against fake adb server."""
+
+    def shell_requests(self):
+        """Get shell service requests received by fake adb server."""
+        return [r for r in self.fake.requests if r.startswith("shell:")]
+
+    def test_commands_run_in_single_request(self):
+        """Check commands are demultiplexed from a single shell request."""
+        with self.device.batch() as batch:
+            first = batch.shell("echo first")
+            no_newline = batch.shell("printf partial")
+            multiline = batch.shell("echo a; echo b >&2")
+            quoted = batch.shell("echo '$HOME'")
+        self.assertEqual(1, len(self.shell_requests()))
+        self.assertEqual("first", first.get())
+        self.assertEqual("partial", no_newline.get())
+        self.assertEqual("a\nb", multiline.get())
+        self.assertEqual("$HOME", quoted.get())
+        self.assertTrue(all(result.ok for result in batch.results))
+
+    def test_failed_command_raises_on_exit(self):
+        """Check first failed command error is raised on context exit."""
+        with self.assertRaises(simpleadb.AdbCommandError) as ctx:
+            with self.device.batch() as batch:
+                batch.shell("true")
+                batch.shell("echo failed; exit 3")
+                last = batch.shell("echo last")
+        self.assertEqual(3, ctx.exception.called_process_error.returncode)
+        self.assertEqual("failed", str(ctx.exception))
+        self.assertEqual("last", last.get())
+
+    def test_failures_stored_without_check(self):
+        """Check command errors are stored in results when check is False."""
+        with self.device.batch(check=False) as batch:
+            failed = batch.rm("/dummy path/dummy_file")
+        self.assertFalse(failed.ok)
+        self.assertNotEqual(0, failed.returncode)
+        with self.assertRaises(simpleadb.AdbCommandError):
+            failed.get()
+
+    def test_stop_on_error_skips_remaining(self):
+        """Check commands after a failed one are not run."""
+        batch = self.device.batch(stop_on_error=True)
+        batch.shell("false")
+        skipped = batch.shell("echo skipped")
+        batch.run()
+        self.assertIsNone(skipped.returncode)
+        self.assertEqual("command not run", str(skipped.error))
+
+    def test_empty_batch_is_not_sent(self):
+        """Check empty batch does not call adb."""
+        with self.device.batch():
+            pass
+        self.assertEqual([], self.shell_requests())
+
+    def test_setprop_invalidates_cached_value(self):
+        """Check batched setprop drops the cached property value."""
+        self.fake.add_command("getprop", GETPROP)
+        self.fake.add_command("setprop", SETPROP)
+        device = simpleadb.AdbDevice(
+            "fake-5554", transport=self.transport, prop_cache_ttl=30
+        )
+        device.setprop("dummy.prop", "a")
+        self.assertEqual("a", device.getprop("dummy.prop"))
+        batch = device.batch()
+        batch.setprop("dummy.prop", "b")
+        batch.run()
+        self.assertEqual("b", device.getprop("dummy.prop"))
+
+    def test_async_batch(self):
+        """Check asyncio batch runs commands in a single request."""
+        transport = simpleadb.AsyncAdbSocketTransport(port=self.fake.port)
+        device = simpleadb.AsyncAdbDevice("fake-5554", transport=transport)
+
+        async def run():
+            async with device.batch() as batch:
+                first = batch.shell("echo 1")
+                second = batch.shell("echo 2")
+            return first.get(), second.get()
+
+        self.assertEqual(("1", "2"), asyncio.run(run()))
+        self.assertEqual(1, len(self.shell_requests()))
@@ -0,0 +1,105 @@
+#
+# file test_adb_cassette.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for adb command record and replay."""
+
+import os
+import tempfile
+import unittest
+import simpleadb
+from simpleadb import adbcassette
+from .fakeadb import FakeAdbServer
+
+LOGCAT = """01-02 03:04:05.678  100  200 I Tag: first
+01-02 03:04:05.679  100  200 E Tag: second"""
+
+
+class AdbCassetteTest(unittest.TestCase):
+    """Record against fake adb server, replay without it."""
+
+    def setUp(self):
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cassette.json.gz")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record(self) -> None:
+        """Record device commands into cassette file."""
+        with FakeAdbServer() as fake:
+            fake.add_command("getprop", "echo dummy")
+            fake.add_command("logcat", f"echo '{LOGCAT}'")
+            transport = simpleadb.AdbSocketTransport(port=fake.port, fallback=False)
+            with simpleadb.AdbRecordingTransport(self.path, transport) as recorder:
+                device = simpleadb.AdbDevice("fake-5554", transport=recorder)
+                self.assertEqual("dummy", device.getprop("dummy"))
+                self.assertEqual(2, device.run("echo x; echo y >&2; exit 2").exit_code)
+                self.assertEqual(2, len(list(device.stream_logcat(dump=True))))
+                with self.assertRaises(simpleadb.AdbCommandError):
+                    device.shell("exit 3")
+                with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+                    device.run("sleep 1", timeout=0.05)
+
+    def test_replay(self):
+        """Check recorded outcomes are replayed without adb server."""
+        self.record()
+        transport = simpleadb.AdbReplayTransport(self.path)
+        device = simpleadb.AdbDevice("fake-5554", transport=transport)
+        self.assertEqual("dummy", device.getprop("dummy"))
+        result = device.run("echo x; echo y >&2; exit 2")
+        self.assertEqual(
+            (b"x\n", b"y\n", 2), (result.stdout, result.stderr, result.exit_code)
+        )
+        entries = list(device.stream_logcat(dump=True))
+        self.assertEqual(["first", "second"], [entry.message for entry in entries])
+        with self.assertRaises(simpleadb.AdbCommandError):
+            device.shell("exit 3")
+        with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+            device.run("sleep 1", timeout=0.05)
+        self.assertEqual("dummy", device.getprop("dummy"))
+
+    def test_unmatched_command(self):
+        """Check missing commands fail or run with fallback transport."""
+        self.record()
+        cassette = simpleadb.Cassette(self.path)
+        count = len(cassette)
+        device = simpleadb.AdbDevice(
+            "fake-5554", transport=simpleadb.AdbReplayTransport(cassette)
+        )
+        with self.assertRaisesRegex(simpleadb.AdbCommandError, "no recorded"):
+            device.shell("echo missing")
+        with FakeAdbServer() as fake:
+            recorder = simpleadb.AdbRecordingTransport(
+                cassette, simpleadb.AdbSocketTransport(port=fake.port, fallback=False)
+            )
+            transport = simpleadb.AdbReplayTransport(cassette, fallback=recorder)
+            device = simpleadb.AdbDevice("fake-5554", transport=transport)
+            self.assertEqual("missing", device.shell("echo missing"))
+            self.assertEqual(0, device.run("true").exit_code)
+            requests = len(fake.requests)
+            self.assertEqual("missing", device.shell("echo missing"))
+            self.assertEqual(requests, len(fake.requests))
+        self.assertEqual(count + 2, len(cassette))
+
+    def test_interaction_round_trip(self):
+        """Check binary output and errors survive serialization."""
+        interaction = adbcassette.Interaction(
+            adbcassette.OPEN,
+            "fake-5554",
+            ["exec-out", "screencap -p"],
+            b"\x89PNG\r\n",
+            error={"output": "failed", "returncode": 1, "process_output": "x"},
+        )
+        loaded = adbcassette.Interaction.from_dict(interaction.to_dict())
+        self.assertEqual(b"\x89PNG\r\n", loaded.stdout)
+        with self.assertRaises(simpleadb.AdbCommandError) as context:
+            loaded.raise_error()
+        self.assertEqual("failed", str(context.exception))
+        self.assertEqual(1, context.exception.called_process_error.returncode)
@@ -0,0 +1,141 @@
+#
+# file test_adb_fleet.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for fleet operations."""
+
+import asyncio
+import threading
+import time
+import simpleadb
+from .fakeadb import AsyncFakeAdbTestCase, FakeAdbTestCase
+
+DEVICES_NUM = 20
+
+
+class AdbFleetTest(FakeAdbTestCase):
+    """Fleet executor unit tests against fake adb server."""
+
+    DEVICES = {f"fake-{i}": "device" for i in range(DEVICES_NUM)}
+    DEVICE_ID = "fake-0"
+
+    def setUp(self):
+        super().setUp()
+        self.adb_server = simpleadb.AdbServer(transport=self.transport)
+
+    def test_map_method_name_runs_concurrently(self):
+        """Check named method runs on all devices in time of the slowest."""
+        start = time.monotonic()
+        results = list(self.adb_server.map("shell", args=["sleep 0.5; echo ok"]))
+        self.assertLess(time.monotonic() - start, DEVICES_NUM * 0.5 / 2)
+        self.assertEqual(DEVICES_NUM, len(results))
+        self.assertTrue(all(result.get() == "ok" for result in results))
+
+    def test_map_stores_exceptions(self):
+        """Check exceptions are returned per device."""
+        devices = self.adb_server.devices()[:2]
+        devices.append(simpleadb.AdbDevice("dummy_id", transport=self.transport))
+        results = {
+            str(result.device): result
+            for result in self.adb_server.map("get_state", devices)
+        }
+        self.assertTrue(results["fake-0"].ok)
+        self.assertIsInstance(results["dummy_id"].error, simpleadb.AdbCommandError)
+        with self.assertRaises(simpleadb.AdbCommandError):
+            results["dummy_id"].get()
+
+    def test_map_serializes_operations_per_device(self):
+        """Check operations on the same device do not overlap."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def operation(device, delay):
+            with lock:
+                running.append(device)
+                peak.append(running.count(device))
+            time.sleep(delay)
+            with lock:
+                running.remove(device)
+
+        device = self.adb_server.devices()[0]
+        results = list(self.adb_server.map(operation, [device] * 4, args=[0.05]))
+        self.assertEqual(4, len(results))
+        self.assertEqual(1, max(peak))
+        peak.clear()
+        adb_server = simpleadb.AdbServer(transport=self.transport, max_per_device=2)
+        list(adb_server.map(operation, [device] * 4, args=[0.1]))
+        self.assertEqual(2, max(peak))
+
+    def test_connect_many_retries_and_reports(self):
+        """Check failed connections are retried and reported per address."""
+        addresses = ["10.0.0.1:5555", "10.0.0.2:5555", "10.0.0.3:5555"]
+        self.fake.connect_failures.update({addresses[1]: 1, addresses[2]: 10})
+        results = self.adb_server.connect_many(addresses, retries=2, backoff=0.01)
+        self.assertEqual(addresses, [result.device for result in results])
+        self.assertEqual([True, True, False], [result.ok for result in results])
+        self.assertIn("failed to connect", str(results[2].error))
+        requests = [r for r in self.fake.requests if r.startswith("host:connect:")]
+        self.assertEqual(3, requests.count("host:connect:10.0.0.3:5555"))
+        self.assertEqual("device", self.fake.devices[addresses[1]])
+
+    def test_lazy_connect(self):
+        """Check network device connects before the first command only."""
+        self.fake.connect_failures["10.0.0.4:5555"] = 1
+        device = simpleadb.AdbDevice("10.0.0.4", 5555, transport=self.transport)
+        self.assertNotIn("host:connect:10.0.0.4:5555", self.fake.requests)
+        with self.assertRaises(simpleadb.AdbCommandError):
+            device.get_state()
+        self.assertEqual("device", device.get_state())
+        self.assertEqual("device", device.get_state())
+        self.assertEqual(2, self.fake.requests.count("host:connect:10.0.0.4:5555"))
+
+
+class AsyncAdbFleetTest(AsyncFakeAdbTestCase):
+    """Asyncio fleet executor unit tests against fake adb server."""
+
+    DEVICES = AdbFleetTest.DEVICES
+    DEVICE_ID = AdbFleetTest.DEVICE_ID
+
+    def setUp(self):
+        super().setUp()
+        self.adb_server = simpleadb.AsyncAdbServer(transport=self.transport)
+
+    async def test_map_limits_workers(self):
+        """Check results stream and global limit is respected."""
+        start = time.monotonic()
+        results = [
+            result
+            async for result in self.adb_server.map(
+                "shell", max_workers=10, args=["sleep 0.3"]
+            )
+        ]
+        elapsed = time.monotonic() - start
+        self.assertEqual(DEVICES_NUM, len(results))
+        self.assertTrue(all(result.ok for result in results))
+        self.assertGreaterEqual(elapsed, 0.6)
+        self.assertLess(elapsed, DEVICES_NUM * 0.3 / 2)
+
+    async def test_lazy_connect(self):
+        """Check concurrent commands share one connect, failures are retried."""
+        self.fake.connect_failures["10.0.0.4:5555"] = 1
+        transport = simpleadb.AsyncAdbSocketTransport(port=self.fake.port)
+        device = simpleadb.AsyncAdbDevice("10.0.0.4", 5555, transport=transport)
+        with self.assertRaisesRegex(simpleadb.AdbCommandError, "failed to connect"):
+            await device.get_state()
+        states = await asyncio.gather(*(device.get_state() for _ in range(5)))
+        self.assertEqual(["device"] * 5, states)
+        self.assertEqual(2, self.fake.requests.count("host:connect:10.0.0.4:5555"))
+
+    async def test_connect_many(self):
+        """Check async connections are retried and reported per address."""
+        self.fake.connect_failures.update({"10.0.0.1:5555": 1, "10.0.0.2:5555": 9})
+        results = await self.adb_server.connect_many(
+            ["10.0.0.1:5555", "10.0.0.2:5555"], retries=1, backoff=0.01
+        )
+        self.assertEqual([True, False], [result.ok for result in results])
@@ -0,0 +1,156 @@
+#
+# file test_adb_install.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for package installation."""
+
+import os
+import struct
+import tempfile
+import zipfile
+from typing import Optional
+import simpleadb
+from simpleadb import adbinstall
+from .fakeadb import FakeAdbTestCase, create_stub_adb
+
+STUB_ADB = """case "$1" in
+    -s) shift 2 ;;
+esac
+echo "$@" > "$(dirname "$0")/args"
+echo Success"""
+
+DUMPSYS = """case "$ANDROID_SERIAL" in
+    fake-1) echo "    versionCode=42 minSdk=28 targetSdk=34" ;;
+    fake-2) echo "    versionCode=41 minSdk=28 targetSdk=34" ;;
+esac"""
+
+
+def encode_pool(strings, utf8: bool) -> bytes:
+    """Encode binary XML string pool chunk."""
+    data = b""
+    offsets = []
+    for string in strings:
+        offsets.append(len(data))
+        if utf8:
+            raw = string.encode()
+            data += bytes([len(string), len(raw)]) + raw + b"\0"
+        else:
+            data += struct.pack("<H", len(string)) + string.encode("utf-16-le")
+            data += b"\0\0"
+    data += b"\0" * (-len(data) % 4)
+    start = 28 + 4 * len(strings)
+    header = struct.pack(
+        "<HHIIIIII", 1, 28, start + len(data), len(strings), 0, 0x100 * utf8, start, 0
+    )
+    return header + struct.pack(f"<{len(strings)}I", *offsets) + data
+
+
+def build_manifest(
+    package: str, version_code: int, split: Optional[str] = None, utf8: bool = False
+) -> bytes:
+    """Build compiled manifest with versionCode, package and split."""
+    strings = ["", "package", "split", "manifest", package, split or ""]
+    resources = struct.pack("<HHII", 0x180, 8, 12, 0x0101021B)
+    attributes = struct.pack(
+        "<IIIHBBI", 0xFFFFFFFF, 0, 0xFFFFFFFF, 8, 0, 0x10, version_code
+    )
+    attributes += struct.pack("<IIIHBBI", 0xFFFFFFFF, 1, 4, 8, 0, 3, 4)
+    if split:
+        attributes += struct.pack("<IIIHBBI", 0xFFFFFFFF, 2, 5, 8, 0, 3, 5)
+    count = len(attributes) // 20
+    element = struct.pack(
+        "<IIIIHHHHHH", 1, 0xFFFFFFFF, 0xFFFFFFFF, 3, 20, 20, count, 0, 0, 0
+    )
+    element = (
+        struct.pack("<HHI", 0x102, 16, 8 + len(element) + len(attributes)) + element
+    )
+    body = encode_pool(strings, utf8) + resources + element + attributes
+    return struct.pack("<HHI", 3, 8, 8 + len(body)) + body
+
+
+def write_apk(path: str, manifest: bytes) -> bytes:
+    """Write APK with given manifest, return its content."""
+    with zipfile.ZipFile(path, "w") as apk:
+        apk.writestr(adbinstall.MANIFEST, manifest)
+        apk.writestr("classes.dex", os.urandom(4096))
+    with open(path, "rb") as source:
+        return source.read()
+
+
+class AdbInstallTest(FakeAdbTestCase):
+    """Package installation unit tests against fake adb server."""
+
+    DEVICES = {f"fake-{i}": "device" for i in range(4)}
+    DEVICE_ID = "fake-0"
+
+    def setUp(self):
+        super().setUp()
+        self.fake.add_command("dumpsys", DUMPSYS)
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.base = os.path.join(self.tmpdir.name, "base.apk")
+        self.split = os.path.join(self.tmpdir.name, "split_config.xxhdpi.apk")
+        self.base_data = write_apk(self.base, build_manifest("com.dummy", 42))
+        self.split_data = write_apk(
+            self.split, build_manifest("com.dummy", 42, "config.xxhdpi", utf8=True)
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_apk_set(self):
+        """Check package identity is read from UTF-16 and UTF-8 manifests."""
+        apks = simpleadb.ApkSet([self.base, self.split])
+        self.assertEqual(("com.dummy", 42), (apks.package, apks.version_code))
+        self.assertEqual("config.xxhdpi", apks.files[1].info.split)
+        self.assertEqual(len(self.base_data) + len(self.split_data), apks.size)
+        other = os.path.join(self.tmpdir.name, "other.apk")
+        write_apk(other, build_manifest("com.other", 1))
+        with self.assertRaises(ValueError):
+            simpleadb.ApkSet([self.base, other])
+        with open(other, "wb") as dest:
+            dest.write(b"dummy")
+        with self.assertRaises(ValueError):
+            simpleadb.ApkSet(other)
+
+    def test_install_streamed(self):
+        """Check single APK is streamed and split APKs use install session."""
+        device = simpleadb.AdbDevice("fake-0", transport=self.transport)
+        device.install_apks(self.base)
+        self.assertEqual([self.base_data], self.fake.installs["fake-0"])
+        size = len(self.base_data)
+        self.assertIn(f"exec:cmd package install -r -S {size}", self.fake.requests)
+        device.install_apks([self.base, self.split])
+        self.assertEqual(
+            [self.base_data, self.split_data], self.fake.installs["fake-0"]
+        )
+
+    def test_fleet_install_skips_same_version(self):
+        """Check devices with the same version code are skipped."""
+        adb_server = simpleadb.AdbServer(transport=self.transport)
+        results = adb_server.install([self.base, self.split], max_workers=4)
+        self.assertEqual(
+            ["fake-0", "fake-1", "fake-2", "fake-3"],
+            [str(result.device) for result in results],
+        )
+        self.assertEqual(
+            ["installed", "skipped", "installed", "installed"],
+            [result.get() for result in results],
+        )
+        self.assertEqual(["fake-0", "fake-2", "fake-3"], sorted(self.fake.installs))
+        self.assertEqual(42, adb_server.devices()[1].get_version_code("com.dummy"))
+
+    def test_install_subprocess(self):
+        """Check adb install-multiple is run with adb client process."""
+        stub = create_stub_adb(self.tmpdir.name, STUB_ADB)
+        device = simpleadb.AdbDevice("dummy", path=stub)
+        device.install_apks([self.base, self.split], replace=False)
+        with open(os.path.join(self.tmpdir.name, "args"), encoding="utf-8") as args:
+            self.assertEqual(
+                f"install-multiple {self.base} {self.split}\n", args.read()
+            )
@@ -0,0 +1,183 @@
+#
+# file test_adb_logcat.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for logcat streaming."""
+
+import asyncio
+import io
+import os
+import struct
+import tempfile
+import simpleadb
+from simpleadb import adblogcat, adbprocess, asyncadbprocess
+from .fakeadb import FakeAdbTestCase, create_stub_adb
+
+LOGCAT_OUTPUT = b"""--------- beginning of main
+01-20 12:34:56.789  1234  1240 I ActivityManager: Start proc 42
+01-20 12:34:56.790  1234  1241 W Dummy Tag: spaced tag
+01-20 12:34:56.791   567   567 E AndroidRuntime: FATAL: crash
+01-20 12:34:56.792   567   567 D Empty   :\x20
+"""
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+
+
+def read_resource(name: str) -> bytes:
+    """Read test resource file."""
+    with open(os.path.join(RESOURCES, name), "rb") as resource:
+        return resource.read()
+
+
+def fields(entry) -> tuple:
+    """Get entry fields independent of the local time zone."""
+    return entry.pid, entry.tid, entry.level, entry.tag, entry.message
+
+
+STUB_ADB_FOLLOW = """echo $$ > "$(dirname "$0")/pid"
+i=0
+while true; do
+    echo "01-20 12:34:56.789  1234  1240 I Dummy   : message $i"
+    i=$((i+1))
+done"""
+
+
+class AdbLogcatTest(FakeAdbTestCase):
+    """Logcat parsing and streaming unit tests."""
+
+    def setUp(self):
+        super().setUp()
+        self.fake.run_shell = lambda serial, command: LOGCAT_OUTPUT
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_parse_threadtime(self):
+        """Check threadtime lines are parsed."""
+        entry = adblogcat.parse_threadtime(
+            "01-20 12:34:56.791   567   567 E AndroidRuntime: FATAL: crash\n"
+        )
+        self.assertEqual("01-20 12:34:56.791", entry.timestamp)
+        self.assertEqual((567, 567), (entry.pid, entry.tid))
+        self.assertEqual(("E", "AndroidRuntime"), (entry.level, entry.tag))
+        self.assertEqual("FATAL: crash", entry.message)
+        self.assertIsNone(adblogcat.parse_threadtime("--------- beginning of main"))
+
+    def test_create_args_filters(self):
+        """Check filters are passed to logcat."""
+        self.assertEqual(
+            ["logcat", "-v", "threadtime", "-b", "crash", "--pid=42", "*:W"],
+            adblogcat.create_args(["crash"], level="W", pid=42),
+        )
+        self.assertEqual(
+            ["logcat", "-v", "threadtime", "-d", "Dummy:I", "*:S"],
+            adblogcat.create_args(tags=["Dummy"], level="I", dump=True),
+        )
+        with self.assertRaises(ValueError):
+            adblogcat.create_args(level="X")
+
+    def test_stream_logcat_socket(self):
+        """Check entries are parsed from logcat service stream."""
+        transport = simpleadb.AdbSocketTransport(port=self.fake.port)
+        device = simpleadb.AdbDevice("fake-5554", transport=transport)
+        entries = list(device.stream_logcat(tags=["AndroidRuntime"], level="E"))
+        self.assertEqual(4, len(entries))
+        self.assertEqual("Dummy Tag", entries[1].tag)
+        self.assertEqual("", entries[3].message)
+        self.assertIn(
+            "exec:logcat -v threadtime AndroidRuntime:E '*:S'", self.fake.requests
+        )
+
+    def test_stream_logcat_close_stops_adb(self):
+        """Check closing followed logcat kills adb process."""
+        adb = create_stub_adb(self.tmpdir.name, STUB_ADB_FOLLOW)
+        device = simpleadb.AdbDevice("dev", path=adb)
+        entries = device.stream_logcat()
+        messages = [next(entries).message for _ in range(3)]
+        self.assertEqual(["message 0", "message 1", "message 2"], messages)
+        entries.close()
+        with open(os.path.join(self.tmpdir.name, "pid"), encoding="utf-8") as pid:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(int(pid.read()), 0)
+
+    def test_stream_logcat_failure_raises(self):
+        """Check adb failure is raised from iterator."""
+        adb = create_stub_adb(self.tmpdir.name, "echo 'device not found' >&2; exit 1")
+        device = simpleadb.AdbDevice("dev", path=adb)
+        with self.assertRaises(simpleadb.AdbCommandError) as ctx:
+            list(device.stream_logcat())
+        self.assertEqual("device not found\n", str(ctx.exception))
+
+    def test_async_stream_logcat(self):
+        """Check asyncio logcat stream."""
+        transport = simpleadb.AsyncAdbSocketTransport(port=self.fake.port)
+        device = simpleadb.AsyncAdbDevice("fake-5554", transport=transport)
+
+        async def run():
+            return [entry.tag async for entry in device.stream_logcat()]
+
+        self.assertEqual(
+            ["ActivityManager", "Dummy Tag", "AndroidRuntime", "Empty"],
+            asyncio.run(run()),
+        )
+
+    def test_parse_binary_matches_text(self):
+        """Check binary records decode to the same messages as text."""
+        text = read_resource("logcat_threadtime.txt").splitlines(keepends=True)
+        entries = list(adblogcat.read_entries(text))
+        records = list(adblogcat.parse_binary(read_resource("logcat_binary.bin")))
+        self.assertEqual(500, len(records))
+        self.assertEqual([fields(e) for e in entries], [fields(r) for r in records])
+
+    def test_parse_binary_v1_header_and_truncated_entry(self):
+        """Check header without size and incomplete entry."""
+        payload = b"\x04Dummy\0message\n\0"
+        entry = struct.pack("<HHiIII", len(payload), 0, 42, 43, 0, 0) + payload
+        records = list(adblogcat.parse_binary(entry + entry[:-1]))
+        self.assertEqual(1, len(records))
+        self.assertEqual((42, 43, "I", "Dummy", "message"), fields(records[0]))
+
+    def test_read_records_matches_parse_binary(self):
+        """Check streamed records keep their own data and match buffer."""
+        payload = b"\x04Dummy\0message\n\0"
+        entry = struct.pack("<HHiIII", len(payload), 0, 42, 43, 0, 0) + payload
+        data = read_resource("logcat_binary.bin") + entry + entry[:-1]
+        expected = [fields(r) for r in adblogcat.parse_binary(data)]
+        stream = adbprocess.AdbStream("dev", io.BytesIO(data))
+        records = list(adblogcat.read_records(stream))
+        self.assertEqual(expected, [fields(r) for r in records])
+
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(data)
+            reader.feed_eof()
+            stream = asyncadbprocess.AsyncAdbStream("dev", reader)
+            return [r async for r in adblogcat.async_read_records(stream)]
+
+        self.assertEqual(expected, [fields(r) for r in asyncio.run(run())])
+
+    def test_binary_filter(self):
+        """Check binary records are filtered by tag and priority."""
+        records = list(adblogcat.parse_binary(read_resource("logcat_binary.bin")))
+        accept = adblogcat.create_filter(["AndroidRuntime"], "W")
+        accepted = [record for record in records if accept(record)]
+        self.assertTrue(accepted)
+        self.assertTrue(all(r.tag == "AndroidRuntime" for r in accepted))
+        self.assertTrue(all(r.level in "WEF" for r in accepted))
+
+    def test_stream_logcat_binary(self):
+        """Check binary logcat is requested with exec and decoded."""
+        self.fake.run_shell = lambda serial, command: read_resource("logcat_binary.bin")
+        transport = simpleadb.AdbSocketTransport(port=self.fake.port)
+        device = simpleadb.AdbDevice("fake-5554", transport=transport)
+        records = list(device.stream_logcat(level="E", binary=True, dump=True))
+        self.assertTrue(records)
+        self.assertTrue(all(record.level == "E" for record in records))
+        self.assertIn("exec:logcat -B -d", self.fake.requests)
@@ -0,0 +1,119 @@
+#
+# file test_adb_metrics.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for adb command instrumentation."""
+
+import os
+import tempfile
+import simpleadb
+from simpleadb import adbmetrics
+from .fakeadb import AsyncFakeAdbTestCase, FakeAdbTestCase
+
+
+class EventHook(adbmetrics.Hook):
+    """Hook collecting command types before and after commands."""
+
+    def __init__(self):
+        self.events = []
+
+    def before(self, event):
+        self.events.append(("before", event.command))
+
+    def after(self, event):
+        self.events.append(("after", event.command))
+
+
+class AdbMetricsTest(FakeAdbTestCase):
+    """Instrumentation unit tests against fake adb server."""
+
+    def setUp(self):
+        super().setUp()
+        self.fake.add_command("getprop", "echo dummy")
+
+    def stats(self, recorder, command):
+        """Get snapshot entry of command type."""
+        commands = recorder.snapshot()["commands"]
+        return [entry for entry in commands if entry["command"] == command][0]
+
+    def test_recorder_counts_commands_bytes_and_errors(self):
+        """Check latency, bytes, errors and timeouts per command type."""
+        with simpleadb.MetricsRecorder() as recorder:
+            self.device.shell("echo dummy")
+            self.device.getprop("dummy")
+            with self.assertRaises(simpleadb.AdbCommandError):
+                self.device.shell("exit 3")
+            with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+                self.device.run("sleep 1", timeout=0.05)
+            with tempfile.TemporaryDirectory() as tmpdir:
+                self.device.push(b"x" * 1000, os.path.join(tmpdir, "dummy"))
+        self.device.shell("true")
+        shell = self.stats(recorder, "shell")
+        self.assertEqual(
+            (3, 2, 1), (shell["count"], shell["errors"], shell["timeouts"])
+        )
+        self.assertEqual(len("dummy"), shell["bytes"])
+        self.assertEqual(3, shell["buckets"]["+Inf"])
+        self.assertEqual("fake-5554", shell["device"])
+        self.assertEqual(1, self.stats(recorder, "getprop")["count"])
+        self.assertEqual(1000, self.stats(recorder, "push")["bytes"])
+        recorder.reset()
+        self.assertEqual([], recorder.snapshot()["commands"])
+
+    def test_prometheus_and_spans(self):
+        """Check Prometheus text and span export."""
+        recorder = simpleadb.MetricsRecorder(buckets=(0.5,))
+        adbmetrics.add_hook(recorder)
+        try:
+            self.device.shell("true")
+            with self.assertRaises(simpleadb.AdbCommandError):
+                self.device.shell("echo failed; exit 1")
+        finally:
+            adbmetrics.remove_hook(recorder)
+        text = recorder.prometheus()
+        labels = 'command="shell",device="fake-5554"'
+        self.assertIn("# TYPE simpleadb_command_duration_seconds histogram", text)
+        self.assertIn(
+            f'simpleadb_command_duration_seconds_bucket{{{labels},le="+Inf"}} 2', text
+        )
+        self.assertIn(f"simpleadb_command_duration_seconds_count{{{labels}}} 2", text)
+        self.assertIn(f"simpleadb_command_errors_total{{{labels}}} 1", text)
+        spans = recorder.spans()
+        self.assertEqual(["OK", "ERROR"], [span["status"]["code"] for span in spans])
+        self.assertEqual("adb shell", spans[0]["name"])
+        self.assertLessEqual(
+            spans[0]["start_time_unix_nano"], spans[0]["end_time_unix_nano"]
+        )
+        self.assertEqual('a\\"b\\\\', adbmetrics.escape_label('a"b\\'))
+
+    def test_hooks(self):
+        """Check hooks are called around commands and removed."""
+        hook = EventHook()
+        adbmetrics.add_hook(hook)
+        self.device.get_state()
+        adbmetrics.remove_hook(hook)
+        self.device.get_state()
+        self.assertEqual([("before", "get-state"), ("after", "get-state")], hook.events)
+        self.assertEqual((), adbmetrics.HOOKS)
+
+
+class AsyncAdbMetricsTest(AsyncFakeAdbTestCase):
+    """Asyncio instrumentation unit tests against fake adb server."""
+
+    async def test_recorder(self):
+        """Check asyncio commands are recorded."""
+        self.fake.add_command("logcat", "true")
+        with simpleadb.MetricsRecorder() as recorder:
+            await self.device.shell("echo dummy")
+            async for _ in self.device.stream_logcat(dump=True):
+                pass
+        logcat, entry = recorder.snapshot()["commands"]
+        self.assertEqual(
+            ("shell", 1, 5), (entry["command"], entry["count"], entry["bytes"])
+        )
+        self.assertEqual(("logcat", 1), (logcat["command"], logcat["count"]))
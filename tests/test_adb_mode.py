@@ -0,0 +1,203 @@
+#
+# file test_adb_mode.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for device mode tracking."""
+
+import os
+import uuid
+import simpleadb
+from simpleadb import adbmode
+from .fakeadb import FakeAdbServer, FakeAdbTestCase
+
+ID = """cat "$(dirname "$0")/uid\""""
+
+GETPROP = """cd "$(dirname "$0")"
+case "$1" in
+    ro.boot.veritymode) cat veritymode ;;
+    sys.boot_completed) echo 1 ;;
+esac"""
+
+CAT = """cd "$(dirname "$0")"
+case "$1" in
+    /proc/sys/kernel/random/boot_id) exec /bin/cat boot_id ;;
+    /proc/mounts) exec /bin/cat mounts ;;
+esac
+exec /bin/cat "$@\""""
+
+MOUNT = "/dev/block/dm-0 / ext4 {},seclabel 0 0\n"
+REBOOT_MESSAGE = "Now reboot your device for settings to take effect\n"
+
+
+class FakeDevice:
+    """Device with adbd, verity and system partition state kept in files
+    read by stub device commands."""
+
+    def __init__(self, fake: FakeAdbServer):
+        self.directory = fake.bin_dir.name
+        self.pending_verity = None
+        self.write("uid", "2000")
+        self.write("veritymode", "enforcing")
+        self.write("boot_id", str(uuid.uuid4()))
+        self.write("mounts", MOUNT.format("ro"))
+        for name, script in (("id", ID), ("getprop", GETPROP), ("cat", CAT)):
+            fake.add_command(name, script)
+        fake.local_outputs.update(
+            {
+                "root": self.root,
+                "unroot": self.unroot,
+                "disable-verity": lambda: self.set_verity("disabled"),
+                "enable-verity": lambda: self.set_verity("enforcing"),
+                "remount": self.remount,
+                "reboot": self.reboot,
+            }
+        )
+
+    def read(self, name: str) -> str:
+        """Read state file."""
+        with open(os.path.join(self.directory, name), encoding="utf-8") as source:
+            return source.read().strip()
+
+    def write(self, name: str, value: str) -> None:
+        """Write state file."""
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as dest:
+            dest.write(value + "\n")
+
+    def root(self) -> str:
+        """Restart adbd as root unless it runs as root."""
+        if self.read("uid") == "0":
+            return "adbd is already running as root\n"
+        self.write("uid", "0")
+        return "restarting adbd as root\n"
+
+    def unroot(self) -> str:
+        """Restart adbd as shell user unless it runs as shell user."""
+        if self.read("uid") != "0":
+            return "adbd not running as root\n"
+        self.write("uid", "2000")
+        return "restarting adbd as non root\n"
+
+    def set_verity(self, mode: str) -> str:
+        """Change verity mode on the next boot."""
+        if self.read("veritymode") == mode and self.pending_verity is None:
+            return f"verity already {mode}\n"
+        self.pending_verity = mode
+        return f"verity {mode}\n" + REBOOT_MESSAGE
+
+    def remount(self) -> str:
+        """Remount system, disable verity first like adb remount does."""
+        if self.read("veritymode") != "disabled":
+            self.pending_verity = "disabled"
+            return "Disabling verity for /system\n" + REBOOT_MESSAGE
+        self.write("mounts", MOUNT.format("rw"))
+        return "remount succeeded\n"
+
+    def reboot(self) -> str:
+        """Boot again with pending verity mode and adbd as shell user."""
+        if self.pending_verity is not None:
+            self.write("veritymode", self.pending_verity)
+            self.pending_verity = None
+        self.write("uid", "2000")
+        self.write("boot_id", str(uuid.uuid4()))
+        self.write("mounts", MOUNT.format("ro"))
+        return ""
+
+
+class AdbModeTest(FakeAdbTestCase):
+    """Device mode unit tests against fake adb server."""
+
+    def setUp(self):
+        super().setUp()
+        self.device_model = FakeDevice(self.fake)
+
+    def count(self, request: str) -> int:
+        """Count requests sent to the fake server."""
+        return self.fake.requests.count(request)
+
+    def test_get_mode(self):
+        """Check mode is read once and tracked after changes."""
+        mode = self.device.get_mode()
+        self.assertEqual((False, True, False), (mode.root, mode.verity, mode.remounted))
+        self.device.root()
+        self.assertTrue(self.device.get_mode().root)
+        self.assertEqual(1, len([r for r in self.fake.requests if "id -u" in r]))
+        self.device_model.unroot()
+        self.assertFalse(self.device.get_mode(refresh=True).root)
+
+    def test_root_skips_restart_wait(self):
+        """Check adbd already in mode is not waited for, failures raise."""
+        wait = "host-serial:fake-5554:wait-for-any-device"
+        self.device.root()
+        self.assertEqual(1, self.count(wait))
+        self.device.root()
+        self.device.unroot()
+        self.device.unroot()
+        self.assertEqual(2, self.count(wait))
+        self.fake.local_outputs["root"] = "adbd cannot run as root in production builds"
+        with self.assertRaises(simpleadb.AdbCommandError):
+            self.device.root()
+        self.fake.local_outputs["unroot"] = "adbd cannot run as non root"
+        with self.assertRaises(simpleadb.AdbCommandError):
+            self.device.unroot()
+
+    def test_set_mode_coalesces_reboot(self):
+        """Check root, verity and remount share a single reboot."""
+        result = self.device.set_mode(verity=False, remount=True, timeout=10)
+        self.assertEqual(
+            ["root", "verity", "reboot", "root", "remount"],
+            [name for name, _ in result.phases],
+        )
+        self.assertEqual(1, self.count("reboot:"))
+        self.assertEqual(
+            (True, False, True, False),
+            (
+                result.mode.root,
+                result.mode.verity,
+                result.mode.remounted,
+                result.mode.reboot_pending,
+            ),
+        )
+        self.assertEqual("disabled", self.device_model.read("veritymode"))
+        self.assertEqual([], self.device.set_mode(verity=False, remount=True).phases)
+        self.assertEqual(1, self.count("reboot:"))
+
+    def test_remount_reboots_when_verity_enabled(self):
+        """Check remount disabling verity is followed by reboot and remount."""
+        result = self.device.set_mode(remount=True, timeout=10)
+        self.assertEqual(
+            ["root", "remount", "reboot", "root", "remount"],
+            [name for name, _ in result.phases],
+        )
+        self.assertTrue(result.mode.remounted)
+        with self.assertRaises(ValueError):
+            self.device.set_mode(root=False, remount=True)
+
+    def test_parse_query_output(self):
+        """Check uid, verity mode, boot ID and overlay mounts are parsed."""
+        mode = adbmode.parse_query_output(
+            "0\n\nb00t\n/dev/dm-0 / ext4 ro 0 0\noverlay /system overlay rw 0 0\n"
+        )
+        self.assertEqual(
+            (True, None, True, "b00t"),
+            (mode.root, mode.verity, mode.remounted, mode.boot_id),
+        )
+        with self.assertRaises(ValueError):
+            adbmode.parse_query_output("id: unknown\n")
+
+    def test_remount_checks_system_over_rootfs(self):
+        """Check read-only /system is remounted when / is read-write rootfs."""
+        self.device_model.write("veritymode", "disabled")
+        self.device_model.write(
+            "mounts",
+            "rootfs / rootfs rw,seclabel 0 0\n"
+            "/dev/block/vda /system ext4 ro,seclabel 0 0",
+        )
+        self.assertFalse(self.device.get_mode().remounted)
+        result = self.device.set_mode(remount=True, timeout=10)
+        self.assertEqual(["root", "remount"], [name for name, _ in result.phases])
+        self.assertEqual(1, self.count("remount:"))
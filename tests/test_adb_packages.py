@@ -0,0 +1,149 @@
+#
+# file test_adb_packages.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for installed package index."""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import simpleadb
+from simpleadb import adbpackages
+from .fakeadb import FakeAdbTestCase
+from .test_adb_install import build_manifest, write_apk
+
+PACKAGES = """package:/system/app/Dummy/Dummy.apk=com.android.dummy \
+versionCode:34 installer=null uid:1000
+package:/data/app/~~x==/com.other-y==/base.apk=com.other \
+versionCode:7 installer=com.android.vending uid:10123
+"""
+
+PM = """cd "$(dirname "$0")"
+case "$1 $3" in
+    "list -d") grep "=${4:-}" packages | grep -f disabled || true ;;
+    list*) grep "=${7:-}" packages || true ;;
+    uninstall*) grep -v "=$2 " packages > rest; mv rest packages; echo Success ;;
+esac"""
+
+
+class AdbPackagesTest(FakeAdbTestCase):
+    """Package index unit tests against fake adb server."""
+
+    def setUp(self):
+        super().setUp()
+        self.fake.add_command("pm", PM)
+        self.packages = os.path.join(self.fake.bin_dir.name, "packages")
+        self.write_packages(PACKAGES)
+        self.write_disabled("")
+
+    def write_packages(self, data: str, mode: str = "w") -> None:
+        """Write package list of pm stub."""
+        with open(self.packages, mode, encoding="utf-8") as dest:
+            dest.write(data)
+
+    def write_disabled(self, data: str) -> None:
+        """Write disabled package names of pm stub."""
+        path = os.path.join(self.fake.bin_dir.name, "disabled")
+        with open(path, "w", encoding="utf-8") as dest:
+            dest.write(data or "^$\n")
+
+    def list_requests(self):
+        """Get package list requests sent to the fake server."""
+        return [r for r in self.fake.requests if "pm list packages" in r]
+
+    def test_parse_package_list(self):
+        """Check paths with '=', null installer and disabled packages."""
+        output = PACKAGES + adbpackages.DISABLED_MARKER + "\npackage:com.other\n"
+        index = adbpackages.parse_package_list(output)
+        self.assertEqual(
+            adbpackages.PackageInfo(
+                "com.other",
+                7,
+                "/data/app/~~x==/com.other-y==/base.apk",
+                10123,
+                False,
+                "com.android.vending",
+            ),
+            index["com.other"],
+        )
+        self.assertIsNone(index["com.android.dummy"].installer)
+        self.assertTrue(index["com.android.dummy"].enabled)
+        self.assertIsNone(adbpackages.parse_package_line("dummy"))
+
+    def test_index_loads_once(self):
+        """Check lookups are served from a single bulk query."""
+        self.write_disabled("com.other\n")
+        packages = self.device.packages
+        self.assertEqual(1000, packages.get("com.android.dummy").uid)
+        self.assertFalse(packages.get("com.other").enabled)
+        self.assertIsNone(packages.get("com.dummy"))
+        self.assertIn("com.other", packages)
+        self.assertEqual(["com.android.dummy", "com.other"], list(packages))
+        self.assertEqual(2, len(packages.packages()))
+        self.assertEqual(1, len(self.list_requests()))
+
+    def test_install_and_uninstall_refresh_single_package(self):
+        """Check install and uninstall update index without full reload."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            apk = os.path.join(tmpdir, "dummy.apk")
+            write_apk(apk, build_manifest("com.dummy", 42))
+            self.assertNotIn("com.dummy", self.device.packages)
+            self.write_packages(
+                "package:/data/app/dummy/base.apk=com.dummy versionCode:42 "
+                "installer=null uid:10200\n",
+                "a",
+            )
+            self.device.install_apks(apk)
+        self.assertEqual(42, self.device.packages.get("com.dummy").version_code)
+        self.device.uninstall("com.other")
+        self.assertNotIn("com.other", self.device.packages)
+        requests = self.list_requests()
+        self.assertEqual(2, len(requests))
+        self.assertIn("-i com.dummy;", requests[1])
+
+    def test_index_reloads_after_ttl(self):
+        """Check changes made outside the library are seen after ttl."""
+        device = simpleadb.AdbDevice(
+            "fake-5554", transport=self.transport, package_index_ttl=0.2
+        )
+        self.assertIn("com.other", device.packages)
+        self.write_packages(PACKAGES.splitlines(True)[0])
+        self.assertIn("com.other", device.packages)
+        time.sleep(0.2)
+        self.assertNotIn("com.other", device.packages)
+        self.assertEqual(2, len(self.list_requests()))
+
+    def test_refresh_while_iterating(self):
+        """Check single package refresh on another thread does not change
+        the mapping being iterated."""
+        packages = {
+            f"com.dummy{i}": adbpackages.PackageInfo(f"com.dummy{i}")
+            for i in range(5000)
+        }
+        index = adbpackages.PackageIndex(
+            lambda package: dict(packages) if package is None else {}
+        )
+        index.refresh()
+
+        def refresh():
+            for i in range(5000):
+                index.refresh(f"com.dummy{i}")
+
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            thread = threading.Thread(target=refresh)
+            thread.start()
+            while thread.is_alive():
+                self.assertLessEqual(len(index.packages()), len(packages))
+            thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(0, len(index))
@@ -9,9 +9,11 @@
 # pylint: disable=no-member
 """Unit tests for adb subprocess."""
 
+import tempfile
 import unittest
 import simpleadb
 from simpleadb import adbprocess
+from .fakeadb import create_stub_adb
 
 
 class AdbProcessTest(unittest.TestCase):
@@ -32,3 +34,40 @@ class AdbProcessTest(unittest.TestCase):
         adb_process = adbprocess.AdbProcess()
         with self.assertRaises(simpleadb.AdbCommandError):
             adb_process.check_output(["invalid4r4j838r"])
+
+
+class AdbSubprocessTransportTest(unittest.TestCase):
+    """Adb subprocess transport unit tests with stub adb binary."""
+
+    def setUp(self):
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.adb = create_stub_adb(self.tmpdir.name, 'printf "%s|" "$@"')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_args_passed_as_argv(self):
+        """Check arguments are passed without host shell splitting."""
+        adb_process = adbprocess.AdbProcess("dev 1", self.adb)
+        output = adb_process.check_output(["shell", "ls | grep 'a b'"])
+        self.assertEqual("-s|dev 1|shell|ls | grep 'a b'|", output)
+
+    def test_device_shell_values_are_quoted(self):
+        """Check values used in device shell commands are quoted."""
+        device = simpleadb.AdbDevice("dev", path=self.adb)
+        output = device.getprop("dummy prop; reboot")
+        self.assertEqual("-s|dev|shell|getprop|'dummy prop; reboot'|", output)
+
+    def test_legacy_shell_mode(self):
+        """Check command line is run with host shell when requested."""
+        transport = simpleadb.AdbSubprocessTransport(use_shell=True)
+        adb_process = adbprocess.AdbProcess("dev", self.adb, transport)
+        output = adb_process.check_output(["shell", "echo 42"])
+        self.assertEqual("-s|dev|shell|echo|42|", output)
+
+    def test_missing_adb_binary_fails(self):
+        """Check missing adb binary raises AdbCommandError."""
+        adb_process = adbprocess.AdbProcess("dev", "dummy/path")
+        with self.assertRaises(simpleadb.AdbCommandError):
+            adb_process.check_output(["devices"])
@@ -0,0 +1,99 @@
+#
+# file test_adb_props.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Unit tests for system properties snapshot and cache."""
+
+import os
+import tempfile
+import time
+import unittest
+import simpleadb
+from simpleadb import adbprops
+from .fakeadb import create_stub_adb
+
+GETPROP_DUMP = r"""[ro.product.model]: [Pixel]
+[ro.empty]: []
+[persist.dummy.prop]: [1]
+[dummy.multiline]: [first
+second]
+"""
+
+STUB_ADB = f"""echo "$*" >> "$(dirname "$0")/calls"
+if [ "$3" = shell ] && [ "$#" -eq 4 ]; then
+    printf '%s' '{GETPROP_DUMP}'
+else
+    echo 42
+fi"""
+
+
+class AdbPropsTest(unittest.TestCase):
+    """System properties unit tests with stub adb binary."""
+
+    def setUp(self):
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.adb = create_stub_adb(self.tmpdir.name, STUB_ADB)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def calls(self):
+        """Get number of stub adb calls."""
+        path = os.path.join(self.tmpdir.name, "calls")
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as calls:
+            return len(calls.readlines())
+
+    def test_parse_getprop(self):
+        """Check getprop dump is parsed into dict."""
+        props = adbprops.parse_getprop(GETPROP_DUMP)
+        self.assertEqual("Pixel", props["ro.product.model"])
+        self.assertEqual("", props["ro.empty"])
+        self.assertEqual("first\nsecond", props["dummy.multiline"])
+        self.assertEqual(4, len(props))
+
+    def test_getprops_single_call(self):
+        """Check all properties are read with a single adb call."""
+        device = simpleadb.AdbDevice("dev", path=self.adb)
+        self.assertEqual("1", device.getprops()["persist.dummy.prop"])
+        self.assertEqual(1, self.calls())
+
+    def test_getprop_without_cache(self):
+        """Check every getprop calls adb when cache is disabled."""
+        device = simpleadb.AdbDevice("dev", path=self.adb)
+        device.getprop("ro.dummy")
+        device.getprop("ro.dummy")
+        self.assertEqual(2, self.calls())
+
+    def test_read_only_props_are_cached(self):
+        """Check read-only properties are served from cache."""
+        device = simpleadb.AdbDevice("dev", path=self.adb, prop_cache_ttl=0)
+        device.getprops()
+        self.assertEqual("Pixel", device.getprop("ro.product.model"))
+        self.assertEqual("42", device.getprop("ro.empty"))
+        self.assertEqual("42", device.getprop("persist.dummy.prop"))
+        self.assertEqual(3, self.calls())
+
+    def test_mutable_props_respect_ttl(self):
+        """Check mutable properties are cached for ttl."""
+        device = simpleadb.AdbDevice("dev", path=self.adb, prop_cache_ttl=0.2)
+        device.getprop("persist.dummy.prop")
+        device.getprop("persist.dummy.prop")
+        self.assertEqual(1, self.calls())
+        time.sleep(0.2)
+        device.getprop("persist.dummy.prop")
+        self.assertEqual(2, self.calls())
+
+    def test_setprop_invalidates_cache(self):
+        """Check setprop drops cached property."""
+        device = simpleadb.AdbDevice("dev", path=self.adb, prop_cache_ttl=60)
+        device.getprops()
+        device.setprop("persist.dummy.prop", "2")
+        device.getprop("persist.dummy.prop")
+        self.assertEqual(3, self.calls())
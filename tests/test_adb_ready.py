@@ -0,0 +1,81 @@
+#
+# file test_adb_ready.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for device readiness waiter."""
+
+import time
+import simpleadb
+from simpleadb import adbready
+from .fakeadb import FakeAdbTestCase
+
+GETPROP = """cd "$(dirname "$0")"
+echo x >> "polls-$ANDROID_SERIAL"
+case "$ANDROID_SERIAL" in
+    fake-1) echo 0 ;;
+    *) [ "$(wc -l < "polls-$ANDROID_SERIAL")" -ge 3 ] && echo 1 || echo 0 ;;
+esac"""
+
+SERVICE = """echo "Service $2: found\""""
+
+
+class AdbReadyTest(FakeAdbTestCase):
+    """Readiness waiter unit tests against fake adb server."""
+
+    DEVICES = {f"fake-{i}": "device" for i in range(3)}
+    DEVICE_ID = "fake-0"
+
+    def setUp(self):
+        super().setUp()
+        self.fake.add_command("getprop", GETPROP)
+        self.fake.add_command("service", SERVICE)
+
+    def test_wait_until_ready(self):
+        """Check conditions are polled over a single shell session."""
+        result = self.device.wait_until_ready(
+            timeout=5, backoff=adbready.Backoff(0.01, 0.02)
+        )
+        self.assertEqual(
+            [adbready.BOOT_COMPLETED, adbready.PACKAGE_MANAGER], list(result.timings)
+        )
+        self.assertLessEqual(result.timings["boot_completed"], result.elapsed)
+        self.assertEqual(
+            1, self.fake.requests.count(simpleadb.adbshell.SHELL_V2_SERVICE)
+        )
+        self.assertIn("host-serial:fake-0:wait-for-any-device", self.fake.requests)
+
+    def test_custom_condition_and_timeout(self):
+        """Check shell command conditions and timeout."""
+        result = self.device.wait_until_ready(["true"], timeout=5)
+        self.assertEqual(["true"], list(result.timings))
+        start = time.monotonic()
+        with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+            self.device.wait_until_ready(["false"], timeout=0.2)
+        self.assertLess(time.monotonic() - start, 1.5)
+
+    def test_fleet_shares_timeout_budget(self):
+        """Check devices are waited for concurrently within one budget."""
+        adb_server = simpleadb.AdbServer(transport=self.transport)
+        start = time.monotonic()
+        results = adb_server.wait_until_ready(
+            conditions=[adbready.BOOT_COMPLETED], timeout=0.5
+        )
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertEqual(
+            ["fake-0", "fake-1", "fake-2"], [str(r.device) for r in results]
+        )
+        self.assertEqual([True, False, True], [result.ok for result in results])
+        self.assertIsInstance(results[1].error, simpleadb.AdbCommandTimeoutExpired)
+        self.assertIn("boot_completed", results[2].value.timings)
+
+    def test_backoff(self):
+        """Check delay grows up to maximum and is reset."""
+        backoff = adbready.Backoff(0.1, 0.25, 2)
+        self.assertEqual([0.1, 0.2, 0.25], [backoff.next() for _ in range(3)])
+        backoff.reset()
+        self.assertEqual(0.1, backoff.next())
@@ -0,0 +1,155 @@
+#
+# file test_adb_screen.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+"""Unit tests for streamed screen capture."""
+
+import io
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+import simpleadb
+from simpleadb import adbscreen, adbsocket
+from .fakeadb import FakeAdbServer, create_stub_adb
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 300
+PIXELS = bytes(range(4)) * 6
+RAW = struct.pack("<IIII", 3, 2, 1, 1) + PIXELS
+
+
+def create_frame(pixels: bytes) -> bytes:
+    """Create raw frame of 3x2 RGBA pixels with color space header."""
+    return struct.pack("<IIII", 3, 2, 1, 1) + pixels
+
+
+FRAMES = [bytes([i]) * 24 for i in (1, 1, 2, 2, 3)]
+
+STUB_ADB = """echo "$*" >> "$(dirname "$0")/calls"
+case "$*" in
+    *"shell getprop"*) echo 34 ;;
+    *"screencap -p") cat "$(dirname "$0")/png" ;;
+    *screencap) cat "$(dirname "$0")/raw" ;;
+    *"while true; do screencap; done") cat "$(dirname "$0")/loop" ;;
+    *) echo 'error: closed' >&2; exit 1 ;;
+esac"""
+
+
+class AdbScreenTest(unittest.TestCase):
+    """Screen capture unit tests with stub adb binary."""
+
+    def setUp(self):
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.adb = create_stub_adb(self.tmpdir.name, STUB_ADB)
+        loop = b"".join(create_frame(pixels) for pixels in FRAMES)
+        for name, data in (("png", PNG), ("raw", RAW), ("loop", loop)):
+            with open(os.path.join(self.tmpdir.name, name), "wb") as dest:
+                dest.write(data)
+        self.device = simpleadb.AdbDevice("dev", path=self.adb)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def calls(self):
+        """Get stub adb calls."""
+        with open(os.path.join(self.tmpdir.name, "calls"), encoding="utf-8") as calls:
+            return calls.read().splitlines()
+
+    def test_screencap_streams_png_without_device_file(self):
+        """Check PNG is streamed by exec-out into file and file object."""
+        local = os.path.join(self.tmpdir.name, "screen.png")
+        self.device.screencap(local=local)
+        with open(local, "rb") as source:
+            self.assertEqual(PNG, source.read())
+        dest = io.BytesIO()
+        self.device.screencap(dest=dest)
+        self.assertEqual(PNG, dest.getvalue())
+        self.assertEqual(["-s dev exec-out screencap -p"] * 2, self.calls())
+
+    def test_screencap_bytes_reuses_buffer(self):
+        """Check raw pixels are read into caller buffer."""
+        buffer = bytearray(64)
+        frame = self.device.screencap_bytes(buffer)
+        self.assertEqual(
+            (3, 2, 1, 1),
+            (frame.width, frame.height, frame.pixel_format, frame.colorspace),
+        )
+        self.assertEqual(12, frame.stride)
+        self.assertEqual(PIXELS, bytes(frame.pixels))
+        self.assertEqual(PIXELS, bytes(buffer[: len(PIXELS)]))
+        self.device.screencap_bytes(buffer)
+        self.assertEqual(
+            1, self.calls().count("-s dev shell getprop ro.build.version.sdk")
+        )
+        with self.assertRaises(ValueError):
+            self.device.screencap_bytes(bytearray(8))
+
+    def test_screencap_failure_raises(self):
+        """Check adb failure is raised and no file is left behind."""
+        os.remove(os.path.join(self.tmpdir.name, "png"))
+        local = os.path.join(self.tmpdir.name, "screen.png")
+        with self.assertRaises(simpleadb.AdbCommandError):
+            self.device.screencap(local=local)
+        self.assertFalse(os.path.exists(local))
+
+    def test_has_colorspace(self):
+        """Check header of devices before Android 9."""
+        self.assertFalse(adbscreen.has_colorspace("27\n"))
+        self.assertTrue(adbscreen.has_colorspace("28"))
+
+    def test_screencap_bytes_socket(self):
+        """Check raw screencap is requested with exec service."""
+        with FakeAdbServer() as fake:
+            fake.run_shell = lambda serial, command: (
+                RAW[:12] + PIXELS
+                if command.startswith("screencap")
+                else f"27\n{adbsocket.EXIT_MARKER}0\n".encode()
+            )
+            transport = simpleadb.AdbSocketTransport(port=fake.port)
+            device = simpleadb.AdbDevice("fake-5554", transport=transport)
+            self.assertEqual(PIXELS, bytes(device.screencap_bytes().pixels))
+            self.assertIn("exec:screencap", fake.requests)
+
+    def test_capture_yields_unique_frames(self):
+        """Check duplicate frames are skipped until the stream ends."""
+        with self.device.capture() as session:
+            frames = [bytes(frame.pixels) for frame in session]
+        self.assertEqual([FRAMES[0], FRAMES[2], FRAMES[4]], frames)
+        self.assertEqual(
+            (5, 2, 0),
+            (session.stats.captured, session.stats.duplicates, session.stats.dropped),
+        )
+        with self.device.capture(dedup=False) as session:
+            self.assertEqual(5, len(list(session)))
+
+    def test_capture_writes_png_frames(self):
+        """Check unique frames are written by background writer."""
+        directory = os.path.join(self.tmpdir.name, "frames")
+        with FakeAdbServer() as fake:
+            fake.run_shell = lambda serial, command: (
+                b"".join(create_frame(pixels) for pixels in FRAMES)
+                if command.startswith("while")
+                else f"34\n{adbsocket.EXIT_MARKER}0\n".encode()
+            )
+            transport = simpleadb.AdbSocketTransport(port=fake.port)
+            device = simpleadb.AdbDevice("fake-5554", transport=transport)
+            stats = device.capture(directory).run(max_frames=10)
+        self.assertEqual(3, stats.written)
+        self.assertEqual(
+            ["frame000001.png", "frame000003.png", "frame000005.png"],
+            sorted(os.listdir(directory)),
+        )
+        with open(os.path.join(directory, "frame000003.png"), "rb") as source:
+            png = source.read()
+        self.assertTrue(png.startswith(b"\x89PNG\r\n\x1a\n"))
+        idat = png.index(b"IDAT")
+        length = struct.unpack(">I", png[idat - 4 : idat])[0]
+        rows = zlib.decompress(png[idat + 4 : idat + 4 + length])
+        self.assertEqual((b"\0" + FRAMES[2][:12]) * 2, rows)
+        self.assertIn("exec:while true; do screencap; done", fake.requests)
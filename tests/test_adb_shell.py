@@ -0,0 +1,127 @@
+#
+# file test_adb_shell.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=duplicate-code
+"""Unit tests for persistent shell session."""
+
+import tempfile
+import time
+import simpleadb
+from simpleadb import adbshell
+from .fakeadb import FakeAdbTestCase, create_stub_adb
+
+STUB_ADB = """case "$3" in
+    features) echo shell_v2 ;;
+    shell) if [ "$#" -eq 3 ]; then exec /bin/sh; fi; shift 3; exec /bin/sh -c "$*" ;;
+esac"""
+
+
+class AdbShellTest(FakeAdbTestCase):
+    """Shell session unit tests against fake adb server."""
+
+    def test_session_keeps_shell_state(self):
+        """Check commands share one shell with shell protocol v2."""
+        with self.device.session() as session:
+            session.shell("cd /tmp; DUMMY=42")
+            self.assertEqual("/tmp 42", session.shell('echo "$(pwd) $DUMMY"'))
+            result = session.run("echo out; echo err >&2; false")
+            self.assertEqual(
+                (b"out\n", b"err\n", 1),
+                (result.stdout, result.stderr, result.exit_code),
+            )
+            self.assertEqual(2, session.run("if").exit_code)
+            with self.assertRaises(simpleadb.AdbCommandError):
+                session.shell("exit 3")
+            self.assertTrue(session.closed)
+        self.assertIn("shell,v2,raw:", self.fake.requests)
+
+    def test_session_raw_fallback(self):
+        """Check exec shell is used without shell protocol v2."""
+        self.fake.features = "cmd"
+        with self.device.session() as session:
+            result = session.run("echo out; echo err >&2")
+        self.assertEqual((b"out\nerr\n", b""), (result.stdout, result.stderr))
+        self.assertIn("exec:sh", self.fake.requests)
+
+    def test_session_timeout_keeps_session(self):
+        """Check timed out command is killed and session stays usable."""
+        with self.device.session() as session:
+            start = time.monotonic()
+            with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+                session.run("echo partial; sleep 10", timeout=0.2)
+            self.assertEqual("alive", session.shell("echo alive", timeout=5))
+            self.assertLess(time.monotonic() - start, 5)
+
+    def test_session_subprocess(self):
+        """Check session with adb client process."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            device = simpleadb.AdbDevice("dev", path=create_stub_adb(tmpdir, STUB_ADB))
+            with device.session() as session:
+                self.assertEqual(["a", "b"], [session.shell(f"echo {c}") for c in "ab"])
+                self.assertEqual(b"err\n", session.run("echo err >&2").stderr)
+                with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+                    session.run("sleep 10", timeout=0.2)
+                self.assertEqual("c", session.shell("echo c"))
+
+    def test_run_shell_v2(self):
+        """Check stdout, stderr and exit status are separated."""
+        result = self.device.run("echo out; echo err >&2; exit 3")
+        self.assertEqual(
+            (b"out\n", b"err\n", 3), (result.stdout, result.stderr, result.exit_code)
+        )
+        self.assertFalse(result.ok)
+        self.assertEqual("out", result.output)
+        with self.assertRaises(simpleadb.AdbCommandError):
+            result.get(self.device.get_id())
+        self.assertIn("shell,v2,raw:echo out; echo err >&2; exit 3", self.fake.requests)
+        self.assertEqual(1, self.fake.requests.count("host-serial:fake-5554:features"))
+
+    def test_run_without_shell_v2(self):
+        """Check exit status is parsed from marker without shell protocol v2."""
+        self.fake.features = "cmd"
+        result = self.device.run("echo out; echo err >&2; exit 3")
+        self.assertEqual(
+            (b"out\nerr\n", b"", 3), (result.stdout, result.stderr, result.exit_code)
+        )
+        self.assertEqual(0, self.device.run("true").exit_code)
+
+    def test_stream_shell(self):
+        """Check output is streamed and exit status raised at the end."""
+        with self.device.stream_shell("seq 3; echo err >&2") as stream:
+            self.assertEqual([b"1\n", b"2\n", b"3\n"], list(stream))
+            self.assertEqual(b"err\n", stream.stderr)
+            self.assertEqual(0, stream.exit_code)
+        with self.device.stream_shell("echo out; exit 2") as stream:
+            with self.assertRaises(simpleadb.AdbCommandError):
+                stream.read()
+
+    def test_run_subprocess(self):
+        """Check command result with adb client process."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            device = simpleadb.AdbDevice("dev", path=create_stub_adb(tmpdir, STUB_ADB))
+            result = device.run("echo out; echo err >&2; exit 3")
+            self.assertEqual(
+                (b"out\n", b"err\n", 3),
+                (result.stdout, result.stderr, result.exit_code),
+            )
+            with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+                device.run("sleep 10", timeout=0.2)
+
+    def test_marked_output(self):
+        """Check output split across chunks and leftovers of previous command."""
+        output = adbshell.MarkedOutput()
+        data = (
+            b"old\x1esimpleadb-end:1:0\n"
+            b"\x1esimpleadb-begin:2:42\r\nnew\n\x1esimpleadb-end:2:3\n"
+        )
+        for offset in range(0, len(data), 5):
+            self.assertIsNone(output.take(2) if offset else None)
+            output.append(data[offset : offset + 5])
+        self.assertEqual((b"new\n", 3), output.take(2))
+        self.assertEqual(42, output.pid)
+        self.assertEqual(b"", bytes(output.data))
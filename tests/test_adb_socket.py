@@ -0,0 +1,136 @@
+#
+# file test_adb_socket.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for adb socket transport."""
+
+import socket
+import time
+import simpleadb
+from simpleadb import adbsocket
+from .fakeadb import FakeAdbTestCase
+
+
+class AdbSocketTransportTest(FakeAdbTestCase):
+    """Adb socket transport unit tests against fake adb server."""
+
+    def test_encode_request(self):
+        """Check hex-length request framing."""
+        self.assertEqual(b"000chost:version", adbsocket.encode_request("host:version"))
+
+    def test_get_state(self):
+        """Check get-state is served by host-serial query."""
+        self.assertEqual("device", self.device.get_state())
+        self.assertIn("host-serial:fake-5554:get-state", self.fake.requests)
+
+    def test_shell_output(self):
+        """Check shell output is returned without exit marker."""
+        self.assertEqual("hello", self.device.shell("echo hello"))
+        self.assertIn("host:transport:fake-5554", self.fake.requests)
+
+    def test_shell_non_zero_exit_raises(self):
+        """Check non-zero remote exit status raises AdbCommandError."""
+        with self.assertRaises(simpleadb.AdbCommandError) as ctx:
+            self.device.shell("echo failed; exit 3")
+        self.assertEqual(3, ctx.exception.called_process_error.returncode)
+        self.assertEqual("failed\n", str(ctx.exception))
+
+    def test_device_command_arguments_quoted(self):
+        """Check logcat and uninstall arguments reach device shell intact."""
+        self.fake.add_command("logcat", 'printf "%s\\n" "$@"')
+        self.assertEqual(
+            "-b\nmain; echo injected\n-d",
+            self.device.dump_logcat("main; echo injected"),
+        )
+        self.assertEqual(
+            (
+                adbsocket.SHELL,
+                adbsocket.shell_service("pm uninstall 'com.dummy;reboot'"),
+            ),
+            adbsocket.translate("fake-5554", ["uninstall", "com.dummy;reboot"]),
+        )
+
+    def test_unknown_device_raises(self):
+        """Check FAIL reply is raised as AdbCommandError."""
+        device = simpleadb.AdbDevice("dummy_id", transport=self.transport)
+        with self.assertRaises(simpleadb.AdbCommandError):
+            device.shell("true")
+        self.assertFalse(device.is_available())
+
+    def test_local_service(self):
+        """Check root service output."""
+        self.device.root()
+        self.assertIn("root:", self.fake.requests)
+
+    def test_server_devices(self):
+        """Check devices are listed with host:devices."""
+        adb_server = simpleadb.AdbServer(transport=self.transport)
+        self.assertEqual(["fake-5554"], [str(d) for d in adb_server.devices()])
+
+    def test_unsupported_command_without_fallback_raises(self):
+        """Check unsupported command fails when fallback is disabled."""
+        transport = simpleadb.AdbSocketTransport(port=self.fake.port, fallback=False)
+        device = simpleadb.AdbDevice("fake-5554", transport=transport)
+        with self.assertRaises(simpleadb.AdbCommandError):
+            device.install("dummy.apk")
+
+
+class AdbConnectionPoolTest(FakeAdbTestCase):
+    """Adb connection pool unit tests against fake adb server."""
+
+    def setUp(self):
+        super().setUp()
+        self.pool = adbsocket.AdbConnectionPool(port=self.fake.port)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def wait_idle(self, serial):
+        """Wait until background refill opens idle connection."""
+        deadline = time.monotonic() + 5
+        while self.pool.idle_count(serial) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_idle_connection_is_reused(self):
+        """Check pre-negotiated connection is served from pool."""
+        self.pool.acquire("fake-5554").close()
+        self.wait_idle("fake-5554")
+        with self.pool.acquire("fake-5554") as conn:
+            self.assertTrue(conn.reused)
+            conn.send_request("shell:echo pooled")
+            self.assertEqual(b"pooled\n", conn.read_all())
+        self.assertEqual(1, self.pool.hits)
+
+    def test_max_per_device_limit(self):
+        """Check acquire waits for a free device slot."""
+        self.pool.max_per_device = 1
+        with self.pool.acquire("fake-5554"):
+            with self.assertRaises(socket.timeout):
+                self.pool.acquire("fake-5554", timeout=0.1)
+        self.pool.acquire("fake-5554", timeout=0.1).close()
+
+    def test_expired_idle_connection_is_evicted(self):
+        """Check idle connections older than idle timeout are not used."""
+        self.pool.acquire(None).close()
+        self.wait_idle(None)
+        self.pool.idle_timeout_sec = 0
+        self.pool.evict()
+        self.assertEqual(0, self.pool.idle_count(None))
+
+    def test_transport_commands_use_pool(self):
+        """Check transport commands are served from shared pool."""
+        transport = simpleadb.AdbSocketTransport(port=self.fake.port)
+        device = simpleadb.AdbDevice("fake-5554", transport=transport)
+        device.shell("true")
+        deadline = time.monotonic() + 5
+        while transport.pool.idle_count("fake-5554") == 0:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+        self.assertEqual("1", device.shell("echo 1"))
+        self.assertGreaterEqual(transport.pool.hits, 1)
+        self.assertIs(transport.pool, adbsocket.get_shared_pool(port=self.fake.port))
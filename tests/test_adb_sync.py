@@ -0,0 +1,171 @@
+#
+# file test_adb_sync.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for file sync protocol."""
+
+import io
+import os
+import stat
+import tempfile
+import simpleadb
+from simpleadb import adbsync
+from .fakeadb import FakeAdbTestCase
+
+DATA = bytes(range(256)) * 800
+
+
+class AdbSyncTest(FakeAdbTestCase):
+    """File sync unit tests against fake adb server sync service."""
+
+    def setUp(self):
+        super().setUp()
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.local = os.path.join(self.tmpdir.name, "local")
+        self.remote = os.path.join(self.tmpdir.name, "remote")
+        os.mkdir(self.local)
+        os.mkdir(self.remote)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def read(self, path: str) -> bytes:
+        """Read file content."""
+        with open(path, "rb") as source:
+            return source.read()
+
+    def test_push_file_to_directory(self):
+        """Check file is pushed into remote directory with mode and mtime."""
+        source = os.path.join(self.local, "dummy.bin")
+        with open(source, "wb") as dest:
+            dest.write(DATA)
+        os.chmod(source, 0o600)
+        os.utime(source, (1000000, 1000000))
+        progress = []
+        stats = self.device.push(
+            source, self.remote + "/", lambda *args: progress.append(args)
+        )
+        pushed = os.path.join(self.remote, "dummy.bin")
+        self.assertEqual(DATA, self.read(pushed))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(pushed).st_mode))
+        self.assertEqual(1000000, os.stat(pushed).st_mtime)
+        self.assertEqual(len(DATA), stats.size)
+        self.assertEqual((len(DATA), len(DATA)), progress[-1])
+        self.assertEqual(4, len(progress))
+
+    def test_push_iterable_and_file_object(self):
+        """Check data is streamed from iterables and file objects."""
+        remote = os.path.join(self.remote, "dummy.bin")
+        chunks = [DATA[:1000], DATA[1000:]]
+        self.assertEqual(len(DATA), self.device.push(iter(chunks), remote).size)
+        self.assertEqual(DATA, self.read(remote))
+        self.device.push(io.BytesIO(DATA[:10]), remote)
+        self.assertEqual(DATA[:10], self.read(remote))
+        self.device.push(b"", remote)
+        self.assertEqual(b"", self.read(remote))
+
+    def test_pull_to_directory_and_file_object(self):
+        """Check file is pulled into local directory and file object."""
+        remote = os.path.join(self.remote, "dummy.bin")
+        with open(remote, "wb") as dest:
+            dest.write(DATA)
+        progress = []
+        stats = self.device.pull(
+            remote, self.local, lambda *args: progress.append(args)
+        )
+        self.assertEqual(DATA, self.read(os.path.join(self.local, "dummy.bin")))
+        self.assertEqual(len(DATA), stats.size)
+        self.assertEqual((len(DATA), len(DATA)), progress[-1])
+        dest = io.BytesIO()
+        self.device.pull(remote, dest)
+        self.assertEqual(DATA, dest.getvalue())
+
+    def test_pull_missing_file_raises(self):
+        """Check missing remote file raises AdbCommandError."""
+        with self.assertRaises(simpleadb.AdbCommandError):
+            self.device.pull(os.path.join(self.remote, "dummy"), io.BytesIO())
+
+    def test_push_failure_raises(self):
+        """Check sync FAIL reply raises AdbCommandError."""
+        remote = os.path.join(self.remote, "dummy_dir", "dummy.bin")
+        with self.assertRaises(simpleadb.AdbCommandError):
+            self.device.push(b"data", remote)
+        with self.device.sync() as sync:
+            self.assertFalse(sync.stat(remote).exists)
+
+    def test_stat_and_listdir(self):
+        """Check remote file status and directory listing."""
+        self.device.push(DATA, os.path.join(self.remote, "dummy.bin"))
+        with self.device.sync() as sync:
+            self.assertEqual(len(DATA), sync.stat(self.remote + "/dummy.bin").size)
+            self.assertTrue(sync.stat(self.remote).is_dir)
+            entries = sync.listdir(self.remote)
+        self.assertEqual(["dummy.bin"], [entry.name for entry in entries])
+        self.assertTrue(self.fake.wait_request("sync:QUIT:"))
+
+    def test_sync_requires_socket_transport(self):
+        """Check sync is not available with subprocess transport."""
+        device = simpleadb.AdbDevice("fake-5554")
+        with self.assertRaises(simpleadb.AdbCommandError):
+            device.sync()
+        with self.assertRaises(simpleadb.AdbCommandError):
+            device.push(io.BytesIO(DATA), "/dummy")
+
+    def test_transfer_stats_throughput(self):
+        """Check throughput is computed from size and time."""
+        self.assertEqual(512.0, adbsync.TransferStats("/dummy", 1024, 2).throughput)
+        self.assertEqual(0.0, adbsync.TransferStats("/dummy", 0, 0).throughput)
+
+    def write_tree(self, files: dict) -> None:
+        """Write local files with fixed modification time."""
+        for name, data in files.items():
+            path = os.path.join(self.local, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as dest:
+                dest.write(data)
+            os.utime(path, (1000000, 1000000))
+
+    def test_sync_dir_pushes_changed_files_only(self):
+        """Check only missing and modified files are pushed."""
+        self.write_tree({"a.bin": DATA, "sub/b.txt": b"b", "sub/deep/c.txt": b"c"})
+        remote = os.path.join(self.remote, "assets")
+        result = self.device.sync_dir(self.local, remote, max_workers=2)
+        self.assertEqual(
+            ["a.bin", "sub/b.txt", "sub/deep/c.txt"], sorted(result.pushed)
+        )
+        self.assertEqual(len(DATA) + 2, result.size)
+        self.assertEqual(b"c", self.read(os.path.join(remote, "sub/deep/c.txt")))
+        self.write_tree({"sub/b.txt": b"bb"})
+        result = self.device.sync_dir(self.local, remote)
+        self.assertEqual(["sub/b.txt"], result.pushed)
+        self.assertEqual(2, result.unchanged)
+        self.assertEqual(0, len(self.device.sync_dir(self.local, remote).pushed))
+        listings = [r for r in self.fake.requests if "find " in r]
+        self.assertEqual(3, len(listings))
+
+    def test_sync_dir_delete_and_checksum(self):
+        """Check stale files are deleted and content is compared by digest."""
+        self.write_tree({"a.txt": b"aaa", "b.txt": b"bbb"})
+        self.device.sync_dir(self.local, self.remote)
+        with open(os.path.join(self.remote, "stale.txt"), "wb") as dest:
+            dest.write(b"stale")
+        self.write_tree({"a.txt": b"xxx"})
+        self.assertEqual([], self.device.sync_dir(self.local, self.remote).pushed)
+        result = self.device.sync_dir(
+            self.local, self.remote, delete=True, checksum=True
+        )
+        self.assertEqual(["a.txt"], result.pushed)
+        self.assertEqual(["stale.txt"], result.deleted)
+        self.assertEqual(b"xxx", self.read(os.path.join(self.remote, "a.txt")))
+        self.assertEqual(["a.txt", "b.txt"], sorted(os.listdir(self.remote)))
+
+    def test_quote_chunks(self):
+        """Check shell arguments are quoted and split by length."""
+        chunks = list(adbsync.quote_chunks(["a b", "c", "d"], limit=8))
+        self.assertEqual(["'a b' c", "d"], chunks)
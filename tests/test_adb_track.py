@@ -0,0 +1,149 @@
+#
+# file test_adb_track.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for device tracking."""
+
+import tempfile
+import simpleadb
+from simpleadb import adbtrack
+from .fakeadb import AsyncFakeAdbTestCase, FakeAdbTestCase, create_stub_adb
+
+STUB_ADB = """case "$1" in
+    track-devices) printf '0015emulator-5554\\tdevice\\n0000' ;;
+esac"""
+
+
+def kinds(events):
+    """Get event kind, serial and state tuples."""
+    return [(event.kind, event.serial, event.device.state) for event in events]
+
+
+class AdbTrackTest(FakeAdbTestCase):
+    """Device tracking unit tests against fake adb server."""
+
+    def test_parse_device_line(self):
+        """Check long format properties and multi word states."""
+        info = adbtrack.parse_device_line(
+            "emulator-5554          device product:sdk model:Pixel_6 "
+            "device:emu64 transport_id:7"
+        )
+        self.assertEqual(
+            adbtrack.DeviceInfo(
+                "emulator-5554", "device", "sdk", "Pixel_6", "emu64", 7
+            ),
+            info,
+        )
+        info = adbtrack.parse_device_line(
+            "0123 no permissions (user in plugdev group); see [http://dummy] usb:1-1"
+        )
+        self.assertEqual("0123", info.serial)
+        self.assertTrue(info.state.startswith("no permissions"))
+        self.assertIsNone(info.transport_id)
+        self.assertIsNone(adbtrack.parse_device_line("  "))
+        devices = adbtrack.parse_device_list(
+            "List of devices attached\ndummy\tdevice\n"
+        )
+        self.assertEqual(["dummy"], list(devices))
+
+    def test_registry_events(self):
+        """Check connect, state change and reconnect events."""
+        registry = adbtrack.DeviceRegistry()
+        first = {"a": adbtrack.DeviceInfo("a", "offline", transport_id=1)}
+        self.assertEqual([("connected", "a", "offline")], kinds(registry.update(first)))
+        self.assertEqual([], registry.update(first))
+        second = {"a": adbtrack.DeviceInfo("a", "device", transport_id=1)}
+        events = registry.update(second)
+        self.assertEqual([("state", "a", "device")], kinds(events))
+        self.assertEqual("offline", events[0].previous.state)
+        third = {"a": adbtrack.DeviceInfo("a", "device", transport_id=2)}
+        self.assertEqual(
+            [("disconnected", "a", "device"), ("connected", "a", "device")],
+            kinds(registry.update(third)),
+        )
+        self.assertEqual(["a"], [info.serial for info in registry.devices("device")])
+        self.assertEqual([], registry.devices("offline"))
+        self.assertIn("a", registry)
+
+    def test_track_devices(self):
+        """Check events follow device list changes without polling."""
+        adb_server = simpleadb.AdbServer(transport=self.transport)
+        events = adb_server.track_devices()
+        self.assertEqual(("connected", "fake-5554", "device"), kinds([next(events)])[0])
+        self.fake.devices["fake-5556"] = "offline"
+        self.assertEqual(
+            ("connected", "fake-5556", "offline"), kinds([next(events)])[0]
+        )
+        self.fake.devices["fake-5556"] = "device"
+        self.assertEqual(("state", "fake-5556", "device"), kinds([next(events)])[0])
+        del self.fake.devices["fake-5554"]
+        self.assertEqual(
+            ("disconnected", "fake-5554", "device"), kinds([next(events)])[0]
+        )
+        self.assertEqual(
+            ["fake-5556"], [d.serial for d in adb_server.registry.devices()]
+        )
+        self.assertEqual("Fake", adb_server.registry.get("fake-5556").model)
+        self.fake.stop()
+        self.assertEqual([("disconnected", "fake-5556", "device")], kinds(events))
+        self.assertEqual(0, len(adb_server.registry))
+        self.assertIn("host:track-devices-l", self.fake.requests)
+
+    def test_devices_reuses_handles(self):
+        """Check device objects are reused and filtered by state."""
+        self.fake.devices["fake-5556"] = "offline"
+        adb_server = simpleadb.AdbServer(transport=self.transport)
+        devices = adb_server.devices()
+        self.assertEqual(["fake-5554", "fake-5556"], [d.get_id() for d in devices])
+        self.assertEqual(
+            ["fake-5554"], [d.get_id() for d in adb_server.devices("device")]
+        )
+        self.assertIs(devices[0], adb_server.devices()[0])
+        self.assertEqual(1, adb_server.registry.get("fake-5554").transport_id)
+        self.assertEqual("Fake", adb_server.registry.get("fake-5556").model)
+        del self.fake.devices["fake-5554"]
+        self.fake.devices["fake-5556"] = "device"
+        devices_after = adb_server.devices("device")
+        self.assertEqual(["fake-5556"], [d.get_id() for d in devices_after])
+        self.assertIs(devices[1], devices_after[0])
+        self.assertIn("host:devices-l", self.fake.requests)
+
+    def test_track_devices_subprocess(self):
+        """Check track-devices output of adb client process is parsed."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            adb_server = simpleadb.AdbServer(path=create_stub_adb(tmpdir, STUB_ADB))
+            self.assertEqual(
+                [
+                    ("connected", "emulator-5554", "device"),
+                    ("disconnected", "emulator-5554", "device"),
+                ],
+                kinds(adb_server.track_devices()),
+            )
+
+
+class AsyncAdbTrackTest(AsyncFakeAdbTestCase):
+    """Asyncio device tracking unit tests against fake adb server."""
+
+    async def test_track_devices(self):
+        """Check async events follow device list changes."""
+        adb_server = simpleadb.AsyncAdbServer(transport=self.transport)
+        events = adb_server.track_devices()
+        event = await events.__anext__()
+        self.assertEqual(("connected", "fake-5554"), (event.kind, event.serial))
+        self.fake.devices["fake-5554"] = "offline"
+        event = await events.__anext__()
+        self.assertEqual(("state", "offline"), (event.kind, event.device.state))
+        await events.aclose()
+        self.assertEqual("offline", adb_server.registry.get("fake-5554").state)
+
+    async def test_devices_reuses_handles(self):
+        """Check async device objects are reused and filtered by state."""
+        adb_server = simpleadb.AsyncAdbServer(transport=self.transport)
+        devices = await adb_server.devices()
+        self.assertIs(devices[0], (await adb_server.devices("device"))[0])
+        self.assertEqual([], await adb_server.devices("offline"))
@@ -0,0 +1,127 @@
+#
+# file test_async_adb.py
+#
+# SPDX-FileCopyrightText: (c) 2026 Michal Kielan
+#
+# SPDX-License-Identifier: GPL-3.0-only
+#
+
+# pylint: disable=no-member
+"""Unit tests for asyncio adb device and server."""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+import simpleadb
+from .fakeadb import AsyncFakeAdbTestCase, create_stub_adb
+
+
+class AsyncAdbSocketTest(AsyncFakeAdbTestCase):
+    """Asyncio adb device unit tests against fake adb server."""
+
+    async def test_shell_and_state(self):
+        """Check shell and get-state commands."""
+        device = simpleadb.AsyncAdbDevice("fake-5554", transport=self.transport)
+        self.assertEqual("device", await device.get_state())
+        self.assertEqual("42", await device.shell("echo 42"))
+        with self.assertRaises(simpleadb.AdbCommandError):
+            await device.shell("exit 1")
+
+    async def test_devices(self):
+        """Check devices are listed by async server."""
+        adb_server = simpleadb.AsyncAdbServer(transport=self.transport)
+        await adb_server.start()
+        devices = await adb_server.devices()
+        self.assertEqual(["fake-5554"], [device.get_id() for device in devices])
+
+    async def test_concurrent_commands(self):
+        """Check commands on many devices run concurrently."""
+        self.fake.devices.update({f"fake-{i}": "device" for i in range(10)})
+        devices = [
+            simpleadb.AsyncAdbDevice(f"fake-{i}", transport=self.transport)
+            for i in range(10)
+        ]
+        start = time.monotonic()
+        outputs = await asyncio.gather(
+            *(d.shell("sleep 0.3; echo ok") for d in devices)
+        )
+        self.assertEqual(["ok"] * 10, outputs)
+        self.assertLess(time.monotonic() - start, 2)
+
+    async def test_root(self):
+        """Check root waits only for restarted adbd and reports failures."""
+        device = simpleadb.AsyncAdbDevice("fake-5554", transport=self.transport)
+        wait = "host-serial:fake-5554:wait-for-any-device"
+        self.fake.local_outputs["root"] = "adbd is already running as root"
+        await device.root()
+        self.assertNotIn(wait, self.fake.requests)
+        self.fake.local_outputs["root"] = "restarting adbd as root"
+        await device.root()
+        self.assertIn(wait, self.fake.requests)
+        self.fake.local_outputs["root"] = "unable to restart adbd as root"
+        with self.assertRaises(simpleadb.AdbCommandError):
+            await device.root()
+        self.fake.local_outputs["unroot"] = "adbd cannot run as non root"
+        with self.assertRaises(simpleadb.AdbCommandError):
+            await device.unroot()
+
+    async def test_timeout(self):
+        """Check timeout raises AdbCommandTimeoutExpired."""
+        process = simpleadb.asyncadbprocess.AsyncAdbProcess(
+            "fake-5554", transport=self.transport
+        )
+        with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+            await process.check_output(["shell", "sleep 5"], timeout=0.2)
+
+
+class AsyncAdbSubprocessTest(unittest.IsolatedAsyncioTestCase):
+    """Asyncio adb subprocess transport unit tests with stub adb binary."""
+
+    def setUp(self):
+        # pylint: disable-next=consider-using-with
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    async def test_argv_passed_verbatim(self):
+        """Check args are passed as argv without host shell parsing."""
+        adb = create_stub_adb(self.tmpdir.name, 'printf "%s|" "$@"')
+        device = simpleadb.AsyncAdbDevice("dev 1", path=adb)
+        output = await device.shell("ls | grep 'a b'")
+        self.assertEqual("-s|dev 1|shell|ls | grep 'a b'|", output)
+
+    async def test_non_zero_exit_raises(self):
+        """Check non-zero adb exit status raises AdbCommandError."""
+        adb = create_stub_adb(self.tmpdir.name, "echo error; exit 1")
+        device = simpleadb.AsyncAdbDevice("dev", path=adb)
+        with self.assertRaises(simpleadb.AdbCommandError) as ctx:
+            await device.get_state()
+        self.assertEqual("error\n", ctx.exception.called_process_error.output)
+
+    async def test_cancel_kills_process(self):
+        """Check cancelled command kills adb process."""
+        pid_file = os.path.join(self.tmpdir.name, "pid")
+        adb = create_stub_adb(self.tmpdir.name, f"echo $$ > {pid_file}; exec sleep 30")
+        device = simpleadb.AsyncAdbDevice("dev", path=adb)
+        task = asyncio.ensure_future(device.get_state())
+        while not os.path.exists(pid_file):
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        with open(pid_file, encoding="utf-8") as pid:
+            with self.assertRaises(ProcessLookupError):
+                os.kill(int(pid.read()), 0)
+
+    async def test_timeout_kills_process(self):
+        """Check timeout raises AdbCommandTimeoutExpired."""
+        adb = create_stub_adb(self.tmpdir.name, "exec sleep 30")
+        device = simpleadb.AsyncAdbDevice("dev", path=adb)
+        start = time.monotonic()
+        with self.assertRaises(simpleadb.AdbCommandTimeoutExpired):
+            await device.wait_for_device(0.2)
+        self.assertLess(time.monotonic() - start, 5)
@@ -13,6 +13,7 @@ import os
 import shutil
 import time
 import wget
+import simpleadb
 
 DUMMY_APK_VERSION = "0.0.1"
 DUMMY_APK_NAME = "app-debug.apk"
@@ -50,8 +51,9 @@ def is_github_workflows_env() -> bool:
 def android_wait_for_emulator() -> None:
     """Wait for android emulator."""
     if is_github_workflows_env():
-        os.system("adb wait-for-device shell 'while [[ -z $(getprop \
-            sys.boot_completed)]]; do sleep 1; done; input keyevent 82'")
+        device = simpleadb.AdbDevice(get_test_device_id(), path=get_adb_path())
+        device.wait_until_ready()
+        device.shell("input keyevent 82")
 
 
 def enable_root_tests() -> bool: